@@ -1,8 +1,10 @@
 from .x_collector import SafeXCollector, CollectionResult
 from .classifier import TweetClassifier
+from .collect_scheduler import CollectScheduler, ScheduledJob, JobOutcome, classify_block_error
+from .graphql_timeline import TimelineCapture, parse_timeline_response
 from .config import (
     INFLUENCER_GROUPS, SEARCH_URLS, CLASSIFICATION_RULES,
-    BATCH_SETTINGS, BLOCK_ERROR_PATTERNS, CollectTask, build_collect_tasks
+    BATCH_SETTINGS, SCHEDULER_SETTINGS, BLOCK_ERROR_PATTERNS, CollectTask, build_collect_tasks
 )
 from .inactive_checker import (
     run_inactive_check, detect_inactive_accounts,
@@ -12,11 +14,18 @@ from .inactive_checker import (
 __all__ = [
     'SafeXCollector',
     'CollectionResult',
+    'CollectScheduler',
+    'ScheduledJob',
+    'JobOutcome',
+    'classify_block_error',
+    'TimelineCapture',
+    'parse_timeline_response',
     'TweetClassifier',
     'INFLUENCER_GROUPS',
     'SEARCH_URLS',
     'CLASSIFICATION_RULES',
     'BATCH_SETTINGS',
+    'SCHEDULER_SETTINGS',
     'BLOCK_ERROR_PATTERNS',
     'CollectTask',
     'build_collect_tasks',
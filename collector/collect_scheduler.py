@@ -0,0 +1,252 @@
+"""
+並行収集スケジューラ
+
+独立したブラウザページ（コンテキスト）を複数並行に回し、人間らしい待機はページごとに
+そのまま残したまま、全体のページ訪問数を毎分の予算で縛る。
+ブロック系エラー（BLOCK_ERROR_PATTERNS）はアカウント（ジョブのキー）単位でバックオフし、
+他のアカウントの収集は止めない。
+
+規約:
+- 同じキー（アカウント/検索URL）のジョブは同時に1つしか走らせない
+  ＝並行化してもアカウント単位の訪問頻度は上げない
+- Playwright の sync API はスレッドをまたげないため、ページはワーカースレッド内で開く
+  （open_worker / close_worker はワーカーごとに1回ずつ、そのスレッドで呼ばれる）
+- fatal_errors（Cookie 失効等）は全ワーカーを止めて呼び出し元へ再送出する
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import BLOCK_ERROR_PATTERNS, SCHEDULER_SETTINGS
+
+
+def classify_block_error(error_str: str) -> str:
+    """
+    エラー文字列からブロック種別を判定
+
+    Args:
+        error_str: エラーメッセージ文字列
+
+    Returns:
+        ブロック種別文字列（BLOCK_ERROR_PATTERNS の要素）。ブロックでない場合は空文字
+    """
+    error_upper = error_str.upper()
+    for pattern in BLOCK_ERROR_PATTERNS:
+        if pattern.upper() in error_upper:
+            return pattern
+    return ""
+
+
+@dataclass
+class ScheduledJob:
+    """スケジューラに渡すジョブ1件"""
+    key: str                 # バックオフと同時実行制限の単位（アカウント名・検索URL）
+    payload: Any             # handler に渡す中身（CollectTask・ハンドル設定等）
+    attempts: int = 0
+    not_before: float = 0.0  # バックオフ中はこの時刻（monotonic）まで着手しない
+
+
+@dataclass
+class JobOutcome:
+    """ジョブ1件の最終結果"""
+    job: ScheduledJob
+    status: str = "pending"          # "completed", "blocked", "failed"
+    result: Any = None               # 最後の試行の handler 戻り値
+    error_type: str = ""
+    error_message: str = ""
+    attempt_results: List[Any] = field(default_factory=list)  # ブロックで打ち切った試行の戻り値（部分結果の回収用）
+
+
+class RequestBudget:
+    """全ワーカー共有のページ訪問予算（毎分 per_minute 回・訪問枠を等間隔に払い出す）"""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute and per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, stop: Optional[threading.Event] = None):
+        """次の訪問枠まで待つ"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        wait = slot - time.monotonic()
+        if wait > 0:
+            if stop is not None:
+                stop.wait(wait)
+            else:
+                time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """全ワーカーの訪問を seconds 秒止める（レート制限の検知時）"""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+class CollectScheduler:
+    """
+    並行収集スケジューラ
+
+    使い方:
+        scheduler = CollectScheduler(workers=3, requests_per_minute=3)
+        outcomes = scheduler.run(jobs, handler, open_worker=..., close_worker=...)
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        requests_per_minute: float = None,
+        max_attempts: int = None,
+        backoff_sec: Dict[str, float] = None,
+        global_pause_errors: List[str] = None,
+        fatal_errors: tuple = (),
+    ):
+        """
+        Args:
+            workers: 同時に開くページ数（省略時は SCHEDULER_SETTINGS）
+            requests_per_minute: 全ワーカー合計のページ訪問上限
+            max_attempts: ブロック系エラー時の同一ジョブ試行上限
+            backoff_sec: エラー種別 → 初回バックオフ秒（"default" キーで既定値）。2回目以降は倍々
+            global_pause_errors: 全ワーカーの訪問予算も止めるエラー種別
+            fatal_errors: 捕捉せず全体を止めて再送出する例外型
+        """
+        s = SCHEDULER_SETTINGS
+        self.workers = max(1, workers if workers is not None else s["workers"])
+        self.budget = RequestBudget(
+            requests_per_minute if requests_per_minute is not None else s["requests_per_minute"]
+        )
+        self.max_attempts = max(1, max_attempts if max_attempts is not None else s["max_attempts"])
+        self.backoff_sec = dict(backoff_sec if backoff_sec is not None else s["backoff_sec"])
+        self.global_pause_errors = set(
+            global_pause_errors if global_pause_errors is not None else s["global_pause_errors"]
+        )
+        self.fatal_errors = fatal_errors
+
+    def _backoff_for(self, error_type: str, attempts: int) -> float:
+        base = self.backoff_sec.get(error_type, self.backoff_sec.get("default", 900))
+        return base * (2 ** (attempts - 1))
+
+    def run(
+        self,
+        jobs: List[ScheduledJob],
+        handler: Callable[[Any, Any], Any],
+        open_worker: Callable[[], Any] = None,
+        close_worker: Callable[[Any], None] = None,
+        blocked_of: Callable[[Any], str] = None,
+    ) -> List[JobOutcome]:
+        """
+        ジョブを並行実行する
+
+        Args:
+            jobs: ジョブのリスト
+            handler: handler(payload, worker_resource) → 結果。例外はブロック種別で分類する
+            open_worker: ワーカースレッド内で1回呼ぶ資源の生成（ページを開く等）
+            close_worker: ワーカー終了時に資源を閉じる
+            blocked_of: 戻り値からブロック種別を取り出す（空文字なら成功扱い）
+
+        Returns:
+            jobs と同じ順の JobOutcome リスト
+        """
+        outcomes = {id(j): JobOutcome(job=j) for j in jobs}
+        queue: List[ScheduledJob] = list(jobs)
+        running_keys: set = set()
+        cond = threading.Condition()
+        stop = threading.Event()
+        fatal: List[BaseException] = []
+
+        def next_job() -> Optional[ScheduledJob]:
+            """着手できるジョブを1つ取る。全て片付いたら None"""
+            with cond:
+                while not stop.is_set():
+                    if not queue:
+                        return None
+                    now = time.monotonic()
+                    ready = [j for j in queue if j.key not in running_keys and j.not_before <= now]
+                    if ready:
+                        job = min(ready, key=lambda j: j.not_before)
+                        queue.remove(job)
+                        running_keys.add(job.key)
+                        return job
+                    # バックオフ明け or 他ワーカーの完了を待つ
+                    waits = [j.not_before - now for j in queue
+                             if j.key not in running_keys and j.not_before > now]
+                    cond.wait(timeout=min(waits) if waits else None)
+                return None
+
+        def finish(job: ScheduledJob, requeue: bool):
+            with cond:
+                running_keys.discard(job.key)
+                if requeue:
+                    queue.append(job)
+                cond.notify_all()
+
+        def worker():
+            resource = None
+            try:
+                if open_worker is not None:
+                    resource = open_worker()
+                while True:
+                    job = next_job()
+                    if job is None:
+                        return
+                    outcome = outcomes[id(job)]
+                    self.budget.acquire(stop)
+                    if stop.is_set():
+                        finish(job, requeue=False)
+                        return
+                    job.attempts += 1
+                    try:
+                        result = handler(job.payload, resource)
+                        error_type = blocked_of(result) if blocked_of is not None else ""
+                        error_message = getattr(result, "error_message", "") or error_type
+                    except self.fatal_errors:
+                        raise
+                    except Exception as e:
+                        result = None
+                        error_type = classify_block_error(str(e))
+                        error_message = str(e)
+                        if not error_type:
+                            outcome.status, outcome.result = "failed", None
+                            outcome.error_message = error_message
+                            finish(job, requeue=False)
+                            continue
+                    outcome.result = result
+                    if not error_type:
+                        outcome.status = "completed"
+                        outcome.error_type = outcome.error_message = ""
+                        finish(job, requeue=False)
+                        continue
+                    # ブロック系: アカウント単位のバックオフ（他のアカウントは止めない）
+                    outcome.status, outcome.error_type = "blocked", error_type
+                    outcome.error_message = error_message
+                    if result is not None:
+                        outcome.attempt_results.append(result)
+                    if error_type in self.global_pause_errors:
+                        self.budget.pause(self._backoff_for(error_type, 1))
+                    retry = job.attempts < self.max_attempts
+                    if retry:
+                        job.not_before = time.monotonic() + self._backoff_for(error_type, job.attempts)
+                    finish(job, requeue=retry)
+            except BaseException as e:  # noqa: BLE001  fatal はここで全体停止して run から再送出
+                fatal.append(e)
+                stop.set()
+                with cond:
+                    cond.notify_all()
+            finally:
+                if close_worker is not None and resource is not None:
+                    try:
+                        close_worker(resource)
+                    except Exception:
+                        pass
+
+        threads = [threading.Thread(target=worker, name=f"collect-worker-{i}", daemon=True)
+                   for i in range(min(self.workers, max(1, len(jobs))))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if fatal:
+            raise fatal[0]
+        return [outcomes[id(j)] for j in jobs]
@@ -614,6 +614,39 @@ BATCH_SETTINGS = {
     "block_cooldown_sec": 3600,               # ブロック時クールダウン（60分）
 }
 
+# 並行収集スケジューラ設定（collector/collect_scheduler.py）
+# ページ（ブラウザコンテキスト）を複数並行に開くが、ページ訪問の総数は毎分の予算で縛る。
+# 同じアカウント/URL へは同時に1ページまで＝並行化してもアカウント単位の訪問頻度は上げない
+SCHEDULER_SETTINGS = {
+    "workers": 3,                             # 同時に開くページ（コンテキスト）数
+    "requests_per_minute": 3,                 # 全ワーカー合計のページ訪問上限
+    "max_attempts": 3,                        # ブロック系エラー時の同一ジョブ試行上限
+    "backoff_sec": {                          # エラー種別（BLOCK_ERROR_PATTERNS）ごとの初回バックオフ
+        "429": 3600,                          #   レート制限は長め（block_cooldown_sec と同値）
+        "default": 900,                       #   接続系（net::ERR_ 等）
+    },
+    "global_pause_errors": ["429"],           # この種別は全ワーカーの訪問予算も止める
+}
+
+# 非活動チェック設定（collector/inactive_checker.py）
+# アカウントごとの確認結果を保存し、状態ごとの鮮度内なら再訪問しない。凍結・不存在は戻ることが
+# 少ないので長め、active は週次の実行で確実に再確認される長さにする。error は保存しない（毎回再確認）
+INACTIVE_CHECK_CONFIG = {
+    "status_file": "inactive_status.json",    # 出力ディレクトリ直下のアカウント単位の確認結果
+    "ttl_days": {                             # 状態 → 再確認までの日数
+        "active": 6,                          #   ※最終投稿日+閾値日数を過ぎる時点でも再確認する
+        "no_tweets_found": 7,
+        "protected": 14,
+        "suspended": 30,
+        "not_found": 30,
+    },
+    "workers": 3,                             # 同時に開くページ（コンテキスト）数
+    "requests_per_minute": 12,                # 全ワーカー合計のプロフィール訪問上限
+    "max_attempts": 2,                        # ブロック系エラー時の同一アカウント試行上限
+    "backoff_sec": {"429": 600, "default": 120},
+    "global_pause_errors": ["429"],
+}
+
 # ブロック検知エラーパターン
 BLOCK_ERROR_PATTERNS = [
     "ERR_CONNECTION_CLOSED", "ERR_CONNECTION_REFUSED",
@@ -654,6 +687,7 @@ DISCOVERY_CONFIG = {
     "min_followers": 3000,
     "default_max_candidates": 50,
     "batch_result_limit": 15,
+    "concurrency": 3,              # 同時に投げるバッチ数（発見・スクリーニング共通）
 }
 
 # スクリーニング設定
@@ -661,7 +695,9 @@ SCREENING_CONFIG = {
     "screen_batch_size": 10,       # allowed_x_handles上限
     "screen_result_limit": 5,      # 候補あたりの代表ツイート数
     "screen_min_score": 20,        # 最低relevanceスコア
-    "screen_cooldown_sec": 2,      # バッチ間クールダウン
+    "screen_cooldown_sec": 2,      # 送信間隔（並行バッチ全体で共有する送信枠。発見にも適用）
+    "screen_cache_file": "output/grok_screen_cache.json",  # ハンドル単位のスクリーニング結果
+    "screen_cache_ttl_sec": 7 * 24 * 3600,                 # これより古い結果は再スクリーニング
 }
 
 # リサーチ用キーワード
@@ -0,0 +1,314 @@
+"""
+GraphQL タイムライン傍受
+
+X の Web クライアントがタイムライン描画のために取りに行く GraphQL 応答（UserTweets /
+SearchTimeline 等）を context/page の "response" イベントで拾い、ツイートの id・本文（長文は
+note_tweet の全文）・投稿時刻・指標を応答 JSON から直接取り出す。
+
+背景（2026-10-19）:
+  SafeXCollector / x_search_collect_twittora / x_watchlist_tracer はカード1枚ごとに
+  inner_text・get_attribute・aria-label 解析を何往復も行っていた。遅いうえ、仮想化スクロール中の
+  空本文・翻訳表示・長文の切断で取りこぼす（apply_syndication_pass の救済が要る原因）。
+  fetch_bookmarks が既に行っている GraphQL 傍受（_deep_find_tweets）を一般化した共有部品。
+
+規約:
+- 傍受は補助。応答が取れなかったカードは従来どおり DOM から読む（呼び出し側のフォールバック）
+- 指標は legacy の整数をそのまま使う（表示文字列の「万」「K」を解釈しない）。欠測は None
+- Service Worker が応答を横取りすると傍受できないため、コンテキストは service_workers="block" で開く
+- sync API のイベントはページを開いたスレッドで配送される＝1ワーカー1インスタンスで使う
+"""
+import html
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from collector.logger import get_logger
+
+logger = get_logger(__name__)
+
+# タイムライン系の GraphQL 操作名（URL: /i/api/graphql/<hash>/<操作名>?variables=...）
+TIMELINE_OPERATIONS = (
+    "UserTweets",
+    "UserTweetsAndReplies",
+    "SearchTimeline",
+    "HomeTimeline",
+    "HomeLatestTimeline",
+    "ListLatestTweetsTimeline",
+    "Bookmarks",
+    "TweetDetail",
+)
+
+_OPERATION_RE = re.compile(r"/graphql/[^/]+/([A-Za-z]+)")
+_MAX_DEPTH = 16  # SearchTimeline の会話モジュール（content.items[].item.itemContent）まで届く深さ
+
+
+def find_tweet_results(obj, depth: int = 0) -> list:
+    """応答 JSON の任意の深さにある tweet_results.result を出現順に集める。"""
+    results = []
+    if depth > _MAX_DEPTH:
+        return results
+    if isinstance(obj, dict):
+        if "tweet_results" in obj and isinstance(obj["tweet_results"], dict):
+            result = obj["tweet_results"].get("result")
+            if result:
+                results.append(result)
+        for v in obj.values():
+            results.extend(find_tweet_results(v, depth + 1))
+    elif isinstance(obj, list):
+        for item in obj:
+            results.extend(find_tweet_results(item, depth + 1))
+    return results
+
+
+def _pinned_ids(data) -> set:
+    """TimelinePinEntry（プロフィールの固定ポスト）の tweet id。"""
+    pinned = set()
+
+    def walk(obj, depth=0):
+        if depth > _MAX_DEPTH:
+            return
+        if isinstance(obj, dict):
+            if obj.get("type") == "TimelinePinEntry":
+                for r in find_tweet_results(obj):
+                    tid = _unwrap(r).get("rest_id")
+                    if tid:
+                        pinned.add(tid)
+                return
+            for v in obj.values():
+                walk(v, depth + 1)
+        elif isinstance(obj, list):
+            for item in obj:
+                walk(item, depth + 1)
+
+    walk(data)
+    return pinned
+
+
+def _unwrap(result: dict) -> dict:
+    """TweetWithVisibilityResults 等のラッパーを外す。"""
+    if isinstance(result, dict) and "tweet" in result and "legacy" not in result:
+        return result["tweet"] or {}
+    return result or {}
+
+
+def _user_of(tweet: dict) -> dict:
+    user = tweet.get("core", {}).get("user_results", {}).get("result", {}) or {}
+    legacy = user.get("legacy", {}) or {}
+    core = user.get("core", {}) or {}  # 2025 以降の応答は screen_name/name を core に持つ
+    return {
+        "screen_name": core.get("screen_name") or legacy.get("screen_name") or "",
+        "name": core.get("name") or legacy.get("name") or "",
+    }
+
+
+def _int_or_none(v) -> Optional[int]:
+    if isinstance(v, bool):
+        return None
+    if isinstance(v, int):
+        return v
+    if isinstance(v, str) and v.isdigit():
+        return int(v)
+    return None
+
+
+def _display_text(tweet: dict) -> tuple:
+    """表示上の本文と長文フラグ。note_tweet（280字超の長文）があればその全文を正とする。"""
+    legacy = tweet.get("legacy", {}) or {}
+    note = tweet.get("note_tweet", {}).get("note_tweet_results", {}).get("result", {}) or {}
+    if note.get("text"):
+        text, urls, is_long = note["text"], (note.get("entity_set", {}) or {}).get("urls", []), True
+    else:
+        text = legacy.get("full_text", "") or ""
+        rng = legacy.get("display_text_range")
+        # 返信先の @ 列と末尾のメディア t.co はカードの本文に出ない（display_text_range の外）
+        if isinstance(rng, list) and len(rng) == 2:
+            text = text[rng[0]:rng[1]]
+        urls = (legacy.get("entities", {}) or {}).get("urls", [])
+        is_long = False
+    for u in urls or []:
+        if u.get("url") and u.get("expanded_url"):
+            text = text.replace(u["url"], u["expanded_url"])
+    # U+2028/U+2029 は json.dumps 素通し + splitlines() を割る → 無害化 (2026-07-21 と同じ)
+    text = html.unescape(text).replace("\u2028", " ").replace("\u2029", " ").strip()
+    return text, is_long or len(text) > 280
+
+
+def _article(tweet: dict) -> Optional[dict]:
+    art = tweet.get("article", {}).get("article_results", {}).get("result", {}) or {}
+    if art.get("title") or art.get("preview_text"):
+        return {"title": art.get("title") or "", "preview_text": art.get("preview_text") or ""}
+    return None
+
+
+def to_iso_utc(created_at: str) -> str:
+    """legacy.created_at（"Sun Oct 19 00:00:00 +0000 2026"）を <time datetime> と同じ形式へ。"""
+    try:
+        t = datetime.strptime(created_at, "%a %b %d %H:%M:%S %z %Y")
+    except (TypeError, ValueError):
+        return ""
+    return t.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def parse_tweet_result(result: dict) -> Optional[Dict]:
+    """tweet_results.result 1件を正規化した辞書にする。ツイートでなければ None。
+
+    リポストはカードと同じく元投稿の中身を返し、reposted_by にリポストしたアカウントを入れる。
+
+    Returns:
+        {"id", "screen_name", "name", "text", "is_long_form", "created_at",
+         "likes", "retweets", "replies", "quotes", "bookmarks", "impressions",
+         "article", "reposted_by", "pinned"}
+    """
+    tweet = _unwrap(result)
+    legacy = tweet.get("legacy")
+    if not isinstance(legacy, dict):
+        return None
+    reposted_by = ""
+    inner = legacy.get("retweeted_status_result", {}).get("result")
+    if inner:
+        reposted_by = _user_of(tweet)["screen_name"]
+        tweet = _unwrap(inner)
+        legacy = tweet.get("legacy")
+        if not isinstance(legacy, dict):
+            return None
+    tweet_id = legacy.get("id_str") or tweet.get("rest_id") or ""
+    user = _user_of(tweet)
+    if not tweet_id or not user["screen_name"]:
+        return None
+    text, is_long = _display_text(tweet)
+    return {
+        "id": tweet_id,
+        "screen_name": user["screen_name"],
+        "name": user["name"],
+        "text": text,
+        "is_long_form": is_long,
+        "created_at": to_iso_utc(legacy.get("created_at", "")),
+        "likes": _int_or_none(legacy.get("favorite_count")),
+        "retweets": _int_or_none(legacy.get("retweet_count")),
+        "replies": _int_or_none(legacy.get("reply_count")),
+        "quotes": _int_or_none(legacy.get("quote_count")),
+        "bookmarks": _int_or_none(legacy.get("bookmark_count")),
+        "impressions": _int_or_none((tweet.get("views") or {}).get("count")),
+        "article": _article(tweet),
+        "reposted_by": reposted_by,
+        "pinned": False,
+    }
+
+
+def parse_timeline_response(data) -> List[Dict]:
+    """GraphQL 応答1件からツイートを出現順に取り出す（同一応答内の重複は先勝ち）。"""
+    pinned = _pinned_ids(data)
+    out, seen = [], set()
+    for r in find_tweet_results(data):
+        t = parse_tweet_result(r)
+        if t is None or t["id"] in seen:
+            continue
+        seen.add(t["id"])
+        t["pinned"] = t["id"] in pinned
+        out.append(t)
+    return out
+
+
+def operation_of(url: str) -> str:
+    """GraphQL の URL から操作名を取り出す。GraphQL でなければ空文字。"""
+    m = _OPERATION_RE.search(url or "")
+    return m.group(1) if m else ""
+
+
+class TimelineCapture:
+    """
+    タイムライン応答の傍受バッファ
+
+    使い方:
+        capture = TimelineCapture(operations=("SearchTimeline",))
+        capture.attach(context)          # または page
+        page.goto(url)
+        for t in capture.take():         # 前回 take 以降に届いたツイート（到着順）
+            ...
+        capture.get(tweet_id)            # id で引く（DOM カードとの突き合わせ用）
+    """
+
+    def __init__(self, operations: Iterable[str] = TIMELINE_OPERATIONS):
+        self.operations = set(operations)
+        self._by_id: Dict[str, Dict] = {}
+        self._order: List[str] = []
+        self._taken = 0
+        self._targets: list = []
+        self.responses = 0   # 取り込んだ応答数（self-check 用）
+
+    def attach(self, target):
+        """page または context の "response" を購読する"""
+        target.on("response", self._on_response)
+        self._targets.append(target)
+        return self
+
+    def detach(self):
+        for target in self._targets:
+            try:
+                target.remove_listener("response", self._on_response)
+            except Exception:
+                pass
+        self._targets = []
+
+    def clear(self):
+        """ページ遷移前に呼ぶ（前のページの応答を次のページの結果に混ぜない）"""
+        self._by_id.clear()
+        self._order.clear()
+        self._taken = 0
+
+    def _on_response(self, response):
+        try:
+            if operation_of(response.url) not in self.operations:
+                return
+            self.ingest(response.json())
+        except Exception as e:
+            logger.debug(f"GraphQL 応答の解析をスキップ: {e}")
+
+    def ingest(self, data) -> int:
+        """応答 JSON を取り込む。新規件数を返す（同じ id は指標の新しい方で上書き・順序は初出）"""
+        self.responses += 1
+        new = 0
+        for t in parse_timeline_response(data):
+            if t["id"] not in self._by_id:
+                self._order.append(t["id"])
+                new += 1
+            elif self._by_id[t["id"]]["pinned"]:
+                t["pinned"] = True
+            self._by_id[t["id"]] = t
+        return new
+
+    def get(self, tweet_id: str) -> Optional[Dict]:
+        return self._by_id.get(str(tweet_id))
+
+    def tweets(self) -> List[Dict]:
+        """これまでに届いた全ツイート（到着順）"""
+        return [self._by_id[i] for i in self._order]
+
+    def take(self) -> List[Dict]:
+        """前回 take 以降に届いたツイート（到着順）"""
+        fresh = self._order[self._taken:]
+        self._taken = len(self._order)
+        return [self._by_id[i] for i in fresh]
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+# カードごとの locator 往復をせず、表示中カードの先頭 status リンクを1回の evaluate で読む
+_CARD_HREFS_JS = """
+(cards) => cards.map(c => {
+  const a = c.querySelector('a[href*="/status/"]');
+  return a ? a.getAttribute('href') : '';
+})
+"""
+
+
+def card_status_hrefs(page, selector: str = '[data-testid="tweet"]') -> Optional[List[str]]:
+    """表示中カードそれぞれの先頭 status リンク（DOM 順・無ければ空文字）。
+
+    evaluate 自体が失敗した時は None（呼び出し側は全カードを DOM から読む従来経路へ戻す）。
+    """
+    try:
+        return page.eval_on_selector_all(selector, _CARD_HREFS_JS) or []
+    except Exception:
+        return None
@@ -1,16 +1,29 @@
-"""Grok APIを用いた投資インフルエンサー候補発見クライアント。"""
-
+"""Grok APIを用いた投資インフルエンサー候補発見クライアント。
+
+発見（キーワード/ネットワーク）とスクリーニングのバッチは concurrency 本まで並行に投げる（2026-10-19）。
+- 送信枠は collect_scheduler.RequestBudget を全バッチで共有する（screen_cooldown_sec 間隔＝従来の
+  バッチ間クールダウンと同じ毎分の上限）
+- 結果はバッチの完了順ではなくバッチ順にマージするので、並行度によらず同じ出力になる
+- スクリーニング結果はハンドル単位に screen_cache_file へ保存し、screen_cache_ttl_sec 以内の
+  ハンドルは再スクリーニングしない（候補プールの再スクリーニングは新しいハンドルの分だけ）。
+  期間を明示したスクリーニングは期間ごとに別の鍵で保存する
+"""
+
+import json
 import os
 import re
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from pydantic import BaseModel, Field
 from xai_sdk import Client
 from xai_sdk.chat import system, user
 from xai_sdk.tools import x_search
 
+from collector.collect_scheduler import RequestBudget
 from collector.logger import get_logger
 
 
@@ -27,6 +40,13 @@ DEFAULT_DISCOVERY_CONFIG = {
     "min_followers": 3000,
     "default_max_candidates": 50,
     "batch_result_limit": 10,
+    "concurrency": 3,
+}
+
+DEFAULT_SCREENING_CACHE = {
+    "screen_cooldown_sec": 2,
+    "screen_cache_file": "output/grok_screen_cache.json",
+    "screen_cache_ttl_sec": 7 * 24 * 3600,
 }
 
 
@@ -76,15 +96,23 @@ class GrokClient:
         max_retries: int = 3,
         retry_backoff_base: float = 2.0,
         timeout_seconds: int = 120,
+        concurrency: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        client: Optional[Any] = None,
     ):
         try:
             from .config import DISCOVERY_CONFIG
             config = {**DEFAULT_DISCOVERY_CONFIG, **DISCOVERY_CONFIG}
         except (ImportError, AttributeError):
             config = DEFAULT_DISCOVERY_CONFIG.copy()
+        try:
+            from .config import SCREENING_CONFIG
+            screening = {**DEFAULT_SCREENING_CACHE, **SCREENING_CONFIG}
+        except (ImportError, AttributeError):
+            screening = DEFAULT_SCREENING_CACHE.copy()
 
         self.api_key = api_key or os.environ.get("XAI_API_KEY")
-        if not self.api_key:
+        if not self.api_key and client is None:
             raise ValueError(
                 "APIキーが設定されていません。環境変数XAI_API_KEYを設定するか、"
                 "コンストラクタでapi_keyを指定してください。"
@@ -111,8 +139,13 @@ class GrokClient:
         self.batch_result_limit = config.get(
             "batch_result_limit", DEFAULT_DISCOVERY_CONFIG["batch_result_limit"]
         )
+        self.concurrency = max(1, concurrency or config.get("concurrency", DEFAULT_DISCOVERY_CONFIG["concurrency"]))
+        cooldown = screening["screen_cooldown_sec"]
+        self.budget = RequestBudget(requests_per_minute or (60.0 / cooldown if cooldown else 0))
+        self.screen_cache_file = screening["screen_cache_file"]
+        self.screen_cache_ttl_sec = screening["screen_cache_ttl_sec"]
 
-        self.client = Client(api_key=self.api_key, timeout=self.timeout_seconds)
+        self.client = client if client is not None else Client(api_key=self.api_key, timeout=self.timeout_seconds)
 
     def discover_by_keywords(
         self,
@@ -134,19 +167,20 @@ class GrokClient:
         candidates_by_username: dict[str, dict[str, Any]] = {}
         errors: list[dict[str, Any]] = []
 
-        for batch in batches:
-            prompt = self._build_keyword_prompt(batch, max_candidates=min(self.batch_result_limit, max_candidates))
-            try:
-                result = self._search_batch(
-                    prompt=prompt,
-                    from_date=from_dt,
-                    to_date=to_dt,
-                    excluded_handles=excluded_handles,
-                    max_candidates=min(self.batch_result_limit, max_candidates),
-                )
+        def search(batch: list[str]) -> dict:
+            return self._search_batch(
+                prompt=self._build_keyword_prompt(batch, max_candidates=min(self.batch_result_limit, max_candidates)),
+                from_date=from_dt,
+                to_date=to_dt,
+                excluded_handles=excluded_handles,
+                max_candidates=min(self.batch_result_limit, max_candidates),
+            )
+
+        for batch, (result, exc) in zip(batches, self._run_batches(batches, search)):
+            if exc is None:
                 self._merge_candidates(candidates_by_username, result.get("candidates", []), excluded_handles)
                 errors.extend(result.get("errors", []))
-            except Exception as exc:
+            else:
                 error = {"batch": batch, "error": self._sanitize_log(str(exc))}
                 errors.append(error)
                 logger.error("Keyword discovery batch failed", extra={"extra_data": error})
@@ -185,19 +219,20 @@ class GrokClient:
         candidates_by_username: dict[str, dict[str, Any]] = {}
         errors: list[dict[str, Any]] = []
 
-        for batch in batches:
-            prompt = self._build_network_prompt(batch, max_candidates=min(self.batch_result_limit, max_candidates))
-            try:
-                result = self._search_batch(
-                    prompt=prompt,
-                    from_date=from_dt,
-                    to_date=to_dt,
-                    excluded_handles=excluded,
-                    max_candidates=min(self.batch_result_limit, max_candidates),
-                )
+        def search(batch: list[str]) -> dict:
+            return self._search_batch(
+                prompt=self._build_network_prompt(batch, max_candidates=min(self.batch_result_limit, max_candidates)),
+                from_date=from_dt,
+                to_date=to_dt,
+                excluded_handles=excluded,
+                max_candidates=min(self.batch_result_limit, max_candidates),
+            )
+
+        for batch, (result, exc) in zip(batches, self._run_batches(batches, search)):
+            if exc is None:
                 self._merge_candidates(candidates_by_username, result.get("candidates", []), excluded)
                 errors.extend(result.get("errors", []))
-            except Exception as exc:
+            else:
                 error = {"batch": batch, "error": self._sanitize_log(str(exc))}
                 errors.append(error)
                 logger.error("Network discovery batch failed", extra={"extra_data": error})
@@ -214,6 +249,19 @@ class GrokClient:
             },
         }
 
+    def _run_batches(self, batches: list[list[str]], call: Callable[[list[str]], dict]) -> list[tuple]:
+        """batches を concurrency 本まで並行に call し、(結果, 例外) をバッチ順に返す。"""
+        def run(batch: list[str]) -> tuple:
+            try:
+                return call(batch), None
+            except Exception as exc:
+                return None, exc
+
+        if self.concurrency <= 1 or len(batches) <= 1:
+            return [run(batch) for batch in batches]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as pool:
+            return list(pool.map(run, batches))
+
     def _search_batch(
         self,
         prompt: str,
@@ -230,6 +278,7 @@ class GrokClient:
         structured_prompt = self._build_structured_prompt(prompt, allowed, excluded, max_candidates)
 
         for attempt in range(self.max_retries):
+            self.budget.acquire()
             try:
                 chat = self.client.chat.create(
                     model=self.model,
@@ -499,6 +548,7 @@ class GrokClient:
     ) -> dict:
         """1バッチ分のスクリーニングを実行する。"""
         for attempt in range(self.max_retries):
+            self.budget.acquire()
             try:
                 chat = self.client.chat.create(
                     model=self.model,
@@ -542,12 +592,43 @@ class GrokClient:
 
         return {"candidates": [], "errors": [{"handles": handles, "error": "unknown error"}]}
 
+    def _screen_cache_key(self, handle: str, window: Optional[tuple] = None) -> str:
+        """既定の直近窓は model:handle、明示した期間は日付を足して別の鍵にする（期間違いの結果を返さない）。"""
+        if window is None:
+            return f"{self.model}:{handle}"
+        return f"{self.model}:{handle}:{window[0].isoformat()}:{window[1].isoformat()}"
+
+    def _load_screen_cache(self) -> dict[str, dict[str, Any]]:
+        """ハンドル単位のスクリーニング結果 {鍵: {"screened_at": epoch秒, "candidate": dict|None}}。"""
+        if not self.screen_cache_file or not os.path.exists(self.screen_cache_file):
+            return {}
+        try:
+            with open(self.screen_cache_file, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", {})
+        except (json.JSONDecodeError, OSError, AttributeError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _save_screen_cache(self, entries: dict[str, dict[str, Any]]) -> None:
+        directory = os.path.dirname(self.screen_cache_file) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".grok_screen_cache.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"entries": entries}, f, ensure_ascii=False)
+            os.replace(tmp, self.screen_cache_file)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
     def screen_candidates(
         self,
         handles: list[str],
         batch_size: int = 10,
         from_date=None,
         to_date=None,
+        use_cache: bool = True,
     ) -> dict:
         """候補アカウントの投資関連度をスクリーニングする。
 
@@ -556,61 +637,81 @@ class GrokClient:
             batch_size: 1バッチあたりのハンドル数（x_search allowed_x_handles上限）
             from_date: 検索開始日
             to_date: 検索終了日
+            use_cache: screen_cache_ttl_sec 以内にスクリーニング済みのハンドルは保存結果を使う
+                （from_date/to_date を明示した場合は同じ期間で保存した結果だけ）
 
         Returns:
             {"candidates": [...], "errors": [...], "meta": {...}}
         """
-        try:
-            from .config import SCREENING_CONFIG
-            cooldown = SCREENING_CONFIG.get("screen_cooldown_sec", 2)
-        except (ImportError, AttributeError):
-            cooldown = 2
-
         handles = [h.strip().lstrip("@").lower() for h in handles if h and h.strip()]
         handles = sorted(set(handles))
         if not handles:
             return {"candidates": [], "errors": ["handles が空です"], "meta": {"source": "screening"}}
 
         from_dt, to_dt = self._resolve_dates(from_date, to_date)
-        batches = self._chunk_list(handles, batch_size)
-
-        candidates_by_username: dict[str, dict[str, Any]] = {}
-        errors: list[dict[str, Any]] = []
+        window = (from_dt.date(), to_dt.date()) if from_date is not None or to_date is not None else None
+        use_cache = use_cache and bool(self.screen_cache_file)
+        cache = self._load_screen_cache() if use_cache else {}
+        now = time.time()
+        fresh = {
+            h: cache[self._screen_cache_key(h, window)] for h in handles
+            if self._screen_cache_key(h, window) in cache
+            and now - cache[self._screen_cache_key(h, window)].get("screened_at", 0) < self.screen_cache_ttl_sec
+        }
+        batches = self._chunk_list([h for h in handles if h not in fresh], batch_size)
 
-        for i, batch in enumerate(batches):
-            prompt = self._build_screening_prompt(batch)
+        def screen(batch: list[str]) -> dict:
             logger.info(
-                f"Screening batch {i + 1}/{len(batches)}",
+                f"Screening batch {batches.index(batch) + 1}/{len(batches)}",
                 extra={"extra_data": {"handles": batch}},
             )
-            try:
-                result = self._screen_batch(
-                    handles=batch,
-                    prompt=prompt,
-                    from_date=from_dt,
-                    to_date=to_dt,
-                )
-                for candidate in result.get("candidates", []):
-                    username = str(candidate.get("username", "")).strip().lstrip("@").lower()
-                    if not username:
-                        continue
-                    candidate["username"] = username
-                    if username not in candidates_by_username:
-                        candidates_by_username[username] = candidate
-                    else:
-                        # 高いスコアを採用
-                        existing = candidates_by_username[username]
-                        if candidate.get("investment_relevance_score", 0) > existing.get("investment_relevance_score", 0):
-                            candidates_by_username[username] = candidate
-                errors.extend(result.get("errors", []))
-            except Exception as exc:
+            return self._screen_batch(
+                handles=batch,
+                prompt=self._build_screening_prompt(batch),
+                from_date=from_dt,
+                to_date=to_dt,
+            )
+
+        results = [(h, [entry["candidate"]] if entry.get("candidate") else []) for h, entry in fresh.items()]
+        errors: list[dict[str, Any]] = []
+        for batch, (result, exc) in zip(batches, self._run_batches(batches, screen)):
+            if exc is not None:
                 error = {"batch": batch, "error": self._sanitize_log(str(exc))}
                 errors.append(error)
                 logger.error("Screening batch failed", extra={"extra_data": error})
+                continue
+            candidates = []
+            for candidate in result.get("candidates", []):
+                username = str(candidate.get("username", "")).strip().lstrip("@").lower()
+                if not username:
+                    continue
+                candidate["username"] = username
+                candidates.append(candidate)
+            results.append((batch[0], candidates))
+            errors.extend(result.get("errors", []))
+            if use_cache and not result.get("errors"):
+                # 失敗したバッチは保存しない。評価が返らなかったハンドルは「候補なし」として保存
+                for handle in batch:
+                    found = [c for c in candidates if c["username"] == handle]
+                    cache[self._screen_cache_key(handle, window)] = {
+                        "screened_at": now,
+                        "candidate": max(found, key=lambda c: c.get("investment_relevance_score", 0)) if found else None,
+                    }
+        if use_cache and batches:
+            self._save_screen_cache(cache)
 
-            # バッチ間クールダウン
-            if i < len(batches) - 1:
-                time.sleep(cooldown)
+        # 保存結果と新規バッチをハンドル順にマージ（完了順・キャッシュの有無によらず同じ出力）
+        candidates_by_username: dict[str, dict[str, Any]] = {}
+        for _, candidates in sorted(results, key=lambda item: item[0]):
+            for candidate in candidates:
+                username = candidate["username"]
+                if username not in candidates_by_username:
+                    candidates_by_username[username] = candidate
+                else:
+                    # 高いスコアを採用
+                    existing = candidates_by_username[username]
+                    if candidate.get("investment_relevance_score", 0) > existing.get("investment_relevance_score", 0):
+                        candidates_by_username[username] = candidate
 
         # スコア降順ソート
         all_candidates = sorted(
@@ -625,6 +726,7 @@ class GrokClient:
             "meta": {
                 "source": "screening",
                 "total_handles": len(handles),
+                "cached_handles": len(fresh),
                 "batch_count": len(batches),
                 "from_date": from_dt.isoformat(),
                 "to_date": to_dt.isoformat(),
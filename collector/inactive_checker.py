@@ -3,17 +3,20 @@
 
 INFLUENCER_GROUPSに定義された全アカウントの状態（凍結・非公開・最終投稿日）を
 Playwrightで確認し、非活動アカウントを検出する。
-結果は日付ベースディレクトリにキャッシュされ、同日の再実行を高速化する。
+結果はアカウント単位で保存し（INACTIVE_CHECK_CONFIG["status_file"]）、状態ごとの鮮度内の
+アカウントは再訪問しない。要確認のアカウントは CollectScheduler で複数ページ並行に巡回する。
+日付ベースディレクトリにはその日の全件結果（inactive_check_result.json）も残す。
 """
 import json
 import os
+import tempfile
 import time
 import random
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
 
-from collector.config import INFLUENCER_GROUPS, get_all_active_usernames
+from collector.collect_scheduler import CollectScheduler, ScheduledJob, classify_block_error
+from collector.config import INACTIVE_CHECK_CONFIG, get_all_active_usernames
 from collector.exceptions import CookieExpiredError
 
 # 非活動判定の閾値（日数）
@@ -141,31 +144,77 @@ def check_account_status(page, username: str) -> dict:
     return result
 
 
-def load_cached_results(output_dir: str = "./output") -> Optional[list]:
-    """同日のキャッシュ済みチェック結果を読み込む。
+def _status_store_path(output_dir: str) -> Path:
+    return Path(output_dir) / INACTIVE_CHECK_CONFIG["status_file"]
 
-    日付ベースディレクトリにキャッシュファイルが存在し、かつ現在の
-    INFLUENCER_GROUPSの全アカウントをカバーしている場合のみ結果を返す。
-    新規アカウントが追加された場合はNoneを返し、再チェックを促す。
+
+def load_status_store(output_dir: str = "./output") -> dict[str, dict]:
+    """アカウント単位の確認結果を読み込む。
 
     Args:
         output_dir: 出力ディレクトリのパス
 
     Returns:
-        キャッシュ済みの結果リスト、またはNone（キャッシュなし/不完全時）
+        {username: check_account_status の結果 + checked_at}。ファイルなし・破損時は空辞書
     """
-    date_str = datetime.now().strftime("%Y-%m-%d")
-    cache_path = Path(output_dir) / date_str / "inactive_check_result.json"
-    if not cache_path.exists():
-        return None
-    with open(cache_path, 'r', encoding='utf-8') as f:
-        results = json.load(f)
-    # キャッシュカバレッジチェック
-    cached_usernames = {r["username"] for r in results}
-    all_usernames = set(get_all_usernames())
-    if not all_usernames.issubset(cached_usernames):
-        return None  # 新規アカウント追加されたので再チェック必要
-    return results
+    path = _status_store_path(output_dir)
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            accounts = json.load(f).get("accounts", {})
+    except (json.JSONDecodeError, OSError, AttributeError):
+        return {}
+    return accounts if isinstance(accounts, dict) else {}
+
+
+def save_status_store(accounts: dict[str, dict], output_dir: str = "./output") -> Path:
+    """アカウント単位の確認結果をアトミックに保存する（途中で落ちても前回分は壊さない）。"""
+    path = _status_store_path(output_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".inactive_status.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"accounts": accounts}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return path
+
+
+def is_fresh(
+    record: dict,
+    now: datetime | None = None,
+    threshold_days: int = INACTIVE_THRESHOLD_DAYS
+) -> bool:
+    """保存済みの確認結果をそのまま使えるかを判定する。
+
+    状態ごとの鮮度（INACTIVE_CHECK_CONFIG["ttl_days"]）内なら再訪問しない。active は
+    最終投稿日+threshold_days を過ぎた時点でも期限切れにする（保存時の最終投稿日のままでは
+    その後の投稿を見落として非活動と誤判定するため、除外する前に必ず再確認する）。
+    鮮度の定義がない状態（error 等）は常に期限切れ。
+
+    Args:
+        record: load_status_store の1件
+        now: 判定時刻（省略時は現在時刻）
+        threshold_days: 非活動とみなす日数の閾値
+
+    Returns:
+        再確認が不要ならTrue
+    """
+    ttl_days = INACTIVE_CHECK_CONFIG["ttl_days"].get(record.get("status"))
+    if not ttl_days:
+        return False
+    try:
+        expires = datetime.fromisoformat(record["checked_at"]) + timedelta(days=ttl_days)
+        if record["status"] == "active" and record.get("last_post_date"):
+            last_date = datetime.strptime(record["last_post_date"][:10], "%Y-%m-%d")
+            expires = min(expires, last_date + timedelta(days=threshold_days))
+    except (KeyError, TypeError, ValueError):
+        return False
+    return (now or datetime.now()) < expires
 
 
 def save_results(results: list, output_dir: str = "./output") -> Path:
@@ -188,76 +237,144 @@ def save_results(results: list, output_dir: str = "./output") -> Path:
     return output_path
 
 
+def _format_status(result: dict) -> str:
+    status = result["status"]
+    if status == "active":
+        date_display = result["last_post_date"][:10] if result["last_post_date"] else "不明"
+        return f"アクティブ | 最終投稿: {date_display}"
+    labels = {"suspended": "凍結", "not_found": "アカウント不存在", "protected": "非公開"}
+    if status in labels:
+        return labels[status]
+    return f"{status}: {result.get('error') or ''}"
+
+
+def _open_page(cookies: list, headless: bool) -> tuple:
+    """ワーカースレッド内でブラウザを起動し、Cookie 付きのページを1枚開く。"""
+    from playwright.sync_api import sync_playwright
+
+    pw = sync_playwright().start()
+    browser = pw.chromium.launch(headless=headless)
+    context = browser.new_context(
+        viewport={"width": 1280, "height": 800},
+        locale="ja-JP",
+        user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+    )
+    if cookies:
+        context.add_cookies(cookies)
+    return pw, browser, context.new_page()
+
+
+def _close_page(resource: tuple) -> None:
+    pw, browser, _page = resource
+    browser.close()
+    pw.stop()
+
+
+def _check_accounts(
+    usernames: list[str],
+    cookies: list,
+    headless: bool,
+    workers: int | None,
+    requests_per_minute: float | None
+) -> dict[str, dict]:
+    """アカウントを複数ページ並行に確認する。
+
+    ワーカーごとに独立したブラウザ/ページを開き（Playwright の sync API はスレッドをまたげない）、
+    ページ内の人間らしい待機はそのまま、全体の訪問数を毎分の予算で縛る。
+    ブロック系エラー（429・net::ERR_ 等）はアカウント単位でバックオフして再試行する。
+
+    Returns:
+        {username: check_account_status の結果}
+    """
+    cfg = INACTIVE_CHECK_CONFIG
+    if requests_per_minute is None:
+        requests_per_minute = cfg["requests_per_minute"]
+    scheduler = CollectScheduler(
+        workers=workers if workers is not None else cfg["workers"],
+        requests_per_minute=requests_per_minute,
+        max_attempts=cfg["max_attempts"],
+        backoff_sec=cfg["backoff_sec"],
+        global_pause_errors=cfg["global_pause_errors"],
+        fatal_errors=(CookieExpiredError,),
+    )
+    jobs = [ScheduledJob(key=username, payload=username) for username in usernames]
+    print(f"並行確認: {len(jobs)}件 / ワーカー{scheduler.workers} / 毎分{requests_per_minute:g}訪問まで")
+
+    def handler(username: str, resource: tuple) -> dict:
+        result = check_account_status(resource[2], username)
+        print(f"  @{username} → {_format_status(result)}")
+        return result
+
+    def blocked_of(result: dict) -> str:
+        return classify_block_error(result.get("error") or "") if result["status"] == "error" else ""
+
+    outcomes = scheduler.run(
+        jobs, handler,
+        open_worker=lambda: _open_page(cookies, headless),
+        close_worker=_close_page,
+        blocked_of=blocked_of,
+    )
+    results = {}
+    for outcome in outcomes:
+        username = outcome.job.payload
+        results[username] = outcome.result or {
+            "username": username,
+            "status": "error",
+            "last_post_date": None,
+            "last_post_text": None,
+            "error": outcome.error_message or outcome.status,
+        }
+    return results
+
+
 def run_inactive_check(
     profile_path: str = "./x_profile",
     headless: bool = False,
     use_cache: bool = True,
-    output_dir: str = "./output"
+    output_dir: str = "./output",
+    workers: int | None = None,
+    requests_per_minute: float | None = None,
+    threshold_days: int = INACTIVE_THRESHOLD_DAYS
 ) -> list:
     """非活動チェックのメイン実行関数。
 
-    キャッシュが有効な場合は同日の結果を再利用する。
-    キャッシュがない場合はPlaywrightでブラウザを起動し、全アカウントを巡回して
-    状態を確認する。
+    アカウント単位の保存結果のうち鮮度内（is_fresh）のものは再利用し、期限切れ・未確認の
+    アカウントだけを並行に巡回する。確認結果は保存結果へ反映し（error は保存しない）、
+    その日の全件結果を日付ベースディレクトリにも書き出す。
 
     Args:
         profile_path: ブラウザプロファイル（cookies.json）のディレクトリパス
         headless: ヘッドレスモードで実行するかどうか
-        use_cache: 同日キャッシュを使用するかどうか
+        use_cache: 鮮度内の保存結果を使用するかどうか（Falseなら全件を再確認）
         output_dir: 出力ディレクトリのパス
+        workers: 同時に開くページ数（省略時は INACTIVE_CHECK_CONFIG）
+        requests_per_minute: 全ワーカー合計の毎分訪問上限（省略時は INACTIVE_CHECK_CONFIG）
+        threshold_days: 非活動とみなす日数の閾値（active の鮮度判定に使う）
 
     Returns:
-        全アカウントのチェック結果リスト
+        全アカウントのチェック結果リスト（get_all_usernames の順）
     """
-    if use_cache:
-        cached = load_cached_results(output_dir)
-        if cached is not None:
-            print(f"同日キャッシュを使用: {len(cached)}件")
-            return cached
-
     usernames = get_all_usernames()
-    profile_path_obj = Path(profile_path)
-    cookies = _load_cookies(profile_path_obj)
-
-    from playwright.sync_api import sync_playwright
-
-    results = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=headless)
-        try:
-            context = browser.new_context(
-                viewport={"width": 1280, "height": 800},
-                locale="ja-JP",
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-            )
-            if cookies:
-                context.add_cookies(cookies)
-            page = context.new_page()
-
-            print(f"\nアカウント状態確認: {len(usernames)}件")
-            for i, username in enumerate(usernames, 1):
-                print(f"[{i}/{len(usernames)}] @{username} を確認中...")
-                result = check_account_status(page, username)
-                results.append(result)
-                # 結果表示
-                if result["status"] == "active":
-                    date_display = result["last_post_date"][:10] if result["last_post_date"] else "不明"
-                    print(f"  → アクティブ | 最終投稿: {date_display}")
-                elif result["status"] == "suspended":
-                    print(f"  → 凍結")
-                elif result["status"] == "not_found":
-                    print(f"  → アカウント不存在")
-                elif result["status"] == "protected":
-                    print(f"  → 非公開")
-                else:
-                    print(f"  → {result['status']}: {result.get('error', '')}")
-
-                if i < len(usernames):
-                    wait_time = random.uniform(3, 6)
-                    time.sleep(wait_time)
-        finally:
-            browser.close()
-
+    store = load_status_store(output_dir)
+    now = datetime.now()
+    fresh = {
+        u: store[u] for u in usernames
+        if use_cache and u in store and is_fresh(store[u], now, threshold_days)
+    }
+    stale = [u for u in usernames if u not in fresh]
+    print(f"\nアカウント状態確認: {len(usernames)}件（保存結果を再利用 {len(fresh)}件 / 要確認 {len(stale)}件）")
+
+    checked = {}
+    if stale:
+        cookies = _load_cookies(Path(profile_path))
+        checked_at = datetime.now().isoformat(timespec="seconds")
+        for username, result in _check_accounts(stale, cookies, headless, workers, requests_per_minute).items():
+            checked[username] = {**result, "checked_at": checked_at}
+            if result["status"] in INACTIVE_CHECK_CONFIG["ttl_days"]:
+                store[username] = checked[username]
+        save_status_store(store, output_dir)
+
+    results = [checked[u] if u in checked else fresh[u] for u in usernames]
     save_results(results, output_dir)
     return results
 
@@ -4,16 +4,32 @@
 Anthropic Messages API (urllibベース) を使用。実装パターンは
 collector/llm_classifier.py を Canonical Module として踏襲する
 （2026-07-08: xAI Grok API から切替。XAI経路は廃止）。
+
+extract_all は未抽出のツイートだけを束ねて複数バッチを並行に投げる（2026-10-19）:
+- 抽出結果はツイート単位で SIGNAL_CACHE_FILE に保存する。鍵は
+  (PROMPT_VERSION, モデル, 本文, ユーザー名, 逆指標フラグ) のハッシュ。再実行や日付窓の重なりでは
+  同じツイートを API に送らない（失敗したバッチ・応答に載らなかったツイートは保存せず次回に再抽出）。
+  保存から SIGNAL_CACHE_MAX_AGE_DAYS を過ぎた分は捨て、件数は SIGNAL_CACHE_MAX_ENTRIES（新しい順）まで
+- 同時に投げるバッチは concurrency 本まで。送信枠は collect_scheduler.RequestBudget を全バッチで共有し
+  （従来のバッチ間 1 秒待機と同じ毎分60枠）、429 を受けたら Retry-After（無ければ指数バックオフ）の間
+  全バッチの送信を止める
+- transport を差し替えれば通信なしで動く（StubTransport。スループットとキャッシュの検証用）
 """
 
+import hashlib
+import io
 import json
 import os
 import re
+import tempfile
+import threading
 import time
 import urllib.error
 import urllib.request
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from collector.collect_scheduler import RequestBudget
 from collector.logger import get_logger
 
 logger = get_logger(__name__)
@@ -24,9 +40,14 @@ DEFAULT_SIGNAL_CONFIG = {
     "max_tokens": 4096,
     "max_retries": 3,
     "retry_backoff_base": 2.0,
+    "concurrency": 4,            # 同時に投げるバッチ数
+    "requests_per_minute": 60,   # 全バッチ合計の送信枠（従来のバッチ間1秒待機と同じ）
 }
 
 ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
+SIGNAL_CACHE_FILE = "output/signal_extract_cache.json"
+SIGNAL_CACHE_MAX_AGE_DAYS = 90     # 日付窓の重なり・再実行で引かれる範囲を十分に覆う
+SIGNAL_CACHE_MAX_ENTRIES = 50000   # 超えたら保存の新しい順に残す
 
 SYSTEM_PROMPT = """あなたは日本語の株式投資ツイートから売買シグナルを抽出する専門家です。
 
@@ -73,6 +94,77 @@ JSON配列で以下の形式:
 シグナルが抽出できないツイートは signals を空配列にしてください。
 必ずJSON配列のみを返してください。余計な説明は不要です。"""
 
+# プロンプトを変えたらキャッシュは自動的に別の鍵になる
+PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:12]
+
+
+class StubTransport:
+    """通信しない Messages API の代役（テスト・スループット計測用）。
+
+    既定の応答は、ツイート本文中の $TICKER と 4桁コード.T をそのまま LONG シグナルとして返す。
+    rate_limit_every=N なら N 回に1回 429（Retry-After: retry_after）を返す。
+    """
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None,
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after: float = 0.0,
+    ):
+        self.responder = responder or self._default_responder
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.calls = 0
+        self.rate_limited = 0
+        self.tweets_sent = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _default_responder(tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = []
+        for t in tweets:
+            tickers = re.findall(r"\$([A-Z]{1,5})\b", t["text"]) + re.findall(r"\b(\d{4}\.T)\b", t["text"])
+            results.append({
+                "tweet_id": t["id"],
+                "signals": [
+                    {"ticker": tk, "direction": "SHORT" if t.get("is_contrarian") else "LONG",
+                     "confidence": 0.8, "matched_text": t["text"][:50], "reasoning": "stub"}
+                    for tk in tickers
+                ],
+            })
+        return results
+
+    def __call__(self, request_body: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.calls += 1
+            limited = self.rate_limit_every and self.calls % self.rate_limit_every == 0
+            if limited:
+                self.rate_limited += 1
+            else:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if limited:
+            raise urllib.error.HTTPError(
+                ANTHROPIC_API_URL, 429, "Too Many Requests", {"retry-after": str(self.retry_after)},
+                io.BytesIO(b'{"type":"error","error":{"type":"rate_limit_error"}}'),
+            )
+        try:
+            content = request_body["messages"][0]["content"]
+            tweets = json.loads(content.split("\n\n", 1)[1])
+            if self.latency:
+                time.sleep(self.latency)
+            with self._lock:
+                self.tweets_sent += len(tweets)
+            text = json.dumps(self.responder(tweets), ensure_ascii=False)
+            return {"content": [{"type": "text", "text": text}]}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
 
 class SignalExtractor:
     """Anthropic Claude APIを使用した売買シグナル抽出器。
@@ -96,6 +188,10 @@ class SignalExtractor:
         api_key: Optional[str] = None,
         model: Optional[str] = None,
         batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        cache_file: Optional[str] = SIGNAL_CACHE_FILE,
+        transport: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
     ):
         """初期化。
 
@@ -103,9 +199,14 @@ class SignalExtractor:
             api_key: Anthropic APIキー（Noneの場合は環境変数ANTHROPIC_API_KEYから取得）
             model: 使用するモデル名
             batch_size: 一度に処理するツイート数
+            concurrency: extract_all で同時に投げるバッチ数（1 なら従来どおり逐次）
+            requests_per_minute: 全バッチ合計の送信枠
+            cache_file: ツイート単位の抽出結果キャッシュ（None でキャッシュしない）
+            transport: request_body → レスポンス dict（None なら Messages API へ HTTP 送信。
+                       差し替え時は APIキー不要）
         """
         self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
-        if not self.api_key:
+        if not self.api_key and transport is None:
             raise ValueError(
                 "APIキーが設定されていません。環境変数ANTHROPIC_API_KEYを設定するか、"
                 "コンストラクタでapi_keyを指定してください。"
@@ -117,6 +218,31 @@ class SignalExtractor:
         self.max_tokens = config["max_tokens"]
         self.max_retries = config["max_retries"]
         self.retry_backoff_base = config["retry_backoff_base"]
+        self.concurrency = max(1, concurrency or config["concurrency"])
+        self.budget = RequestBudget(requests_per_minute or config["requests_per_minute"])
+        self.transport = transport or self._http_transport
+        self.cache_file = cache_file
+        self._cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _http_transport(self, request_body: Dict[str, Any]) -> Dict[str, Any]:
+        """Messages API へ1回 POST する（リトライは _call_api 側）。"""
+        data = json.dumps(request_body).encode("utf-8")
+
+        req = urllib.request.Request(
+            ANTHROPIC_API_URL,
+            data=data,
+            headers={
+                "Content-Type": "application/json",
+                "X-API-Key": self.api_key,
+                "anthropic-version": "2023-06-01",
+            },
+        )
+
+        with urllib.request.urlopen(req, timeout=60) as response:
+            return json.loads(response.read().decode("utf-8"))
 
     def _call_api(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
         """Anthropic Messages APIを呼び出し。
@@ -130,30 +256,16 @@ class SignalExtractor:
         Raises:
             Exception: API呼び出しに失敗した場合
         """
+        request_body = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "system": SYSTEM_PROMPT,
+            "messages": messages,
+        }
         for attempt in range(self.max_retries):
+            self.budget.acquire()
             try:
-                request_body = {
-                    "model": self.model,
-                    "max_tokens": self.max_tokens,
-                    "system": SYSTEM_PROMPT,
-                    "messages": messages,
-                }
-
-                data = json.dumps(request_body).encode("utf-8")
-
-                req = urllib.request.Request(
-                    ANTHROPIC_API_URL,
-                    data=data,
-                    headers={
-                        "Content-Type": "application/json",
-                        "X-API-Key": self.api_key,
-                        "anthropic-version": "2023-06-01",
-                    },
-                )
-
-                with urllib.request.urlopen(req, timeout=60) as response:
-                    response_data = json.loads(response.read().decode("utf-8"))
-                    return response_data
+                return self.transport(request_body)
 
             except urllib.error.HTTPError as e:
                 error_body = e.read().decode("utf-8")
@@ -169,7 +281,17 @@ class SignalExtractor:
                     },
                 )
 
-                if e.code in [429, 500, 502, 503, 504] and attempt < self.max_retries - 1:
+                if e.code == 429 and attempt < self.max_retries - 1:
+                    # レート制限: 並行中の全バッチの送信枠を止める（Retry-After を優先）
+                    wait_time = self.retry_backoff_base ** attempt
+                    try:
+                        wait_time = max(wait_time, float(e.headers.get("retry-after", 0)))
+                    except (AttributeError, TypeError, ValueError):
+                        pass
+                    print(f"{wait_time}秒待機してリトライします...")
+                    self.budget.pause(wait_time)
+                    continue
+                elif e.code in [500, 502, 503, 504] and attempt < self.max_retries - 1:
                     wait_time = self.retry_backoff_base ** attempt
                     print(f"{wait_time}秒待機してリトライします...")
                     time.sleep(wait_time)
@@ -225,18 +347,8 @@ class SignalExtractor:
 
         return ticker
 
-    def extract_batch(self, tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """ツイートバッチからシグナルを抽出する。
-
-        Args:
-            tweets: ツイートのリスト
-
-        Returns:
-            シグナル抽出結果のリスト
-        """
-        if not tweets:
-            return []
-
+    def _request_batch(self, tweets: List[Dict[str, Any]]) -> Optional[List[Tuple[int, List[Any]]]]:
+        """1バッチを API に投げ、(ツイート番号, 生シグナル配列) を応答順に返す。失敗時は None。"""
         tweets_for_llm = []
         for i, tweet in enumerate(tweets):
             tweets_for_llm.append({
@@ -262,7 +374,7 @@ class SignalExtractor:
             content_blocks = response.get("content", [])
             if not content_blocks:
                 print("警告: APIレスポンスにcontentが含まれていません")
-                return []
+                return None
 
             response_text = ""
             for block in content_blocks:
@@ -272,7 +384,7 @@ class SignalExtractor:
 
             if not response_text:
                 print("警告: APIレスポンスにテキストが含まれていません")
-                return []
+                return None
 
             response_text = response_text.strip()
             if response_text.startswith("```"):
@@ -281,8 +393,7 @@ class SignalExtractor:
 
             raw_results = json.loads(response_text)
 
-            # Flatten signals with tweet info
-            all_signals = []
+            pairs = []
             for result in raw_results:
                 if not isinstance(result, dict):
                     continue
@@ -294,78 +405,186 @@ class SignalExtractor:
 
                 if tweet_id < 0 or tweet_id >= len(tweets):
                     continue
-
-                tweet = tweets[tweet_id]
-                for sig in result.get("signals", []):
-                    if not isinstance(sig, dict):
-                        continue
-
-                    ticker = str(sig.get("ticker", "")).strip()
-                    ticker = self._resolve_ticker(ticker)
-                    direction = str(sig.get("direction", "")).upper()
-                    if not ticker or direction not in ("LONG", "SHORT"):
-                        continue
-
-                    confidence = sig.get("confidence", 0.5)
-                    try:
-                        confidence = max(0.0, min(1.0, float(confidence)))
-                    except (ValueError, TypeError):
-                        confidence = 0.5
-
-                    if confidence < 0.5:
-                        continue
-
-                    all_signals.append({
-                        "tweet_url": tweet.get("url", ""),
-                        "username": tweet.get("username", ""),
-                        "display_name": tweet.get("display_name", ""),
-                        "posted_at": tweet.get("posted_at", ""),
-                        "is_contrarian": tweet.get("is_contrarian", False),
-                        "ticker": ticker,
-                        "direction": direction,
-                        "confidence": confidence,
-                        "matched_text": str(sig.get("matched_text", ""))[:200],
-                        "reasoning": str(sig.get("reasoning", ""))[:500],
-                    })
-
-            return all_signals
+                signals = result.get("signals", [])
+                pairs.append((tweet_id, signals if isinstance(signals, list) else []))
+            return pairs
 
         except json.JSONDecodeError as e:
             logger.error("API response JSON parse error", extra={"extra_data": {"error": str(e)}})
-            return []
+            return None
         except Exception as e:
             print(f"エラー: バッチシグナル抽出に失敗しました: {e}")
-            return []
+            return None
+
+    def _to_signals(self, tweet: Dict[str, Any], raw_signals: List[Any]) -> List[Dict[str, Any]]:
+        """1ツイート分の生シグナルを正規化し、ツイート情報を付けて返す。"""
+        out = []
+        for sig in raw_signals:
+            if not isinstance(sig, dict):
+                continue
+
+            ticker = str(sig.get("ticker", "")).strip()
+            ticker = self._resolve_ticker(ticker)
+            direction = str(sig.get("direction", "")).upper()
+            if not ticker or direction not in ("LONG", "SHORT"):
+                continue
+
+            confidence = sig.get("confidence", 0.5)
+            try:
+                confidence = max(0.0, min(1.0, float(confidence)))
+            except (ValueError, TypeError):
+                confidence = 0.5
+
+            if confidence < 0.5:
+                continue
+
+            out.append({
+                "tweet_url": tweet.get("url", ""),
+                "username": tweet.get("username", ""),
+                "display_name": tweet.get("display_name", ""),
+                "posted_at": tweet.get("posted_at", ""),
+                "is_contrarian": tweet.get("is_contrarian", False),
+                "ticker": ticker,
+                "direction": direction,
+                "confidence": confidence,
+                "matched_text": str(sig.get("matched_text", ""))[:200],
+                "reasoning": str(sig.get("reasoning", ""))[:500],
+            })
+        return out
 
-    def extract_all(self, tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """全ツイートからシグナルを抽出（バッチ処理）。
+    def extract_batch(self, tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """ツイートバッチからシグナルを抽出する（キャッシュは使わない）。
 
         Args:
             tweets: ツイートのリスト
 
         Returns:
-            全シグナルのリスト
+            シグナル抽出結果のリスト
         """
         if not tweets:
             return []
 
-        print(f"シグナル抽出を開始: 全{len(tweets)}件のツイートを{self.batch_size}件ずつ処理")
-
+        pairs = self._request_batch(tweets)
         all_signals = []
-        total_batches = (len(tweets) + self.batch_size - 1) // self.batch_size
+        for tweet_id, raw_signals in pairs or []:
+            all_signals.extend(self._to_signals(tweets[tweet_id], raw_signals))
+        return all_signals
 
-        for batch_idx in range(total_batches):
-            start_idx = batch_idx * self.batch_size
-            end_idx = min(start_idx + self.batch_size, len(tweets))
-            batch = tweets[start_idx:end_idx]
+    # --- ツイート単位のキャッシュ ---
+
+    def cache_key(self, tweet: Dict[str, Any]) -> str:
+        """(プロンプト版, モデル, 本文, ユーザー名, 逆指標フラグ) のハッシュ。"""
+        ident = [PROMPT_VERSION, self.model, tweet.get("text", ""), tweet.get("username", "unknown"),
+                 bool(tweet.get("is_contrarian", False))]
+        return hashlib.sha256(json.dumps(ident, ensure_ascii=False).encode("utf-8")).hexdigest()
 
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        """{鍵: {"at": 保存時刻（epoch秒）, "signals": 生シグナル配列}}。"""
+        if self._cache is None:
+            self._cache = {}
+            if self.cache_file and os.path.exists(self.cache_file):
+                try:
+                    with open(self.cache_file, "r", encoding="utf-8") as f:
+                        entries = json.load(f).get("entries", {})
+                except (json.JSONDecodeError, OSError, AttributeError):
+                    entries = {}
+                now = time.time()
+                for key, entry in (entries.items() if isinstance(entries, dict) else []):
+                    if isinstance(entry, dict) and isinstance(entry.get("signals"), list):
+                        self._cache[key] = entry
+                    elif isinstance(entry, list) and entry:
+                        # 旧形式（シグナル配列のみ）。空配列は応答欠けの取りこぼしと区別できないので捨てる
+                        self._cache[key] = {"at": now, "signals": entry}
+        return self._cache
+
+    def _prune_cache(self) -> None:
+        """保存から SIGNAL_CACHE_MAX_AGE_DAYS を過ぎた分を捨て、SIGNAL_CACHE_MAX_ENTRIES 件に収める。"""
+        cutoff = time.time() - SIGNAL_CACHE_MAX_AGE_DAYS * 86400
+        kept = sorted(((k, e) for k, e in self._cache.items() if e.get("at", 0) >= cutoff),
+                      key=lambda item: item[1].get("at", 0), reverse=True)[:SIGNAL_CACHE_MAX_ENTRIES]
+        self._cache.clear()
+        self._cache.update(kept)
+
+    def _save_cache(self) -> None:
+        if not self.cache_file or self._cache is None:
+            return
+        directory = os.path.dirname(self.cache_file) or "."
+        os.makedirs(directory, exist_ok=True)
+        with self._cache_lock:
+            self._prune_cache()
+            payload = {"prompt_version": PROMPT_VERSION, "entries": self._cache}
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=".signal_cache.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, ensure_ascii=False)
+                os.replace(tmp, self.cache_file)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                raise
+
+    def extract_all(self, tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """全ツイートからシグナルを抽出（未抽出分だけをバッチにして並行処理）。
+
+        Args:
+            tweets: ツイートのリスト
+
+        Returns:
+            全シグナルのリスト（ツイートの入力順）
+        """
+        if not tweets:
+            return []
+
+        use_cache = self.cache_file is not None
+        cache = self._load_cache() if use_cache else {}
+        keys = [self.cache_key(t) for t in tweets]
+        results: Dict[str, Optional[List[Any]]] = {}
+        todo: List[Dict[str, Any]] = []
+        todo_keys: List[str] = []
+        for tweet, key in zip(tweets, keys):
+            if key in cache:
+                results[key] = cache[key]["signals"]
+            elif key not in results:
+                results[key] = None  # 同じツイートの重複は1回だけ送る
+                todo.append(tweet)
+                todo_keys.append(key)
+        self.cache_hits += len(tweets) - len(todo)
+        self.cache_misses += len(todo)
+
+        total_batches = (len(todo) + self.batch_size - 1) // self.batch_size
+        print(f"シグナル抽出を開始: 全{len(tweets)}件（キャッシュ済み{len(tweets) - len(todo)}件）・"
+              f"未抽出{len(todo)}件を{self.batch_size}件ずつ{total_batches}バッチ（同時{self.concurrency}）で処理")
+
+        def run(batch_idx: int) -> None:
+            start_idx = batch_idx * self.batch_size
+            end_idx = min(start_idx + self.batch_size, len(todo))
             print(f"バッチ {batch_idx + 1}/{total_batches} を処理中 ({start_idx + 1}-{end_idx}件目)...")
+            pairs = self._request_batch(todo[start_idx:end_idx])
+            if pairs is None:
+                return  # 失敗したバッチは保存しない（次回の実行で再抽出）
+            by_tweet: Dict[int, List[Any]] = {}
+            for tweet_id, raw_signals in pairs:
+                by_tweet.setdefault(tweet_id, []).extend(raw_signals)
+            now = time.time()
+            with self._cache_lock:
+                for offset, key in enumerate(todo_keys[start_idx:end_idx]):
+                    results[key] = by_tweet.get(offset, [])
+                    # 応答に載らなかったツイート（打ち切り・欠け）は今回だけ「シグナルなし」で、保存しない
+                    if use_cache and offset in by_tweet:
+                        cache[key] = {"at": now, "signals": results[key]}
 
-            signals = self.extract_batch(batch)
-            all_signals.extend(signals)
+        try:
+            if total_batches:
+                with ThreadPoolExecutor(max_workers=min(self.concurrency, total_batches)) as pool:
+                    list(pool.map(run, range(total_batches)))
+        finally:
+            if use_cache and todo:
+                self._save_cache()
 
-            if batch_idx < total_batches - 1:
-                time.sleep(1)
+        all_signals = []
+        for tweet, key in zip(tweets, keys):
+            if results[key] is not None:
+                all_signals.extend(self._to_signals(tweet, results[key]))
 
         print(f"シグナル抽出完了: {len(all_signals)}件のシグナルを抽出")
         return all_signals
@@ -384,7 +603,7 @@ class SignalExtractor:
         """
         try:
             from collector.ticker_extractor import TickerExtractor
-            extractor = TickerExtractor()
+            extractor = TickerExtractor(include_master=True)
         except ImportError:
             logger.warning("TickerExtractor が利用できません。バリデーションをスキップします。")
             for sig in signals:
@@ -0,0 +1,141 @@
+"""銘柄名・別名の多パターン照合器（Aho-Corasick）
+
+TickerExtractor は表記ごとに `name in text` を回していたため、1ツイートあたりの手間が
+辞書の大きさに比例していた（J-Quants master の全社名を載せると数千回）。全表記を1本の
+オートマトンにまとめ、本文を1回なめるだけで出現した表記を全て拾う（2026-10-19）。
+
+規約:
+- 照合は生の部分文字列一致（`name in text` と同じ。正規化・境界規則は加えない）
+- 重なり・包含も全て拾う（「メタプラネット」の中の「メタ」も出現扱い）。どれを採るかは
+  呼び出し側が表記の並び（エントリ番号）で決める
+- to_dict / from_dict で JSON に往復でき、保存済みなら組み立てずに読み込む
+"""
+import hashlib
+import json
+import os
+import tempfile
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+AUTOMATON_VERSION = 1
+
+# (表記, ティッカー, 抽出方法) — エントリ番号が採用の優先順
+Entry = Tuple[str, str, str]
+
+
+class TickerAutomaton:
+    """表記リストから組んだ Aho-Corasick オートマトン"""
+
+    def __init__(
+        self,
+        entries: Sequence[Entry],
+        goto: List[Dict[str, int]],
+        fail: List[int],
+        out: List[List[int]],
+    ):
+        self.entries = [tuple(e) for e in entries]
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    @classmethod
+    def build(cls, entries: Iterable[Entry]) -> "TickerAutomaton":
+        """エントリ列からオートマトンを組み立てる。空の表記は無視する。"""
+        entries = list(entries)
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for eid, (pattern, _ticker, _source) in enumerate(entries):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append([])
+                    goto[state][ch] = nxt
+                state = nxt
+            out[state].append(eid)
+
+        # 失敗遷移は幅優先で張る（浅い状態の出力を先に確定させてから深い状態へ合流させる）
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                if out[fail[nxt]]:
+                    out[nxt] = out[nxt] + out[fail[nxt]]
+                queue.append(nxt)
+        return cls(entries, goto, fail, out)
+
+    def find(self, text: str) -> Set[int]:
+        """text に出現したエントリ番号の集合（1回の走査）。"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[int] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+    def matches(self, text: str) -> List[Entry]:
+        """出現したエントリをエントリ番号順（＝採用の優先順）に返す。"""
+        return [self.entries[eid] for eid in sorted(self.find(text))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": AUTOMATON_VERSION,
+            "entries": [list(e) for e in self.entries],
+            "goto": self._goto,
+            "fail": self._fail,
+            "out": self._out,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TickerAutomaton":
+        if data.get("version") != AUTOMATON_VERSION:
+            raise ValueError(f"unsupported automaton version: {data.get('version')}")
+        return cls(data["entries"], data["goto"], data["fail"], data["out"])
+
+
+def signature(*parts: Any) -> str:
+    """組み立ての入力（辞書の中身・供給元ファイルの署名）から保存物の鍵を作る。"""
+    payload = json.dumps([AUTOMATON_VERSION, *parts], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def load_automaton(path: str, sig: str) -> Optional[TickerAutomaton]:
+    """保存済みオートマトンを読む。署名違い・版違い・破損は None（組み直し）。"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("signature") != sig:
+            return None
+        return TickerAutomaton.from_dict(data)
+    except (json.JSONDecodeError, OSError, AttributeError, KeyError, ValueError):
+        return None
+
+
+def save_automaton(automaton: TickerAutomaton, path: str, sig: str) -> None:
+    """オートマトンをアトミックに保存する。"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".ticker_automaton.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"signature": sig, **automaton.to_dict()}, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
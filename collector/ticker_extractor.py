@@ -1,8 +1,22 @@
-"""ツイートからティッカーシンボル・銘柄名を抽出するモジュール"""
+"""ツイートからティッカーシンボル・銘柄名を抽出するモジュール
 
+銘柄名・別名の照合は全表記を1本にまとめたオートマトン（collector/ticker_automaton.py）で
+本文を1回なめて行う。J-Quants master の社名も載せる場合は組み立て結果を保存し、
+master が変わるまで次回以降は読み込むだけにする（2026-10-19）。
+ツイートを扱う本番の呼び出し元（performance_tracker・signal_extractor・measure/update_performance・
+winrate_worklist）は include_master=True で使う。master が未取得なら辞書だけで動く。
+"""
+
+import gzip
+import json
 import re
+from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+from collector.ticker_automaton import (
+    Entry, TickerAutomaton, load_automaton, save_automaton, signature,
+)
+
 
 # $記号付きティッカーパターン
 TICKER_PATTERN = r'\$([A-Z]{1,5})\b'
@@ -66,6 +80,18 @@ ETF_MAP = {
     "全世界株": "ACWI",
 }
 
+# J-Quants 月次 master（scripts/jq_fetch.py が取得する YYYYMMDD.json.gz）
+JQUANTS_MASTER_DIR = Path(__file__).resolve().parent.parent / "data" / "jquants" / "master"
+# master の社名を載せたオートマトンの保存先（master・辞書が変わると組み直す）
+TICKER_AUTOMATON_FILE = "output/ticker_automaton.json"
+# master の社名はこの文字数未満を採らない（一般語との衝突。x_mention_dict.MIN_LEN と同じ）
+MASTER_NAME_MIN_LEN = 3
+
+_MASTER_FILE_RE = re.compile(r"^\d{8}\.json\.gz$")
+
+# プロセス内で共有する組み立て済みオートマトン（署名 → オートマトン）
+_AUTOMATA: Dict[str, TickerAutomaton] = {}
+
 # カテゴリのコンテキスト変換
 CATEGORY_CONTEXT_MAP = {
     "recommended_assets": "推奨",
@@ -80,19 +106,105 @@ CATEGORY_CONTEXT_MAP = {
 }
 
 
+def latest_master_file(master_dir: Path) -> Optional[Path]:
+    """最新の master スナップショット（無ければ None）。"""
+    master_dir = Path(master_dir)
+    if not master_dir.exists():
+        return None
+    files = sorted(p for p in master_dir.glob("*.json.gz") if _MASTER_FILE_RE.match(p.name))
+    return files[-1] if files else None
+
+
+def master_name_entries(master_path: Path) -> List[Entry]:
+    """master の社名（CoName）→ "{4桁コード}.T" のエントリを長い社名から順に返す。
+
+    既存の辞書にある表記・MASTER_NAME_MIN_LEN 未満の社名・複数コードに対応する社名は採らない。
+
+    Args:
+        master_path: master スナップショット（{"data": [...]}・{"info": [...]}・素の配列のいずれも可）
+
+    Returns:
+        (社名, ティッカー, "master_mapping") のリスト
+    """
+    with gzip.open(master_path, "rt", encoding="utf-8") as f:
+        obj = json.load(f)
+    rows = obj if isinstance(obj, list) else (obj.get("data") or obj.get("info") or [])
+    curated = set(JAPANESE_TICKER_MAP) | set(ETF_MAP)
+    codes_by_name: Dict[str, set] = {}
+    for row in rows:
+        name = str(row.get("CoName") or "").strip()
+        code = str(row.get("Code") or "")
+        if len(name) < MASTER_NAME_MIN_LEN or not code or name in curated:
+            continue
+        # J-Quants の5桁コードは末尾がチェック用の0（72030 → 7203、285A0 → 285A）
+        codes_by_name.setdefault(name, set()).add(code[:4] if len(code) == 5 else code)
+    entries = [(name, f"{next(iter(codes))}.T", "master_mapping")
+               for name, codes in codes_by_name.items() if len(codes) == 1]
+    return sorted(entries, key=lambda e: len(e[0]), reverse=True)
+
+
+def build_entries(master_path: Optional[Path] = None) -> List[Entry]:
+    """照合の優先順に並べたエントリ（日本語銘柄名 → ETF → master 社名。それぞれ長い表記から）。"""
+    jp = sorted(JAPANESE_TICKER_MAP.items(), key=lambda x: len(x[0]), reverse=True)
+    etf = sorted(ETF_MAP.items(), key=lambda x: len(x[0]), reverse=True)
+    entries = [(name, ticker, "jp_mapping") for name, ticker in jp]
+    entries += [(name, ticker, "etf_mapping") for name, ticker in etf]
+    if master_path is not None:
+        entries += master_name_entries(master_path)
+    return entries
+
+
+def load_ticker_automaton(
+    include_master: bool = False,
+    master_dir: Optional[Path] = None,
+    cache_file: Optional[str] = None,
+) -> TickerAutomaton:
+    """照合用オートマトンを返す（プロセス内共有・master 込みは保存物を再利用）。
+
+    署名は辞書の中身と master ファイルの名前・サイズ・更新時刻から作るので、保存物が
+    使えるかは master を読まずに判定できる。辞書だけのオートマトンは組み立てが軽いため保存しない。
+
+    Args:
+        include_master: 最新の J-Quants master の社名も載せるかどうか
+        master_dir: master スナップショットのディレクトリ（省略時は JQUANTS_MASTER_DIR）
+        cache_file: master 込みオートマトンの保存先（省略時は TICKER_AUTOMATON_FILE）
+
+    Returns:
+        TickerAutomaton
+    """
+    master_path = latest_master_file(master_dir or JQUANTS_MASTER_DIR) if include_master else None
+    cache_file = cache_file or TICKER_AUTOMATON_FILE
+    master_sig = None
+    if master_path is not None:
+        st = master_path.stat()
+        master_sig = [master_path.name, st.st_size, st.st_mtime_ns]
+    sig = signature(list(JAPANESE_TICKER_MAP.items()), list(ETF_MAP.items()),
+                    master_sig, MASTER_NAME_MIN_LEN)
+    automaton = _AUTOMATA.get(sig)
+    if automaton is not None:
+        return automaton
+    persist = master_path is not None
+    automaton = load_automaton(cache_file, sig) if persist else None
+    if automaton is None:
+        automaton = TickerAutomaton.build(build_entries(master_path))
+        if persist:
+            save_automaton(automaton, cache_file, sig)
+    _AUTOMATA[sig] = automaton
+    return automaton
+
+
 class TickerExtractor:
     """ツイートからティッカーシンボルを抽出するクラス"""
 
-    def __init__(self):
-        """初期化"""
+    def __init__(self, include_master: bool = False):
+        """初期化
+
+        Args:
+            include_master: J-Quants master の社名（"master_mapping"）でも抽出するかどうか
+        """
         self.ticker_pattern = re.compile(TICKER_PATTERN)
-        # 日本語マッピングは長い方から先にマッチさせる（部分マッチ防止）
-        self.jp_map_sorted = sorted(
-            JAPANESE_TICKER_MAP.items(), key=lambda x: len(x[0]), reverse=True
-        )
-        self.etf_map_sorted = sorted(
-            ETF_MAP.items(), key=lambda x: len(x[0]), reverse=True
-        )
+        # 日本語銘柄名・ETF名は長い方を優先（同じティッカーの短い表記で二重計上しない）
+        self.automaton = load_ticker_automaton(include_master)
 
     def extract(self, tweet: Dict[str, Any]) -> List[Dict[str, Any]]:
         """ツイートからティッカーを抽出する。
@@ -106,7 +218,7 @@ class TickerExtractor:
         Returns:
             抽出結果のリスト。各要素は:
                 - ticker: ティッカーシンボル (e.g., "AVGO")
-                - source: 抽出方法 ("regex" / "jp_mapping" / "etf_mapping")
+                - source: 抽出方法 ("regex" / "jp_mapping" / "etf_mapping" / "master_mapping")
                 - context: コンテキスト (e.g., "推奨", "購入")
                 - matched_text: マッチしたテキスト
         """
@@ -130,26 +242,15 @@ class TickerExtractor:
                     "matched_text": match.group(0),
                 })
 
-        # 2. 日本語銘柄名マッピング
-        for jp_name, ticker in self.jp_map_sorted:
-            if jp_name in text and ticker not in seen_tickers:
-                seen_tickers.add(ticker)
-                results.append({
-                    "ticker": ticker,
-                    "source": "jp_mapping",
-                    "context": context,
-                    "matched_text": jp_name,
-                })
-
-        # 3. ETF・ファンド名マッピング
-        for etf_name, ticker in self.etf_map_sorted:
-            if etf_name in text and ticker not in seen_tickers:
+        # 2. 日本語銘柄名・ETF名（・master 社名）を1回の走査で拾い、優先順に採る
+        for name, ticker, source in self.automaton.matches(text):
+            if ticker not in seen_tickers:
                 seen_tickers.add(ticker)
                 results.append({
                     "ticker": ticker,
-                    "source": "etf_mapping",
+                    "source": source,
                     "context": context,
-                    "matched_text": etf_name,
+                    "matched_text": name,
                 })
 
         return results
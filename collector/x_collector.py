@@ -14,11 +14,14 @@ from typing import List, Dict, Optional
 
 from .config import COLLECTION_SETTINGS, PROFILE_PATH, OUTPUT_DIR
 from .exceptions import CookieExpiredError
+from .graphql_timeline import TimelineCapture, card_status_hrefs
 from collector.logger import get_logger
 from dataclasses import dataclass
 
 logger = get_logger(__name__)
 
+_STATUS_ID_RE = re.compile(r"/status/(\d+)")
+
 
 @dataclass
 class CollectionResult:
@@ -51,6 +54,7 @@ class SafeXCollector:
         self.collected_urls: set = shared_collected_urls if shared_collected_urls is not None else set()
         self.settings = COLLECTION_SETTINGS
         self._shared_mode = shared_collected_urls is not None
+        self._capture: Optional[TimelineCapture] = None
 
     def _load_cookies(self) -> List[Dict]:
         """保存済みCookieを読み込む（暗号化対応）。
@@ -109,6 +113,7 @@ class SafeXCollector:
                 viewport={"width": 1280, "height": 900},
                 locale="ja-JP",
                 timezone_id="Asia/Tokyo",
+                service_workers="block",  # GraphQL 応答を傍受するため（fetch_bookmarks と同じ）
             )
 
             # Cookieを適用
@@ -117,6 +122,8 @@ class SafeXCollector:
 
             try:
                 page = context.new_page()
+                # タイムラインの GraphQL 応答を傍受（カードの DOM 解析は取れなかった分だけ）
+                self._capture = TimelineCapture().attach(page)
 
                 # ページ読み込み
                 print("ページを開いています...")
@@ -228,6 +235,7 @@ class SafeXCollector:
                 logger.error("収集中にエラーが発生", extra={"extra_data": {"url": search_url, "detail": str(e)}})
 
             finally:
+                self._capture = None
                 context.close()
                 browser.close()
 
@@ -288,27 +296,60 @@ class SafeXCollector:
         """
         表示中のツイートを収集
 
+        傍受済みの GraphQL 応答から先に取り込み、応答に無かったカードだけを DOM から読む
+        （2026-10-19: カード1枚ごとの locator 往復を減らす・長文は note_tweet の全文になる）。
+
         Returns:
             新規収集件数
         """
         new_count = 0
 
         try:
-            tweet_cards = page.query_selector_all('[data-testid="tweet"]')
+            if self._capture is not None:
+                for t in self._capture.take():
+                    new_count += self._add_tweet(self._tweet_from_graphql(t))
 
-            for card in tweet_cards:
-                tweet_data = self._parse_tweet_card(card)
+            hrefs = card_status_hrefs(page)
+            tweet_cards = page.query_selector_all('[data-testid="tweet"]')
 
-                if tweet_data and tweet_data['url'] not in self.collected_urls:
-                    self.tweets.append(tweet_data)
-                    self.collected_urls.add(tweet_data['url'])
-                    new_count += 1
+            for idx, card in enumerate(tweet_cards):
+                if hrefs is not None and idx < len(hrefs) and self._capture is not None:
+                    m = _STATUS_ID_RE.search(hrefs[idx] or "")
+                    if m and self._capture.get(m.group(1)):
+                        continue  # GraphQL で取り込み済み
+                new_count += self._add_tweet(self._parse_tweet_card(card))
 
         except Exception as e:
             print(f"\n  [警告] ツイート収集中にエラー: {e}")
 
         return new_count
 
+    def _add_tweet(self, tweet_data: Optional[Dict]) -> int:
+        """未収集なら追加して 1、重複・解析失敗なら 0"""
+        if tweet_data and tweet_data['url'] not in self.collected_urls:
+            self.tweets.append(tweet_data)
+            self.collected_urls.add(tweet_data['url'])
+            return 1
+        return 0
+
+    def _tweet_from_graphql(self, t: Dict) -> Dict:
+        """
+        graphql_timeline.parse_tweet_result の結果を _parse_tweet_card と同じ形にする
+
+        URL は DOM 経路と同じ twitter.com 形式（shared_collected_urls の重複排除を揃える）
+        """
+        return {
+            'username': t['screen_name'],
+            'display_name': t['name'],
+            'text': t['text'],
+            'url': f"https://twitter.com/{t['screen_name']}/status/{t['id']}",
+            'posted_at': t['created_at'] or None,
+            'like_count': t['likes'],
+            'retweet_count': t['retweets'],
+            'reply_count': t['replies'],
+            'collected_at': datetime.now().isoformat()
+        }
+
     def _parse_tweet_card(self, card) -> Optional[Dict]:
         """
         ツイートカードをパース
@@ -418,12 +459,8 @@ class SafeXCollector:
         Returns:
             ブロック種別文字列。ブロックでない場合は空文字
         """
-        from .config import BLOCK_ERROR_PATTERNS
-        error_upper = error_str.upper()
-        for pattern in BLOCK_ERROR_PATTERNS:
-            if pattern.upper() in error_upper:
-                return pattern
-        return ""
+        from .collect_scheduler import classify_block_error
+        return classify_block_error(error_str)
 
     def save_to_json(self, filename: str = None, output_dir: str = OUTPUT_DIR):
         """
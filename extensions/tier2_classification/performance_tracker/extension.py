@@ -55,7 +55,7 @@ class PerformanceTrackerExtension(Extension):
         else:
             cache_file = "output/price_cache.json"
 
-        self._extractor = TickerExtractor()
+        self._extractor = TickerExtractor(include_master=True)
         self._fetcher = PriceFetcher(cache_file=cache_file)
         self._store = RecommendationStore(base_dir=self._output_dir)
 
@@ -30,6 +30,12 @@ worklist生成（bookmarks_keyword_worklist.py）とingest（bookmarks_keyword_i
     blocking=Falseでノンブロッキング取得を試み、取得できなければBlockingIOErrorを送出する
     （呼び出し側が「別プロセス実行中」として専用exit codeにマップする）。
 - replay(events) -> dict（台帳イベントからの状態再構築。下記「台帳イベントスキーマ」参照）
+- load_replay_state(ledger_path, verify=False) -> dict
+    replay(read_ledger(ledger_path))と同値の状態を、.<台帳名>.replay.json（先頭バイト位置と
+    その範囲のsha256をキーにしたreplay途中状態）＋末尾行だけのJSON検証/replayで返す。
+    破損検出の例外はread_ledgerと同じ。verify=Trueは全replayと突き合わせ、不一致なら
+    LedgerSnapshotMismatch（LedgerCorruptionのサブクラス）。CLI:
+    python3 scripts/bookmarks_keyword_common.py --verify-snapshot <ledger.jsonl>
 - note_eval_parse(note_text, known_ids=None) -> (evaluations, unknown_values)
     known_idsは{(id_type, id), ...}。指定時、未知idの評価マーカーは無視する（ログのみ）。
     1行に評価マーカーが2個以上出現した場合はそのidだけを不採用にするのではなく行全体を
@@ -110,6 +116,7 @@ import os
 import platform
 import re
 import sys
+import tempfile
 import unicodedata
 from datetime import datetime, timezone
 from pathlib import Path
@@ -389,108 +396,281 @@ def read_ledger(ledger_path) -> list:
     return events
 
 
+def _replay_init() -> dict:
+    """replayの途中状態（イベント1件ずつ畳み込む累積器）の初期値。"""
+    return {
+        "last_generation": None,
+        "active_clusters": [],
+        "dormant_clusters": [],
+        "baseline_urls": set(),
+        "consumed_evaluation_keys": set(),
+        "last_fetch_success_at": None,
+        "digest_urls": set(),
+        "digest_items": {},
+        "latest_digest": None,
+        "all_evaluations": [],
+        "seen_eval_keys": set(),
+        "known_eval_ids": set(),
+        "last_source_snapshot": None,
+    }
+
+
+def _replay_apply(acc: dict, ev: dict) -> None:
+    """イベント1件を累積器へ畳み込む（replay/スナップショット+末尾replayの共通実装）。"""
+    etype = ev.get("type")
+
+    if etype == "fetch_run":
+        if ev.get("status") == "SUCCESS":
+            acc["last_fetch_success_at"] = ev.get("ts")
+
+    elif etype == "evaluation_batch":
+        note_revision = ev.get("note_revision")
+        for item in ev.get("evaluations", []):
+            key = (item.get("id_type"), item.get("id"), item.get("mark"), note_revision)
+            if key in acc["seen_eval_keys"]:
+                continue
+            acc["seen_eval_keys"].add(key)
+            acc["all_evaluations"].append({
+                "id_type": item.get("id_type"),
+                "id": item.get("id"),
+                "mark": item.get("mark"),
+                "note": item.get("note", ""),
+                "note_revision": note_revision,
+            })
+
+    elif etype == "generation":
+        acc["last_generation"] = {
+            "generation": ev.get("generation"),
+            "revision": ev.get("revision", 0),
+            "at": ev.get("ts"),
+            "reason": ev.get("generation_reason"),
+        }
+        acc["last_source_snapshot"] = ev.get("source_snapshot")
+        if "active_clusters" in ev:
+            acc["active_clusters"] = ev.get("active_clusters") or []
+        if "dormant_clusters" in ev:
+            acc["dormant_clusters"] = ev.get("dormant_clusters") or []
+
+        snapshot_urls = ev.get("snapshot_urls")
+        if snapshot_urls:
+            acc["baseline_urls"] |= set(snapshot_urls)
+        delta_urls = ev.get("delta_urls")
+        if delta_urls:
+            acc["baseline_urls"] |= set(delta_urls)
+
+        for key in ev.get("consumed_evaluation_keys", []):
+            acc["consumed_evaluation_keys"].add(tuple(key))
+
+        # 評価マーカーの既知id（generationのquery_id/proposal_id。未知idの偽造マーカーを無視させる, P0-5）
+        for cluster in (ev.get("active_clusters") or []) + (ev.get("dormant_clusters") or []):
+            for q in cluster.get("queries", []):
+                if q.get("query_id"):
+                    acc["known_eval_ids"].add(("qid", q["query_id"]))
+        for p in ev.get("proposals") or []:
+            if p.get("proposal_id"):
+                acc["known_eval_ids"].add(("pid", p["proposal_id"]))
+
+    elif etype == "digest":
+        acc["latest_digest"] = ev
+        for item in ev.get("items", []):
+            url = item.get("url")
+            if not url:
+                continue
+            key = canonical_url_key(url)
+            acc["digest_urls"].add(key)
+            acc["digest_items"][key] = {
+                "cluster_id": item.get("cluster_id"),
+                "seed_query_id": item.get("seed_query_id"),
+                "published_at": ev.get("ts"),
+            }
+
+    # rejection / proposal_decision: replay()は現状パススルー。B3(ingest)が
+    # generationイベントの"proposals"配列を直接横断して状態を再構築する（モジュール
+    # docstring「台帳イベントスキーマ」参照）。
+
+
+def _replay_finish(acc: dict) -> dict:
+    consumed = acc["consumed_evaluation_keys"]
+    pending_evaluations = [
+        e for e in acc["all_evaluations"]
+        if (e["id_type"], e["id"], e["mark"], e["note_revision"]) not in consumed
+    ]
+
+    return {
+        "last_generation": acc["last_generation"],
+        "active_clusters": acc["active_clusters"],
+        "dormant_clusters": acc["dormant_clusters"],
+        "pending_proposals": [],
+        "baseline_urls": acc["baseline_urls"],
+        "consumed_evaluation_keys": consumed,
+        "pending_evaluations": pending_evaluations,
+        "last_fetch_success_at": acc["last_fetch_success_at"],
+        "digest_urls": acc["digest_urls"],
+        "digest_items": acc["digest_items"],
+        "latest_digest": acc["latest_digest"],
+        "known_eval_ids": acc["known_eval_ids"],
+        "last_source_snapshot": acc["last_source_snapshot"],
+    }
+
+
 def replay(events: list) -> dict:
     """台帳イベント列から現在の状態を再構築する。モジュールdocstring「台帳イベント
     スキーマ」参照。generation/rejection/proposal_decisionの詳細な状態反映は
     B3(ingest)実装時に拡張する前提で、以下を再構築する:
     last_generation / active_clusters / dormant_clusters / baseline_urls /
     last_fetch_success_at / consumed_evaluation_keys / pending_evaluations /
-    digest_urls / digest_items / latest_digest（digest_*はC1(digest_apply)拡張分）。
+    digest_urls / digest_items / latest_digest（digest_*はC1(digest_apply)拡張分）/
+    known_eval_ids（評価マーカーの既知qid/pid）/ last_source_snapshot（最新generationの
+    source_snapshot）。
     """
-    last_generation = None
-    active_clusters: list = []
-    dormant_clusters: list = []
-    pending_proposals: list = []
-    baseline_urls: set = set()
-    consumed_evaluation_keys: set = set()
-    last_fetch_success_at = None
-    digest_urls: set = set()
-    digest_items: dict = {}
-    latest_digest = None
-
-    all_evaluations: list = []
-    seen_eval_keys: set = set()
-
+    acc = _replay_init()
     for ev in events:
-        etype = ev.get("type")
+        _replay_apply(acc, ev)
+    return _replay_finish(acc)
 
-        if etype == "fetch_run":
-            if ev.get("status") == "SUCCESS":
-                last_fetch_success_at = ev.get("ts")
 
-        elif etype == "evaluation_batch":
-            note_revision = ev.get("note_revision")
-            for item in ev.get("evaluations", []):
-                key = (item.get("id_type"), item.get("id"), item.get("mark"), note_revision)
-                if key in seen_eval_keys:
-                    continue
-                seen_eval_keys.add(key)
-                all_evaluations.append({
-                    "id_type": item.get("id_type"),
-                    "id": item.get("id"),
-                    "mark": item.get("mark"),
-                    "note": item.get("note", ""),
-                    "note_revision": note_revision,
-                })
-
-        elif etype == "generation":
-            last_generation = {
-                "generation": ev.get("generation"),
-                "revision": ev.get("revision", 0),
-                "at": ev.get("ts"),
-                "reason": ev.get("generation_reason"),
-            }
-            if "active_clusters" in ev:
-                active_clusters = ev.get("active_clusters") or []
-            if "dormant_clusters" in ev:
-                dormant_clusters = ev.get("dormant_clusters") or []
-
-            snapshot_urls = ev.get("snapshot_urls")
-            if snapshot_urls:
-                baseline_urls |= set(snapshot_urls)
-            delta_urls = ev.get("delta_urls")
-            if delta_urls:
-                baseline_urls |= set(delta_urls)
-
-            for key in ev.get("consumed_evaluation_keys", []):
-                consumed_evaluation_keys.add(tuple(key))
-
-        elif etype == "digest":
-            latest_digest = ev
-            for item in ev.get("items", []):
-                url = item.get("url")
-                if not url:
-                    continue
-                key = canonical_url_key(url)
-                digest_urls.add(key)
-                digest_items[key] = {
-                    "cluster_id": item.get("cluster_id"),
-                    "seed_query_id": item.get("seed_query_id"),
-                    "published_at": ev.get("ts"),
-                }
-
-        # rejection / proposal_decision: replay()は現状パススルー。B3(ingest)が
-        # generationイベントの"proposals"配列を直接横断して状態を再構築する（モジュール
-        # docstring「台帳イベントスキーマ」参照）。
+# --- replayスナップショット（2026-10-19） --------------------------------------------
+#
+# 台帳は追記専用のため、「先頭からNバイトまでをreplayした累積器」を台帳と同じディレクトリの
+# .<台帳名>.replay.json に保存し、次回は先頭Nバイトのsha256が一致すれば累積器を読み込んで
+# 末尾（Nバイト目以降）だけをJSON検証+replayする。スナップショットは派生物（消しても次回に
+# 全replayで作り直される）。先頭の書き換え・切り詰めはsha256/サイズ不一致で検出して全replayへ
+# 戻るため、途中行の破損は従来どおりLedgerCorruptionとして検出される。
 
-    pending_evaluations = [
-        e for e in all_evaluations
-        if (e["id_type"], e["id"], e["mark"], e["note_revision"]) not in consumed_evaluation_keys
-    ]
+REPLAY_SNAPSHOT_VERSION = 1
+_SNAPSHOT_SETS = ("baseline_urls", "consumed_evaluation_keys", "digest_urls",
+                  "seen_eval_keys", "known_eval_ids")
 
-    return {
-        "last_generation": last_generation,
-        "active_clusters": active_clusters,
-        "dormant_clusters": dormant_clusters,
-        "pending_proposals": pending_proposals,
-        "baseline_urls": baseline_urls,
-        "consumed_evaluation_keys": consumed_evaluation_keys,
-        "pending_evaluations": pending_evaluations,
-        "last_fetch_success_at": last_fetch_success_at,
-        "digest_urls": digest_urls,
-        "digest_items": digest_items,
-        "latest_digest": latest_digest,
+
+class LedgerSnapshotMismatch(LedgerCorruption):
+    """検証モードでスナップショット+末尾replayと全replayの結果が一致しない場合に送出する。"""
+
+
+def replay_snapshot_path(ledger_path) -> Path:
+    ledger_path = Path(ledger_path)
+    return ledger_path.parent / f".{ledger_path.name}.replay.json"
+
+
+def _acc_to_json(acc: dict) -> dict:
+    out = dict(acc)
+    for k in _SNAPSHOT_SETS:
+        # 要素はstrまたはtuple（Noneを含みうる）→ JSON文字列で順序を固定する
+        out[k] = sorted((list(v) if isinstance(v, tuple) else v for v in acc[k]),
+                        key=lambda v: json.dumps(v, ensure_ascii=False))
+    return out
+
+
+def _acc_from_json(data: dict) -> dict:
+    acc = _replay_init()
+    acc.update({k: data[k] for k in acc if k in data})
+    for k in _SNAPSHOT_SETS:
+        acc[k] = {tuple(v) if isinstance(v, list) else v for v in data.get(k, [])}
+    return acc
+
+
+def _load_snapshot(ledger_path, content: bytes):
+    """(累積器, offset, 行数)。使えない（無い・壊れ・版違い・先頭不一致）ならNone。"""
+    try:
+        snap = json.loads(replay_snapshot_path(ledger_path).read_text(encoding="utf-8"))
+        offset = int(snap["offset"])
+        if snap.get("version") != REPLAY_SNAPSHOT_VERSION or not 0 < offset <= len(content):
+            return None
+        if hashlib.sha256(content[:offset]).hexdigest() != snap["prefix_sha256"]:
+            return None
+        return _acc_from_json(snap["state"]), offset, int(snap["lines"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_snapshot(ledger_path, acc: dict, content: bytes, offset: int, lines: int) -> None:
+    """スナップショットを原子的に書く（書込失敗は無視＝次回は全replay）。"""
+    path = replay_snapshot_path(ledger_path)
+    snap = {
+        "version": REPLAY_SNAPSHOT_VERSION,
+        "offset": offset,
+        "prefix_sha256": hashlib.sha256(content[:offset]).hexdigest(),
+        "lines": lines,
+        "state": _acc_to_json(acc),
     }
+    tmp = None
+    try:
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=path.name, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(snap, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        if tmp:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+
+
+def _parse_ledger_lines(text: str, first_lineno: int, is_file_tail: bool) -> list:
+    """read_ledgerと同じ規則で行をJSON検証する（行番号は空行を除いた通し番号）。"""
+    raw_lines = [ln for ln in text.splitlines() if ln.strip()]
+    events: list = []
+    last_idx = len(raw_lines) - 1
+    for i, line in enumerate(raw_lines):
+        try:
+            events.append(json.loads(line))
+        except json.JSONDecodeError as exc:
+            lineno = first_lineno + i
+            if i == last_idx and is_file_tail:
+                raise LedgerTailCorruption(
+                    f"台帳の最終行(行{lineno})が破損しています: {exc}"
+                ) from exc
+            raise LedgerCorruption(
+                f"台帳の途中行(行{lineno})が破損しています: {exc}"
+            ) from exc
+    return events
+
+
+def load_replay_state(ledger_path, verify: bool = False) -> dict:
+    """replay(read_ledger(ledger_path))と同じ状態を、スナップショット+末尾replayで返す。
+
+    台帳全体をLOCK_SHで読む点・例外（LedgerTailCorruption/LedgerCorruption）・台帳が
+    無ければ空状態、はread_ledgerと同じ。末尾に改行で終わる完全な行が増えていれば
+    スナップショットを進めて保存する。
+
+    verify=Trueでは全行を読み直して全replayも行い、結果が一致しなければ
+    LedgerSnapshotMismatchを送出してスナップショットを消す（次回は全replayで作り直す）。
+    """
+    ledger_path = Path(ledger_path)
+    if not ledger_path.exists():
+        return replay([])
+
+    with open(ledger_path, "rb") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+        try:
+            content = f.read()
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    loaded = _load_snapshot(ledger_path, content)
+    acc, offset, lines = loaded if loaded else (_replay_init(), 0, 0)
+    complete = content.rfind(b"\n") + 1  # 改行で終わる最後の位置（以降は書きかけ行）
+
+    head = _parse_ledger_lines(content[offset:complete].decode("utf-8"), lines + 1,
+                               is_file_tail=not content[complete:].strip())
+    rest = _parse_ledger_lines(content[complete:].decode("utf-8"), lines + len(head) + 1,
+                               is_file_tail=True)
+    for ev in head:
+        _replay_apply(acc, ev)
+    if head:
+        _save_snapshot(ledger_path, acc, content, complete, lines + len(head))
+    for ev in rest:
+        _replay_apply(acc, ev)
+    state = _replay_finish(acc)
+
+    if verify:
+        full = replay(_parse_ledger_lines(content.decode("utf-8"), 1, is_file_tail=True))
+        if full != state:
+            diff = sorted(k for k in full if full[k] != state.get(k))
+            with contextlib.suppress(OSError):
+                replay_snapshot_path(ledger_path).unlink()
+            raise LedgerSnapshotMismatch(
+                f"スナップショット+末尾replayが全replayと一致しません: {diff}"
+            )
+    return state
 
 
 # --- note_eval_parse ----------------------------------------------------------
@@ -591,3 +771,31 @@ def extract_min_faves(q: str) -> int | None:
         return None
     m = _MIN_FAVES_RE.search(q)
     return int(m.group(1)) if m else None
+
+
+def main(argv=None) -> int:
+    """台帳replayスナップショットの検証（スナップショット+末尾replay == 全replay）。"""
+    import argparse
+
+    ap = argparse.ArgumentParser(description=main.__doc__)
+    ap.add_argument("--verify-snapshot", metavar="LEDGER", required=True,
+                    help="検証する台帳JSONL（スナップショットが無ければ作ってから検証する）")
+    args = ap.parse_args(argv)
+    try:
+        load_replay_state(args.verify_snapshot)  # 無ければ作る・あれば末尾まで進める
+        state = load_replay_state(args.verify_snapshot, verify=True)
+    except LedgerSnapshotMismatch as exc:
+        print(f"[bookmarks_keyword_common] SNAPSHOT MISMATCH: {exc}", file=sys.stderr)
+        return 1
+    except LedgerCorruption as exc:
+        print(f"[bookmarks_keyword_common] LEDGER CORRUPTION: {exc}", file=sys.stderr)
+        return 5
+    snap = replay_snapshot_path(args.verify_snapshot)
+    print(f"[bookmarks_keyword_common] snapshot OK: {snap.name} "
+          f"generation={(state['last_generation'] or {}).get('generation')} "
+          f"baseline_urls={len(state['baseline_urls'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
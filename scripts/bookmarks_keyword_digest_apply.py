@@ -324,19 +324,19 @@ def find_pair_by_run_id(inbox: Path, run_id: str):
     return rp, sp, data
 
 
-def current_source_urls_sha256(latest_data: dict, events: list) -> str | None:
+def current_source_urls_sha256(latest_data: dict, replay_state: dict) -> str | None:
     """現在の「正」とみなすurls_sha256を返す。
 
     優先: latest.json側の source_snapshot.urls_sha256。それが無ければ台帳末尾の
-    generationイベントのsource_snapshot.urls_sha256にフォールバックする。
+    generationイベントのsource_snapshot.urls_sha256（replay_state["last_source_snapshot"]）
+    にフォールバックする。
     どちらにも無ければNone（statusのurls_sha256もNoneの場合のみ許容=同一視）。
     """
     snapshot = (latest_data or {}).get("source_snapshot")
     if snapshot:
         return snapshot.get("urls_sha256")
-    for ev in reversed(events):
-        if ev.get("type") == "generation":
-            return (ev.get("source_snapshot") or {}).get("urls_sha256")
+    if replay_state.get("last_generation"):
+        return (replay_state.get("last_source_snapshot") or {}).get("urls_sha256")
     return None
 
 
@@ -416,17 +416,16 @@ def run_apply(args, now: datetime) -> int:
 def _run_apply_locked(args, now: datetime, pair, ledger_path: Path) -> int:
     rp, sp, status = pair
 
+    # 台帳全体のJSON検証+replayを毎回やり直さない（スナップショット+末尾replay・2026-10-19）
     try:
-        events = common.read_ledger(ledger_path)
+        replay_state = common.load_replay_state(ledger_path)
     except common.LedgerCorruption as exc:
         sys.stderr.write(f"[bookmarks_keyword_digest_apply] LEDGER CORRUPTION: {exc}\n")
         return 5
 
-    replay_state = common.replay(events)
-
     latest_path = Path(args.latest)
     latest_data = json.loads(latest_path.read_text(encoding="utf-8")) if latest_path.exists() else {}
-    current_urls_sha256 = current_source_urls_sha256(latest_data, events)
+    current_urls_sha256 = current_source_urls_sha256(latest_data, replay_state)
 
     ok, reason = validate_run_integrity(status, replay_state, now, current_urls_sha256)
     if not ok:
@@ -350,13 +350,13 @@ def resolve_meta(latest: dict, ledger_path) -> dict:
         "last_fetch_success_at": latest.get("last_fetch_success_at"),
     }
 
+    # 台帳全体を毎回replayしない: スナップショット+末尾replay（空台帳・破損時はlatest.jsonの値のまま）
     try:
-        events = common.read_ledger(ledger_path)
+        state = common.load_replay_state(ledger_path)
     except common.LedgerCorruption:
-        events = []
+        state = None
 
-    if events:
-        state = common.replay(events)
+    if state:
         last_gen = state.get("last_generation")
         if last_gen:
             meta["generation"] = last_gen.get("generation", meta["generation"])
@@ -531,12 +531,9 @@ def render_proposals_section(proposals: list) -> str:
 def load_latest_digest(ledger_path) -> dict | None:
     """台帳replayから最新のdigestイベント（latest_digest）を返す。無ければNone。"""
     try:
-        events = common.read_ledger(ledger_path)
+        return common.load_replay_state(ledger_path).get("latest_digest")
     except common.LedgerCorruption:
-        events = []
-    if not events:
         return None
-    return common.replay(events).get("latest_digest")
 
 
 def render_digest_item(item: dict, cluster_names: dict) -> str:
@@ -386,28 +386,6 @@ def compute_stats_candidates(records, top_n=STATS_CANDIDATES_TOP_N):
     return candidates[:top_n]
 
 
-def _collect_known_eval_ids(events):
-    """台帳replay由来の既知qid/pid集合を返す({(id_type, id), ...})。
-
-    note_eval_parseへのknown_ids引数として渡し、LLM/raw由来テキストへ埋め込まれた
-    未知id（偽造マーカー）を無視させる（P0-5対策）。
-    """
-    known = set()
-    for ev in events:
-        if ev.get("type") != "generation":
-            continue
-        for cluster in (ev.get("active_clusters") or []) + (ev.get("dormant_clusters") or []):
-            for q in cluster.get("queries", []):
-                qid = q.get("query_id")
-                if qid:
-                    known.add(("qid", qid))
-        for p in ev.get("proposals") or []:
-            pid = p.get("proposal_id")
-            if pid:
-                known.add(("pid", pid))
-    return known
-
-
 def harvest_evaluations(note_path, ledger_path, replay_state, run_id):
     """ノートから評価マークを収穫し、未消費の新規評価をevaluation_batchとして台帳へ追記する。
 
@@ -420,7 +398,7 @@ def harvest_evaluations(note_path, ledger_path, replay_state, run_id):
 
     note_hash = common.sha256_of_file(note_path)
     note_text = note_path.read_text(encoding="utf-8")
-    known_ids = _collect_known_eval_ids(common.read_ledger(ledger_path))
+    known_ids = replay_state["known_eval_ids"]
     evaluations, unknown_values = common.note_eval_parse(note_text, known_ids=known_ids)
     if unknown_values:
         return note_hash, unknown_values
@@ -570,7 +548,7 @@ def _move_export_file(src: Path, dst_dir: Path) -> None:
     shutil.move(str(src), str(dst_dir / src.name))
 
 
-def harvest_web_exports(downloads_dir, ledger_path, events, replay_state, run_id):
+def harvest_web_exports(downloads_dir, ledger_path, replay_state, run_id):
     """~/Downloads直下（再帰なし）のx-keywords-evals-*.jsonを回収し、台帳へ
     evaluation_batch（source=web_export）イベントを追記する。
 
@@ -593,7 +571,7 @@ def harvest_web_exports(downloads_dir, ledger_path, events, replay_state, run_id
     ledger_dir = Path(ledger_path).parent
     processed_dir = ledger_dir / WEB_EXPORT_PROCESSED_DIRNAME
     rejected_dir = ledger_dir / WEB_EXPORT_REJECTED_DIRNAME
-    known_ids = _collect_known_eval_ids(events)
+    known_ids = replay_state["known_eval_ids"]
 
     valid_files = []
     for path in sorted(downloads_root.glob(WEB_EXPORT_GLOB)):
@@ -761,29 +739,27 @@ def build_worklist(args) -> tuple:
 
     # 台帳読込→評価収穫(evaluation_batch append)→再読込の区間はingestと排他する(P1-1)。
     with common.pipeline_lock(args.ledger):
+        # 台帳の全行検証+全replayは毎回やらない: スナップショット+末尾replay（2026-10-19）。
+        # 破損検出（末尾/途中）は read_ledger と同じ例外で上がる
         try:
-            events = common.read_ledger(args.ledger)
+            replay_state = common.load_replay_state(args.ledger)
         except common.LedgerTailCorruption as exc:
             return {"abort": {"reason": "ledger_corruption", "detail": str(exc), "tail": True}}, 5
         except common.LedgerCorruption as exc:
             return {"abort": {"reason": "ledger_corruption", "detail": str(exc), "tail": False}}, 5
 
-        replay_state = common.replay(events)
-
         note_hash, unknown_values = harvest_evaluations(args.note, args.ledger, replay_state, run_id)
         if unknown_values:
             return {"abort": {"reason": "unknown_eval_values", "values": unknown_values}}, 3
 
         if note_hash is not None:
-            # 評価収穫でイベントを追記した可能性があるため、最新状態を読み直す。
-            events = common.read_ledger(args.ledger)
-            replay_state = common.replay(events)
+            # 評価収穫でイベントを追記した可能性があるため、最新状態を読み直す（末尾だけ）。
+            replay_state = common.load_replay_state(args.ledger)
 
         downloads_dir = getattr(args, "downloads_dir", DEFAULT_DOWNLOADS_DIR)
-        web_export_harvest = harvest_web_exports(downloads_dir, args.ledger, events, replay_state, run_id)
+        web_export_harvest = harvest_web_exports(downloads_dir, args.ledger, replay_state, run_id)
         if web_export_harvest["appended_events"]:
-            events = common.read_ledger(args.ledger)
-            replay_state = common.replay(events)
+            replay_state = common.load_replay_state(args.ledger)
 
     delta_records, eligible_nonempty = compute_delta(records, replay_state["baseline_urls"])
     current_url_keys = {common.canonical_url_key(r["url"]) for r in records if r.get("url")}
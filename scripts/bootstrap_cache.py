@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""月ブロック・ブートストラップ結果（p値・CI）の内容アドレス型キャッシュ。
+
+kpi_screen_batch（帰無中心化 p値 n_boot=20000/50000・seed 42/43 の感度確認・lift/EV CI）と
+kpi_bonferroni_check（n_boot=10000 の調整 CI）は、同じシグナル母集団 × 同じ推定量 × 同じ seed の
+セルを再スクリーン・グリッド改訂（screening_grid_v1/v2t/v4）・FDR の掛け直しのたびに計算し直して
+いた。結果は入力と乱数 seed だけで決まるので、次をハッシュした鍵で結果を保存する（2026-10-19）。
+
+    鍵 = sha256(推定量のソース, numpy のバージョン, パラメータ(n_boot/seed/ci_level/cost...),
+                入力列の型と中身（行順どおり）)
+    data/kpi_trials/bootstrap_cache/<鍵の先頭2桁>/<鍵>.json   {"estimator", "params", "result"}
+
+  - 推定量のソース（補助関数込み）を鍵に含めるので、計算式を直したら自動的に別の鍵になる。
+    numpy の版も含める（Generator の乱数列は版をまたいだ同一性が保証されないため）
+  - 入力列は並び順ごとハッシュする（月内の合計は行順で浮動小数の丸めが変わり得るため）
+  - 保存するのは結果の dict のみ（draw 列そのものは持たない。結果は鍵から決定的に再現できる）
+  - enabled=False なら素通し（--no-bootstrap-cache。キャッシュ無しの実行と結果は同一）
+
+依存は numpy / pandas（呼び出し側と同じ）のみ。
+"""
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+import kpi_event_study  # noqa: E402  (Canonical Module: bootstrap_lift_ci / bootstrap_ev_ci)
+import measure_base_rate  # noqa: E402  (Canonical Module: ROUND_TRIP_COST)
+
+CACHE_DIR = Path("data/kpi_trials/bootstrap_cache")
+CACHE_VERSION = 1
+
+
+def estimator_id(*fns: Callable) -> str:
+    """推定量（と結果を左右する補助関数）のソースのハッシュ。"""
+    h = hashlib.sha256()
+    for fn in fns:
+        h.update(f"{fn.__module__}.{fn.__qualname__}\n".encode("utf-8"))
+        h.update(inspect.getsource(fn).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def frame_digest(df: pd.DataFrame, columns: Iterable[str]) -> str:
+    """指定列の型と中身（行順どおり）のハッシュ。"""
+    h = hashlib.sha256()
+    for col in columns:
+        arr = df[col].to_numpy()
+        h.update(f"{col}\0{arr.dtype.str}\0{len(arr)}\0".encode("utf-8"))
+        if arr.dtype.kind in "biuf":
+            h.update(np.ascontiguousarray(arr).tobytes())
+        else:
+            h.update("\0".join(map(str, arr.tolist())).encode("utf-8"))
+    return h.hexdigest()
+
+
+class BootstrapCache:
+    """ブートストラップ結果の読み書き。hits/misses はこのインスタンスでの件数。"""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._mem: dict[str, str] = {}  # 鍵 -> 保存形の JSON（呼び出し側の書き換えが波及しないよう毎回解く）
+        self._ids: dict[tuple, str] = {}
+
+    def key(self, estimator: tuple[Callable, ...], df: pd.DataFrame, columns: Iterable[str],
+            params: dict[str, Any]) -> str:
+        est = self._ids.get(estimator)
+        if est is None:
+            est = self._ids[estimator] = estimator_id(*estimator)
+        header = json.dumps({"v": CACHE_VERSION, "estimator": est, "numpy": np.__version__, "params": params},
+                            sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(f"{header}\n{frame_digest(df, columns)}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _load(self, key: str) -> Optional[dict]:
+        text = self._mem.get(key)
+        if text is None:
+            try:
+                text = self._path(key).read_text(encoding="utf-8")
+            except OSError:
+                return None
+        try:
+            entry = json.loads(text)
+        except ValueError:
+            return None
+        self._mem[key] = text
+        return entry.get("result") if isinstance(entry, dict) else None
+
+    def _store(self, key: str, estimator: tuple[Callable, ...], params: dict, result: dict) -> None:
+        try:
+            text = json.dumps({"estimator": [f"{f.__module__}.{f.__qualname__}" for f in estimator],
+                               "params": params, "result": result}, ensure_ascii=False)
+        except TypeError:
+            return  # JSON 化できない結果は保存しない
+        self._mem[key] = text
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def get_or_compute(self, estimator: tuple[Callable, ...], df: pd.DataFrame, columns: Iterable[str],
+                       params: dict[str, Any], compute: Callable[[], dict]) -> dict:
+        """鍵が一致する保存結果を返す。無ければ compute() して保存する。"""
+        if not self.enabled:
+            return compute()
+        key = self.key(estimator, df, columns, params)
+        hit = self._load(key)
+        if hit is not None:
+            self.hits += 1
+            return hit
+        self.misses += 1
+        result = compute()
+        self._store(key, estimator, params, result)
+        return result
+
+    def lift_ci(self, df: pd.DataFrame, base_rate_by_month: dict[str, float],
+                n_boot: int = kpi_event_study.N_BOOTSTRAP, seed: int = kpi_event_study.BOOTSTRAP_SEED,
+                ci_level: float = 0.95) -> dict:
+        """kpi_event_study.bootstrap_lift_ci と同じ結果（df 中の月のベースレートも鍵に含める）。"""
+        months = sorted(df["month"].unique())
+        params = {"n_boot": n_boot, "seed": seed, "ci_level": ci_level,
+                  "base_rate": [[str(m), base_rate_by_month.get(m)] for m in months]}
+        return self.get_or_compute(
+            (kpi_event_study.bootstrap_lift_ci, kpi_event_study._pooled_p20_and_base,
+             kpi_event_study._is_missing_base_rate),
+            df, ("month", "ret"), params,
+            lambda: kpi_event_study.bootstrap_lift_ci(df, base_rate_by_month, n_boot=n_boot, seed=seed,
+                                                      ci_level=ci_level),
+        )
+
+    def ev_ci(self, df: pd.DataFrame, ev_column: str = "ret", cost: float = measure_base_rate.ROUND_TRIP_COST,
+              n_boot: int = kpi_event_study.N_BOOTSTRAP, seed: int = kpi_event_study.BOOTSTRAP_SEED,
+              ci_level: float = 0.95, month_equal_weight: bool = False) -> dict:
+        """kpi_event_study.bootstrap_ev_ci と同じ結果。"""
+        params = {"ev_column": ev_column, "cost": cost, "n_boot": n_boot, "seed": seed, "ci_level": ci_level,
+                  "month_equal_weight": month_equal_weight}
+        return self.get_or_compute(
+            (kpi_event_study.bootstrap_ev_ci, kpi_event_study._pooled_ev, kpi_event_study._month_equal_ev),
+            df, ("month", ev_column), params,
+            lambda: kpi_event_study.bootstrap_ev_ci(df, ev_column=ev_column, cost=cost, n_boot=n_boot, seed=seed,
+                                                    ci_level=ci_level, month_equal_weight=month_equal_weight),
+        )
+
+    def summary(self) -> str:
+        return f"bootstrap_cache hits={self.hits} misses={self.misses}" if self.enabled else "bootstrap_cache off"
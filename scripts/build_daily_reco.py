@@ -21,8 +21,10 @@ SCRIPTS = Path(__file__).resolve().parent
 REPO = SCRIPTS.parent
 sys.path.insert(0, str(SCRIPTS))
 
-import jq_fetch  # noqa: E402  (stdlib-only・DATA_ROOT と read_json_gz を再利用)
 from kpi_clock_sla import KPI_SHORT_JA  # noqa: E402  (表示名の正本を再利用)
+import ledger_index  # noqa: E402  (台帳の status 索引)
+import master_index  # noqa: E402  (月次 master の時点索引)
+import trading_calendar  # noqa: E402  (Canonical Module: 取引カレンダーの営業日演算)
 
 LEDGER_PATH = REPO / "data/paper_trades/ledger.jsonl"
 META_PATH = REPO / "config/recipe_shelf_meta.json"
@@ -41,37 +43,49 @@ TIER_WATCH = "observing"  # 本番試験走行 → 観察欄
 RECENT_BDAYS = 5      # 有力候補として掲示する鮮度窓（営業日・表示専用の既定値）
 NOSTOP_BDAYS = 20     # nostop 満期（catalog 凍結値の引用）
 
-# 営業日概算用の祝日（表示専用の概算・判定には不使用）
+# 営業日概算用の祝日（取引カレンダーが無い・範囲外の時だけ使う。表示専用の概算・判定には不使用）
 HOLIDAYS_APPROX = {"2026-08-11", "2026-09-21", "2026-09-22", "2026-10-12"}
 
 
-def load_jsonl(path: Path) -> list[dict]:
-    rows = []
-    with path.open(encoding="utf-8") as handle:
-        for line in handle:
-            if line.strip():
-                rows.append(json.loads(line))
-    return rows
+def load_active_rows(path: Path) -> list[dict]:
+    """台帳のうち pending_entry / open の行（台帳順）。決済済みの行は読まない（status 索引・2026-10-19）。"""
+    if not path.exists():
+        raise FileNotFoundError(path)
+    return ledger_index.Ledger(path).lookup_any("status", ("pending_entry", "open"))
 
 
 def code_names() -> dict[str, str]:
-    """銘柄コード→社名（daily_screen.code_name と同じ月次masterを読む・表示専用）。"""
+    """銘柄コード→社名（daily_screen.code_name と同じ最新の月次masterを master_index から引く・表示専用）。"""
     names: dict[str, str] = {}
     try:
-        files = sorted((jq_fetch.DATA_ROOT / "master").glob("*.json.gz"))
-        if files:
-            obj = jq_fetch.read_json_gz(files[-1])
-            rows = obj if isinstance(obj, list) else (obj.get("info") or obj.get("data") or [])
-            for row in rows:
-                if row.get("Code"):
-                    names[str(row["Code"])] = row.get("CoName") or ""
+        for code, rec in master_index.open_index().latest(fields=["CoName"]).items():
+            names[str(code)] = rec["CoName"] or ""
     except Exception as exc:  # noqa: BLE001  (表示専用・社名なしで続行)
         print(f"WARN: 社名マスタ読込失敗（コードのみ表示で続行）: {exc}", file=sys.stderr)
     return names
 
 
+def _calendar_offset(date: dt.date, n: int, roll: str) -> dt.date | None:
+    """取引カレンダーで n 営業日ずらす（calendar.json.gz が無い・date が範囲外なら None）。"""
+    try:
+        cal = trading_calendar.jp()
+    except FileNotFoundError:
+        return None
+    key = date.strftime("%Y%m%d")
+    if not len(cal) or not cal.first <= key <= cal.last:
+        return None
+    day = cal.offset(key, n, roll=roll)
+    return parse_ymd(day) if day else None
+
+
 def add_bdays(date: dt.date, n: int) -> dt.date:
-    """土日+概算祝日スキップの営業日加算（表示専用の概算）。"""
+    """date の翌日から数えて n 営業日目（表示専用）。
+
+    取引カレンダーがあればそれで数え（2026-10-19）、無ければ土日+概算祝日スキップの概算。
+    """
+    exact = _calendar_offset(date, n, roll="backward")
+    if exact is not None:
+        return exact
     current = date
     remaining = n
     while remaining > 0:
@@ -82,6 +96,10 @@ def add_bdays(date: dt.date, n: int) -> dt.date:
 
 
 def recent_bday_floor(today: dt.date, n: int) -> dt.date:
+    """today の前日から遡って n 営業日目（add_bdays の逆向き）。"""
+    exact = _calendar_offset(today, -n, roll="forward")
+    if exact is not None:
+        return exact
     current = today
     remaining = n
     while remaining > 0:
@@ -104,7 +122,7 @@ def build() -> tuple[str, dict]:
     tiers = {kpi: item["tier"] for kpi, item in meta["kpi_classification"].items()}
     watchlist = json.loads(WATCHLIST_PATH.read_text(encoding="utf-8"))["watchlist"]
     wl_by_name = {e["kpi_name"]: e for e in watchlist}
-    ledger = load_jsonl(LEDGER_PATH)
+    ledger = load_active_rows(LEDGER_PATH)
     names = code_names()
     today = dt.date.today()
     recent_floor = recent_bday_floor(today, RECENT_BDAYS)
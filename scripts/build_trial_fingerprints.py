@@ -21,14 +21,20 @@ trials.jsonl側のfamily/entry_conditionはkpi_nameからの規則ベース対
 Usage:
     docker compose run --rm xstock python scripts/build_trial_fingerprints.py
     # 出力: data/kpi_trials/trial_fingerprints.json（ensure_ascii=False・冪等）
+    # 併せて近傍検索索引 data/kpi_trials/trial_similarity_index.json を追記分だけ更新する
+    # （類似試行の照合は scripts/trial_similarity.py query）
 """
 from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
 from typing import Any
 
+sys.path.insert(0, str(Path(__file__).parent))
+import ledger_index  # noqa: E402  (Canonical Module: 台帳の逐次読み)
+
 TRIALS_JSONL = Path("data/kpi_trials/trials.jsonl")
 CATALOG_MD = Path("docs/stock-algo-kpi-catalog.md")
 OUTPUT_PATH = Path("data/kpi_trials/trial_fingerprints.json")
@@ -476,14 +482,9 @@ def _period_str(period: dict[str, Any] | None) -> str:
 
 
 def load_trials(path: Path) -> list[dict[str, Any]]:
-    rows: list[dict[str, Any]] = []
-    with path.open(encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            rows.append(json.loads(line))
-    return rows
+    if not path.exists():
+        raise FileNotFoundError(path)
+    return list(ledger_index.Ledger(path).rows())
 
 
 def determine_verdict(kpi_name: str, rows_for_kpi: list[dict[str, Any]]) -> str:
@@ -929,6 +930,11 @@ def main() -> int:
         default=OUTPUT_PATH,
         help=f"出力先（既定: {OUTPUT_PATH}）",
     )
+    parser.add_argument(
+        "--no-similarity-index",
+        action="store_true",
+        help="近傍検索索引（scripts/trial_similarity.py）を更新しない",
+    )
     args = parser.parse_args()
 
     if not TRIALS_JSONL.exists():
@@ -983,6 +989,13 @@ def main() -> int:
     print(f"family別内訳: {family_counts}")
     print(f"UNKNOWN kpi_names ({len(unknown)}): {unknown}")
 
+    # 近傍検索索引（trial_similarity）も追記分だけ追いつかせる（2026-10-19）
+    if not args.no_similarity_index:
+        from trial_similarity import INDEX_PATH, refresh
+
+        index, stats = refresh(TRIALS_JSONL, INDEX_PATH)
+        print(f"近傍検索索引: {INDEX_PATH}（{len(index['entries'])} 試行・追記解析 {stats['parsed']} 行）")
+
     return 0
 
 
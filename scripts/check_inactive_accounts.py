@@ -25,11 +25,13 @@ def main():
     parser.add_argument("--days", type=int, default=INACTIVE_THRESHOLD_DAYS,
                         help=f"非活動判定の閾値日数 (default: {INACTIVE_THRESHOLD_DAYS})")
     parser.add_argument("--no-cache", action="store_true", default=False,
-                        help="キャッシュを使わず再チェック")
+                        help="保存結果を使わず全件を再チェック")
     parser.add_argument("--profile", "-p", type=str, default="./x_profile",
                         help="ブラウザプロファイルのパス (default: ./x_profile)")
     parser.add_argument("--output", "-o", type=str, default="./output",
                         help="出力ディレクトリ (default: ./output)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="同時に開くページ数 (default: INACTIVE_CHECK_CONFIG)")
     args = parser.parse_args()
 
     usernames = get_all_usernames()
@@ -43,7 +45,9 @@ def main():
         profile_path=args.profile,
         headless=args.headless,
         use_cache=not args.no_cache,
-        output_dir=args.output
+        output_dir=args.output,
+        workers=args.workers,
+        threshold_days=args.days
     )
 
     # 非活動アカウント検出
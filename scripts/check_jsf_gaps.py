@@ -11,9 +11,15 @@ error のみだった日を欠損として扱う）。
 に合わせた暦週平日であり、J-Quants側のJPX営業日カレンダー（祝日除外）とは別の定義
 （本スクリプトはjsf archive監視専用でJ-Quants依存を持たせないための意図的な単純化）。
 
+--data-dates は実行記録ではなく収録データ側を見る: 解析済みストア（scripts/jsf_store.py）の
+manifest だけを読み、日付列を持つデータセット（zandaka/shina/meigara）で data_date が
+1件も収録されていない平日を列挙する（CSV は開かない）。祝日は配信自体がないため欠損として出るので、
+実行記録側の検査とは別の参考出力として扱う。
+
 Usage:
     python3 scripts/check_jsf_gaps.py
     python3 scripts/check_jsf_gaps.py --lookback-weekdays 10
+    python3 scripts/check_jsf_gaps.py --data-dates --lookback-weekdays 20
 """
 from __future__ import annotations
 
@@ -25,6 +31,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 import jsf_daily_archive  # noqa: E402  (Canonical Module: DATASETS/LOG_PATH/now_jstを再利用)
+import jsf_store  # noqa: E402
 
 OK_STATUSES = {"saved", "skipped_dup"}
 
@@ -81,12 +88,35 @@ def find_gaps(log_records: list[dict], target_days: list[str]) -> list[tuple[str
     return gaps
 
 
+def find_data_gaps(manifest: dict, target_days: list[str]) -> list[tuple[str, str]]:
+    """ストア manifest 上で data_date が無い (day, dataset) の一覧（日付列のあるデータセットのみ）。"""
+    gaps = []
+    for dataset in sorted(jsf_daily_archive.DATASETS):
+        if jsf_daily_archive.DATASETS[dataset]["date_column"] is None:
+            continue
+        stored = set(jsf_store.stored_dates(dataset, manifest=manifest))
+        gaps.extend((day, dataset) for day in target_days if day.replace("-", "") not in stored)
+    return sorted(gaps)
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="jsf_daily_archive.py の欠損検知（直近営業日走査）")
     parser.add_argument("--lookback-weekdays", type=int, default=5)
     parser.add_argument("--log-path", default=str(jsf_daily_archive.LOG_PATH))
+    parser.add_argument("--data-dates", action="store_true",
+                        help="実行記録ではなくストア manifest の収録 data_date で欠損を見る")
+    parser.add_argument("--store-root", default=str(jsf_store.STORE_ROOT))
     args = parser.parse_args()
 
+    if args.data_dates:
+        target_days = recent_weekdays(args.lookback_weekdays, jsf_daily_archive.now_jst().date())
+        gaps = find_data_gaps(jsf_store.load_manifest(Path(args.store_root)), target_days)
+        for day, dataset in gaps:
+            print(f"WARN: 未収録 {day} [{dataset}]（祝日なら正常）", file=sys.stderr)
+        print(f"data_date 未収録{len(gaps)}件（直近{args.lookback_weekdays}平日・詳細はSTDERR）"
+              if gaps else f"OK（直近{args.lookback_weekdays}平日の data_date はすべて収録済み）")
+        return 1 if gaps else 0
+
     log_path = Path(args.log_path)
     records = _read_log_records(log_path)
     if not records:
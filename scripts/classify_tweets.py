@@ -198,8 +198,32 @@ def print_summary(tweets: List[Dict], classifier: TweetClassifier):
     print("=" * 70)
 
 
-def main():
-    """Main execution function"""
+def init_classifiers():
+    """
+    Initialize the keyword and LLM classifiers.
+
+    Returns:
+        (TweetClassifier, LLMClassifier or None when the LLM is unavailable)
+    """
+    print("\nInitializing classifiers...")
+    keyword_classifier = TweetClassifier()
+    try:
+        llm_classifier = LLMClassifier()
+    except ValueError as e:
+        print(f"Warning: LLM classifier unavailable ({e})")
+        print("Falling back to keyword-only classification.")
+        llm_classifier = None
+    print("Classifiers initialized")
+    return keyword_classifier, llm_classifier
+
+
+def main(argv=None, tweets=None, classifiers=None):
+    """
+    Main execution function.
+
+    daily_pipeline --in-process passes the tweets collected in the same process
+    (with --input pointing at their tweets.json) and the shared classifiers.
+    """
     parser = argparse.ArgumentParser(
         description='Classify tweets using LLM and regenerate viewer.html'
     )
@@ -220,7 +244,7 @@ def main():
         help='Skip viewer.html regeneration'
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Find input file
     if args.input:
@@ -232,27 +256,22 @@ def main():
             print("Please specify --input path/to/tweets.json")
             sys.exit(1)
 
-    print(f"Loading tweets from: {input_file}")
+    if tweets is None:
+        print(f"Loading tweets from: {input_file}")
 
-    # Load tweets
-    try:
-        tweets = load_tweets(input_file)
-        print(f"✓ Loaded {len(tweets)} tweets")
-    except Exception as e:
-        print(f"Error loading tweets: {e}")
-        sys.exit(1)
+        # Load tweets
+        try:
+            tweets = load_tweets(input_file)
+            print(f"✓ Loaded {len(tweets)} tweets")
+        except Exception as e:
+            print(f"Error loading tweets: {e}")
+            sys.exit(1)
+    else:
+        print(f"Using {len(tweets)} tweets collected in this process ({input_file})")
 
     # Initialize classifiers
-    print("\nInitializing classifiers...")
-    keyword_classifier = TweetClassifier()
-    try:
-        llm_classifier = LLMClassifier()
-        llm_available = True
-    except ValueError as e:
-        print(f"Warning: LLM classifier unavailable ({e})")
-        print("Falling back to keyword-only classification.")
-        llm_available = False
-    print("Classifiers initialized")
+    keyword_classifier, llm_classifier = classifiers or init_classifiers()
+    llm_available = llm_classifier is not None
 
     # Run keyword classification
     print("\nRunning keyword classification...")
@@ -292,6 +311,7 @@ def main():
     print("\n" + "=" * 70)
     print("Classification complete!")
     print("=" * 70)
+    return output_json
 
 
 if __name__ == '__main__':
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""銘柄ごとの日次終値ストア（前向き評価の共通キャッシュ・2026-10-19）。
+
+foreign_forward は台帳の1行ごとに yfinance を呼び、同じ銘柄・同じ指数を1回の実行の中でも
+毎日の実行でも取り直していた。price_watch_forward も終値1つを引くたびに bars の日次ファイル
+（全銘柄分の gz）を読み直していた。どちらも「銘柄ごとの (日付, 終値) 列」を手元に持てば済む。
+
+規約:
+- 銘柄ごとに「取得済みの区間」[covered_from, covered_to)（終端は含まない）と終値列を持つ。
+  要求区間のうち足りない頭と尻だけを取りに行き、取得元が許すなら複数銘柄を1回で取る
+- 尻の取り足しは OVERLAP_DAYS 日重ねて取り直す。重なった過去行が REVISION_RTOL を超えて
+  変わっていたら（分割・配当の調整やり直し）その銘柄は取得済み区間ごと取り直す。
+  最後の行だけの変化は未確定の足の確定とみなして差し替える
+- 日付は取得元の表記のまま扱う（海外は YYYY-MM-DD、日本株 bars は YYYYMMDD）。区間の端は
+  同じ表記で渡す。文字列の大小で日付順になる表記ならどちらでもよい
+- 取得関数が返さなかった銘柄は取得済みにしない（次の要求で取り直す・fail-soft）。
+  空の列を返した銘柄は「その区間に足が無い」として取得済みにする
+- root を渡すと銘柄ごとに JSON で保存し、次回の実行は読むだけで済む
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import tempfile
+import urllib.parse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+STORE_VERSION = 1
+# 尻の取り足しで重ねる暦日数（遡及改訂の検出と、遅れて届いた足の拾い直し）
+OVERLAP_DAYS = 7
+# 重なり行の相対許容差（us_price_fetch.REVISION_RTOL と同じ考え方。float のゆらぎは無視する）
+REVISION_RTOL = 1e-4
+
+Pairs = List[Tuple[str, float]]
+# (銘柄リスト, 開始日, 終了日[含まない]) -> {銘柄: (日付, 終値) の列}
+FetchManyFn = Callable[[List[str], str, str], Dict[str, Pairs]]
+
+
+def shift_day(day: str, delta: int) -> str:
+    """日付を delta 暦日ずらす（YYYY-MM-DD / YYYYMMDD の表記を保つ）。"""
+    fmt = "%Y-%m-%d" if "-" in day else "%Y%m%d"
+    return (datetime.strptime(day, fmt) + timedelta(days=delta)).strftime(fmt)
+
+
+def _differs(a: float, b: float) -> bool:
+    scale = max(abs(a), abs(b))
+    return scale > 0 and abs(a - b) / scale > REVISION_RTOL
+
+
+class CloseSeries:
+    """1銘柄の日付昇順の終値列。引くのは二分探索だけ。"""
+
+    __slots__ = ("dates", "closes")
+
+    def __init__(self, dates: Sequence[str] = (), closes: Sequence[float] = ()):
+        self.dates = list(dates)
+        self.closes = list(closes)
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[str, float]]) -> "CloseSeries":
+        """(日付, 終値) の列から作る。順不同・重複は後勝ち。"""
+        merged = dict(pairs)
+        dates = sorted(merged)
+        return cls(dates, [merged[d] for d in dates])
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def pairs(self) -> Pairs:
+        return list(zip(self.dates, self.closes))
+
+    def on(self, day: str) -> Optional[float]:
+        """day ちょうどの終値（無ければ None）。"""
+        i = bisect.bisect_left(self.dates, day)
+        return self.closes[i] if i < len(self.dates) and self.dates[i] == day else None
+
+    def on_or_before(self, day: str, floor: Optional[str] = None) -> Tuple[Optional[float], Optional[str]]:
+        """day 以前の直近終値と日付（look-ahead を作らない）。floor より前の足は使わない。"""
+        i = bisect.bisect_right(self.dates, day) - 1
+        if i < 0 or (floor is not None and self.dates[i] < floor):
+            return None, None
+        return self.closes[i], self.dates[i]
+
+    def after(self, entry_day: str, n: int) -> Tuple[Optional[float], Optional[str]]:
+        """entry_day の n 取引日後（この銘柄の取引日で数える）。entry_day が無ければ None。"""
+        i = bisect.bisect_left(self.dates, entry_day)
+        if i >= len(self.dates) or self.dates[i] != entry_day or i + n >= len(self.dates):
+            return None, None
+        return self.closes[i + n], self.dates[i + n]
+
+    def between(self, start: str, end: str) -> Pairs:
+        """[start, end) の (日付, 終値) 列。"""
+        lo = bisect.bisect_left(self.dates, start)
+        hi = bisect.bisect_left(self.dates, end)
+        return list(zip(self.dates[lo:hi], self.closes[lo:hi]))
+
+
+class CloseStore:
+    """銘柄ごとの終値列と取得済み区間を持ち、足りない区間だけを取りに行くストア。
+
+    Args:
+        fetch_many: 複数銘柄を1回で取る取得関数（FetchManyFn）。
+        root: 保存先ディレクトリ。None ならメモリ上だけ（テスト・selftest 用）。
+        horizon: 区間の端と同じ表記の日付を受け取り、取得済みにしてよい終端（含まない）を返す
+            関数。既定は今日（今日の足は未確定なので取得済みにせず、次回の重なり取得で拾い直す）。
+    """
+
+    def __init__(self, fetch_many: FetchManyFn, root: Optional[Path] = None,
+                 horizon: Optional[Callable[[str], str]] = None):
+        self.fetch_many = fetch_many
+        self.root = Path(root) if root is not None else None
+        self.horizon = horizon or _today_like
+        self._series: Dict[str, CloseSeries] = {}
+        self._covered: Dict[str, Tuple[str, str]] = {}
+        self._loaded: set = set()
+
+    # --- 保存・読み込み ---------------------------------------------------------
+
+    def _path(self, symbol: str) -> Path:
+        assert self.root is not None
+        return self.root / f"{urllib.parse.quote(symbol, safe='')}.json"
+
+    def _load(self, symbol: str) -> None:
+        if symbol in self._loaded:
+            return
+        self._loaded.add(symbol)
+        if self.root is None:
+            return
+        path = self._path(symbol)
+        if not path.exists():
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("version") != STORE_VERSION:
+                return
+            self._series[symbol] = CloseSeries(data["dates"], [float(v) for v in data["closes"]])
+            self._covered[symbol] = (data["covered"][0], data["covered"][1])
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            return  # 壊れていれば取り直す
+
+    def _save(self, symbol: str) -> None:
+        if self.root is None or symbol not in self._covered:
+            return
+        series = self._series.get(symbol) or CloseSeries()
+        payload = {"version": STORE_VERSION, "symbol": symbol, "covered": list(self._covered[symbol]),
+                   "dates": series.dates, "closes": series.closes}
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".close_store.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self._path(symbol))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    # --- 参照 -------------------------------------------------------------------
+
+    def series(self, symbol: str) -> CloseSeries:
+        """手元にある終値列（取りには行かない。先に ensure する）。"""
+        self._load(symbol)
+        return self._series.get(symbol) or CloseSeries()
+
+    def covered(self, symbol: str) -> Optional[Tuple[str, str]]:
+        self._load(symbol)
+        return self._covered.get(symbol)
+
+    def history(self, symbol: str, start: str, end: str) -> Pairs:
+        """[start, end) を揃えてから (日付, 終値) 列で返す（従来の HistoryFn と同じ形）。"""
+        self.ensure([symbol], start, end)
+        return self.series(symbol).between(start, end)
+
+    # --- 取得 -------------------------------------------------------------------
+
+    def ensure(self, symbols: Iterable[str], start: str, end: str) -> None:
+        """symbols の [start, end) を手元に揃える。
+
+        足りない頭と尻だけを取りに行く。未取得・頭・尻の3組ごとに区間を1つにまとめ、1組
+        1回の fetch_many で取る（銘柄ごとに尻の始まりが違っても1回。重なって取り直した行は
+        突合に使うだけで害はない）。
+        """
+        missing = []
+        for symbol in dict.fromkeys(symbols):
+            cov = self.covered(symbol) if symbol else (start, end)
+            if cov is None or start < cov[0] or end > cov[1]:
+                missing.append(symbol)
+        if not missing:
+            return  # 揃っていれば取得元にも horizon にも触らない
+        cap = self.horizon(start)
+        fresh: List[str] = []
+        heads: Dict[str, str] = {}
+        tails: Dict[str, str] = {}
+        for symbol in missing:
+            cov = self.covered(symbol)
+            if cov is None:
+                fresh.append(symbol)
+                continue
+            if start < cov[0]:
+                heads[symbol] = cov[0]
+            if end > cov[1] and cov[1] < cap:
+                tails[symbol] = shift_day(cov[1], -OVERLAP_DAYS)
+        plans: List[Tuple[List[str], str, str]] = []
+        if fresh:
+            plans.append((fresh, start, end))
+        if heads:
+            plans.append((list(heads), start, max(heads.values())))
+        if tails:
+            plans.append((list(tails), min(tails.values()), end))
+
+        revised: Dict[str, Tuple[str, str]] = {}
+        touched: set = set()
+        for group, lo, hi in plans:
+            fetched = self._fetch(group, lo, hi)
+            for symbol in group:
+                pairs = fetched.get(symbol)
+                if pairs is None:
+                    continue  # 取得失敗は取得済みにしない
+                if self._merge(symbol, pairs, lo, min(hi, cap)):
+                    touched.add(symbol)
+                else:
+                    cov = self._covered[symbol]
+                    revised[symbol] = (min(cov[0], lo), max(cov[1], hi))
+
+        # 遡及改訂を検出した銘柄は取得済み区間ごと取り直して置き換える
+        if revised:
+            lo = min(r[0] for r in revised.values())
+            hi = max(r[1] for r in revised.values())
+            fetched = self._fetch(list(revised), lo, hi)
+            for symbol in revised:
+                pairs = fetched.get(symbol)
+                if pairs:
+                    self._series[symbol] = CloseSeries.from_pairs(pairs)
+                    self._covered[symbol] = (lo, max(lo, min(hi, cap)))
+                    touched.add(symbol)
+                else:
+                    # 取り直せなければ古い列は信用できないので捨てる（次回また取りに行く）
+                    self._series.pop(symbol, None)
+                    self._covered.pop(symbol, None)
+                    if self.root is not None:
+                        self._path(symbol).unlink(missing_ok=True)
+        for symbol in touched:
+            self._save(symbol)
+
+    def _fetch(self, symbols: List[str], start: str, end: str) -> Dict[str, Pairs]:
+        try:
+            return self.fetch_many(list(symbols), start, end) or {}
+        except Exception:  # noqa: BLE001  価格取得の失敗で本線を止めない
+            return {}
+
+    def _merge(self, symbol: str, pairs: Pairs, lo: str, hi: str) -> bool:
+        """取得した列を足し、取得済み区間を広げる。重なった過去行の遡及改訂を見つけたら False。"""
+        current = self._series.get(symbol) or CloseSeries()
+        old = dict(current.pairs())
+        last = current.dates[-1] if current.dates else None
+        for day, value in pairs:
+            if day in old and day != last and _differs(old[day], value):
+                return False
+        old.update(pairs)
+        self._series[symbol] = CloseSeries.from_pairs(old.items())
+        cov = self._covered.get(symbol)
+        hi = max(lo, hi)
+        self._covered[symbol] = (min(cov[0], lo), max(cov[1], hi)) if cov else (lo, hi)
+        return True
+
+
+def _today_like(sample: str) -> str:
+    """sample と同じ表記の今日の日付。"""
+    return datetime.now().strftime("%Y-%m-%d" if "-" in sample else "%Y%m%d")
+
+
+def per_symbol(history_fn: Callable[[str, str, str], Pairs]) -> FetchManyFn:
+    """1銘柄ずつの HistoryFn を FetchManyFn に包む（まとめ取りできない取得元・テスト差し替え用）。"""
+    def fetch_many(symbols: List[str], start: str, end: str) -> Dict[str, Pairs]:
+        return {s: history_fn(s, start, end) for s in symbols}
+    return fetch_many
@@ -30,11 +30,14 @@ from collector.config import (
     DATA_DIR,
     COLLECTION_SETTINGS,
     BATCH_SETTINGS,
+    SCHEDULER_SETTINGS,
     BLOCK_ERROR_PATTERNS,
     CollectTask,
     build_collect_tasks,
 )
 from collector.inactive_checker import run_inactive_check, detect_inactive_accounts
+from collector.collect_scheduler import CollectScheduler, ScheduledJob
+from collector.exceptions import CookieExpiredError
 
 
 def _emit_collection_metrics(
@@ -131,6 +134,69 @@ def _append_tweets_with_group_info(all_tweets: list, result: CollectionResult, t
     all_tweets.extend(result.tweets)
 
 
+def _append_new_tweets(all_tweets: list, tweets: list, task: CollectTask, seen_urls: set):
+    """並行モード用: 他タスクで収集済みのURLを除いてから all_tweets に追加"""
+    fresh = []
+    for tweet in tweets:
+        if tweet.get('url') in seen_urls:
+            continue
+        seen_urls.add(tweet.get('url'))
+        fresh.append(tweet)
+    _append_tweets_with_group_info(all_tweets, CollectionResult(tweets=fresh, status="success"), task)
+    return len(fresh)
+
+
+def _run_parallel_collect(tasks: list, profile_path: str, max_scrolls: int, workers: int,
+                          requests_per_minute: float, shared_collected_urls: set,
+                          all_tweets: list, no_retry: bool) -> list:
+    """
+    並行モードの収集（--workers 2 以上）
+
+    タスクごとに独立したブラウザコンテキストを開き（SafeXCollector.collect がワーカースレッド内で
+    起動する）、人間らしい待機はページごとにそのまま残す。バッチ分割・URL間待機の代わりに
+    CollectScheduler が全体の訪問予算（毎分）とブロック系エラーのURL単位バックオフを管理する。
+    同じ検索URLへは同時に1ページまで。重複排除はタスク間で結合する時に行う。
+
+    Returns:
+        直列のリトライフェーズへ回すタスク（ブロック以外の失敗でリトライ枠が残るもの）
+    """
+    scheduler = CollectScheduler(
+        workers=workers,
+        requests_per_minute=requests_per_minute,
+        fatal_errors=(CookieExpiredError,),
+    )
+    jobs = [ScheduledJob(key=t.search_url, payload=t) for t in tasks if t.status == "pending"]
+    print(f"並行収集: {len(jobs)}タスク / ワーカー{scheduler.workers} / 毎分{requests_per_minute}訪問まで")
+
+    def handler(task: CollectTask, _resource) -> CollectionResult:
+        return _execute_collect_task(task, profile_path, max_scrolls, None)
+
+    def blocked_of(result: CollectionResult) -> str:
+        return (result.error_type or "blocked") if result.status == "blocked" else ""
+
+    retry_queue = []
+    for outcome in scheduler.run(jobs, handler, blocked_of=blocked_of):
+        task = outcome.job.payload
+        # ブロックで打ち切った試行の部分結果も保存（直列モードと同じ）
+        for partial in outcome.attempt_results:
+            if partial is not outcome.result:
+                _append_new_tweets(all_tweets, partial.tweets, task, shared_collected_urls)
+        if outcome.status == "completed":
+            task.status = "completed"
+            n = _append_new_tweets(all_tweets, outcome.result.tweets, task, shared_collected_urls)
+            print(f"  → {task.group_key} [{task.url_type}]: {n}件収集")
+            continue
+        task.status = outcome.status
+        task.error_message = outcome.error_message
+        if outcome.status == "blocked":
+            if outcome.result is not None:
+                _append_new_tweets(all_tweets, outcome.result.tweets, task, shared_collected_urls)
+            print(f"  → {task.group_key} [{task.url_type}]: ブロック（{outcome.job.attempts}回試行）")
+        elif not no_retry and task.retries < BATCH_SETTINGS["max_retries"]:
+            retry_queue.append(task)
+    return retry_queue
+
+
 def _get_retry_wait(task: CollectTask) -> int:
     """エラー種別に応じた待機秒数を取得"""
     # ブロック系は長めに待機
@@ -177,8 +243,8 @@ def _print_collection_summary(tasks: list):
     print("=" * 60)
 
 
-def parse_args():
-    """コマンドライン引数をパース"""
+def parse_args(argv=None):
+    """コマンドライン引数をパース（argv=None なら sys.argv）"""
     parser = argparse.ArgumentParser(
         description='X投稿収集ツール（バッチ分割・自動リトライ対応）',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -198,6 +264,9 @@ def parse_args():
 
   # JSON出力のみ（CSV出力しない）
   python scripts/collect_tweets.py --no-csv
+
+  # 3ページ並行で収集（全体で毎分3訪問まで・ブロック時はURL単位でバックオフ）
+  python scripts/collect_tweets.py --workers 3 --rpm 3
         """
     )
 
@@ -268,6 +337,20 @@ def parse_args():
         help='自動リトライ無効化'
     )
 
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=1,
+        help='並行ブラウザ数。2以上でバッチ分割の代わりに並行スケジューラを使う (default: 1=直列)'
+    )
+
+    parser.add_argument(
+        '--rpm',
+        type=float,
+        default=SCHEDULER_SETTINGS["requests_per_minute"],
+        help=f'並行モードの毎分ページ訪問上限（全ワーカー合計） (default: {SCHEDULER_SETTINGS["requests_per_minute"]})'
+    )
+
     parser.add_argument(
         '--check-inactive',
         action='store_true',
@@ -320,12 +403,16 @@ def parse_args():
         help='データ保持日数 (デフォルト: 90)'
     )
 
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
-def main():
-    """メイン処理"""
-    args = parse_args()
+def main(argv=None, classifier=None):
+    """メイン処理
+
+    daily_pipeline の同一プロセス実行（--in-process）からは argv と分類器を渡して呼ばれ、
+    (tweets.json のパス, 収集したツイート) を返す（2026-10-19）。
+    """
+    args = parse_args(argv)
 
     def _validate_date(date_str, param_name):
         """YYYY-MM-DD 形式の日付を検証"""
@@ -379,7 +466,8 @@ def main():
             profile_path=str(profile_path),
             headless=True,
             use_cache=not args.no_inactive_cache,
-            output_dir=args.output
+            output_dir=args.output,
+            threshold_days=args.inactive_days
         )
         exclude_accounts = detect_inactive_accounts(results, threshold_days=args.inactive_days)
         if exclude_accounts:
@@ -410,7 +498,10 @@ def main():
     print(f"スクロール回数: {args.scrolls}")
     print(f"プロファイル: {profile_path}")
     print(f"タスク数: {len(tasks)} (インターリーブ: {'ON' if interleave else 'OFF'})")
-    print(f"バッチサイズ: {args.batch_size}, クールダウン: {args.cooldown}秒")
+    if args.workers > 1:
+        print(f"並行モード: ワーカー{args.workers}, 毎分{args.rpm}訪問まで")
+    else:
+        print(f"バッチサイズ: {args.batch_size}, クールダウン: {args.cooldown}秒")
     if exclude_accounts:
         print(f"除外アカウント: {len(exclude_accounts)}件")
     if args.since or args.until:
@@ -427,6 +518,13 @@ def main():
     # バッチ分割ループ
     batch_num = 0
     i = 0
+    if args.workers > 1:
+        # 並行モード: 訪問予算とバックオフはスケジューラが持つ。直列のバッチループは通らない
+        retry_queue = _run_parallel_collect(
+            tasks, str(profile_path), args.scrolls, args.workers, args.rpm,
+            shared_collected_urls, all_tweets, args.no_retry
+        )
+        i = len(tasks)
     while i < len(tasks):
         batch = tasks[i:i + args.batch_size]
         batch_num += 1
@@ -542,7 +640,7 @@ def main():
     # 分類処理
     if not args.no_classify:
         print("\n分類処理中...")
-        classifier = TweetClassifier()
+        classifier = classifier or TweetClassifier()
         all_tweets = classifier.classify_all(all_tweets)
         classifier.print_summary(all_tweets)
 
@@ -612,6 +710,7 @@ def main():
     if metrics["warnings"]:
         print(f"[WARNING] 閾値未達: {', '.join(metrics['warnings'])}")
     print()
+    return json_path, all_tweets
 
 
 if __name__ == "__main__":
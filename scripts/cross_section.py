@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""日次 bars（data/jquants/bars/YYYYMMDD.json.gz）から作る横断面（cross-section）統計のキャッシュ。
+
+売買代金トレーリング順位（measure_base_rate.build_universe の TOP-N 選抜）・20営業日リターン
+（influencer_rescore の3分位）・直近 N 日の平均売買代金（x_trade500_universe）・当日 Va
+（kpi_top1000_sensitivity の四分位）は、どれも呼ぶたびに複数日分の bars 全件を解凍し直していた。
+bars 1日分から Code 順・Va・AdjC だけを抜いた列と、営業日ごとの順位表を持つ（2026-10-19）。
+measure_base_rate（§6凍結）は読み替えず、順位表が build_universe と一致することをテストで固定する。
+
+    data/jquants/xsec/manifest.json         取込済み bars の署名・派生統計の設定
+    data/jquants/xsec/<YYYYMM>.json.gz      {"days": {日付: {"codes", "va", "adjc",
+                                              "turnover": {窓: [[code, 合計], ...]},
+                                              "ret": {ラグ: [[code, リターン], ...]}}}}
+
+  - turnover は build_universe と完全に同じ並び: 窓内の各日を日付順に、ファイル内の Code 順で
+    Va（真のものだけ）を 0.0 から足し、売買代金降順の安定ソート（同額は窓内で最初に Va が立った
+    日・その日のファイル内位置の順）。ProdCat 絞り込みは master 日付に依存するので持たず、
+    呼び出し側で順位表を絞る（安定ソート後の絞り込みは絞り込み後のソートと同じ並び）
+  - 窓・ラグは J-Quants カレンダーの営業日で数える（build_universe / ret20_cross_section と同じ）。
+    窓内の bars が欠けた日は統計を持たない（None。呼び出し側は従来の生 bars 経路に落ちて同じ
+    FATAL を出す）
+  - 更新は差分のみ: 署名（サイズ・mtime_ns）の変わった bars だけ読み直し、その日から窓・ラグが
+    届く先の営業日だけ統計を作り直す。書き換えるのは該当月のチャンクだけ
+
+依存は標準ライブラリのみ。
+
+Usage:
+    python3 scripts/cross_section.py sync
+    python3 scripts/cross_section.py top 20240131 --window 21 --n 10
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+import jq_fetch  # noqa: E402  (Canonical Module: DATA_ROOT / read_json_gz / カレンダー変換)
+
+BARS_DIR = jq_fetch.DATA_ROOT / "bars"
+STORE_DIR = jq_fetch.DATA_ROOT / "xsec"
+MANIFEST_NAME = "manifest.json"
+STORE_VERSION = 1
+TURNOVER_WINDOWS = (21,)  # build_universe の UNIVERSE_WINDOW（§6凍結）
+RETURN_LAGS = (20,)       # influencer_rescore.ret20_cross_section
+
+
+def _num(v: Any) -> Optional[float]:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def bars_columns(obj: dict) -> dict:
+    """bars 1日分を {"codes", "va", "adjc"} の列にする（load_bars_day の dict と同じ Code 順・後勝ち）。"""
+    day = {rec["Code"]: rec for rec in obj["data"]}
+    return {"codes": list(day), "va": [day[c].get("Va") for c in day], "adjc": [day[c].get("AdjC") for c in day]}
+
+
+def turnover_ranking(days: list[dict]) -> list[list]:
+    """窓内の日（日付昇順の列 dict）から [[code, 売買代金合計], ...]（build_universe と同じ並び）。"""
+    turnover: dict[str, float] = defaultdict(float)
+    for cols in days:
+        for code, va in zip(cols["codes"], cols["va"]):
+            if va:
+                turnover[code] += va
+    return [[c, tv] for c, tv in sorted(turnover.items(), key=lambda x: -x[1])]
+
+
+def trailing_returns(cur: dict, prev: dict) -> list[list]:
+    """cur の Code 順に AdjC(cur)/AdjC(prev)-1（どちらかが欠損・0 以下なら除外）。"""
+    prev_adjc = dict(zip(prev["codes"], prev["adjc"]))
+    out = []
+    for code, v in zip(cur["codes"], cur["adjc"]):
+        c1, c0 = _num(v), _num(prev_adjc.get(code))
+        if c1 and c0 and c0 > 0:
+            out.append([code, c1 / c0 - 1.0])
+    return out
+
+
+def _months_back(date: str, n: int) -> str:
+    """YYYYMMDD の n か月前の YYYYMM（窓の届く最古の月の目安）。"""
+    y, m = int(date[:4]), int(date[4:6]) - n
+    while m < 1:
+        y, m = y - 1, m + 12
+    return f"{y:04d}{m:02d}"
+
+
+def _calendar_bdays() -> Optional[list[str]]:
+    if not (jq_fetch.DATA_ROOT / "calendar.json.gz").exists():
+        return None
+    days = jq_fetch.load_calendar_days(api_key=None, run_id=None)  # type: ignore[arg-type]
+    return jq_fetch.business_days_in_range(days, "00010101", "99991231")
+
+
+class CrossSectionStore:
+    """月チャンクを必要な分だけ読み、差分同期と照会を行う。"""
+
+    def __init__(self, store_dir: Path = STORE_DIR, bars_dir: Path = BARS_DIR,
+                 bdays: Optional[list[str]] = None):
+        self.store_dir = store_dir
+        self.bars_dir = bars_dir
+        self._bdays = bdays
+        self._bday_pos: Optional[dict[str, int]] = None
+        self._chunks: dict[str, dict] = {}
+        self._positions: dict[str, dict[str, int]] = {}
+        self.manifest = self._load_manifest()
+
+    # --- 永続化 ---------------------------------------------------------------
+
+    def _config(self) -> dict:
+        return {"turnover_windows": list(TURNOVER_WINDOWS), "return_lags": list(RETURN_LAGS)}
+
+    def _load_manifest(self) -> dict:
+        empty = {"version": STORE_VERSION, **self._config(), "days": {}}
+        try:
+            m = json.loads((self.store_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return empty
+        if not isinstance(m, dict) or m.get("version") != STORE_VERSION:
+            return empty
+        return m
+
+    def _chunk(self, month: str) -> dict:
+        if month not in self._chunks:
+            path = self.store_dir / f"{month}.json.gz"
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    self._chunks[month] = json.load(f)
+            except (OSError, EOFError, ValueError):
+                self._chunks[month] = {"version": STORE_VERSION, "days": {}}
+        return self._chunks[month]
+
+    def _day(self, date: str) -> Optional[dict]:
+        return self._chunk(date[:6])["days"].get(date)
+
+    def _save_chunk(self, month: str) -> None:
+        path = self.store_dir / f"{month}.json.gz"
+        chunk = self._chunks[month]
+        if not chunk["days"]:
+            path.unlink(missing_ok=True)
+            return
+        raw = json.dumps(chunk, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        _write_atomic(path, gzip.compress(raw, mtime=0))
+
+    # --- 同期 -------------------------------------------------------------------
+
+    def bdays(self) -> Optional[list[str]]:
+        if self._bdays is None:
+            self._bdays = _calendar_bdays()
+        return self._bdays
+
+    def sync(self) -> dict[str, int]:
+        """bars と突き合わせ、変わった日の列と、その影響が届く営業日の統計だけ作り直す。"""
+        files = {p.name[:8]: p for p in sorted(self.bars_dir.glob("*.json.gz"))
+                 if p.name[:8].isdigit() and p.name == f"{p.name[:8]}.json.gz"} if self.bars_dir.exists() else {}
+        sigs = {}
+        for d, p in files.items():
+            st = p.stat()
+            sigs[d] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        known = self.manifest["days"]
+        config_changed = {k: self.manifest.get(k) for k in self._config()} != self._config()
+        changed = [d for d in files if known.get(d) != sigs[d]]
+        removed = [d for d in known if d not in files]
+        stats = {"read": 0, "removed": len(removed), "stats": 0}
+        if not changed and not removed and not config_changed:
+            return stats
+
+        touched: set[str] = set()
+        for d in removed:
+            self._chunk(d[:6])["days"].pop(d, None)
+            known.pop(d)
+            touched.add(d[:6])
+
+        bdays = self.bdays() or []
+        pos = {d: i for i, d in enumerate(bdays)}
+        reach = max([w - 1 for w in TURNOVER_WINDOWS] + list(RETURN_LAGS))
+        if config_changed:
+            dirty = set(files)
+        else:
+            dirty = set()
+            for d in changed + removed:
+                i = pos.get(d)
+                dirty.update(bdays[i:i + reach + 1] if i is not None else [d])
+        dirty &= set(files)
+
+        # 日付順に「列の取込 → 統計」を進め、窓の届かない古い月は書き出してメモリから外す
+        changed_set = set(changed)
+        for d in sorted(changed_set | dirty):
+            self._flush(touched, keep_from=_months_back(d, 2))
+            if d in changed_set:
+                self._chunk(d[:6])["days"][d] = bars_columns(jq_fetch.read_json_gz(files[d]))
+                self._positions.pop(d, None)
+                known[d] = sigs[d]
+                stats["read"] += 1
+            if d in dirty:
+                self._compute_stats(d, pos, bdays)
+                stats["stats"] += 1
+            touched.add(d[:6])
+        self.manifest.update(self._config())
+        self._flush(touched)
+        return stats
+
+    def _flush(self, touched: set[str], keep_from: Optional[str] = None) -> None:
+        """keep_from（YYYYMM）より前の月を書き出して手放す。None なら全部書き出し manifest も保存。"""
+        for month in sorted(m for m in touched if keep_from is None or m < keep_from):
+            self._save_chunk(month)
+            touched.discard(month)
+        for month in [m for m in self._chunks if keep_from is not None and m < keep_from]:
+            del self._chunks[month]
+        if keep_from is None:
+            _write_atomic(self.store_dir / MANIFEST_NAME,
+                          json.dumps(self.manifest, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+
+    def _compute_stats(self, date: str, pos: dict[str, int], bdays: list[str]) -> None:
+        cols = self._day(date)
+        cols["turnover"], cols["ret"] = {}, {}
+        i = pos.get(date)
+        if i is None:
+            return
+        for w in TURNOVER_WINDOWS:
+            if i >= w - 1:
+                win = [self._day(d) for d in bdays[i - w + 1:i + 1]]
+                if all(c is not None for c in win):
+                    cols["turnover"][str(w)] = turnover_ranking(win)
+        for lag in RETURN_LAGS:
+            if i >= lag:
+                prev = self._day(bdays[i - lag])
+                if prev is not None:
+                    cols["ret"][str(lag)] = trailing_returns(cols, prev)
+
+    # --- 照会 -------------------------------------------------------------------
+
+    def days(self) -> list[str]:
+        """取込済みの bars 日付（昇順）。"""
+        return sorted(self.manifest["days"])
+
+    def columns(self, date: str) -> Optional[dict]:
+        """その日の {"codes", "va", "adjc"}（bars が無ければ None）。"""
+        return self._day(date)
+
+    def value(self, date: str, code: str, field: str) -> Any:
+        """その日の1銘柄の値（field は "va" / "adjc"）。日付・銘柄が無ければ None。"""
+        cols = self._day(date)
+        if cols is None:
+            return None
+        if date not in self._positions:
+            self._positions[date] = {c: i for i, c in enumerate(cols["codes"])}
+        i = self._positions[date].get(code)
+        return cols[field][i] if i is not None else None
+
+    def window_days(self, date: str, window: int) -> Optional[list[str]]:
+        """統計の窓に使った営業日（date で終わる window 日）。カレンダーに無ければ None。"""
+        bdays = self.bdays() or []
+        if self._bday_pos is None:
+            self._bday_pos = {d: i for i, d in enumerate(bdays)}
+        i = self._bday_pos.get(date)
+        if i is None:
+            return None
+        return bdays[i - window + 1:i + 1] if i >= window - 1 else None
+
+    def turnover_ranking(self, date: str, window: int) -> Optional[list[tuple[str, float]]]:
+        """[(code, 窓内売買代金合計), ...] を build_universe と同じ順位で。統計が無ければ None。"""
+        cols = self._day(date)
+        ranking = (cols or {}).get("turnover", {}).get(str(window))
+        return [(c, tv) for c, tv in ranking] if ranking is not None else None
+
+    def turnover_ranks(self, date: str, window: int) -> Optional[dict[str, tuple[int, float]]]:
+        """{code: (順位[1始まり], 分位[順位/件数])}（ProdCat で絞る前の全銘柄）。"""
+        ranking = self.turnover_ranking(date, window)
+        if ranking is None:
+            return None
+        n = len(ranking)
+        return {c: (r, r / n) for r, (c, _) in enumerate(ranking, start=1)}
+
+    def returns(self, date: str, lag: int) -> Optional[dict[str, float]]:
+        """{code: lag 営業日リターン}（その日の Code 順）。統計が無ければ None。"""
+        cols = self._day(date)
+        rows = (cols or {}).get("ret", {}).get(str(lag))
+        return dict((c, r) for c, r in rows) if rows is not None else None
+
+
+_shared: Optional[CrossSectionStore] = None
+
+
+def open_store() -> CrossSectionStore:
+    """プロセス内で共有するストア（初回に sync 済み）。"""
+    global _shared
+    if _shared is None:
+        _shared = CrossSectionStore()
+        _shared.sync()
+    return _shared
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="日次 bars の横断面統計キャッシュ")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("sync", help="追加・変更された bars を取り込む")
+    p_top = sub.add_parser("top", help="売買代金トレーリング順位の上位")
+    p_top.add_argument("date", help="YYYYMMDD")
+    p_top.add_argument("--window", type=int, default=TURNOVER_WINDOWS[0])
+    p_top.add_argument("--n", type=int, default=20)
+    args = parser.parse_args()
+
+    store = CrossSectionStore()
+    stats = store.sync()
+    if args.cmd == "sync":
+        print(f"days={len(store.days())} read={stats['read']} removed={stats['removed']} stats={stats['stats']}")
+        return 0
+    ranking = store.turnover_ranking(args.date, args.window)
+    if ranking is None:
+        print(f"{args.date} w{args.window}: 統計なし（bars 欠損・窓不足・未取込）", file=sys.stderr)
+        return 1
+    for rank, (code, tv) in enumerate(ranking[:args.n], start=1):
+        print(f"{rank:4d} {code} {tv:,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,6 +17,15 @@ Usage:
     python scripts/daily_pipeline.py --skip-compose      # compose スキップ
     python scripts/daily_pipeline.py --no-llm-compose    # compose 時に LLM 呼ばない
     python scripts/daily_pipeline.py --scrolls 8         # 収集スクロール数
+    python scripts/daily_pipeline.py --in-process        # collect/classify を同一プロセスで実行
+
+--in-process（2026-10-19）: collect と classify をサブプロセスではなく関数として呼ぶ。
+インタプリタ起動と collector 一式の import は1回、キーワード/LLM 分類器は1回だけ初期化して
+両ステップで共有し、collect が集めたツイートはファイルを読み直さずメモリのまま classify に渡す
+（tweets.json の保存は従来どおり）。ステップ内の sys.exit と例外はそのステップの exit code として
+記録し（_log_run / _summarize_log も従来と同じ）、以降の判断はサブプロセス実行と同じ。
+compose は別リポ（TIER3_REPO）の CLI なので常にサブプロセス。ステップの import に失敗した時は
+サブプロセス実行に戻す。
 """
 from __future__ import annotations
 
@@ -26,10 +35,11 @@ import os
 import subprocess
 import sys
 import time
+import traceback
 import uuid
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, TypedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypedDict
 
 
 class PipelineSummary(TypedDict):
@@ -56,6 +66,68 @@ def _run(cmd: List[str], step: str, allow_nonzero: bool = False, cwd: Optional[s
     return proc.returncode
 
 
+def _run_inprocess(fn: Callable[[], Any], step: str) -> Tuple[int, Any]:
+    """ステップ関数を PROJECT_ROOT で実行する（サブプロセス実行と同じ相対パス解決）。
+
+    sys.exit はその exit code、捕捉されない例外は traceback を stderr に出して 1 として返し、
+    パイプライン本体は止めない（サブプロセスのクラッシュと同じ扱い）。
+    """
+    print(f"\n===== [{step}] (in-process) =====")
+    rc, value = 0, None
+    prev = os.getcwd()  # contextlib.chdir は 3.11+ のため使わない（launchd はホストの python3 で動く）
+    try:
+        os.chdir(PROJECT_ROOT)
+        value = fn()
+    except SystemExit as e:
+        rc = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:  # noqa: BLE001  ステップの隔離（サブプロセスの異常終了に相当）
+        traceback.print_exc()
+        rc = 1
+    finally:
+        os.chdir(prev)
+    if rc != 0:
+        print(f"[ERROR] {step} が exit code {rc} で失敗", file=sys.stderr)
+    return rc, value
+
+
+class _InProcessSteps:
+    """--in-process で使うステップ関数と、全ステップで共有する分類器（初回に1回だけ初期化）。"""
+
+    def __init__(self):
+        scripts_dir = str(PROJECT_ROOT / "scripts")
+        if scripts_dir not in sys.path:
+            sys.path.insert(0, scripts_dir)
+        import classify_tweets  # noqa: E402  (Canonical Module: 分類ステップ)
+        import collect_tweets  # noqa: E402  (Canonical Module: 収集ステップ)
+
+        self.collect_tweets = collect_tweets
+        self.classify_tweets = classify_tweets
+        self._classifiers = None
+
+    @property
+    def classifiers(self):
+        if self._classifiers is None:
+            self._classifiers = self.classify_tweets.init_classifiers()
+        return self._classifiers
+
+    def collect(self, argv: List[str]):
+        return self.collect_tweets.main(argv, classifier=self.classifiers[0])
+
+    def classify(self, collected) -> str:
+        if collected is None:
+            return self.classify_tweets.main([], classifiers=self.classifiers)
+        json_path, tweets = collected
+        return self.classify_tweets.main(["--input", str(json_path)], tweets=tweets, classifiers=self.classifiers)
+
+
+def _load_in_process_steps() -> Optional[_InProcessSteps]:
+    try:
+        return _InProcessSteps()
+    except Exception as e:  # noqa: BLE001  import 失敗はサブプロセス実行へ戻す
+        print(f"[pipeline] in-process 実行の準備に失敗、サブプロセス実行に戻します: {e}", file=sys.stderr)
+        return None
+
+
 def _append_log(log_path: Path, entry: Dict[str, Any]) -> None:
     """pipeline_log/YYYY-MM-DD.jsonl に 1 レコード追記する汎用ヘルパ。
 
@@ -101,6 +173,8 @@ def main() -> int:
     parser.add_argument("--groups", default="all")
     parser.add_argument("--output", default="output")
     parser.add_argument("--posting-output", default="output/posting")
+    parser.add_argument("--in-process", action="store_true",
+                        help="collect/classify を同一プロセスの関数として実行（分類器とツイートを共有）")
     args = parser.parse_args()
 
     today = datetime.now(JST).strftime("%Y-%m-%d")
@@ -118,16 +192,18 @@ def main() -> int:
     print(f"[pipeline] day={today} run_id={run_id} log={log_path}")
 
     failures: List[str] = []
+    steps = _load_in_process_steps() if args.in_process else None
+    collected = None  # in-process: collect の (tweets.json, ツイート) を classify へ渡す
 
     # Step 1: collect_tweets
     if not args.skip_collect:
         start = datetime.now(JST).isoformat()
         t0 = time.time()
-        rc = _run(
-            ["python3", "scripts/collect_tweets.py",
-             "--groups", args.groups, "--scrolls", str(args.scrolls), "--output", args.output],
-            "collect",
-        )
+        collect_argv = ["--groups", args.groups, "--scrolls", str(args.scrolls), "--output", args.output]
+        if steps is not None:
+            rc, collected = _run_inprocess(lambda: steps.collect(collect_argv), "collect")
+        else:
+            rc = _run(["python3", "scripts/collect_tweets.py", *collect_argv], "collect")
         _log_run(log_path, run_id, "collect", start, rc, time.time() - t0)
         if rc != 0:
             failures.append("collect")
@@ -138,7 +214,10 @@ def main() -> int:
     if not args.skip_classify and "collect" not in failures:
         start = datetime.now(JST).isoformat()
         t0 = time.time()
-        rc = _run(["python3", "scripts/classify_tweets.py"], "classify")
+        if steps is not None:
+            rc, _ = _run_inprocess(lambda: steps.classify(collected), "classify")
+        else:
+            rc = _run(["python3", "scripts/classify_tweets.py"], "classify")
         _log_run(log_path, run_id, "classify", start, rc, time.time() - t0)
 
         # plan.md M1 T1.9: classify 完了時に classify_done_at と collect_to_classify_sec を保存
@@ -77,6 +77,7 @@ import kpi_volshock_signals  # noqa: E402  (Canonical Module: generate_volshock_
 import kpi_volshock_v2_amplifiers  # noqa: E402  (Canonical Module: compute_quiet_ratio を再利用・第13周A)
 import measure_base_rate  # noqa: E402  (Canonical Module: カレンダー・regime・universe構築を再利用)
 import paper_eval  # noqa: E402  (Canonical Module: ledger I/O・状態更新・scoreboard集計を再利用)
+import signal_host  # noqa: E402  (Canonical Module: volshock 系の常駐状態から当日シグナルを引く)
 
 PROJECT_ROOT = Path(__file__).parent.parent
 WATCHLIST_PATH = PROJECT_ROOT / "config" / "paper_watchlist.json"
@@ -902,13 +903,17 @@ def generate_kpi_signals(
         # (dev200符号フィルタ) をそのまま再利用する (Canonical Module原則・判定ロジックの
         # 再実装はしない)。日次判定でも generate_volshock_signals 内部の SMA200 は
         # 「D自身を含む直近200営業日終値平均」= PIT安全（同関数のdocstring参照）。
-        df, _diag = kpi_volshock_signals.generate_volshock_signals(
-            start_bd, end_bd,
+        # 2026-10-19: 朝ジョブで signal_host.prepare 済みなら常駐状態の当日公開分を使う
+        # （冷間生成と同じ行。区間指定・未 prepare は None で従来どおり生成器を呼ぶ）。
+        vs_params = dict(
             vol_multiplier=params["vol_multiplier"],
             day_ret_min=params["day_ret_min"],
             day_ret_max=params["day_ret_max"],
             filter_ma200=params.get("filter_ma200"),
         )
+        df = signal_host.volshock_signals(start_bd, end_bd, **vs_params)
+        if df is None:
+            df, _diag = kpi_volshock_signals.generate_volshock_signals(start_bd, end_bd, **vs_params)
         if df.empty:
             # 生成器が0件時に「列なし空DataFrame」を返す日があり、無条件の列アクセスは KeyError で
             # 朝ジョブ全体を落とす（§7-T 60営業日リプレイが 20260603 で実証・2026-07-13修正）。
@@ -1151,13 +1156,15 @@ def find_volshock_near_misses(
     has_ma200 = params.get("filter_ma200") == "above"
     has_quiet = params.get("quiet_min") is not None
 
-    df, _diag = kpi_volshock_signals.generate_volshock_signals(
-        start_bd, end_bd,
+    vs_params = dict(
         vol_multiplier=NEAR_MISS_VOL_MULTIPLIER_FLOOR,
         day_ret_min=params["day_ret_min"],
         day_ret_max=params["day_ret_max"],
         filter_ma200=None,
     )
+    df = signal_host.volshock_signals(start_bd, end_bd, **vs_params)  # 2026-10-19: prepare 済みなら常駐状態から
+    if df is None:
+        df, _diag = kpi_volshock_signals.generate_volshock_signals(start_bd, end_bd, **vs_params)
     if df.empty:
         return []
 
@@ -1864,6 +1871,10 @@ def main() -> int:
     topix_close = measure_base_rate.load_topix_series()
     regime_by_day = measure_base_rate.build_regime_series(topix_close)
     universe_cache = UniverseCache(calendar_days, bday_index, all_bdays)
+    if not args.dry_run:
+        # 2026-10-19: volshock 系の常駐状態を end_bd まで進める（dry-run は書き込まないので従来の
+        # 冷間生成のまま。失敗しても警告のみで、各分岐は生成器の直接呼び出しに落ちる）
+        signal_host.prepare(end_bd)
 
     run_id = uuid.uuid4().hex
     records = paper_eval.read_ledger()
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""EDINET / TDnet キャッシュの照会用索引（SQLite・stdlib のみ・2026-10-19）。
+
+「銘柄 X の A〜B の開示は？」に答えるために、各利用側（kpi_tob_candidate_score・
+surge_origin_attribution・tdnet_event_profile・tob_deal_audit）が edinet_fetch の日次
+JSON.gz と tdnet_index_fetch の週次チャンクを毎回全部開いて解析していた。
+本モジュールはそれらを1つの SQLite ファイル data/disclosure_index.sqlite3 に索引し、
+銘柄・期間・書類種別・表題（正規表現）で索引引きできる Python API を出す。
+
+索引の中身:
+- edinet_docs: doc_id・証券コード(5桁)・提出者/対象/発行者の EDINET コード・提出者名・
+  docTypeCode/ordinanceCode/formCode・submitDateTime・docDescription・
+  TOB キーワードフラグ（edinet_fetch._matches_tob_keywords と同じ判定）・レコード原文
+  （dataset = "documents_all" | "holdings"）
+- tdnet_items: id・company_code（原文と 5桁正規化）・社名・表題・pubdate（日付・時）・
+  TOB キーワードフラグ・レコード原文
+- sources: 索引済みファイルの署名（mtime_ns・サイズ）と行数
+
+増分更新:
+- 入口は fetch_log.jsonl（EDINET）と receipts.jsonl（TDnet）。前回から台帳が伸びていなければ
+  取得は起きていない＝ディレクトリも歩かずに済ませる（照会だけの利用側はこれで即答）
+- 伸びていたら（または --rescan）キャッシュを歩いて署名を比べ、変わったファイルだけ読み直す
+  （<date>.revN.json.gz の退避ファイルは正本ではないので読まない＝edinet_fetch と同じ規約）
+- 原文を持つので、利用側は従来と同じ dict をファイル順・レコード順で受け取れる
+
+Usage:
+    python3 scripts/disclosure_index.py update [--rescan]
+    python3 scripts/disclosure_index.py query --code 72030 --start 20240101 --end 20241231
+    python3 scripts/disclosure_index.py query --title 公開買付 --start 20250101 --tob-only
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+import edinet_fetch  # noqa: E402  Canonical（保存先・TOB キーワード判定）
+import tdnet_index_fetch  # noqa: E402  Canonical（保存先・receipts）
+
+DB_PATH = ROOT / "data/disclosure_index.sqlite3"
+SCHEMA_VERSION = 1
+
+_CANONICAL_EDINET_FILE_RE = re.compile(r"^\d{8}\.json\.gz$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY, kind TEXT NOT NULL, mtime_ns INTEGER, size INTEGER, rows INTEGER
+);
+CREATE TABLE IF NOT EXISTS edinet_docs (
+    source TEXT NOT NULL, seq INTEGER NOT NULL, dataset TEXT NOT NULL, file_date TEXT NOT NULL,
+    doc_id TEXT, code TEXT, sec_code TEXT, edinet_code TEXT, subject_edinet_code TEXT,
+    issuer_edinet_code TEXT, filer_name TEXT, doc_type_code TEXT, ordinance_code TEXT,
+    form_code TEXT, submit_datetime TEXT, submit_date TEXT, doc_description TEXT,
+    tob_keyword INTEGER, raw TEXT NOT NULL,
+    PRIMARY KEY (source, seq)
+);
+CREATE INDEX IF NOT EXISTS edinet_by_code ON edinet_docs (code, submit_date);
+CREATE INDEX IF NOT EXISTS edinet_by_file_date ON edinet_docs (dataset, file_date);
+CREATE INDEX IF NOT EXISTS edinet_by_subject ON edinet_docs (subject_edinet_code);
+CREATE INDEX IF NOT EXISTS edinet_by_doc_type ON edinet_docs (doc_type_code, submit_date);
+CREATE TABLE IF NOT EXISTS tdnet_items (
+    source TEXT NOT NULL, seq INTEGER NOT NULL, item_id TEXT, company_code TEXT, code TEXT,
+    company_name TEXT, title TEXT, pubdate TEXT, pub_date TEXT, pub_hour INTEGER,
+    tob_keyword INTEGER, raw TEXT NOT NULL,
+    PRIMARY KEY (source, seq)
+);
+CREATE INDEX IF NOT EXISTS tdnet_by_code ON tdnet_items (code, pub_date);
+CREATE INDEX IF NOT EXISTS tdnet_by_date ON tdnet_items (pub_date);
+"""
+
+
+def normalize_code(raw: Any) -> str | None:
+    """証券コードを J-Quants の 5桁へ（4桁は末尾0付け・5桁はそのまま）。"""
+    if not raw:
+        return None
+    c = str(raw).strip().upper()
+    if len(c) == 4:
+        return c + "0"
+    if len(c) == 5:
+        return c
+    return None
+
+
+def _flag(value: bool | None) -> int | None:
+    return None if value is None else int(value)
+
+
+def _edinet_row(source: str, seq: int, dataset: str, file_date: str, r: Any) -> tuple:
+    if not isinstance(r, dict):
+        # 壊れたレコードも原文で持つ（利用側に従来と同じ列を返すため）
+        return (source, seq, dataset, file_date, None, None, None, None, None, None, None, None,
+                None, None, None, None, None, None, json.dumps(r, ensure_ascii=False))
+    sec = r.get("secCode")
+    submit = r.get("submitDateTime") or ""
+    doc_type = r.get("docTypeCode")
+    return (
+        source, seq, dataset, file_date, r.get("docID"),
+        str(sec)[:5].ljust(5, "0") if sec else None, sec,
+        r.get("edinetCode"), r.get("subjectEdinetCode"), r.get("issuerEdinetCode"),
+        r.get("filerName"), None if doc_type is None else str(doc_type),
+        r.get("ordinanceCode"), r.get("formCode"), submit or None,
+        submit[:10].replace("-", "") if len(submit) >= 10 else None,
+        r.get("docDescription"), _flag(edinet_fetch._matches_tob_keywords(r.get("docDescription"))),
+        json.dumps(r, ensure_ascii=False),
+    )
+
+
+def _tdnet_row(source: str, seq: int, it: Any) -> tuple:
+    t = it.get("Tdnet", it) if isinstance(it, dict) else {}
+    if not isinstance(t, dict):
+        t = {}
+    pub = t.get("pubdate") or ""
+    ok_pub = len(pub) >= 16
+    return (
+        source, seq, t.get("id"), t.get("company_code"), normalize_code(t.get("company_code")),
+        t.get("company_name"), t.get("title"), pub or None,
+        pub[:10].replace("-", "") if ok_pub else None,
+        int(pub[11:13]) if ok_pub and pub[11:13].isdigit() else None,
+        _flag(edinet_fetch._matches_tob_keywords(t.get("title"))),
+        json.dumps(it, ensure_ascii=False),
+    )
+
+
+def _regexp(pattern: str, value: Any) -> bool:
+    return value is not None and _compiled(pattern).search(value) is not None
+
+
+_RX_CACHE: dict[str, re.Pattern] = {}
+
+
+def _compiled(pattern: str) -> re.Pattern:
+    rx = _RX_CACHE.get(pattern)
+    if rx is None:
+        rx = _RX_CACHE[pattern] = re.compile(pattern)
+    return rx
+
+
+class DisclosureIndex:
+    """EDINET / TDnet キャッシュの SQLite 索引。
+
+    使い方:
+        idx = DisclosureIndex()
+        idx.refresh()                       # 台帳が伸びた時だけキャッシュを歩く
+        idx.documents_for_code("72030", "20240101", "20241231")
+        for doc in idx.edinet_documents("20210707", "20221130"): ...
+        for item in idx.tdnet_items(title_regex="公開買付"): ...
+    """
+
+    def __init__(
+        self,
+        db_path: Path = DB_PATH,
+        edinet_all_root: Path | None = None,
+        edinet_holdings_root: Path | None = None,
+        tdnet_root: Path | None = None,
+        edinet_log: Path | None = None,
+        tdnet_receipts: Path | None = None,
+    ):
+        # 保存先は呼び出し時の各 fetch モジュールの定数（テストでの差し替えに追従する）
+        self.edinet_all_root = Path(edinet_all_root or edinet_fetch.ALL_DOCS_DATA_ROOT)
+        self.edinet_holdings_root = Path(edinet_holdings_root or edinet_fetch.DATA_ROOT)
+        self.tdnet_root = Path(tdnet_root or tdnet_index_fetch.OUT_DIR)
+        self.ledgers = {
+            "edinet_fetch_log": Path(edinet_log or edinet_fetch.LOG_PATH),
+            "tdnet_receipts": Path(tdnet_receipts or tdnet_index_fetch.RECEIPTS),
+        }
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.con = sqlite3.connect(str(db_path))
+        self.con.create_function("REGEXP", 2, _regexp, deterministic=True)
+        version = self._schema_version()
+        if version not in (None, SCHEMA_VERSION):
+            self._drop_all()
+        self.con.executescript(_SCHEMA)
+        with self.con:
+            self.con.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+
+    def close(self):
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- 更新 -------------------------------------------------------------
+
+    def _schema_version(self) -> int | None:
+        try:
+            row = self.con.execute("SELECT value FROM meta WHERE key='schema_version'").fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return int(row[0]) if row else None
+
+    def _drop_all(self):
+        with self.con:
+            for table in ("meta", "sources", "edinet_docs", "tdnet_items"):
+                self.con.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def _ledger_state(self) -> dict[str, int]:
+        return {name: (p.stat().st_size if p.exists() else -1) for name, p in self.ledgers.items()}
+
+    def _source_files(self) -> dict[str, tuple[str, Path]]:
+        """索引対象ファイル（キー＝種別付き相対名）。"""
+        out: dict[str, tuple[str, Path]] = {}
+        for kind, root in (("documents_all", self.edinet_all_root), ("holdings", self.edinet_holdings_root)):
+            if root.exists():
+                for p in root.glob("*.json.gz"):
+                    if _CANONICAL_EDINET_FILE_RE.match(p.name):
+                        out[f"{kind}:{p.name}"] = (kind, p)
+        if self.tdnet_root.exists():
+            for p in self.tdnet_root.glob("*/*.json.gz"):
+                out[f"tdnet:{p.parent.name}/{p.name}"] = ("tdnet", p)
+        return out
+
+    def refresh(self, rescan: bool = False) -> dict[str, int]:
+        """台帳（fetch_log / receipts）が前回から伸びていれば、変わったファイルだけ索引し直す。
+
+        Returns:
+            {"walked": 歩いたら 1, "indexed": 読み直したファイル数, "removed": 消えたファイル数}
+        """
+        ledgers = self._ledger_state()
+        row = self.con.execute("SELECT value FROM meta WHERE key='ledgers'").fetchone()
+        if not rescan and row and json.loads(row[0]) == ledgers:
+            return {"walked": 0, "indexed": 0, "removed": 0}
+
+        known = {p: (m, s) for p, m, s in self.con.execute("SELECT path, mtime_ns, size FROM sources")}
+        files = self._source_files()
+        indexed = removed = 0
+        with self.con:
+            for key in sorted(set(known) - set(files)):
+                self._delete_source(key)
+                removed += 1
+            for key in sorted(files):
+                kind, path = files[key]
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                if known.get(key) == (st.st_mtime_ns, st.st_size):
+                    continue
+                try:
+                    payload = json.loads(gzip.open(path, "rb").read().decode("utf-8"))
+                except Exception as e:  # noqa: BLE001  壊れたキャッシュは索引から外して続行
+                    print(f"WARN: {path} を読めないため索引から外す: {e}", file=sys.stderr)
+                    self._delete_source(key)
+                    continue
+                self._delete_source(key)
+                n = self._insert(key, kind, path, payload)
+                self.con.execute("INSERT INTO sources VALUES (?, ?, ?, ?, ?)",
+                                 (key, kind, st.st_mtime_ns, st.st_size, n))
+                indexed += 1
+            self.con.execute("INSERT OR REPLACE INTO meta VALUES ('ledgers', ?)", (json.dumps(ledgers),))
+        return {"walked": 1, "indexed": indexed, "removed": removed}
+
+    def _delete_source(self, key: str):
+        self.con.execute("DELETE FROM sources WHERE path=?", (key,))
+        self.con.execute("DELETE FROM edinet_docs WHERE source=?", (key,))
+        self.con.execute("DELETE FROM tdnet_items WHERE source=?", (key,))
+
+    def _insert(self, key: str, kind: str, path: Path, payload: Any) -> int:
+        if kind == "tdnet":
+            items = payload.get("items") if isinstance(payload, dict) else None
+            rows = [_tdnet_row(key, i, it) for i, it in enumerate(items if isinstance(items, list) else [])]
+            self.con.executemany(f"INSERT INTO tdnet_items VALUES ({','.join('?' * 12)})", rows)
+            return len(rows)
+        results = payload.get("results") if isinstance(payload, dict) else None
+        file_date = path.name[:8]
+        rows = [_edinet_row(key, i, kind, file_date, r)
+                for i, r in enumerate(results if isinstance(results, list) else [])]
+        self.con.executemany(f"INSERT INTO edinet_docs VALUES ({','.join('?' * 19)})", rows)
+        return len(rows)
+
+    # ---- 照会 -------------------------------------------------------------
+
+    def edinet_files(self, dataset: str = "documents_all") -> set[str]:
+        """索引済みの日付（YYYYMMDD）。"""
+        return {p.split(":", 1)[1][:8] for (p,) in self.con.execute(
+            "SELECT path FROM sources WHERE kind=?", (dataset,))}
+
+    def edinet_documents(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        *,
+        dataset: str = "documents_all",
+        code: str | None = None,
+        doc_types: list[str] | None = None,
+        tob_only: bool = False,
+        title_regex: str | None = None,
+        file_dates: set[str] | None = None,
+    ) -> list[dict]:
+        """EDINET レコード原文を、ファイル日付昇順・ファイル内の順で返す。
+
+        start/end はファイル日付（= 一覧の取得日・YYYYMMDD・両端含む）。file_dates を渡すと
+        その日付のファイルだけに絞る（営業日だけを読む利用側用）。
+        """
+        where, params = ["dataset = ?"], [dataset]
+        if start:
+            where.append("file_date >= ?")
+            params.append(start)
+        if end:
+            where.append("file_date <= ?")
+            params.append(end)
+        if code:
+            where.append("code = ?")
+            params.append(normalize_code(code))
+        if doc_types:
+            where.append(f"doc_type_code IN ({','.join('?' * len(doc_types))})")
+            params.extend(str(t) for t in doc_types)
+        if tob_only:
+            where.append("tob_keyword = 1")
+        if title_regex:
+            where.append("doc_description REGEXP ?")
+            params.append(title_regex)
+        sql = f"SELECT file_date, raw FROM edinet_docs WHERE {' AND '.join(where)} ORDER BY file_date, seq"
+        return [json.loads(raw) for d, raw in self.con.execute(sql, params)
+                if file_dates is None or d in file_dates]
+
+    def edinet_doc_types_by_code(self, file_date: str, dataset: str = "documents_all") -> dict[str, set[str]]:
+        """ファイル日付 1日分の {証券コード5桁: {docTypeCode}}。"""
+        out: dict[str, set[str]] = {}
+        for code, doc_type in self.con.execute(
+            "SELECT code, doc_type_code FROM edinet_docs WHERE dataset=? AND file_date=? AND code IS NOT NULL",
+            (dataset, file_date),
+        ):
+            out.setdefault(code, set()).add(str(doc_type))
+        return out
+
+    def tdnet_count(self) -> int:
+        return self.con.execute("SELECT COUNT(*) FROM tdnet_items").fetchone()[0]
+
+    def tdnet_items(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        *,
+        code: str | None = None,
+        title_regex: str | None = None,
+        tob_only: bool = False,
+    ) -> Iterator[dict]:
+        """TDnet 項目（items の要素そのまま）を、チャンク順・チャンク内の順で返す。
+
+        start/end は開示日（YYYYMMDD・両端含む）。指定すると pubdate の壊れた項目は出ない。
+        """
+        where, params = [], []
+        if start:
+            where.append("pub_date >= ?")
+            params.append(start)
+        if end:
+            where.append("pub_date <= ?")
+            params.append(end)
+        if code:
+            where.append("code = ?")
+            params.append(normalize_code(code))
+        if title_regex:
+            where.append("title REGEXP ?")
+            params.append(title_regex)
+        if tob_only:
+            where.append("tob_keyword = 1")
+        sql = "SELECT raw FROM tdnet_items"
+        if where:
+            sql += f" WHERE {' AND '.join(where)}"
+        sql += " ORDER BY source, seq"
+        for (raw,) in self.con.execute(sql, params):
+            yield json.loads(raw)
+
+    def documents_for_code(self, code: str, start: str, end: str) -> list[dict]:
+        """銘柄 code の [start, end]（YYYYMMDD）の開示を EDINET・TDnet 横断で時刻順に返す。"""
+        c = normalize_code(code)
+        out: list[dict] = []
+        for doc_id, filer, doc_type, ts, title, tob in self.con.execute(
+            "SELECT doc_id, filer_name, doc_type_code, submit_datetime, doc_description, tob_keyword "
+            "FROM edinet_docs WHERE dataset='documents_all' AND code=? AND submit_date BETWEEN ? AND ?",
+            (c, start, end),
+        ):
+            out.append({"source": "edinet", "doc_id": doc_id, "code": c, "filer": filer,
+                        "doc_type": doc_type, "timestamp": ts, "title": title, "tob_keyword": tob})
+        for item_id, name, ts, title, tob in self.con.execute(
+            "SELECT item_id, company_name, pubdate, title, tob_keyword "
+            "FROM tdnet_items WHERE code=? AND pub_date BETWEEN ? AND ?",
+            (c, start, end),
+        ):
+            out.append({"source": "tdnet", "doc_id": item_id, "code": c, "filer": name,
+                        "doc_type": None, "timestamp": ts, "title": title, "tob_keyword": tob})
+        out.sort(key=lambda d: (d["timestamp"] or "", d["source"], d["doc_id"] or ""))
+        return out
+
+
+_shared: DisclosureIndex | None = None
+
+
+def open_index(rescan: bool = False) -> DisclosureIndex:
+    """プロセス内で共有する索引（初回に refresh 済み）。
+
+    rescan=True は台帳を信用せずキャッシュの署名を必ず確かめる（stat だけ・変わったファイルだけ読む）。
+    """
+    global _shared
+    if _shared is None:
+        _shared = DisclosureIndex()
+        _shared.refresh(rescan=rescan)
+    elif rescan:
+        _shared.refresh(rescan=True)
+    return _shared
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="EDINET / TDnet キャッシュの照会用索引")
+    ap.add_argument("--db", type=Path, default=DB_PATH)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    up = sub.add_parser("update", help="台帳が伸びていれば変わったファイルだけ索引し直す")
+    up.add_argument("--rescan", action="store_true", help="台帳に関係なくキャッシュを歩く")
+    q = sub.add_parser("query", help="開示を引く")
+    q.add_argument("--code")
+    q.add_argument("--start", default="00000000")
+    q.add_argument("--end", default="99999999")
+    q.add_argument("--title", help="表題・書類名の正規表現（TDnet 表題・EDINET docDescription）")
+    q.add_argument("--tob-only", action="store_true")
+    q.add_argument("--limit", type=int, default=50)
+    a = ap.parse_args()
+
+    with DisclosureIndex(a.db) as idx:
+        t0 = time.perf_counter()
+        stats = idx.refresh(rescan=getattr(a, "rescan", False))
+        if a.cmd == "update":
+            n_ed = idx.con.execute("SELECT COUNT(*) FROM edinet_docs").fetchone()[0]
+            print(f"[disclosure-index] edinet={n_ed:,} tdnet={idx.tdnet_count():,} "
+                  f"walked={stats['walked']} indexed={stats['indexed']} removed={stats['removed']} "
+                  f"({time.perf_counter() - t0:.2f}s) -> {a.db}")
+            return 0
+        t0 = time.perf_counter()
+        if a.code and not a.title and not a.tob_only:
+            rows = idx.documents_for_code(a.code, a.start, a.end)
+        else:
+            rows = []
+            for r in idx.edinet_documents(a.start, a.end, code=a.code, tob_only=a.tob_only, title_regex=a.title):
+                rows.append({"source": "edinet", "timestamp": r.get("submitDateTime"), "code": r.get("secCode"),
+                             "title": r.get("docDescription"), "doc_id": r.get("docID")})
+            for it in idx.tdnet_items(a.start, a.end, code=a.code, title_regex=a.title, tob_only=a.tob_only):
+                t = it.get("Tdnet", it)
+                rows.append({"source": "tdnet", "timestamp": t.get("pubdate"), "code": t.get("company_code"),
+                             "title": t.get("title"), "doc_id": t.get("id")})
+            rows.sort(key=lambda d: d["timestamp"] or "")
+        elapsed = (time.perf_counter() - t0) * 1000
+        for r in rows[: a.limit]:
+            print(f"  {r['timestamp'] or '-':<25} {r['source']:<6} {r['code'] or '-':<6} {r['title'] or ''}")
+        print(f"[disclosure-index] {len(rows)} 件（{elapsed:.1f}ms）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
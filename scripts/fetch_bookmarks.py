@@ -67,6 +67,7 @@ class Bookmark:
 
 
 from collector.exceptions import CookieExpiredError
+from collector.graphql_timeline import find_tweet_results
 
 
 def load_cookies(profile_path: str = "./x_profile") -> list:
@@ -345,20 +346,8 @@ def _extract_entries(data: dict) -> list:
 
 
 def _deep_find_tweets(obj, depth=0) -> list:
-    results = []
-    if depth > 10:
-        return results
-    if isinstance(obj, dict):
-        if "tweet_results" in obj and isinstance(obj["tweet_results"], dict):
-            result = obj["tweet_results"].get("result")
-            if result:
-                results.append(result)
-        for v in obj.values():
-            results.extend(_deep_find_tweets(v, depth + 1))
-    elif isinstance(obj, list):
-        for item in obj:
-            results.extend(_deep_find_tweets(item, depth + 1))
-    return results
+    # 2026-10-19: 探索は collector.graphql_timeline に一般化（検索・プロフィール収集と共有）
+    return find_tweet_results(obj, depth)
 
 
 def _parse_tweet_entry(entry: dict) -> Optional[Bookmark]:
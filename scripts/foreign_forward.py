@@ -14,6 +14,8 @@
 
 価格は yfinance（Docker イメージ同梱）。**発火日以前の直近終値**を使い、実際に採用した日付を
 `entry_date_used` に残す（発火後の値を掴む look-ahead を避ける）。取得失敗は fail-soft。
+終値は銘柄ごとのストア（`close_store.py`・`data/price_watch/close_store/foreign/`）に貯め、
+足りない区間だけを複数銘柄まとめて取る。台帳の行数が増えても取得回数は増えない（2026-10-19）。
 
 実行:
     python3 scripts/foreign_forward.py --selftest   # ネットワーク不要の固定テスト
@@ -27,10 +29,15 @@ import json
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from close_store import CloseSeries, CloseStore, per_symbol, shift_day  # noqa: E402  (Canonical Module: 終値ストア)
 
 ROOT = Path(__file__).resolve().parent.parent
 LEDGER_PATH = ROOT / "data" / "price_watch" / "foreign_forward_log.jsonl"
+CLOSE_STORE_DIR = ROOT / "data" / "price_watch" / "close_store" / "foreign"
 SPEC_VERSION = "foreign-v2"
 # 日本株レーンと同じ評価窓（8週=40取引日 / 15週=75取引日）。数えるのは当該銘柄の取引日
 WINDOWS_BD = {"w8": 40, "w15": 75}
@@ -101,11 +108,23 @@ def latest_prices(rows: List[Dict[str, Any]], fire_date: str, ticker: str) -> Di
         {"exists": bool, "entry_close": float|None, "benchmark_entry": float|None,
          "entry_date_used": str|None}
     """
+    return _fold_prices([r for r in rows
+                         if r.get("fire_date") == fire_date and r.get("ticker") == ticker
+                         and r.get("type") in ("firing", "backfill")])
+
+
+def _prices_by_key(rows: List[Dict[str, Any]]) -> Dict[Tuple[Any, Any], Dict[str, Any]]:
+    """台帳を1回なめて、(fire_date, ticker) ごとの `latest_prices` を作る（行数の2乗にしない）。"""
+    grouped: Dict[Tuple[Any, Any], List[Dict[str, Any]]] = {}
+    for r in rows:
+        if r.get("type") in ("firing", "backfill"):
+            grouped.setdefault((r.get("fire_date"), r.get("ticker")), []).append(r)
+    return {k: _fold_prices(rel) for k, rel in grouped.items()}
+
+
+def _fold_prices(rel: List[Dict[str, Any]]) -> Dict[str, Any]:
     state: Dict[str, Any] = {"exists": False, "entry_close": None, "benchmark_entry": None,
                              "entry_date_used": None, "benchmark": None, "card": None}
-    rel = [r for r in rows
-           if r.get("fire_date") == fire_date and r.get("ticker") == ticker
-           and r.get("type") in ("firing", "backfill")]
     if not rel:
         return state
     # カードの benchmark が後から変わった場合、**指数が違う行の価格は混ぜない**
@@ -130,6 +149,19 @@ def needs_backfill(state: Dict[str, Any]) -> bool:
     )
 
 
+def _finite_closes(items: Iterable[Tuple[Any, Any]]) -> List[Tuple[str, float]]:
+    """(日付インデックス, 終値) から有限値だけを (YYYY-MM-DD, 終値) で返す。"""
+    out: List[Tuple[str, float]] = []
+    for idx, value in items:
+        v = float(value)
+        # 当日分など未確定の行は Close が NaN で返る（2026-08-18 実測: CF・^GSPC の当日行）。
+        # NaN は比較を全てすり抜けて台帳へ入り、リターン計算を丸ごと壊すのでここで落とす
+        if v != v or v in (float("inf"), float("-inf")):
+            continue
+        out.append((idx.strftime("%Y-%m-%d"), v))
+    return out
+
+
 def yf_history(ticker: str, start: str, end: str) -> List[Tuple[str, float]]:
     """yfinance から (日付, 終値) の列を取る。失敗時は空（fail-soft）。"""
     try:
@@ -138,45 +170,74 @@ def yf_history(ticker: str, start: str, end: str) -> List[Tuple[str, float]]:
         hist = yf.Ticker(ticker).history(start=start, end=end, auto_adjust=True)
         if hist is None or hist.empty:
             return []
-        out: List[Tuple[str, float]] = []
-        for idx, row in hist.iterrows():
-            v = float(row["Close"])
-            # 当日分など未確定の行は Close が NaN で返る（2026-08-18 実測: CF・^GSPC の当日行）。
-            # NaN は比較を全てすり抜けて台帳へ入り、リターン計算を丸ごと壊すのでここで落とす
-            if v != v or v in (float("inf"), float("-inf")):
-                continue
-            out.append((idx.strftime("%Y-%m-%d"), v))
-        return out
+        return _finite_closes(hist["Close"].items())
     except Exception:  # noqa: BLE001  価格取得の失敗で本線を止めない
         return []
 
 
+def yf_history_many(tickers: List[str], start: str, end: str) -> Dict[str, List[Tuple[str, float]]]:
+    """yfinance の一括取得（yf.download）で複数銘柄の (日付, 終値) を1回で取る。
+
+    足が1本も取れなかった銘柄は返さない（CloseStore は取得済みにせず次回また取りに行く）。
+    一括取得そのものが失敗したら空 dict（fail-soft）。
+    """
+    try:
+        import yfinance as yf
+
+        frame = yf.download(tickers, start=start, end=end, auto_adjust=True,
+                            group_by="ticker", progress=False)
+    except Exception:  # noqa: BLE001  価格取得の失敗で本線を止めない
+        return {}
+    if frame is None or frame.empty:
+        return {}
+    out: Dict[str, List[Tuple[str, float]]] = {}
+    for ticker in tickers:
+        try:
+            column = frame[ticker]["Close"] if frame.columns.nlevels > 1 else frame["Close"]
+            closes = _finite_closes(column.items())
+        except (KeyError, TypeError, ValueError):
+            continue
+        if closes:
+            out[ticker] = closes
+    return out
+
+
+_DEFAULT_STORE: Optional[CloseStore] = None
+
+
+def default_store() -> CloseStore:
+    """yfinance を取得元にした保存つきストア（プロセス内で共有）。"""
+    global _DEFAULT_STORE
+    if _DEFAULT_STORE is None:
+        _DEFAULT_STORE = CloseStore(yf_history_many, CLOSE_STORE_DIR)
+    return _DEFAULT_STORE
+
+
+def _resolve_store(history_fn: Optional[Callable[[str, str, str], List[Tuple[str, float]]]],
+                   store: Optional[CloseStore]) -> CloseStore:
+    """history_fn（テスト差し替え）が渡されたらそれを取得元にしたメモリ上のストアを使う。"""
+    if store is not None:
+        return store
+    if history_fn is not None:
+        return CloseStore(per_symbol(history_fn))
+    return default_store()
+
+
 def close_on_or_before(hist: List[Tuple[str, float]], day: str) -> Tuple[Optional[float], Optional[str]]:
     """`day` 以前の直近終値と、その日付を返す（look-ahead を作らない）。"""
-    cands = [(d, v) for d, v in hist if d <= day]
-    if not cands:
-        return None, None
-    d, v = max(cands, key=lambda x: x[0])
-    return v, d
+    return CloseSeries.from_pairs(hist).on_or_before(day)
 
 
 def close_after_bdays(hist: List[Tuple[str, float]], entry_day: str, n: int
                       ) -> Tuple[Optional[float], Optional[str]]:
     """entry_day の n 取引日後の終値と日付を返す（その銘柄の取引日で数える）。"""
-    days = sorted({d for d, _ in hist})
-    if entry_day not in days:
-        return None, None
-    idx = days.index(entry_day) + n
-    if idx >= len(days):
-        return None, None
-    target = days[idx]
-    price = dict(hist).get(target)
-    return (price, target) if price is not None else (None, None)
+    return CloseSeries.from_pairs(hist).after(entry_day, n)
 
 
 def record_firings(alerts: List[Tuple[Dict, Dict, List[str]]], fire_date: str,
                    path: Path = LEDGER_PATH,
-                   history_fn: Optional[Callable[[str, str, str], List[Tuple[str, float]]]] = None
+                   history_fn: Optional[Callable[[str, str, str], List[Tuple[str, float]]]] = None,
+                   store: Optional[CloseStore] = None,
                    ) -> int:
     """発火した系列の海外カードを別台帳へ記録する（1日1銘柄1行・欠けた価格は後日 backfill）。
 
@@ -185,11 +246,12 @@ def record_firings(alerts: List[Tuple[Dict, Dict, List[str]]], fire_date: str,
         fire_date: 発火日 "YYYY-MM-DD"。
         path: 台帳パス。
         history_fn: 価格取得関数（テスト差し替え用）。
+        store: 終値ストア（省略時は history_fn かプロセス共有の既定ストア）。
 
     Returns:
         追記した行数（firing + backfill）。
     """
-    fetch_hist = history_fn or yf_history
+    closes = _resolve_store(history_fn, store)
     rows = read_log(path)
     n = 0
 
@@ -216,14 +278,20 @@ def record_firings(alerts: List[Tuple[Dict, Dict, List[str]]], fire_date: str,
                 "value": row.get("value"), "weekly_pct": row.get("weekly_pct")}
 
     start = (datetime.strptime(fire_date, "%Y-%m-%d")).strftime("%Y-%m-%d")
+    states = _prices_by_key(rows)
+    todo = [t for t in by_ticker
+            if not states.get((fire_date, t)) or needs_backfill(states[(fire_date, t)])]
+    # 価格が要る銘柄と指数を先に1回でまとめて揃える
+    _ensure_entry_window(closes, [x for t in todo for x in (t, str(by_ticker[t]["card"]["benchmark"]))],
+                         start)
     for ticker, slot in by_ticker.items():
         card = slot["card"]
-        state = latest_prices(rows, fire_date, ticker)
+        state = states.get((fire_date, ticker)) or _fold_prices([])
         if state["exists"] and not needs_backfill(state):
             continue  # 価格まで揃っている＝二重計上しない
 
         # 発火日以前の直近終値を使う（休場日に発火後の値を掴まない）
-        px, px_day, bench_px = _entry_prices(fetch_hist, ticker, str(card["benchmark"]), start)
+        px, px_day, bench_px = _entry_prices(closes, ticker, str(card["benchmark"]), start)
         if state["exists"]:
             # 既存行がある＝価格の穴埋め目的。情報が増えない再実行では追記しない（Codex 6審 #1）
             adds = (px is not None and state["entry_close"] is None) or \
@@ -256,8 +324,7 @@ def record_firings(alerts: List[Tuple[Dict, Dict, List[str]]], fire_date: str,
 
 
 def _shift_days(day: str, delta: int) -> str:
-    from datetime import timedelta
-    return (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=delta)).strftime("%Y-%m-%d")
+    return shift_day(day, delta)
 
 
 def _days_apart(a: Optional[str], b: Optional[str]) -> int:
@@ -267,7 +334,17 @@ def _days_apart(a: Optional[str], b: Optional[str]) -> int:
     return abs((datetime.strptime(a, "%Y-%m-%d") - datetime.strptime(b, "%Y-%m-%d")).days)
 
 
-def _entry_prices(fetch_hist, ticker: str, benchmark: str, fire_date: str
+def _entry_window(fire_date: str) -> Tuple[str, str]:
+    """エントリー価格を探す区間 [発火日-12, 発火日+2)。"""
+    return _shift_days(fire_date, -12), _shift_days(fire_date, 2)
+
+
+def _ensure_entry_window(closes: CloseStore, symbols: List[str], fire_date: str) -> None:
+    if symbols:
+        closes.ensure(symbols, *_entry_window(fire_date))
+
+
+def _entry_prices(closes: CloseStore, ticker: str, benchmark: str, fire_date: str
                   ) -> Tuple[Optional[float], Optional[str], Optional[float]]:
     """エントリー価格の組を返す。**指数は銘柄の採用日に合わせる**（Codex 6審 #2）。
 
@@ -277,46 +354,45 @@ def _entry_prices(fetch_hist, ticker: str, benchmark: str, fire_date: str
     Returns:
         (銘柄終値, 採用日, 指数終値)。銘柄が取れなければ指数も採らない。
     """
-    win_start, win_end = _shift_days(fire_date, -12), _shift_days(fire_date, 2)
-    px, px_day = close_on_or_before(fetch_hist(ticker, win_start, win_end), fire_date)
+    win_start, win_end = _entry_window(fire_date)
+    closes.ensure([ticker, benchmark], win_start, win_end)  # 揃っていれば取りに行かない
+    px, px_day = closes.series(ticker).on_or_before(fire_date, floor=win_start)
     if px is None or px_day is None:
         return None, None, None
-    bench_px, bench_day = close_on_or_before(fetch_hist(benchmark, win_start, win_end), px_day)
+    bench_px, bench_day = closes.series(benchmark).on_or_before(px_day, floor=win_start)
     if bench_px is not None and _days_apart(px_day, bench_day) > BENCH_STALE_DAYS:
         bench_px = None  # 指数が古すぎる＝比較の起点が揃わないので採らない（後日 backfill で埋め直す）
     return px, px_day, bench_px
 
 
 def backfill_missing(path: Path = LEDGER_PATH,
-                     history_fn: Optional[Callable[[str, str, str], List[Tuple[str, float]]]] = None
+                     history_fn: Optional[Callable[[str, str, str], List[Tuple[str, float]]]] = None,
+                     store: Optional[CloseStore] = None,
                      ) -> int:
     """台帳を走査し、価格が欠けたままの過去の発火を埋める（Codex 5審 #1）。
 
     `record_firings` は当日の発火しか見ないため、取得に失敗した過去行は
     そのままでは永久に null で残る。本関数が全期間を再訪する。
+    価格は発火日ごとに、欠けた銘柄と指数をまとめて1回で揃える。
 
     Returns:
         追記した backfill 行数。
     """
-    fetch_hist = history_fn or yf_history
+    closes = _resolve_store(history_fn, store)
     rows = read_log(path)
-    keys = []
-    seen = set()
-    for r in rows:
-        if r.get("type") not in ("firing", "backfill"):
-            continue
-        k = (r.get("fire_date"), r.get("ticker"))
-        if k not in seen:
-            seen.add(k)
-            keys.append(k)
+    states = _prices_by_key(rows)  # キーは台帳の出現順
+    keys = [k for k, st in states.items() if needs_backfill(st)]
+    by_date: Dict[Any, List[str]] = {}
+    for fire_date, ticker in keys:
+        by_date.setdefault(fire_date, []).extend([ticker, str(states[(fire_date, ticker)]["benchmark"])])
+    for fire_date, symbols in by_date.items():
+        _ensure_entry_window(closes, symbols, fire_date)
     n = 0
     for fire_date, ticker in keys:
-        state = latest_prices(rows, fire_date, ticker)
-        if not needs_backfill(state):
-            continue
+        state = states[(fire_date, ticker)]
         card = state["card"] or {}
         px, px_day, bench_px = _entry_prices(
-            fetch_hist, ticker, str(state["benchmark"]), fire_date)
+            closes, ticker, str(state["benchmark"]), fire_date)
         # 追記して情報が増える時だけ書く。片側だけ永遠に欠測する銘柄で
         # 毎回同じ行を積むと台帳が無制限に膨らむ（Codex 6審 #1）
         adds_entry = px is not None and state["entry_close"] is None
@@ -341,42 +417,59 @@ def backfill_missing(path: Path = LEDGER_PATH,
 
 
 def evaluate(today: str, path: Path = LEDGER_PATH,
-             history_fn: Optional[Callable[[str, str, str], List[Tuple[str, float]]]] = None
+             history_fn: Optional[Callable[[str, str, str], List[Tuple[str, float]]]] = None,
+             store: Optional[CloseStore] = None,
              ) -> int:
     """期日が来た発火を評価し、超過リターンを追記する。
 
     指標 = 銘柄リターン − ベンチマークリターン（カードの benchmark）。
     まだ取引日が足りない窓は書かず、次回に持ち越す（期日前に結論を焼かない）。
+    評価待ちの銘柄と指数は最初に1回でまとめて揃え、以降の照合は手元の終値列だけで行う。
 
     Returns:
         追記した evaluation 行数。
     """
-    fetch_hist = history_fn or yf_history
+    closes = _resolve_store(history_fn, store)
     rows = read_log(path)
     done = {(r.get("fire_date"), r.get("ticker"), r.get("window"))
             for r in rows if r.get("type") == "evaluation"}
-    n = 0
+    states = _prices_by_key(rows)
+    pending: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
     for r in rows:
         if r.get("type") not in ("firing", "backfill"):
             continue
         fire_date, ticker = r.get("fire_date"), r.get("ticker")
-        state = latest_prices(rows, fire_date, ticker)
+        state = states[(fire_date, ticker)]
+        if state["entry_close"] is None or state["benchmark_entry"] is None \
+                or not state["entry_date_used"]:
+            continue  # 価格未取得は評価しない（backfill 待ち）
+        if all((fire_date, ticker, win) in done for win in (r.get("windows_bd") or WINDOWS_BD)):
+            continue
+        pending.append((r, state))
+    if not pending:
+        return 0
+    end = _shift_days(today, 1)
+    closes.ensure([x for r, st in pending for x in (str(r.get("ticker")), str(st["benchmark"]))],
+                  _shift_days(min(st["entry_date_used"] for _, st in pending), -5), end)
+
+    n = 0
+    for r, state in pending:
+        fire_date, ticker = r.get("fire_date"), r.get("ticker")
         entry, bench_entry = state["entry_close"], state["benchmark_entry"]
         entry_day = state["entry_date_used"]
-        if entry is None or bench_entry is None or not entry_day:
-            continue  # 価格未取得は評価しない（backfill 待ち）
         bench_id = state["benchmark"]  # エントリー値と同じ指数を使う（途中変更を混ぜない）
-        hist = fetch_hist(ticker, _shift_days(entry_day, -5), _shift_days(today, 1))
-        bhist = fetch_hist(str(bench_id), _shift_days(entry_day, -5), _shift_days(today, 1))
+        floor = _shift_days(entry_day, -5)
+        series = closes.series(str(ticker))
+        bseries = closes.series(str(bench_id))
         for win, bd in (r.get("windows_bd") or WINDOWS_BD).items():
             if (fire_date, ticker, win) in done:
                 continue
-            px, day = close_after_bdays(hist, entry_day, bd)
-            if px is None or day is None:
+            px, day = series.after(entry_day, bd)
+            if px is None or day is None or day >= end:
                 continue  # 期日未到来 or 取得不能 → 次回へ
             # 指数は**銘柄の評価日時点**を採る。指数側で独立に40/75日を数えると
             # 休場日の違いで別の暦日どうしを引き算してしまう（Codex 5審 #2）
-            bpx, _bday = close_on_or_before(bhist, day)
+            bpx, _bday = bseries.on_or_before(day, floor=floor)
             if bpx is None or _days_apart(day, _bday) > BENCH_STALE_DAYS:
                 continue  # 指数が欠測 or 古すぎる → 誤った超過リターンを書かず次回へ持ち越す
             ret = (px / entry - 1) * 100
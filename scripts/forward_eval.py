@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""インフルエンサー採点のフォワード評価（signal 翌営業日エントリー〜N営業日）をまとめて計算するエンジン。
+
+influencer_leaderboard（§6 の compute_forward_return_for_code）・influencer_candidate_score
+（§0 の evaluate_forward）・influencer_rescore（対照の forward_reach）は、どれも
+(アカウント, signal, 銘柄) ごとに窓内の bars を1日ずつ引き直していた。複数アカウントが
+同じ銘柄・同じ日を挙げると同じ窓を何度も読む。ここでは要求 (code, signal, horizon, rule) を
+全部集めて重複を畳み、必要な日の bars を日付順に1回ずつ読んで銘柄ごとの価格列
+（AdjO/AdjH/AdjL/AdjC を営業日に揃えた配列）を作り、その上で規則を評価する（2026-10-19）。
+
+    data/jquants/forward_eval/<rule>.json.gz   {"version", "rule_version",
+                                                 "bars": {日付: [size, mtime_ns]},
+                                                 "results": {"code|entry|exit": 結果}}
+
+  - 結果はスクリプトをまたいで使い回す。キーは (銘柄, エントリー日, イグジット目標日) で、
+    窓の計算は signal に依らない。窓内の bars が変わった（署名が違う・消えた）結果だけ捨てる
+  - 打ち切り（censored）・カレンダー外の判定は呼び出し側の責務（データ終端で変わるので保存しない）。
+    ここに来る要求は窓の全日に bars がある前提（無ければ load_bars_day の FATAL で止まる）
+  - 規則の数値は各スクリプトの従来関数と同一（tests/test_forward_eval.py で固定）。
+    規則を変えたら RULES の版を上げる（保存済みの結果は捨てられる）
+
+Usage:
+    python3 scripts/forward_eval.py stats
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import gzip
+import json
+import math
+import os
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+import jq_fetch  # noqa: E402  (Canonical Module: DATA_ROOT)
+import measure_base_rate as mbr  # noqa: E402  (Canonical Module: load_bars_day / §6 定数)
+
+CACHE_DIR = jq_fetch.DATA_ROOT / "forward_eval"
+STORE_VERSION = 1
+
+Request = tuple[str, str, int, str]   # (code, signal, horizon, rule)
+
+
+def _num(v: Any) -> Optional[float]:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _finite(v: Any) -> Optional[float]:
+    x = _num(v)
+    return x if x is not None and math.isfinite(x) else None
+
+
+# --- 規則（days / o / h / l / c は窓=エントリー日〜イグジット目標日の同じ長さの列） --------
+
+
+def rule_base_rate(days: list[str], o: list, h: list, l: list, c: list) -> Optional[dict]:
+    """measure_base_rate.compute_forward_return_for_code の T 以降（§6・損切りシミュレーション込み）。"""
+    entry_price = o[0]
+    if not entry_price:
+        return None
+    max_h = h[0] or entry_price
+    min_l = l[0] or entry_price
+    last_seen_adjc = c[0] or entry_price
+    last_seen = 0
+    for k in range(1, len(days)):
+        if h[k] is not None:
+            max_h = max(max_h, h[k])
+        if l[k] is not None:
+            min_l = min(min_l, l[k])
+        if c[k] is not None:
+            last_seen_adjc, last_seen = c[k], k
+
+    if c[-1]:
+        exit_price, exit_date, delisted_flag = c[-1], days[-1], 0
+    else:
+        # 上場廃止等でイグジット目標日に価格が無い -> 窓内最後の AdjC で決済
+        exit_price, exit_date, delisted_flag = last_seen_adjc, days[last_seen], 1
+
+    ret = exit_price / entry_price - 1
+    mfe = max_h / entry_price - 1
+    mae = min_l / entry_price - 1
+
+    stop_rets = {}
+    for name, s in mbr.STOP_LEVELS.items():
+        threshold = entry_price * (1 - s)
+        stop_price = None
+        for k in range(last_seen + 1):   # 上場廃止後は約定しえない
+            if o[k] is not None and o[k] <= threshold:
+                stop_price = o[k]        # ギャップダウン: 始値で決済
+                break
+            if l[k] is not None and l[k] <= threshold:
+                stop_price = threshold   # 指値相当: 損切り水準そのもので決済
+                break
+        if stop_price is None:
+            stop_price = exit_price
+        stop_rets[name] = (stop_price / entry_price - 1) - mbr.ROUND_TRIP_COST
+
+    row = {
+        "entry_date": days[0],
+        "exit_date": exit_date,
+        "entry_price": entry_price,
+        "ret": ret,
+        "mfe": mfe,
+        "mae": mae,
+        "delisted_flag": delisted_flag,
+        "ret_stop8": stop_rets["stop8"],
+        "ret_stop10": stop_rets["stop10"],
+    }
+    for name, level in mbr.MAE_TOUCH_LEVELS:
+        row[name] = int(mae <= level)
+    for name, level in mbr.MFE_TOUCH_LEVELS:
+        row[name] = int(mfe >= level)
+    return row
+
+
+def rule_section0(days: list[str], o: list, h: list, l: list, c: list) -> dict:
+    """influencer_candidate_score の §0（AdjO エントリー・AdjC イグジット・窓内 AdjH 最大の MFE）。
+
+    欠損は {"reason": ...}。コスト控除と到達フラグは呼び出し側（ROUND_TRIP_COST は各スクリプトの値）。
+    """
+    entry = _finite(o[0])
+    if entry is None or entry <= 0:
+        return {"reason": "entry_adj_open_missing"}
+    exit_close = _finite(c[-1])
+    highs = [x for x in map(_finite, h) if x is not None]
+    if exit_close is None or not highs:
+        return {"reason": "forward_price_missing"}
+    return {"entry_adj_open": entry, "exit_adj_close": exit_close,
+            "gross_return": exit_close / entry - 1.0, "mfe": max(highs) / entry - 1.0}
+
+
+def rule_reach20(days: list[str], o: list, h: list, l: list, c: list) -> Optional[dict]:
+    """influencer_rescore の対照評価（close20=イグジット終値で+20%・touch=窓内 AdjH が +20% 到達）。"""
+    entry = _num(o[0])
+    if not entry or entry <= 0:
+        return None
+    exit_c = _num(c[-1])
+    if not exit_c:
+        return None
+    touch = any(x is not None and x >= entry * 1.2 for x in map(_num, h))
+    gross = exit_c / entry - 1.0
+    return {"close20": gross >= 0.20, "touch": touch, "gross": gross}
+
+
+# 規則名 -> (版, 関数)。数値の定義を変えたら版を上げる
+RULES: dict[str, tuple[int, Callable[..., Any]]] = {
+    "base_rate": (1, rule_base_rate),
+    "section0": (1, rule_section0),
+    "reach20": (1, rule_reach20),
+}
+
+
+# --- エンジン -------------------------------------------------------------------------
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class ForwardEngine:
+    """要求をまとめて評価し、結果を規則ごとに保存して次回・他スクリプトへ持ち越す。
+
+    cache_dir=None なら保存しない（プロセス内の memo だけ）。load_day は日付 -> {Code: record}
+    （既定は呼び出し時点の mbr.load_bars_day。influencer_pick_profile の無制限 memo 差し替えも効く）。
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = CACHE_DIR, bars_dir: Optional[Path] = None,
+                 load_day: Optional[Callable[[str], dict]] = None):
+        self.cache_dir = cache_dir
+        self._bars_dir = bars_dir
+        self._load_day = load_day
+        self._stores: dict[str, dict] = {}
+        self._dirty: set[str] = set()
+        self.stats = {"requests": 0, "unique": 0, "memo": 0, "computed": 0, "days_read": 0}
+
+    @property
+    def bars_dir(self) -> Path:
+        return self._bars_dir if self._bars_dir is not None else jq_fetch.DATA_ROOT / "bars"
+
+    def _signature(self, day: str) -> Optional[list[int]]:
+        try:
+            st = (self.bars_dir / f"{day}.json.gz").stat()
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    def _store(self, rule: str) -> dict:
+        """規則の保存済み結果。bars の署名が変わった日を窓に含む結果はここで捨てる。"""
+        if rule in self._stores:
+            return self._stores[rule]
+        version = RULES[rule][0]
+        store = {"version": STORE_VERSION, "rule_version": version, "bars": {}, "results": {}}
+        if self.cache_dir is not None:
+            try:
+                with gzip.open(self.cache_dir / f"{rule}.json.gz", "rt", encoding="utf-8") as f:
+                    saved = json.load(f)
+                if saved.get("version") == STORE_VERSION and saved.get("rule_version") == version:
+                    store = saved
+            except (OSError, EOFError, ValueError, AttributeError):
+                pass
+        changed = sorted(d for d, sig in store["bars"].items() if self._signature(d) != sig)
+        if changed:
+            stale = []
+            for key in store["results"]:
+                _code, entry, exit_day = key.split("|")
+                i = bisect.bisect_left(changed, entry)
+                if i < len(changed) and changed[i] <= exit_day:
+                    stale.append(key)
+            for key in stale:
+                del store["results"][key]
+            for d in changed:
+                del store["bars"][d]
+            self._dirty.add(rule)
+        self._stores[rule] = store
+        return store
+
+    def evaluate(self, requests: Iterable[Request], bdays: list[str],
+                 bday_index: Optional[dict[str, int]] = None) -> dict[Request, Any]:
+        """要求ごとの結果を返す（同じ要求は1回だけ計算・保存済みなら読まない）。
+
+        signal はカレンダー（bdays）上の営業日。エントリー=signal の翌営業日・
+        イグジット目標日=エントリーから horizon 営業日後。
+        """
+        if bday_index is None:
+            bday_index = {d: i for i, d in enumerate(bdays)}
+        out: dict[Request, Any] = {}
+        pending: dict[tuple[str, str, int, int], list[Request]] = defaultdict(list)
+        n = 0
+        for req in requests:
+            n += 1
+            if req in out:
+                continue
+            code, signal, horizon, rule = req
+            ei = bday_index[signal] + 1
+            xi = ei + horizon
+            if xi >= len(bdays):
+                raise SystemExit(f"FATAL: T={signal} の{horizon}営業日後がカレンダー範囲外です"
+                                 f"（カレンダーキャッシュの延長が必要）。")
+            results = self._store(rule)["results"]
+            key = f"{code}|{bdays[ei]}|{bdays[xi]}"
+            if key in results:
+                out[req] = results[key]
+                self.stats["memo"] += 1
+            else:
+                out[req] = None
+                pending[(rule, code, ei, xi)].append(req)
+        self.stats["requests"] += n
+        self.stats["unique"] += len(out)
+        if pending:
+            self._compute(pending, bdays, out)
+            self.save()
+        return out
+
+    def _compute(self, pending: dict[tuple[str, str, int, int], list[Request]],
+                 bdays: list[str], out: dict[Request, Any]) -> None:
+        """必要な日の bars を日付順に1回ずつ読み、銘柄ごとの揃った列から規則を評価する。"""
+        span: dict[str, list[int]] = {}
+        need: dict[int, set[str]] = defaultdict(set)
+        for _rule, code, ei, xi in pending:
+            lo_hi = span.setdefault(code, [ei, xi])
+            lo_hi[0], lo_hi[1] = min(lo_hi[0], ei), max(lo_hi[1], xi)
+            for i in range(ei, xi + 1):
+                need[i].add(code)
+        cols = {code: {f: [None] * (hi - lo + 1) for f in ("AdjO", "AdjH", "AdjL", "AdjC")}
+                for code, (lo, hi) in span.items()}
+        load_day = self._load_day or (lambda d: mbr.load_bars_day(d))
+        sigs: dict[str, Optional[list[int]]] = {}
+        for i in sorted(need):
+            day = bdays[i]
+            bars = load_day(day)
+            sigs[day] = self._signature(day)
+            self.stats["days_read"] += 1
+            for code in need[i]:
+                rec = bars.get(code)
+                if rec is None:
+                    continue
+                k = i - span[code][0]
+                for f, arr in cols[code].items():
+                    arr[k] = rec.get(f)
+        for (rule, code, ei, xi), reqs in pending.items():
+            lo = span[code][0]
+            a, b = ei - lo, xi - lo + 1
+            col = cols[code]
+            result = RULES[rule][1](bdays[ei:xi + 1], col["AdjO"][a:b], col["AdjH"][a:b],
+                                    col["AdjL"][a:b], col["AdjC"][a:b])
+            store = self._store(rule)
+            store["results"][f"{code}|{bdays[ei]}|{bdays[xi]}"] = result
+            for day in bdays[ei:xi + 1]:
+                if sigs.get(day) is not None:
+                    store["bars"][day] = sigs[day]
+            self._dirty.add(rule)
+            self.stats["computed"] += 1
+            for req in reqs:
+                out[req] = result
+
+    def save(self) -> None:
+        if self.cache_dir is None:
+            self._dirty.clear()
+            return
+        for rule in sorted(self._dirty):
+            raw = json.dumps(self._stores[rule], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            _write_atomic(self.cache_dir / f"{rule}.json.gz", gzip.compress(raw, mtime=0))
+        self._dirty.clear()
+
+
+_shared: Optional[ForwardEngine] = None
+
+
+def shared() -> ForwardEngine:
+    """プロセス内で共有するエンジン（保存先は CACHE_DIR）。"""
+    global _shared
+    if _shared is None:
+        _shared = ForwardEngine(CACHE_DIR)
+    return _shared
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="フォワード評価の保存済み結果")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="規則ごとの保存件数")
+    parser.parse_args()
+    engine = ForwardEngine(CACHE_DIR)
+    for rule in RULES:
+        store = engine._store(rule)
+        print(f"{rule}: results={len(store['results'])} bars_days={len(store['bars'])}")
+    engine.save()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
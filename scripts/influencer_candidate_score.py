@@ -24,6 +24,7 @@ from typing import Any
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "scripts"))
 import measure_base_rate as mbr  # noqa: E402  Canonical loaders
+import forward_eval  # noqa: E402  フォワード評価の一括計算（§0 規則・スクリプト横断の memo）
 
 
 DEFAULT_INPUT = ROOT / "data/influencer_candidates/observed_posts.json"
@@ -146,64 +147,67 @@ def to_float(value: Any) -> float | None:
 
 def evaluate_forward(code: str, post_date: str, bdays: list[str], last_bar_day: str) -> dict[str, Any]:
     """投稿翌営業日をsignal、その翌営業日をentryとして§0を評価する。"""
-    signal_idx = bisect.bisect_right(bdays, post_date)
-    if signal_idx >= len(bdays):
-        return {"status": "censored", "reason": "signal_not_arrived"}
-    entry_idx = signal_idx + 1
-    exit_idx = entry_idx + HORIZON_BD
-    base = {"signal_date": bdays[signal_idx]}
-    if entry_idx >= len(bdays) or bdays[entry_idx] > last_bar_day:
-        return {**base, "status": "censored", "reason": "entry_not_arrived"}
-    if exit_idx >= len(bdays) or bdays[exit_idx] > last_bar_day:
-        return {
-            **base,
-            "entry_date": bdays[entry_idx],
-            "status": "censored",
-            "reason": "20bd_not_matured",
-        }
-
-    entry_day = bdays[entry_idx]
-    exit_day = bdays[exit_idx]
-    entry = to_float(mbr.load_bars_day(entry_day).get(code, {}).get("AdjO"))
-    if entry is None or entry <= 0:
-        return {
-            **base,
-            "entry_date": entry_day,
-            "exit_date": exit_day,
-            "status": "excluded",
-            "reason": "entry_adj_open_missing",
-        }
-    exit_close = to_float(mbr.load_bars_day(exit_day).get(code, {}).get("AdjC"))
-    highs = []
-    for day in bdays[entry_idx : exit_idx + 1]:
-        high = to_float(mbr.load_bars_day(day).get(code, {}).get("AdjH"))
-        if high is not None:
-            highs.append(high)
-    if exit_close is None or not highs:
-        return {
-            **base,
-            "entry_date": entry_day,
-            "exit_date": exit_day,
-            "status": "excluded",
-            "reason": "forward_price_missing",
-        }
-    gross_return = exit_close / entry - 1.0
-    net_return = gross_return - ROUND_TRIP_COST
-    mfe = max(highs) / entry - 1.0
-    return {
-        **base,
-        "entry_date": entry_day,
-        "exit_date": exit_day,
-        "entry_adj_open": entry,
-        "exit_adj_close": exit_close,
-        "gross_return": gross_return,
-        "net_return": net_return,
-        "mfe": mfe,
-        "touch_20pct": mfe >= 0.20,
-        "close_20pct": gross_return >= 0.20,
-        "status": "scored",
-        "reason": "",
-    }
+    return evaluate_forward_many([(code, post_date)], bdays, last_bar_day)[0]
+
+
+def evaluate_forward_many(
+    mentions: list[tuple[str, str]], bdays: list[str], last_bar_day: str,
+    engine: forward_eval.ForwardEngine | None = None,
+) -> list[dict[str, Any]]:
+    """(code, post_date) ごとの evaluate_forward を mentions の順で返す。
+
+    打ち切りはここで判定し、満期の窓だけを forward_eval の section0 規則でまとめて計算する
+    （同じ銘柄×signal は1回・bars は1日1回）。
+    """
+    heads: list[tuple[dict[str, Any], tuple | None]] = []
+    for code, post_date in mentions:
+        signal_idx = bisect.bisect_right(bdays, post_date)
+        if signal_idx >= len(bdays):
+            heads.append(({"status": "censored", "reason": "signal_not_arrived"}, None))
+            continue
+        entry_idx = signal_idx + 1
+        exit_idx = entry_idx + HORIZON_BD
+        base = {"signal_date": bdays[signal_idx]}
+        if entry_idx >= len(bdays) or bdays[entry_idx] > last_bar_day:
+            heads.append(({**base, "status": "censored", "reason": "entry_not_arrived"}, None))
+            continue
+        if exit_idx >= len(bdays) or bdays[exit_idx] > last_bar_day:
+            heads.append(({
+                **base,
+                "entry_date": bdays[entry_idx],
+                "status": "censored",
+                "reason": "20bd_not_matured",
+            }, None))
+            continue
+        heads.append(({**base, "entry_date": bdays[entry_idx], "exit_date": bdays[exit_idx]},
+                      (code, bdays[signal_idx], HORIZON_BD, "section0")))
+
+    engine = engine or forward_eval.shared()
+    results = engine.evaluate([req for _, req in heads if req is not None], bdays)
+    out: list[dict[str, Any]] = []
+    for head, req in heads:
+        if req is None:
+            out.append(head)
+            continue
+        result = results[req]
+        if "reason" in result:
+            out.append({**head, "status": "excluded", "reason": result["reason"]})
+            continue
+        gross_return = result["gross_return"]
+        mfe = result["mfe"]
+        out.append({
+            **head,
+            "entry_adj_open": result["entry_adj_open"],
+            "exit_adj_close": result["exit_adj_close"],
+            "gross_return": gross_return,
+            "net_return": gross_return - ROUND_TRIP_COST,
+            "mfe": mfe,
+            "touch_20pct": mfe >= 0.20,
+            "close_20pct": gross_return >= 0.20,
+            "status": "scored",
+            "reason": "",
+        })
+    return out
 
 
 def pct(value: float | None) -> str:
@@ -312,7 +316,8 @@ def build_report(
         f"- input: `{input_path.relative_to(ROOT)}`",
         f"- master: `{master_path.relative_to(ROOT)}`（最新）",
         f"- surge episodes: `{surge_path.relative_to(ROOT)}`",
-        "- price/calendar: `scripts/measure_base_rate.py` の `load_bars_day` / `load_calendar_days` / `all_business_days` をCanonical import。",
+        "- price/calendar: `scripts/measure_base_rate.py` の `load_bars_day` / `load_calendar_days` / `all_business_days` をCanonical import"
+        "（フォワード評価は `scripts/forward_eval.py` の section0 規則で一括計算）。",
         "",
     ]
     return "\n".join(lines)
@@ -372,7 +377,6 @@ def main() -> int:
         prospective, classification = prospective_class(text)
         for code, source in mentions:
             episode_starts = match_episodes(code, date, surges)
-            forward = evaluate_forward(code, date, bdays, last_bar_day)
             details.append({
                 "account": account,
                 "post_date": date,
@@ -383,8 +387,10 @@ def main() -> int:
                 "surge_hit": bool(episode_starts),
                 "episode_starts": episode_starts,
                 "text": text,
-                **forward,
             })
+    # フォワード評価は全言及を集めてから一括（アカウントをまたいで同じ銘柄×日を畳む）
+    forwards = evaluate_forward_many([(row["code"], row["post_date"]) for row in details], bdays, last_bar_day)
+    details = [{**row, **forward} for row, forward in zip(details, forwards)]
 
     summaries: list[dict[str, Any]] = []
     for account in sorted(post_stats):
@@ -51,6 +51,10 @@ signal_date（T）= 言及日が営業日ならその日、非営業日なら翌
 censored として除外する（`measure_base_rate` の FATAL を避けるため、呼び出し前に
 判定する）。
 
+計算そのものは `forward_eval` の base_rate 規則（compute_forward_return_for_code と同一の数値）で
+全行まとめて行う。同じ (銘柄, T) は1回だけ・窓の bars は日付順に1日1回だけ読み、結果は
+data/jquants/forward_eval/ に残して次回以降と他の採点スクリプトで使い回す（2026-10-19）。
+
 Usage:
     python3 scripts/influencer_leaderboard.py
 """
@@ -74,6 +78,7 @@ sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
 
 import jq_fetch  # noqa: E402  (Canonical Module: DATA_ROOT)
 import measure_base_rate  # noqa: E402  (Canonical Module: calendar/bars読み込み・フォワードリターン計算・summarize)
+import forward_eval  # noqa: E402  (Canonical Module: フォワード評価の一括計算・スクリプト横断の memo)
 import winrate_score  # noqa: E402  (Canonical Module: ticker_to_jquants_code)
 
 OUTPUT_DIR = PROJECT_ROOT / "output" / "influencer_leaderboard"
@@ -307,14 +312,18 @@ def prev_year_month(date_str: str) -> str:
 
 
 def evaluate_rows(rows: list[dict], all_bdays: list[str], bday_index: dict, data_end: str,
-                   universe_by_month: dict) -> tuple[list[dict], Counter]:
-    """抽出済み(account,mention_date,code)行を measure_base_rate の Canonical 関数で評価する。
+                   universe_by_month: dict,
+                   engine: Optional[forward_eval.ForwardEngine] = None) -> tuple[list[dict], Counter]:
+    """抽出済み(account,mention_date,code)行を measure_base_rate の Canonical 定義で評価する。
+
+    打ち切り・カレンダー外を先に判定し、残りの (code, T) を forward_eval でまとめて計算する。
 
     Returns:
         (kept_rows, exclusion_counter)
     """
     kept = []
     excl = Counter()
+    pending = []
 
     for row in rows:
         t_date = resolve_signal_bday(row["mention_date"], all_bdays)
@@ -333,7 +342,14 @@ def evaluate_rows(rows: list[dict], all_bdays: list[str], bday_index: dict, data
             excl["censored"] += 1
             continue
 
-        result = measure_base_rate.compute_forward_return_for_code(row["code"], t_date, bday_index, all_bdays)
+        pending.append((row, t_date))
+
+    engine = engine or forward_eval.shared()
+    window = measure_base_rate.FORWARD_WINDOW_BD
+    results = engine.evaluate([(row["code"], t_date, window, "base_rate") for row, t_date in pending],
+                              all_bdays, bday_index)
+    for row, t_date in pending:
+        result = results[(row["code"], t_date, window, "base_rate")]
         if result is None:
             excl["entry_missing"] += 1
             continue
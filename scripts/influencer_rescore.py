@@ -20,8 +20,6 @@ master の ScaleCat（TOPIX規模区分）で代用する。粗い層化の趣
 from __future__ import annotations
 
 import csv
-import gzip
-import json
 import math
 import random
 import sys
@@ -32,6 +30,9 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "scripts"))
 import influencer_pick_profile as ipp  # noqa: E402  無制限memoパッチ済み mbr を再利用
+import cross_section  # noqa: E402  日次 bars の横断面キャッシュ（20営業日リターン）
+import master_index  # noqa: E402  月次 master の時点索引
+import forward_eval  # noqa: E402  フォワード評価の一括計算（reach20 規則・スクリプト横断の memo）
 mbr = ipp.mbr
 
 SEED = 20260728
@@ -68,28 +69,23 @@ def iso_week(ymd: str) -> str:
 
 
 def load_master_index(master_dir: Path):
-    """月次master: 日付昇順の (ymd, {code:(S33, ScaleCat)})。"""
-    files = sorted(master_dir.glob("*.json.gz"))
-    out = []
-    for f in files:
-        ymd = f.name[:8]
-        rows = json.load(gzip.open(f, "rt"))
-        if isinstance(rows, dict):
-            rows = rows.get("info") or rows.get("data") or []
-        m = {r["Code"]: (r.get("S33", "?"), r.get("ScaleCat", "?")) for r in rows}
-        out.append((ymd, m))
-    return out
+    """月次master の時点索引（master_index・銘柄×属性の変更点だけを持つ）。"""
+    idx, _ = master_index.refresh(master_dir.parent / master_index.INDEX_PATH.name, master_dir)
+    return idx
+
+
+_asof_cache: dict[str, dict] = {}
 
 
 def master_asof(masters, ymd: str):
-    """signal日以前の最新master（PIT）。無ければ最古を返す。"""
-    prev = None
-    for d, m in masters:
-        if d <= ymd:
-            prev = m
-        else:
-            break
-    return prev or masters[0][1]
+    """signal日以前の最新master（PIT）の {code:(S33, ScaleCat)}。無ければ最古を返す。"""
+    snap = masters.snapshot_date(ymd) or masters.snapshots[0]
+    if snap not in _asof_cache:
+        recs = masters.snapshot(snap, fields=["S33", "ScaleCat"])
+        _asof_cache[snap] = {c: (r["S33"] if r["S33"] is not None else "?",
+                                 r["ScaleCat"] if r["ScaleCat"] is not None else "?")
+                             for c, r in recs.items()}
+    return _asof_cache[snap]
 
 
 def ret20_cross_section(bdays, bidx, t: str) -> dict[str, float]:
@@ -98,6 +94,11 @@ def ret20_cross_section(bdays, bidx, t: str) -> dict[str, float]:
     if i < 20:
         return {}
     day_t, day_p = bdays[i], bdays[i - 20]
+    store = cross_section.open_store()
+    if (store.window_days(t, 21) or [None])[0] == day_p:
+        cached = store.returns(t, 20)  # 横断面キャッシュ（同じ AdjC 比・同じ Code 順）
+        if cached is not None:
+            return cached
     bt, bp = mbr.load_bars_day(day_t), mbr.load_bars_day(day_p)
     out = {}
     for code, row in bt.items():
@@ -119,29 +120,35 @@ def tercile_of(v, lo, hi):
 
 def forward_reach(code: str, bdays, bidx, signal: str, last_bar: str):
     """§0執行（entry=signal翌営業日AdjO・exit=20bd AdjC・touch=AdjH）の到達判定。"""
-    si = bidx.get(signal)
-    if si is None:
-        return None
-    ei, xi = si + 1, si + 1 + HORIZON_BD
-    if xi >= len(bdays) or bdays[xi] > last_bar:
-        return None
-    entry = fnum(mbr.load_bars_day(bdays[ei]).get(code, {}).get("AdjO"))
-    if not entry or entry <= 0:
-        return None
-    exit_c = fnum(mbr.load_bars_day(bdays[xi]).get(code, {}).get("AdjC"))
-    if not exit_c:
-        return None
-    touch = False
-    for d in bdays[ei:xi + 1]:
-        h = fnum(mbr.load_bars_day(d).get(code, {}).get("AdjH"))
-        if h is not None and h >= entry * 1.2:
-            touch = True
-            break
-    gross = exit_c / entry - 1.0
-    # ret は本人側 net_return と同じコスト後（mentions.csv の net_return は往復コスト控除済み）。
-    # 第27R A14: EV超過（本人−対照）の下限を出すために対照のリターンも返す（2026-07-30 追加）。
-    return {"close20": gross >= 0.20, "touch": touch,
-            "ret": gross - mbr.ROUND_TRIP_COST}
+    return forward_reach_many([(code, signal)], bdays, bidx, last_bar)[(code, signal)]
+
+
+def forward_reach_many(pairs, bdays, bidx, last_bar: str, engine=None) -> dict:
+    """(code, signal) ごとの forward_reach を {(code, signal): 結果 or None} で返す。
+
+    満期の窓だけを forward_eval の reach20 規則でまとめて計算する（対照20本×クラスタで
+    重なる銘柄×signal は1回・bars は1日1回）。
+    """
+    out, reqs = {}, {}
+    for code, signal in pairs:
+        si = bidx.get(signal)
+        if si is None:
+            out[(code, signal)] = None
+            continue
+        xi = si + 1 + HORIZON_BD
+        if xi >= len(bdays) or bdays[xi] > last_bar:
+            out[(code, signal)] = None
+            continue
+        reqs[(code, signal)] = (code, signal, HORIZON_BD, "reach20")
+    engine = engine or forward_eval.shared()
+    results = engine.evaluate(reqs.values(), bdays, bidx)
+    for pair, req in reqs.items():
+        r = results[req]
+        # ret は本人側 net_return と同じコスト後（mentions.csv の net_return は往復コスト控除済み）。
+        # 第27R A14: EV超過（本人−対照）の下限を出すために対照のリターンも返す（2026-07-30 追加）。
+        out[pair] = None if r is None else {"close20": r["close20"], "touch": r["touch"],
+                                            "ret": r["gross"] - mbr.ROUND_TRIP_COST}
+    return out
 
 
 def main() -> int:
@@ -154,7 +161,7 @@ def main() -> int:
     masters = load_master_index(ROOT / "data/jquants/master")
     rng = random.Random(SEED)
 
-    # 対象クラスタの収集（先に全読みして必要日を prewarm）
+    # 対象クラスタの収集（先に全アカウント分を読む）
     acc_clusters: dict[str, list[dict]] = {}
     for acc, (rel, _old) in ACCOUNTS.items():
         p = ROOT / rel
@@ -182,13 +189,8 @@ def main() -> int:
     if not all_signals:
         print("FATAL: no clusters")
         return 2
-    lo = max(0, bidx[all_signals[0]] - 25)
-    need = bdays[lo:]
-    print(f"[rescore] prewarm {len(need)}営業日", flush=True)
-    for k, d in enumerate(need):
-        ipp._load_bars_unbounded(d)
-        if k % 200 == 0:
-            print(f"  warm {k}/{len(need)}", flush=True)
+    # 全日の事前ロードはしない: 対照のフォワード評価は forward_eval が必要な日だけを1回ずつ読み
+    # （保存済みの窓は読まない）、ret20 断面は横断面キャッシュ・欠けた日だけ無制限 memo で読む
 
     # signal日ごとの ret20 断面と3分位境界（キャッシュ）
     cs_cache: dict[str, tuple[dict, float, float]] = {}
@@ -236,6 +238,8 @@ def main() -> int:
         # matched-control
         ctrl_close, ctrl_touch, matched = [], [], 0
         paired = []   # 第27R A14: (本人net − 対照net平均) のクラスタ対応差
+        # 対照の抽出（rng の消費順は従来どおりクラスタ順）→ 到達判定はアカウント分を一括
+        draws = []
         for c in clusters:
             t = c["signal"]
             if t not in bidx or bidx[t] < 21:
@@ -252,8 +256,11 @@ def main() -> int:
             if not pool:
                 pool = [k for k, v in cs.items()
                         if k != c["code"] and tercile_of(v, lo_b, hi_b) == ter]
-            picks = rng.sample(pool, min(N_CONTROL, len(pool)))
-            res = [forward_reach(k, bdays, bidx, t, last_bar) for k in picks]
+            draws.append((c, rng.sample(pool, min(N_CONTROL, len(pool)))))
+        reach = forward_reach_many([(k, c["signal"]) for c, picks in draws for k in picks],
+                                   bdays, bidx, last_bar)
+        for c, picks in draws:
+            res = [reach[(k, c["signal"])] for k in picks]
             res = [r for r in res if r]
             if not res:
                 continue
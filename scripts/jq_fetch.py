@@ -293,6 +293,32 @@ def append_log(record: dict) -> None:
         print(f"WARN: fetch_log 書き込み失敗: {e}", file=sys.stderr)
 
 
+def update_master_index() -> None:
+    """月末 master を取得したら時点索引（master_index.py）へ差分反映する。
+
+    索引は master ファイルから作り直せる派生物なので、失敗しても取得処理は止めず警告のみ
+    （master_index は本モジュールを import するため遅延 import）。
+    """
+    try:
+        import master_index
+        idx, stats = master_index.refresh()
+    except Exception as e:  # 派生物の更新失敗で取得結果を失わない
+        print(f"WARN: master 時点索引の更新失敗: {e}", file=sys.stderr)
+        return
+    print(f"[master] 時点索引 snapshots={len(idx.snapshots)} read={stats['read']} rebuilt={stats['rebuilt']}")
+
+
+def update_cross_section() -> None:
+    """日次 bars を取得したら横断面キャッシュ（cross_section.py）へ差分反映する（失敗は警告のみ）。"""
+    try:
+        import cross_section
+        stats = cross_section.CrossSectionStore().sync()
+    except Exception as e:  # 派生物の更新失敗で取得結果を失わない
+        print(f"WARN: 横断面キャッシュの更新失敗: {e}", file=sys.stderr)
+        return
+    print(f"[bars] 横断面キャッシュ read={stats['read']} removed={stats['removed']} stats={stats['stats']}")
+
+
 def fatal_auth_error(e: AuthError) -> None:
     print(f"FATAL: 認証エラー（APIキーが無効または失効している可能性）: {e}", file=sys.stderr)
     sys.exit(2)
@@ -812,11 +838,13 @@ def main() -> int:
                 dates = month_end_business_days_in_range(calendar_days, start, end)
                 print(f"[master] 対象月末営業日 {len(dates)} 件")
                 run_daily_snapshot("master", "master", "/v2/equities/master", dates, api_key, run_id)
+                update_master_index()
             elif target == "bars":
                 calendar_days = load_calendar_days(api_key, run_id)
                 dates = business_days_in_range(calendar_days, start, end)
                 print(f"[bars] 対象営業日 {len(dates)} 件")
                 run_daily_snapshot("bars", "bars", "/v2/equities/bars/daily", dates, api_key, run_id)
+                update_cross_section()
             elif target == "fins":
                 calendar_days = load_calendar_days(api_key, run_id)
                 dates = business_days_in_range(calendar_days, start, end)
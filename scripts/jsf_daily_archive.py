@@ -54,23 +54,33 @@ MAX_RETRIES = 3  # 初回 + 3 リトライ = 最大 4 試行
 RETRY_INTERVAL_SECONDS = 20
 HEADER_SCAN_LIMIT = 50  # ヘッダー行探索の走査上限（安全弁）
 
-# dataset 名 -> (URL, 日付列名 or None)
+# dataset 名 -> (URL, 日付列名 or None, 銘柄コード列名)
+# code_column は jsf_store.py（解析済みストア）がヘッダー行の特定と行の主キーに使う
+# exchange_column は同一コード・同一日に取引所別の行がある場合の区分列（zandaka は 東証/名証/福証/札証 の各行）
 DATASETS: dict[str, dict[str, Optional[str]]] = {
     "zandaka": {
         "url": "https://www.taisyaku.jp/data/zandaka.csv",
         "date_column": "申込日",
+        "code_column": "銘柄コード",
+        "exchange_column": "取引所区分名",
     },
     "shina": {
         "url": "https://www.taisyaku.jp/data/shina.csv",
         "date_column": "貸借申込日",
+        "code_column": "コード",
+        "exchange_column": "取引所区分",
     },
     "meigara": {
         "url": "https://www.taisyaku.jp/data/meigara.csv",
         "date_column": "貸借申込日",
+        "code_column": "コード",
+        "exchange_column": None,
     },
     "seigenichiran": {
         "url": "https://www.taisyaku.jp/data/seigenichiran.csv",
         "date_column": None,
+        "code_column": "銘柄コード",
+        "exchange_column": None,
     },
 }
 
@@ -228,6 +238,22 @@ def save_dataset(dataset_dir: Path, dataset: str, date_str: str, content: bytes,
         rev += 1
 
 
+def update_store(dataset: str) -> None:
+    """新規保存したデータセットを解析済みストア（jsf_store.py）へ差分取込する。
+
+    ストアは原本から何度でも作り直せる派生物なので、失敗しても本処理を止めず警告のみ
+    （次回の保存時か `jsf_store.py sync` で追いつく）。jsf_store は本モジュールを import するため遅延 import。
+    """
+    try:
+        import jsf_store
+        stats = jsf_store.sync([dataset])
+    except Exception as e:  # 派生物の更新失敗でアーカイブ結果を失わない
+        print(f"[{dataset}] WARN: ストア更新失敗: {e}", file=sys.stderr)
+        return
+    for err in stats["errors"]:
+        print(f"[{dataset}] WARN: ストア取込失敗: {err}", file=sys.stderr)
+
+
 def append_log(record: dict) -> None:
     """archive_log.jsonl に1行追記。書き込み失敗は本処理を止めず警告のみ（監視が本処理を壊さない原則）。"""
     try:
@@ -274,6 +300,9 @@ def archive_dataset(dataset: str, run_id: str) -> dict:
         append_log(record)
         return record
 
+    if saved_path is not None:
+        update_store(dataset)
+
     record = {
         "run_id": run_id,
         "ts": ts,
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""日証金アーカイブ（data/jsf/<dataset>/*.csv.gz）の解析済み列指向ストア。
+
+jsf_daily_archive.py は配信 CSV を生バイトのまま gzip 保存する（再生成不可データの原本保全）。
+特徴量の検証で複数年分を読むたびに数百ファイルを cp932 デコード・CSV 解析し直すのは無駄なので、
+解析結果を データセット × 年月 の列指向チャンクとして持つ（2026-10-19）。
+
+    data/jsf/store/manifest.json               取込済みファイルの署名・data_date・行数
+    data/jsf/store/<dataset>/<YYYYMM>.json.gz  {"fields", "dates", "columns": {data_date, code, <列名>...}}
+
+  - data_date は jsf_daily_archive.save_dataset が付けたファイル名の日付（extract_data_date /
+    normalize_date_value で正規化済み。日付列のない seigenichiran は取得日）をそのまま使う
+  - 同じ data_date に確報差し替え（_rN）が複数あれば最大の rN だけを載せる（原本は全て残る）
+  - 数値は int/float、"*****"・空欄は None、それ以外の文字列はそのまま。コード列・日付列は文字列のまま
+  - 取込は差分のみ: 署名（サイズ・mtime_ns）が変わらないファイルは読まず、書き換えるのは
+    そのファイルの年月チャンクだけ
+  - zandaka は同一コード・同一日に取引所区分名（東証およびＰＴＳ/名証/福証/札証）ごとの行がある。
+    行はすべて残し、as_of は主市場（PRIMARY_EXCHANGES）の行を採る（2026-10-19）
+
+欠損検知（check_jsf_gaps.py --data-dates）は manifest だけを見る（CSV を開かない）。
+
+依存はすべて標準ライブラリ（jsf_daily_archive と同じく launchd のホスト python3 で動く）。
+
+Usage:
+    python3 scripts/jsf_store.py sync                       # 未取込・更新分を取込
+    python3 scripts/jsf_store.py dates zandaka              # 収録済み data_date 一覧
+    python3 scripts/jsf_store.py asof shina 20260801 --codes 1320 7203
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+import jsf_daily_archive  # noqa: E402  (Canonical Module: DATASETS / DATA_ROOT / HEADER_SCAN_LIMIT)
+
+STORE_ROOT = jsf_daily_archive.DATA_ROOT / "store"
+MANIFEST_NAME = "manifest.json"
+STORE_VERSION = 1
+# 取引所区分列の主市場の値（zandaka「取引所区分名」・shina「取引所区分」）
+PRIMARY_EXCHANGES = frozenset({"東証およびＰＴＳ", "東証"})
+
+FILE_RE = re.compile(r"^(?P<dataset>[a-z]+)_(?P<date>\d{8})(?:_r(?P<rev>\d+))?\.csv\.gz$")
+_NUM_RE = re.compile(r"^[+-]?(?:\d+(?:\.\d*)?|\.\d+)$")
+
+
+def parse_file_name(name: str) -> Optional[tuple[str, str, int]]:
+    """'shina_20260710_r2.csv.gz' → ('shina', '20260710', 2)。原本（サフィックスなし）は rev=1。"""
+    m = FILE_RE.match(name)
+    if not m:
+        return None
+    return m.group("dataset"), m.group("date"), int(m.group("rev") or 1)
+
+
+def _value(raw: str):
+    v = raw.strip()
+    if not v or set(v) == {"*"}:
+        return None
+    s = v.replace(",", "")
+    if _NUM_RE.match(s):
+        return float(s) if "." in s else int(s)
+    return v
+
+
+def parse_csv(dataset: str, content: bytes) -> tuple[list[str], list[tuple[str, list]]]:
+    """配信 CSV（cp932）を (列名リスト, [(code, 値リスト)]) に解析する。
+
+    ヘッダー行は extract_data_date と同じく列名一致で探す（コード列を含む最初の行）。
+    列名が空・重複する列は位置で名前を補う。コードが空の行（注記・合計行）は捨てる。
+    """
+    cfg = jsf_daily_archive.DATASETS[dataset]
+    code_column = cfg["code_column"]
+    keep_text = {code_column, cfg["date_column"]}
+    reader = csv.reader(io.StringIO(content.decode("cp932")))
+    header: Optional[list[str]] = None
+    for i, row in enumerate(reader):
+        if code_column in row:
+            header = row
+            break
+        if i >= jsf_daily_archive.HEADER_SCAN_LIMIT:
+            break
+    if header is None:
+        raise ValueError(f"{dataset}: code column '{code_column}' not found within first "
+                         f"{jsf_daily_archive.HEADER_SCAN_LIMIT} rows")
+
+    fields: list[str] = []
+    for i, name in enumerate(header):
+        name = name.strip() or f"col{i}"
+        if name in fields:
+            name = f"{name}_{i}"
+        fields.append(name)
+    code_idx = header.index(code_column)
+    text_idx = {i for i, name in enumerate(header) if name in keep_text}
+
+    rows: list[tuple[str, list]] = []
+    for row in reader:
+        if code_idx >= len(row) or not row[code_idx].strip():
+            continue
+        row = (row + [""] * len(fields))[:len(fields)]
+        values = [(v.strip() or None) if i in text_idx else _value(v) for i, v in enumerate(row)]
+        rows.append((row[code_idx].strip(), values))
+    return fields, rows
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _empty_manifest() -> dict:
+    return {"version": STORE_VERSION, "datasets": {}}
+
+
+def load_manifest(root: Path = STORE_ROOT) -> dict:
+    """manifest を読む。無い・壊れている・版違いなら空（次の sync で全取込し直し）。"""
+    try:
+        m = json.loads((root / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return _empty_manifest()
+    if not isinstance(m, dict) or m.get("version") != STORE_VERSION:
+        return _empty_manifest()
+    return m
+
+
+def save_manifest(manifest: dict, root: Path = STORE_ROOT) -> None:
+    _write_atomic(root / MANIFEST_NAME,
+                  json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True).encode("utf-8"))
+
+
+def _chunk_path(root: Path, dataset: str, month: str) -> Path:
+    return root / dataset / f"{month}.json.gz"
+
+
+def _load_chunk(root: Path, dataset: str, month: str) -> dict:
+    """年月チャンクを {date: (fields, [(code, values)], ファイル名)} の形で返す（無ければ空）。"""
+    path = _chunk_path(root, dataset, month)
+    if not path.exists():
+        return {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        chunk = json.load(f)
+    cols = chunk["columns"]
+    blocks: dict = {}
+    for date, meta in chunk["dates"].items():
+        lo, hi = meta["start"], meta["start"] + meta["rows"]
+        fields = meta["fields"]
+        rows = [(cols["code"][i], [cols[name][i] for name in fields]) for i in range(lo, hi)]
+        blocks[date] = (fields, rows, meta["file"])
+    return blocks
+
+
+def _save_chunk(root: Path, dataset: str, month: str, blocks: dict) -> None:
+    path = _chunk_path(root, dataset, month)
+    if not blocks:
+        path.unlink(missing_ok=True)
+        return
+    union: list[str] = []
+    for fields, _, _ in blocks.values():
+        union.extend(f for f in fields if f not in union)
+    columns: dict[str, list] = {"data_date": [], "code": [], **{f: [] for f in union}}
+    dates: dict = {}
+    for date in sorted(blocks):
+        fields, rows, file_name = blocks[date]
+        dates[date] = {"file": file_name, "fields": fields, "start": len(columns["code"]), "rows": len(rows)}
+        pos = {f: i for i, f in enumerate(fields)}
+        for code, values in rows:
+            columns["data_date"].append(date)
+            columns["code"].append(code)
+            for f in union:
+                columns[f].append(values[pos[f]] if f in pos else None)
+    chunk = {"version": STORE_VERSION, "dataset": dataset, "month": month, "fields": union,
+             "dates": dates, "columns": columns}
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb", mtime=0) as f:
+        f.write(json.dumps(chunk, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    _write_atomic(path, buf.getvalue())
+
+
+def _signature(path: Path) -> dict:
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def sync(datasets: Optional[Iterable[str]] = None, *, root: Path = STORE_ROOT,
+         archive_root: Path = jsf_daily_archive.DATA_ROOT) -> dict:
+    """アーカイブとストアを突き合わせ、追加・変更・削除のあった data_date だけ取り込み直す。
+
+    Returns: {"read": 解析したファイル数, "dates": 書き換えた data_date 数, "errors": [...]}
+    """
+    manifest = load_manifest(root)
+    stats = {"read": 0, "dates": 0, "errors": []}
+    for dataset in sorted(datasets or jsf_daily_archive.DATASETS):
+        entry = manifest["datasets"].setdefault(dataset, {"files": {}, "dates": {}})
+        files = entry["files"]
+        on_disk: dict[str, Path] = {}
+        ds_dir = archive_root / dataset
+        for p in sorted(ds_dir.glob("*.csv.gz")) if ds_dir.exists() else []:
+            parsed = parse_file_name(p.name)
+            if parsed and parsed[0] == dataset:
+                on_disk[p.name] = p
+
+        dirty: set[str] = set()
+        for name in set(files) - set(on_disk):
+            dirty.add(files.pop(name)["date"])
+        for name, p in on_disk.items():
+            sig = _signature(p)
+            old = files.get(name)
+            if old is None or old["size"] != sig["size"] or old["mtime_ns"] != sig["mtime_ns"]:
+                _, date, rev = parse_file_name(name)
+                files[name] = {**sig, "date": date, "rev": rev, "rows": None}
+                dirty.add(date)
+
+        # data_date ごとに最大 rev のファイルを採用する
+        best: dict[str, str] = {}
+        for name, meta in files.items():
+            if meta["date"] in dirty:
+                cur = best.get(meta["date"])
+                if cur is None or files[cur]["rev"] < meta["rev"]:
+                    best[meta["date"]] = name
+
+        by_month: dict[str, list[str]] = {}
+        for date in dirty:
+            by_month.setdefault(date[:6], []).append(date)
+        for month, dates in sorted(by_month.items()):
+            blocks = _load_chunk(root, dataset, month)
+            for date in sorted(dates):
+                blocks.pop(date, None)
+                entry["dates"].pop(date, None)
+                name = best.get(date)
+                if name is None:
+                    continue
+                try:
+                    with gzip.open(on_disk[name], "rb") as f:
+                        fields, rows = parse_csv(dataset, f.read())
+                except (OSError, EOFError, UnicodeDecodeError, ValueError) as e:
+                    stats["errors"].append(f"{name}: {e}")
+                    files[name]["rows"] = None
+                    continue
+                stats["read"] += 1
+                files[name]["rows"] = len(rows)
+                blocks[date] = (fields, rows, name)
+                entry["dates"][date] = name
+            _save_chunk(root, dataset, month, blocks)
+            stats["dates"] += len(dates)
+    save_manifest(manifest, root)
+    return stats
+
+
+def stored_dates(dataset: str, *, root: Path = STORE_ROOT, manifest: Optional[dict] = None) -> list[str]:
+    """収録済み data_date（YYYYMMDD・昇順）。manifest だけを読む。"""
+    manifest = manifest if manifest is not None else load_manifest(root)
+    return sorted(manifest["datasets"].get(dataset, {}).get("dates", {}))
+
+
+def read_columns(dataset: str, start: Optional[str] = None, end: Optional[str] = None, *,
+                 fields: Optional[Iterable[str]] = None, codes: Optional[Iterable[str]] = None,
+                 root: Path = STORE_ROOT) -> dict[str, list]:
+    """[start, end]（YYYYMMDD・両端含む）の行を列ごとのリストで返す。data_date 昇順・配信 CSV 内の順。
+
+    fields を渡せばその列だけ（data_date・code と、あれば取引所区分列は常に含む）。存在しない列は None で埋める。
+    """
+    code_set = {str(c) for c in codes} if codes is not None else None
+    exchange_column = jsf_daily_archive.DATASETS[dataset].get("exchange_column")
+    wanted = list(fields) if fields is not None else None
+    if wanted is not None and exchange_column and exchange_column not in wanted:
+        wanted.insert(0, exchange_column)
+    out: dict[str, list] = {"data_date": [], "code": []}
+    ds_dir = root / dataset
+    months = sorted(p.name[:6] for p in ds_dir.glob("*.json.gz")) if ds_dir.exists() else []
+    for month in months:
+        if (start and month < start[:6]) or (end and month > end[:6]):
+            continue
+        with gzip.open(_chunk_path(root, dataset, month), "rt", encoding="utf-8") as f:
+            chunk = json.load(f)
+        cols = chunk["columns"]
+        names = wanted if wanted is not None else chunk["fields"]
+        for name in names:
+            if name not in out:
+                out[name] = [None] * len(out["code"])
+        idx = [i for i, d in enumerate(cols["data_date"])
+               if (not start or d >= start) and (not end or d <= end)
+               and (code_set is None or cols["code"][i] in code_set)]
+        for name in out:
+            col = cols.get(name)
+            out[name].extend([col[i] for i in idx] if col is not None else [None] * len(idx))
+    return out
+
+
+def as_of(dataset: str, date: str, *, codes: Optional[Iterable[str]] = None,
+          fields: Optional[Iterable[str]] = None, lookback_days: int = 31,
+          root: Path = STORE_ROOT) -> dict[str, dict]:
+    """date（YYYYMMDD）時点で最新の行を銘柄ごとに返す: {code: {"data_date": ..., 列名: 値}}。
+
+    data_date <= date の中で最も新しい行（date 当日を含む。公表タイミングのラグは呼び出し側で
+    date をずらして扱う）。lookback_days 暦日より古い行は採らない（上場廃止・対象外化の残骸を避ける）。
+    同じ data_date に取引所別の行があれば主市場（PRIMARY_EXCHANGES）の行、なければ配信 CSV で
+    最初の行を採る（札証などの残高で東証の残高を上書きしない）。採った取引所は区分列に残る。
+    """
+    floor = (datetime.datetime.strptime(date, "%Y%m%d")
+             - datetime.timedelta(days=lookback_days)).strftime("%Y%m%d")
+    cols = read_columns(dataset, floor, date, fields=fields, codes=codes, root=root)
+    exchange_column = jsf_daily_archive.DATASETS[dataset].get("exchange_column")
+    exchanges = cols.get(exchange_column) if exchange_column else None
+    names = [n for n in cols if n != "code"]
+    latest: dict[str, dict] = {}
+    primary: dict[str, bool] = {}
+    for i, code in enumerate(cols["code"]):
+        is_primary = exchanges is None or exchanges[i] in PRIMARY_EXCHANGES
+        held = latest.get(code)
+        if held is not None and held["data_date"] == cols["data_date"][i] and (primary[code] or not is_primary):
+            continue  # data_date 昇順なので新しい日は後勝ち。同じ日は主市場・先頭行を優先
+        latest[code] = {n: cols[n][i] for n in names}
+        primary[code] = is_primary
+    return latest
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="日証金アーカイブの列指向ストア")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_sync = sub.add_parser("sync", help="未取込・更新分を取込")
+    p_sync.add_argument("--datasets", nargs="+", choices=sorted(jsf_daily_archive.DATASETS))
+    p_dates = sub.add_parser("dates", help="収録済み data_date 一覧")
+    p_dates.add_argument("dataset", choices=sorted(jsf_daily_archive.DATASETS))
+    p_asof = sub.add_parser("asof", help="指定日時点の最新行")
+    p_asof.add_argument("dataset", choices=sorted(jsf_daily_archive.DATASETS))
+    p_asof.add_argument("date", help="YYYYMMDD")
+    p_asof.add_argument("--codes", nargs="+")
+    p_asof.add_argument("--fields", nargs="+")
+    args = parser.parse_args()
+
+    if args.cmd == "sync":
+        stats = sync(args.datasets)
+        print(f"read={stats['read']} dates={stats['dates']} errors={len(stats['errors'])}")
+        for e in stats["errors"]:
+            print(f"WARN: {e}", file=sys.stderr)
+        return 1 if stats["errors"] else 0
+    if args.cmd == "dates":
+        dates = stored_dates(args.dataset)
+        print(f"{args.dataset}: {len(dates)} 日" + (f"（{dates[0]}〜{dates[-1]}）" if dates else ""))
+        for d in dates:
+            print(d)
+        return 0
+    rows = as_of(args.dataset, args.date, codes=args.codes, fields=args.fields)
+    for code in sorted(rows):
+        print(json.dumps({"code": code, **rows[code]}, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
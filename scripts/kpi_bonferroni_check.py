@@ -32,7 +32,8 @@ from pathlib import Path
 import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).parent))
-import kpi_event_study  # noqa: E402  (Canonical: bootstrap_lift_ci/bootstrap_ev_ci を再利用)
+import bootstrap_cache  # noqa: E402  (Canonical: bootstrap_lift_ci/bootstrap_ev_ci の結果キャッシュ)
+import kpi_event_study  # noqa: E402  (Canonical: load_base_rate_by_month を再利用)
 
 CHAMPION_RETURNS = Path("output/kpi/volshock_x_above200/returns.csv")
 CHAMPION_FEATURES = Path("output/kpi/volshock_v2_amplifiers/signals_features_volshock_x_above200.csv")
@@ -71,7 +72,12 @@ def main() -> int:
     parser.add_argument("--n-boot", type=int, default=10000,
                         help="ブートストラップ本数（既定10000。docstring参照・1000では裾が解像できない）")
     parser.add_argument("--show-n", action="store_true", help="台帳由来の累積試行数を表示して終了")
+    parser.add_argument("--no-bootstrap-cache", action="store_true",
+                        help="CIのキャッシュ（data/kpi_trials/bootstrap_cache）を使わず再計算する")
     args = parser.parse_args()
+    # 2026-10-19: 同じ母集団・n_boot・seed・CI水準の結果は bootstrap_cache から再利用する
+    # （分母 n_trials が変わった時は調整後 CI だけが再計算になる。数値は再計算時と同一）
+    boot = bootstrap_cache.BootstrapCache(enabled=not args.no_bootstrap_cache)
 
     n_trials = args.n_trials if args.n_trials is not None else effective_trial_count()
     source = "手動上書き（再現用）" if args.n_trials is not None else f"台帳 {TRIALS_PATH} の非空行数"
@@ -92,29 +98,29 @@ def main() -> int:
     champ = champ[champ["quiet_bucket"] == "quiet"].reset_index(drop=True)
     if len(champ) != CHAMPION_EXPECTED_N:
         raise SystemExit(f"FATAL: champion母集団n={len(champ)}が既知値{CHAMPION_EXPECTED_N}と不一致")
-    lift95 = kpi_event_study.bootstrap_lift_ci(champ, base_rate_by_month, n_boot=args.n_boot)
-    lift_adj = kpi_event_study.bootstrap_lift_ci(champ, base_rate_by_month, n_boot=args.n_boot,
-                                                 ci_level=ci_level)
+    lift95 = boot.lift_ci(champ, base_rate_by_month, n_boot=args.n_boot)
+    lift_adj = boot.lift_ci(champ, base_rate_by_month, n_boot=args.n_boot, ci_level=ci_level)
     print(f"champion lift: point={lift_adj['point_lift']:.2f} "
           f"95%CI=[{lift95['ci_low']:.2f},{lift95['ci_high']:.2f}] "
           f"調整後CI=[{lift_adj['ci_low']:.2f},{lift_adj['ci_high']:.2f}]")
 
     # --- ULフェード EV(なし) ---
     ul = load_in_universe(UL_FADE_RETURNS)
-    ul95 = kpi_event_study.bootstrap_ev_ci(ul, n_boot=args.n_boot)
-    ul_adj = kpi_event_study.bootstrap_ev_ci(ul, n_boot=args.n_boot, ci_level=ci_level)
+    ul95 = boot.ev_ci(ul, n_boot=args.n_boot)
+    ul_adj = boot.ev_ci(ul, n_boot=args.n_boot, ci_level=ci_level)
     print(f"ul_fade EV: n={len(ul)} point={ul_adj['point_ev']:.4%} "
           f"95%CI=[{ul95['ci_low']:.4%},{ul95['ci_high']:.4%}] "
           f"調整後CI=[{ul_adj['ci_low']:.4%},{ul_adj['ci_high']:.4%}]")
 
     # --- SUE EV(なし) ---
     sue = load_in_universe(SUE_RETURNS)
-    sue95 = kpi_event_study.bootstrap_ev_ci(sue, n_boot=args.n_boot)
-    sue_adj = kpi_event_study.bootstrap_ev_ci(sue, n_boot=args.n_boot, ci_level=ci_level)
+    sue95 = boot.ev_ci(sue, n_boot=args.n_boot)
+    sue_adj = boot.ev_ci(sue, n_boot=args.n_boot, ci_level=ci_level)
     print(f"sue_beat EV: n={len(sue)} point={sue_adj['point_ev']:.4%} "
           f"95%CI=[{sue95['ci_low']:.4%},{sue95['ci_high']:.4%}] "
           f"調整後CI=[{sue_adj['ci_low']:.4%},{sue_adj['ci_high']:.4%}]")
 
+    print(boot.summary())
     return 0
 
 
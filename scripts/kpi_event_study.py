@@ -17,7 +17,6 @@ Usage（他KPIスクリプトから run_event_study() を直接呼ぶのが主
 from __future__ import annotations
 
 import argparse
-import fcntl
 import json
 import re
 import sys
@@ -30,6 +29,7 @@ import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).parent))
 import jq_fetch  # noqa: E402  (Canonical Module: now_jst を再利用)
+import ledger_index  # noqa: E402  (Canonical Module: 台帳の追記とキー索引)
 import measure_base_rate  # noqa: E402  (Canonical Module: compute_forward_return_for_code/summarize等を再利用)
 
 MONTH_RE = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
@@ -884,15 +884,11 @@ def append_trial(record: dict, trials_path: Path) -> None:
     場合に、コミット前の「出版前訂正」として置き換えられうる（例: 第18/20周の年度キー・単位不整合
     修正時に初回実行分の行を差し替え。差し替えの経緯は対応するKPIの`report.md`または
     §7各節の修正履歴に記録する運用とし、trials.jsonl自体には必ずしも差し替え注記行を残さない）。
+
+    ロック中に台帳のキー索引（ledger_index のサイドカー）も同じ行まで進める（2026-10-19）。
     """
     warn_if_not_preregistered(record.get("kpi_name", ""))
-    trials_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(trials_path, "a", encoding="utf-8") as f:
-        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
-        try:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
-        finally:
-            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    ledger_index.append(trials_path, [record])
 
 
 # --- メイン処理（他スクリプトから直接呼ばれる主経路） -----------------------------
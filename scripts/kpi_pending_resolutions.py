@@ -30,6 +30,9 @@ import sys
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent))
+import ledger_index  # noqa: E402  (Canonical Module: 台帳の逐次読みとキー索引)
+
 REPO = Path(__file__).resolve().parent.parent
 TRIALS_PATH = REPO / "data" / "kpi_trials" / "trials.jsonl"
 RESOLUTIONS_PATH = REPO / "data" / "kpi_trials" / "resolutions.jsonl"
@@ -73,10 +76,8 @@ def load_resolutions() -> dict[str, dict]:
     current: dict[str, dict] = {}
     if not RESOLUTIONS_PATH.exists():
         return current
-    for line in RESOLUTIONS_PATH.read_text(encoding="utf-8").splitlines():
-        if line.strip():
-            rec = json.loads(line)
-            current[rec["run_id"]] = rec
+    for rec in ledger_index.Ledger(RESOLUTIONS_PATH).rows():
+        current[rec["run_id"]] = rec
     return current
 
 
@@ -227,6 +228,7 @@ def guarded_append(records: list[dict], trials_fingerprint: tuple[str, int],
                 f.write(json.dumps(rec, ensure_ascii=False) + "\n")
             f.flush()
             os.fsync(f.fileno())
+            ledger_index.Ledger(RESOLUTIONS_PATH).refresh(lock=False)  # 排他中に索引も進める
         finally:
             fcntl.flock(f.fileno(), fcntl.LOCK_UN)
     after = sha256_of(TRIALS_PATH)
@@ -45,6 +45,7 @@ import numpy as np
 import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).parent))
+import bootstrap_cache  # noqa: E402  (Canonical Module: p値・CI の内容アドレス型キャッシュ)
 import jq_fetch  # noqa: E402  (Canonical Module: now_jst を再利用)
 import kpi_event_study  # noqa: E402  (Canonical: load_base_rate_by_month/bootstrap_lift_ci/bootstrap_ev_ci/append_trial)
 import kpi_f03_pullback_signals as f03_v2t  # noqa: E402  (Canonical: batch_v2tグリッド検証(verify_grid_frozen)・
@@ -55,6 +56,7 @@ import kpi_run_evidence  # noqa: E402  (Canonical: compute_code_tree_hash を再
 import kpi_sue_champion_signals as sue_mod  # noqa: E402  (Canonical: compute_dev200)
 import kpi_volshock_v2_amplifiers as v2_amp  # noqa: E402  (Canonical: compute_quiet_ratio)
 import kpi_volshock_v3_ul_earnings as v3_ul  # noqa: E402  (Canonical: compute_ul_count_10bd)
+import ledger_index  # noqa: E402  (Canonical: screening_batches.jsonl の batch_id 索引)
 import measure_base_rate  # noqa: E402  (Canonical: カレンダー・bars/regime読込・ROUND_TRIP_COST)
 
 DEFAULT_GRID_PATH = Path("config/screening_grid_v1.json")
@@ -78,6 +80,10 @@ CONFIRM_MIN_N = 30
 SENSITIVITY_N_BOOT = 10000
 LIFT_N_BOOT = 1000  # 点推定のみ使用（CIは参考併記）。§6既定N_BOOTSTRAP=1000と同一
 
+# p値・CI の内容アドレス型キャッシュ（2026-10-19）。main() が --no-bootstrap-cache でなければ有効化する。
+# 無効時（import して関数だけ使う場合を含む）は素通しで、有効時も結果は無効時と同一
+BOOT_CACHE = bootstrap_cache.BootstrapCache(enabled=False)
+
 # 凍結グリッドの sha256 先頭16桁の登録簿（Codexレビュー⑬M1対応）。
 # 新バッチはここへの追記＝事前登録の一部。実行時に実ファイルのハッシュと照合し、
 # 不一致（=凍結後のグリッド変更）は FATAL 停止する。--grid-override（smoke用）は対象外だが、
@@ -159,6 +165,12 @@ def verify_population_integrity(pops: list[dict]) -> None:
             )
 
 
+def load_batch_rows(ledger_path: Path, batch_id: str) -> list[dict]:
+    """screening_batches.jsonl の当該batch_idの行（台帳順）。全行を読まず batch_id 索引から引く（2026-10-19）。"""
+    return ledger_index.Ledger(ledger_path, keys=ledger_index.KEY_FIELDS["screening_batches.jsonl"]).lookup(
+        "batch_id", batch_id)
+
+
 def check_batch_replay_fatal(ledger_path: Path, batch_id: str) -> None:
     """同一batch_idの行が既にscreening_batches.jsonlに存在すればFATAL（batch_replay_rules）。
 
@@ -168,17 +180,11 @@ def check_batch_replay_fatal(ledger_path: Path, batch_id: str) -> None:
     """
     if not ledger_path.exists():
         return
-    with open(ledger_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            rec = json.loads(line)
-            if rec.get("batch_id") == batch_id:
-                raise SystemExit(
-                    f"FATAL: {ledger_path} に既存の batch_id={batch_id} の行が存在します"
-                    "（batch_replay_rules違反・同一batch_idへの再appendは禁止）。"
-                )
+    if load_batch_rows(ledger_path, batch_id):
+        raise SystemExit(
+            f"FATAL: {ledger_path} に既存の batch_id={batch_id} の行が存在します"
+            "（batch_replay_rules違反・同一batch_idへの再appendは禁止）。"
+        )
 
 
 # --- 特徴量計算（ユニーク(code, signal_date)単位で1回だけ計算し全セル共有） -------------
@@ -247,6 +253,15 @@ def load_population_period_df(pop: dict, period: tuple[str, str]) -> pd.DataFram
 
 
 def compute_null_centered_pvalue(df: pd.DataFrame, n_boot: int, seed: int) -> dict:
+    """帰無中心化 p値（_null_centered_pvalue）。BOOT_CACHE が有効なら同じ入力・seed の結果を再利用する。"""
+    return BOOT_CACHE.get_or_compute(
+        (_null_centered_pvalue,), df, ("month", "ret"),
+        {"n_boot": n_boot, "seed": seed, "cost": ROUND_TRIP_COST},
+        lambda: _null_centered_pvalue(df, n_boot, seed),
+    )
+
+
+def _null_centered_pvalue(df: pd.DataFrame, n_boot: int, seed: int) -> dict:
     """EV_obs = mean(ret) - cost。ret_centered = ret - mean(ret) + cost で中心化した系列に
     月ブロック復元抽出（kpi_event_study.bootstrap_ev_ciと同一方式）を適用し、
     p = (1 + #{EV*_centered >= EV_obs}) / (n_boot + 1) を計算する。
@@ -361,7 +376,7 @@ def score_family(cells: list[dict], n_boot: int, seed: int) -> None:
             continue
         pval_res = compute_null_centered_pvalue(c["df"], n_boot=n_boot, seed=seed)
         c["ev_obs"], c["p"], c["mc_se"] = pval_res["ev_obs"], pval_res["p"], pval_res["mc_se"]
-        lift_res = kpi_event_study.bootstrap_lift_ci(c["df"], c["_base_rate_by_month"], n_boot=LIFT_N_BOOT, seed=SEED_PRIMARY)
+        lift_res = BOOT_CACHE.lift_ci(c["df"], c["_base_rate_by_month"], n_boot=LIFT_N_BOOT, seed=SEED_PRIMARY)
         c["lift_point"], c["lift_ci_low"], c["lift_ci_high"] = (
             lift_res["point_lift"], lift_res["ci_low"], lift_res["ci_high"],
         )
@@ -527,15 +542,7 @@ def load_screen_summary_from_ledger(ledger_path: Path, batch_id: str) -> dict:
     """
     if not ledger_path.exists():
         raise SystemExit(f"FATAL: confirmフェーズ単独実行にはscreening_batches.jsonlが必要です: {ledger_path}")
-    rows = []
-    with open(ledger_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            rec = json.loads(line)
-            if rec.get("batch_id") == batch_id:
-                rows.append(rec)
+    rows = load_batch_rows(ledger_path, batch_id)
     if not rows:
         raise SystemExit(f"FATAL: batch_id={batch_id} の行が {ledger_path} に見つかりません。")
 
@@ -600,8 +607,8 @@ def run_confirm_phase(
 
         if n_confirm > 0:
             pval_res = compute_null_centered_pvalue(cell_df, n_boot=N_BOOT_PRIMARY, seed=SEED_PRIMARY)
-            lift_res = kpi_event_study.bootstrap_lift_ci(cell_df, base_rate_by_month, n_boot=LIFT_N_BOOT, seed=SEED_PRIMARY)
-            ev_ci95 = kpi_event_study.bootstrap_ev_ci(cell_df, n_boot=LIFT_N_BOOT, seed=SEED_PRIMARY)
+            lift_res = BOOT_CACHE.lift_ci(cell_df, base_rate_by_month, n_boot=LIFT_N_BOOT, seed=SEED_PRIMARY)
+            ev_ci95 = BOOT_CACHE.ev_ci(cell_df, n_boot=LIFT_N_BOOT, seed=SEED_PRIMARY)
         else:
             pval_res = {"ev_obs": None, "p": None, "mc_se": None}
             lift_res = {"point_lift": None, "ci_low": None, "ci_high": None}
@@ -660,7 +667,7 @@ def build_confirm_trial_records(
     cell_records = []
     for r in confirm["results"]:
         sens_ci = (
-            kpi_event_study.bootstrap_ev_ci(
+            BOOT_CACHE.ev_ci(
                 # cell_dfは confirm フェーズ内でしか保持していないため、ここでは再計算しない。
                 # 代わりに confirm_ev_ci95 と同じ n_boot=10000/ci_level=ci_level を
                 # run_confirm_phase 側で計算済みの値として渡す設計にできないため、
@@ -868,6 +875,15 @@ def write_report(
 
 
 def compute_v2t_pvalue(df: pd.DataFrame, n_boot: int = V2T_N_BOOT, seed: int = V2T_SEED) -> dict:
+    """v2t の直接ブートストラップ p値（_v2t_pvalue）。BOOT_CACHE が有効なら結果を再利用する。"""
+    return BOOT_CACHE.get_or_compute(
+        (_v2t_pvalue,), df, ("month", "ret"),
+        {"n_boot": n_boot, "seed": seed, "cost": ROUND_TRIP_COST},
+        lambda: _v2t_pvalue(df, n_boot, seed),
+    )
+
+
+def _v2t_pvalue(df: pd.DataFrame, n_boot: int, seed: int) -> dict:
     """grid protocol.bootstrap_spec の直接ブートストラップ片側p値
     （p=(1+#{boot平均EV<=0})/(n_boot+1)・H0: EV<=0）。
 
@@ -981,7 +997,7 @@ def run_v2t_screen(cells: list[dict], cells_dir: Path, base_rate_by_month: dict[
         stats = {**c, "n": n, "months_spanned": months_spanned, "eligible": eligible}
         if eligible:
             pv = compute_v2t_pvalue(df)
-            lift_res = kpi_event_study.bootstrap_lift_ci(df, base_rate_by_month, n_boot=V2T_LIFT_N_BOOT, seed=V2T_LIFT_SEED)
+            lift_res = BOOT_CACHE.lift_ci(df, base_rate_by_month, n_boot=V2T_LIFT_N_BOOT, seed=V2T_LIFT_SEED)
             stats.update(
                 ev_obs=pv["ev_obs"], p=pv["p"],
                 lift_point=lift_res["point_lift"], lift_ci_low=lift_res["ci_low"], lift_ci_high=lift_res["ci_high"],
@@ -1041,8 +1057,8 @@ def run_v2t_confirm(representatives: list[dict], cells_dir: Path, base_rate_by_m
             })
             continue
         pv = compute_v2t_pvalue(df)
-        lift_res = kpi_event_study.bootstrap_lift_ci(df, base_rate_by_month, n_boot=V2T_LIFT_N_BOOT, seed=V2T_LIFT_SEED)
-        ev_ci = kpi_event_study.bootstrap_ev_ci(df)
+        lift_res = BOOT_CACHE.lift_ci(df, base_rate_by_month, n_boot=V2T_LIFT_N_BOOT, seed=V2T_LIFT_SEED)
+        ev_ci = BOOT_CACHE.ev_ci(df)
         passed = bool(
             n >= V2T_CONFIRM_MIN_N
             and alpha is not None and pv["p"] <= alpha
@@ -1080,15 +1096,7 @@ def load_v2t_screen_summary_from_ledger(ledger_path: Path, batch_id: str) -> dic
     代表セル(selected_representative=True)を再構築する。"""
     if not ledger_path.exists():
         raise SystemExit(f"FATAL: confirmフェーズ単独実行にはscreening_batches.jsonlが必要です: {ledger_path}")
-    rows = []
-    with open(ledger_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            rec = json.loads(line)
-            if rec.get("batch_id") == batch_id:
-                rows.append(rec)
+    rows = load_batch_rows(ledger_path, batch_id)
     if len(rows) != 4:
         raise SystemExit(
             f"FATAL: batch_id={batch_id} の行数が4ではありません: {len(rows)}件"
@@ -1350,8 +1358,13 @@ def main() -> int:
     parser.add_argument("--trials-path", default=str(DEFAULT_TRIALS_PATH))
     parser.add_argument("--no-trials-append", action="store_true", help="confirmフェーズのtrials.jsonlへの追記をスキップ（smoke用）")
     parser.add_argument("--v2t-cells-dir", default=None, help="batch_v2t専用: セルCSVディレクトリ（既定はoutput/kpi_screening/batch_v2t/cells）")
+    parser.add_argument("--no-bootstrap-cache", action="store_true",
+                        help="p値・CIのキャッシュ（data/kpi_trials/bootstrap_cache）を使わず全セルを再計算する")
     args = parser.parse_args()
 
+    global BOOT_CACHE
+    BOOT_CACHE = bootstrap_cache.BootstrapCache(enabled=not args.no_bootstrap_cache)
+
     grid_path = Path(args.grid_override) if args.grid_override else Path(args.grid)
     grid = load_grid(grid_path)
     grid_sha = sha256_16(grid_path)
@@ -1360,7 +1373,9 @@ def main() -> int:
     if batch_id == "batch_v2t":
         # v1(population/feature/bucket)とスキーマが全く異なるため独立実装へ完全に分岐する
         # （以下のFROZEN_GRID_HASHES照合・population読込等のv1専用ロジックは一切通らない）。
-        return run_v2t_batch_main(args, grid_path)
+        rc = run_v2t_batch_main(args, grid_path)
+        print(BOOT_CACHE.summary(), file=sys.stderr)
+        return rc
 
     # Codexレビュー⑬M1: 凍結ハッシュ照合と smoke 経路の本番台帳保護
     if args.grid_override:
@@ -1502,6 +1517,7 @@ def main() -> int:
 
     report_path = Path(args.output_dir) / batch_id / "report.md"
     write_report(report_path, grid, grid_sha, screen_summary, confirm_result, trials_meta)
+    print(BOOT_CACHE.summary(), file=sys.stderr)
     print(f"report: {report_path}")
     return 0
 
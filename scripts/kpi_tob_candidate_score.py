@@ -106,6 +106,8 @@ import measure_base_rate as mbr  # noqa: E402  (Canonical Module: カレンダ
 import kpi_pead_signals as kps  # noqa: E402  (Canonical Module: load_fins_day)
 import kpi_uprev_signals as kus  # noqa: E402  (Canonical Module: _parse_numeric・FINS_HISTORY_START_BD)
 import edinet_fetch  # noqa: E402  (Canonical Module: ALL_DOCS_DATA_ROOT・ALL_DOCS_DEFAULT_START)
+import disclosure_index  # noqa: E402  (EDINET documents_all の索引引き)
+import master_index  # noqa: E402  (月次 master の時点索引)
 import kpi_run_evidence as run_evidence  # noqa: E402  (Canonical Module: 純粋util=compute_file_hash/compute_code_tree_hashのみ再利用。
                                           # append_run_log()やKPI_DEPENDENCY_TABLEは一切呼ばない=daily証跡チェーン非結合)
 
@@ -263,19 +265,31 @@ def load_edinet_documents_all(start_bd: str, end_bd: str) -> list[dict]:
 
     欠損営業日があれば明確なFATALで停止する（edinet_fetch.py --dataset documents_all で
     先に取得すること）。<date>.revN.json.gz（退避ファイル）は正本ではないため読まない。
+
+    レコードは disclosure_index（EDINET/TDnet キャッシュの SQLite 索引）から、従来と同じ
+    「日付昇順・ファイル内の順」で受け取る（2026-10-19。全ファイルの gzip 展開+JSON 解析を
+    毎回やり直さない。索引は fetch_log が伸びた時だけ変わったファイルを読み直す）。
+    索引は壊れたファイルを WARN で外して続行するため、ファイルがあっても索引に無い営業日も
+    FATAL にする（読めなかった日の書類を黙って落とし、manifest hash だけ付けて報告しない）。
     """
     calendar_days = mbr.load_calendar_days()
     all_bdays = mbr.all_business_days(calendar_days)
     business_days = [d for d in all_bdays if start_bd <= d <= end_bd]
+    missing = [d for d in business_days
+               if not (edinet_fetch.ALL_DOCS_DATA_ROOT / f"{d}.json.gz").exists()]
     rows: list[dict] = []
-    missing: list[str] = []
-    for d in business_days:
-        path = edinet_fetch.ALL_DOCS_DATA_ROOT / f"{d}.json.gz"
-        if not path.exists():
-            missing.append(d)
-            continue
-        obj = jq_fetch.read_json_gz(path)
-        rows.extend(obj.get("results", []))
+    if not missing:
+        # 凍結仕様の入力なので台帳を信用せずファイル署名を必ず確かめる（変わったファイルだけ読み直す）
+        idx = disclosure_index.open_index(rescan=True)
+        unreadable = sorted(set(business_days) - idx.edinet_files())
+        if unreadable:
+            raise SystemExit(
+                f"FATAL: EDINET documents_all キャッシュ {len(unreadable)}/{len(business_days)} 日分を"
+                f"読めません（例: {unreadable[:3]}。壊れたファイルは索引から外れています）。\n"
+                f"{edinet_fetch.ALL_DOCS_DATA_ROOT} の該当ファイルを削除してから `python3 scripts/edinet_fetch.py "
+                f"--dataset documents_all --start {start_bd} --end {end_bd}` を実行してください。"
+            )
+        rows = idx.edinet_documents(start_bd, end_bd, file_dates=set(business_days))
     if missing:
         raise SystemExit(
             f"FATAL: EDINET documents_all キャッシュが {len(missing)}/{len(business_days)} 日分"
@@ -404,10 +418,17 @@ def build_master_name_index(master_date: str) -> dict[str, tuple[str, ...]]:
     """指定master日のCode+CoNameから 正規化名 -> (Code,...) のインデックスを作る（曖昧判定用）。
 
     同一master snapshot内で複数Codeが同一正規化名になるケース（ambiguous判定用）を含めて
-    全件保持する。mbr.load_master_day自体がlru_cache済み（measure_base_rate.py）なので、
-    本関数の追加cacheは正規化・インデックス構築コストのみを削減する。
+    全件保持する。社名は master_index の時点索引から引く（2026-10-19・月次ファイルを
+    都度解凍しない）。master_date は available_master_dates() の実在日なので、索引の
+    スナップショットと一致しなければ FATAL（黙って別の日の社名を使わない）。
     """
-    master = mbr.load_master_day(master_date)
+    idx = master_index.open_index()
+    if master_date not in idx.snapshots:
+        raise SystemExit(
+            f"FATAL: master {master_date} が時点索引にありません（索引={idx.snapshots[-1] if idx.snapshots else 'なし'}まで）。"
+            f"`python3 scripts/master_index.py update` を実行してください。"
+        )
+    master = idx.snapshot(master_date, fields=["CoName"])
     index: dict[str, list[str]] = defaultdict(list)
     for code, rec in master.items():
         name = rec.get("CoName")
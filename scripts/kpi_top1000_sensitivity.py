@@ -44,6 +44,7 @@ import kpi_event_study  # noqa: E402  (Canonical Module: compute_stats/judge/app
 import kpi_exit_study  # noqa: E402  (Canonical Module: build_price_history/_walk_e1_scenario_break等を再利用)
 import kpi_volshock_v2_amplifiers as v2amp  # noqa: E402  (Canonical Module: compute_quiet_ratio を再利用)
 import measure_base_rate  # noqa: E402  (Canonical Module: カレンダー・bars読込・ROUND_TRIP_COSTを再利用)
+import cross_section  # noqa: E402  (当日 Va の横断面キャッシュ)
 
 BASE_RATE_DIR_TOP1000 = Path("output/base_rate_top1000")
 UNIVERSE_WINDOW = 21
@@ -181,12 +182,19 @@ def load_rank_lookup() -> dict[tuple[str, str], int]:
 
 
 def turnover_quartiles(codes_dates: list[tuple[str, str]]) -> dict:
-    """(signal_date, code)ペアのリストについて、当日売買代金(Va)の中央値・四分位を返す。"""
+    """(signal_date, code)ペアのリストについて、当日売買代金(Va)の中央値・四分位を返す。
+
+    当日 Va は横断面キャッシュ（cross_section）の列から引く。未取込の日だけ bars を直接読む。
+    """
+    store = cross_section.open_store()
     vas = []
     for signal_date, code in codes_dates:
-        rec = measure_base_rate.load_bars_day(signal_date).get(code)
-        if rec is not None and rec.get("Va"):
-            vas.append(rec["Va"])
+        if store.columns(signal_date) is not None:
+            va = store.value(signal_date, code, "va")
+        else:
+            va = (measure_base_rate.load_bars_day(signal_date).get(code) or {}).get("Va")
+        if va:
+            vas.append(va)
     if not vas:
         return {"n": 0, "median": None, "q1": None, "q3": None}
     s = pd.Series(vas)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""追記型 JSONL 台帳の逐次読み・キー索引（行オフセットのサイドカー）。
+
+trials.jsonl・screening_batches.jsonl・resolutions.jsonl・paper_trades/ledger.jsonl などを、
+数行を探すだけの用途でも各スクリプトが全行 json.loads してリストにしていた。台帳の隣に
+行の開始オフセットとキー列（kpi_name・batch_id・status 等）ごとの行番号を持つサイドカーを置き、
+必要な行だけ seek して読む（2026-10-19）。
+
+    data/kpi_trials/.trials.jsonl.idx.json
+      {"version", "keys", "ino", "size", "head", "tail", "offsets": [行頭オフセット...],
+       "by": {キー列: {値: [行番号...]}}}
+
+  - 追記（size が伸び、既知部分の先頭・末尾 4KB のハッシュと inode が同じ）は伸びた分だけ読む。
+    縮んだ・書き換わった（paper_eval.write_ledger_atomic の全件置換など）時は作り直す
+  - 改行で終わっていない末尾（追記中の行）はまだ索引に入れない
+  - 追記側は append()（台帳ファイル自体への fcntl.flock 排他。kpi_event_study.append_trial と
+    同じ規律）で書き、ロックを持ったまま索引も進める。読み側の refresh は共有ロックで伸びた分を読む
+  - 壊れた行は json.JSONDecodeError をそのまま送出する（従来の全件読みと同じ）
+  - サイドカーが書けない場所でもメモリ上の索引で動く
+
+依存は標準ライブラリのみ。
+
+Usage:
+    python3 scripts/ledger_index.py data/kpi_trials/screening_batches.jsonl --lookup batch_id=batch_v4
+    python3 scripts/ledger_index.py data/paper_trades/ledger.jsonl --since 123456
+"""
+from __future__ import annotations
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+INDEX_VERSION = 1
+_PROBE = 4096
+
+# 台帳ファイル名 -> 索引を持つキー列（呼び出し側が keys を渡さない時の既定）
+KEY_FIELDS: dict[str, tuple[str, ...]] = {
+    "trials.jsonl": ("kpi_name", "run_id"),
+    "screening_batches.jsonl": ("batch_id", "kpi_name"),
+    "resolutions.jsonl": ("run_id", "kpi_name"),
+    "ledger.jsonl": ("kpi_name", "status", "signal_date", "code"),
+    "pair_forward_ledger.jsonl": ("event", "pair_id", "code"),
+    "run_log.jsonl": ("run_id", "target_signal_date"),
+}
+
+
+def _value_key(value: Any) -> Optional[str]:
+    """索引に載せる値の表記（文字列はそのまま、他のスカラーは JSON。dict/list は載せない）。"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return None
+    return json.dumps(value)
+
+
+def _digest(f, start: int, end: int) -> str:
+    f.seek(start)
+    return hashlib.sha256(f.read(end - start)).hexdigest()
+
+
+class Ledger:
+    """1本の JSONL 台帳。索引は初回の照会で refresh される。"""
+
+    def __init__(self, path: Path, keys: Optional[Iterable[str]] = None, index_path: Optional[Path] = None):
+        self.path = Path(path)
+        self.keys = tuple(keys) if keys is not None else KEY_FIELDS.get(self.path.name, ())
+        self.index_path = index_path or self.path.with_name(f".{self.path.name}.idx.json")
+        self._index: Optional[dict] = None
+
+    # --- 索引 ---
+
+    def _empty(self) -> dict:
+        return {"version": INDEX_VERSION, "keys": list(self.keys), "ino": None, "size": 0,
+                "head": None, "tail": None, "offsets": [], "by": {k: {} for k in self.keys}}
+
+    def _load(self) -> dict:
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return self._empty()
+        if not isinstance(index, dict) or index.get("version") != INDEX_VERSION or index.get("keys") != list(self.keys):
+            return self._empty()
+        return index
+
+    def _save(self, index: dict) -> None:
+        try:
+            fd, tmp = tempfile.mkstemp(dir=str(self.index_path.parent), prefix=self.index_path.name, suffix=".tmp")
+        except OSError:
+            return  # 書けない場所ではメモリ上の索引だけで動く
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.index_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _still_prefix(self, f, index: dict, st: os.stat_result) -> bool:
+        size = index["size"]
+        if index["ino"] != st.st_ino or st.st_size < size:
+            return False
+        if size == 0:
+            return True
+        return (_digest(f, 0, min(size, _PROBE)) == index["head"]
+                and _digest(f, max(0, size - _PROBE), size) == index["tail"])
+
+    def _scan(self, f, index: dict, size: int) -> int:
+        f.seek(index["size"])
+        pos = index["size"]
+        added = 0
+        offsets, by = index["offsets"], index["by"]
+        for raw in f:
+            if not raw.endswith(b"\n") or pos + len(raw) > size:
+                break  # 追記途中の行
+            if raw.strip():
+                row = json.loads(raw)
+                n = len(offsets)
+                offsets.append(pos)
+                if isinstance(row, dict):
+                    for k in self.keys:
+                        v = _value_key(row.get(k))
+                        if v is not None:
+                            by[k].setdefault(v, []).append(n)
+                added += 1
+            pos += len(raw)
+        index["size"] = pos
+        if pos:
+            index["head"] = _digest(f, 0, min(pos, _PROBE))
+            index["tail"] = _digest(f, max(0, pos - _PROBE), pos)
+        return added
+
+    def refresh(self, lock: bool = True) -> dict[str, int]:
+        """索引を台帳に追いつかせる。lock=False は呼び出し側が既に台帳の排他ロックを持つ時。"""
+        index = self._index or self._load()
+        if not self.path.exists():
+            self._index = self._empty()
+            return {"added": 0, "rebuilt": 0}
+        rebuilt = 0
+        with open(self.path, "rb") as f:
+            if lock:
+                fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+            try:
+                st = os.fstat(f.fileno())
+                if not self._still_prefix(f, index, st):
+                    rebuilt = int(index["ino"] is not None)
+                    index = self._empty()
+                    index["ino"] = st.st_ino
+                before = index["size"]
+                added = self._scan(f, index, st.st_size)
+            finally:
+                if lock:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        self._index = index
+        if added or rebuilt or index["size"] != before or not self.index_path.exists():
+            self._save(index)
+        return {"added": added, "rebuilt": rebuilt}
+
+    def _ready(self) -> dict:
+        if self._index is None:
+            self.refresh()
+        return self._index
+
+    # --- 照会 ---
+
+    def __len__(self) -> int:
+        return len(self._ready()["offsets"])
+
+    @property
+    def end(self) -> int:
+        """索引済みの末尾オフセット（rows_since に渡せば、以後に追記された行だけが返る）。"""
+        return self._ready()["size"]
+
+    def _read_rows(self, numbers: Iterable[int]) -> list[Any]:
+        offsets = self._ready()["offsets"]
+        out = []
+        with open(self.path, "rb") as f:
+            for n in numbers:
+                f.seek(offsets[n])
+                out.append(json.loads(f.readline()))
+        return out
+
+    def lookup(self, field: str, value: Any) -> list[Any]:
+        """field == value の行（台帳の並び順）。field は索引キーであること。"""
+        return self.lookup_any(field, [value])
+
+    def lookup_any(self, field: str, values: Iterable[Any]) -> list[Any]:
+        """field が values のいずれかに一致する行（台帳の並び順）。"""
+        if field not in self.keys:
+            raise KeyError(f"{self.path.name} の索引キーではありません: {field}（keys={self.keys}）")
+        by = self._ready()["by"][field]
+        numbers = sorted({n for v in values for n in by.get(_value_key(v) or "", ())})
+        return self._read_rows(numbers)
+
+    def values(self, field: str) -> list[str]:
+        """field の値の一覧（索引表記・昇順）。"""
+        return sorted(self._ready()["by"][field])
+
+    def rows(self, start: int = 0) -> Iterator[Any]:
+        """オフセット start から末尾まで逐次に読む（索引を使わない。空行は飛ばす）。"""
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            for raw in f:
+                if raw.strip():
+                    yield json.loads(raw)
+
+    def rows_since(self, offset: int) -> tuple[list[Any], int]:
+        """offset（以前の end）より後に追記された行と、新しい end を返す。"""
+        index = self._ready()
+        if offset > index["size"]:
+            offset = 0  # 台帳が作り直された
+        offsets = index["offsets"]
+        lo, hi = 0, len(offsets)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if offsets[mid] < offset:
+                lo = mid + 1
+            else:
+                hi = mid
+        return self._read_rows(range(lo, len(offsets))), index["size"]
+
+
+def append(path: Path, records: Iterable[dict], keys: Optional[Iterable[str]] = None, fsync: bool = False) -> Ledger:
+    """records を台帳へ追記する（台帳ファイルへの fcntl.flock 排他中に索引も進める）。"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ledger = Ledger(path, keys)
+    with open(path, "a", encoding="utf-8") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            for rec in records:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+            ledger.refresh(lock=False)
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    return ledger
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="JSONL 台帳の索引照会")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--lookup", help="キー=値")
+    parser.add_argument("--since", type=int, help="このオフセットより後に追記された行")
+    args = parser.parse_args()
+
+    ledger = Ledger(args.path)
+    stats = ledger.refresh()
+    print(f"rows={len(ledger)} end={ledger.end} added={stats['added']} rebuilt={stats['rebuilt']}", file=sys.stderr)
+    if args.lookup:
+        field, value = args.lookup.split("=", 1)
+        rows = ledger.lookup(field, value)
+    elif args.since is not None:
+        rows, _ = ledger.rows_since(args.since)
+    else:
+        return 0
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""J-Quants 月次 master（data/jquants/master/YYYYMMDD.json.gz）の時点索引（point-in-time）。
+
+master は月末営業日ごとの全件スナップショットで、採点・集計スクリプトがそれぞれ
+glob → 解凍 → Code で辞書化していた（surge_origin_attribution.sector_map_asof・
+influencer_rescore.load_master_index・kpi_tob_candidate_score.build_master_name_index・
+build_daily_reco.code_names・x_trade500_universe）。スナップショットが増えるほど読む量も
+メモリも線形に増えるので、銘柄 × 属性ごとの「値が変わったスナップショット日」だけを持つ
+索引にまとめる（2026-10-19）。
+
+    data/jquants/master_index.json.gz
+      {"version", "snapshots": [YYYYMMDD...], "files": {日付: {size, mtime_ns}},
+       "codes": {Code: {属性: [[有効開始日, 値], ...], "_listed": [[日付, true|false], ...]}}}
+
+  - 値は次の変更点まで有効（社名変更・業種変更・市場区分変更）。スナップショットから消えた
+    銘柄は "_listed" に false を積む（上場廃止。再び現れたら true）
+  - as-of は「date 以前（strict=True なら date より前）で最新のスナップショット」の内容。
+    スナップショットが無い日付は None（最古への繰り上げはしない。必要な呼び出し側が明示する）
+  - 保持量は変更点の数に比例し、スナップショットの本数には比例しない
+  - 末尾への追加（jq_fetch の月末取得）は新しいファイルだけ読む。途中のファイルが
+    変わった・消えた時は作り直す
+
+依存は標準ライブラリのみ。
+
+Usage:
+    python3 scripts/master_index.py update
+    python3 scripts/master_index.py asof 72030 20240115
+    python3 scripts/master_index.py members 20240115 --where ProdCat=011 S33=3700
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import gzip
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Union
+
+sys.path.insert(0, str(Path(__file__).parent))
+import jq_fetch  # noqa: E402  (Canonical Module: DATA_ROOT / read_json_gz)
+
+MASTER_DIR = jq_fetch.DATA_ROOT / "master"
+INDEX_PATH = jq_fetch.DATA_ROOT / "master_index.json.gz"
+INDEX_VERSION = 1
+LISTED = "_listed"
+_CANONICAL_RE = re.compile(r"^(\d{8})\.json\.gz$")
+
+Filter = Union[dict[str, Any], Callable[[dict[str, Any]], bool], None]
+
+
+def master_rows(obj: Any) -> list[dict]:
+    """master ファイルの中身から行リストを取り出す（{"data"}・{"info"}・素の配列のいずれも可）。"""
+    if isinstance(obj, list):
+        return obj
+    return (obj or {}).get("data") or (obj or {}).get("info") or []
+
+
+def master_files(master_dir: Path = MASTER_DIR) -> dict[str, Path]:
+    """正規名（YYYYMMDD.json.gz）の master ファイルを 日付 -> Path で返す（.tmp 等の亜種は除外）。"""
+    out = {}
+    for p in master_dir.glob("*.json.gz") if master_dir.exists() else []:
+        m = _CANONICAL_RE.match(p.name)
+        if m:
+            out[m.group(1)] = p
+    return dict(sorted(out.items()))
+
+
+def _empty_index() -> dict:
+    return {"version": INDEX_VERSION, "snapshots": [], "files": {}, "codes": {}}
+
+
+def load_index(path: Path = INDEX_PATH) -> dict:
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, EOFError, ValueError):
+        return _empty_index()
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return _empty_index()
+    return index
+
+
+def save_index(index: dict, path: Path = INDEX_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+            f.write(json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def apply_snapshot(index: dict, date: str, rows: Iterable[dict]) -> None:
+    """スナップショット1本（index の最新より新しい日付）を変更点として積む。"""
+    codes = index["codes"]
+    seen = set()
+    for rec in rows:
+        code = rec.get("Code")
+        if not code or code in seen:
+            continue
+        seen.add(code)
+        attrs = codes.setdefault(code, {})
+        listed = attrs.setdefault(LISTED, [])
+        if not listed or listed[-1][1] is not True:
+            listed.append([date, True])
+        for key in set(attrs) | set(rec):
+            if key in (LISTED, "Code", "Date"):
+                continue
+            value = rec.get(key)
+            hist = attrs.setdefault(key, [])
+            if not hist or hist[-1][1] != value:
+                hist.append([date, value])
+    for code, attrs in codes.items():
+        if code not in seen and attrs[LISTED][-1][1] is True:
+            attrs[LISTED].append([date, False])
+    index["snapshots"].append(date)
+
+
+def update_index(index: dict, master_dir: Path = MASTER_DIR) -> dict[str, int]:
+    """ディレクトリと突き合わせる。末尾追加だけなら新しいファイルだけ読み、そうでなければ作り直す。"""
+    files = master_files(master_dir)
+    sigs = {}
+    for d, p in files.items():
+        st = p.stat()
+        sigs[d] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    known = index["snapshots"]
+    prefix_ok = (known == list(files)[:len(known)]
+                 and all(index["files"].get(d) == sigs[d] for d in known))
+    rebuilt = 0
+    if not prefix_ok:
+        index.clear()
+        index.update(_empty_index())
+        rebuilt = 1
+    new_dates = [d for d in files if d not in set(index["snapshots"])]
+    for d in new_dates:
+        apply_snapshot(index, d, master_rows(jq_fetch.read_json_gz(files[d])))
+        index["files"][d] = sigs[d]
+    return {"read": len(new_dates), "rebuilt": rebuilt}
+
+
+class MasterIndex:
+    """索引の照会側。属性ごとに (開始日リスト, 値リスト) を持ち bisect で引く。"""
+
+    def __init__(self, index: dict):
+        self.snapshots: list[str] = list(index["snapshots"])
+        self._codes: dict[str, dict[str, tuple[list[str], list[Any]]]] = {
+            code: {k: ([d for d, _ in hist], [v for _, v in hist]) for k, hist in attrs.items()}
+            for code, attrs in index["codes"].items()
+        }
+
+    def snapshot_date(self, date: str, *, strict: bool = False) -> Optional[str]:
+        """date 以前（strict=True なら date より前）で最新のスナップショット日。無ければ None。"""
+        pos = (bisect.bisect_left if strict else bisect.bisect_right)(self.snapshots, date)
+        return self.snapshots[pos - 1] if pos else None
+
+    @staticmethod
+    def _at(hist: tuple[list[str], list[Any]], snap: str) -> Any:
+        pos = bisect.bisect_right(hist[0], snap)
+        return hist[1][pos - 1] if pos else None
+
+    def _record(self, code: str, snap: str, fields: Optional[Iterable[str]] = None) -> Optional[dict]:
+        attrs = self._codes.get(code)
+        if attrs is None or self._at(attrs[LISTED], snap) is not True:
+            return None
+        keys = fields if fields is not None else (k for k in attrs if k != LISTED)
+        rec = {"Code": code}
+        for k in keys:
+            if k != "Code":
+                rec[k] = self._at(attrs[k], snap) if k in attrs else None
+        return rec
+
+    def asof(self, code: str, date: str, *, strict: bool = False,
+             fields: Optional[Iterable[str]] = None) -> Optional[dict]:
+        """date 時点の master 行（スナップショットに無い銘柄・日付なら None）。"""
+        snap = self.snapshot_date(date, strict=strict)
+        return self._record(code, snap, fields) if snap else None
+
+    def snapshot(self, date: str, *, strict: bool = False,
+                 fields: Optional[Iterable[str]] = None) -> dict[str, dict]:
+        """date 時点で掲載されている全銘柄の {Code: 行}（月次ファイルを読んだのと同じ中身）。"""
+        snap = self.snapshot_date(date, strict=strict)
+        if snap is None:
+            return {}
+        fields = list(fields) if fields is not None else None
+        out = {}
+        for code in self._codes:
+            rec = self._record(code, snap, fields)
+            if rec is not None:
+                out[code] = rec
+        return out
+
+    def latest(self, fields: Optional[Iterable[str]] = None) -> dict[str, dict]:
+        """最新スナップショットの {Code: 行}（表示用の社名引きなど）。索引が空なら空 dict。"""
+        return self.snapshot(self.snapshots[-1], fields=fields) if self.snapshots else {}
+
+    def members(self, date: str, where: Filter = None, *, strict: bool = False) -> list[str]:
+        """date 時点で掲載され where（{属性: 値} または 行 -> bool）を満たす Code の昇順リスト。"""
+        if where is None or callable(where):
+            recs = self.snapshot(date, strict=strict)
+            return sorted(c for c, r in recs.items() if where is None or where(r))
+        recs = self.snapshot(date, strict=strict, fields=list(where))
+        return sorted(c for c, r in recs.items() if all(r.get(k) == v for k, v in where.items()))
+
+
+def refresh(index_path: Path = INDEX_PATH, master_dir: Path = MASTER_DIR) -> tuple[MasterIndex, dict[str, int]]:
+    """索引を読み、追加・変更分を反映して保存する（jq_fetch の master 取得後にも呼ぶ）。"""
+    index = load_index(index_path)
+    stats = update_index(index, master_dir)
+    if stats["read"] or stats["rebuilt"]:
+        save_index(index, index_path)
+    return MasterIndex(index), stats
+
+
+_shared: Optional[MasterIndex] = None
+
+
+def open_index() -> MasterIndex:
+    """プロセス内で共有する索引（初回に refresh 済み）。"""
+    global _shared
+    if _shared is None:
+        _shared, _ = refresh()
+    return _shared
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="J-Quants 月次 master の時点索引")
+    parser.add_argument("--index", type=Path, default=INDEX_PATH)
+    parser.add_argument("--master-dir", type=Path, default=MASTER_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("update", help="追加・変更された master を索引に反映")
+    p_asof = sub.add_parser("asof", help="銘柄の時点 master 行")
+    p_asof.add_argument("code")
+    p_asof.add_argument("date", help="YYYYMMDD")
+    p_mem = sub.add_parser("members", help="時点の掲載銘柄")
+    p_mem.add_argument("date", help="YYYYMMDD")
+    p_mem.add_argument("--where", nargs="*", default=[], help="属性=値（複数は AND）")
+    args = parser.parse_args()
+
+    idx, stats = refresh(args.index, args.master_dir)
+    if args.cmd == "update":
+        print(f"snapshots={len(idx.snapshots)} read={stats['read']} rebuilt={stats['rebuilt']} -> {args.index}")
+        return 0
+    if args.cmd == "asof":
+        rec = idx.asof(args.code, args.date)
+        print(json.dumps({"snapshot": idx.snapshot_date(args.date), "record": rec}, ensure_ascii=False))
+        return 0 if rec else 1
+    where = dict(w.split("=", 1) for w in args.where) or None
+    codes = idx.members(args.date, where)
+    print(f"snapshot={idx.snapshot_date(args.date)} n={len(codes)}")
+    for c in codes:
+        print(c)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -637,7 +637,7 @@ def main():
 
     # 3. ティッカー抽出 + 価格取得 + リターン算出
     print("ティッカー抽出・価格取得中...")
-    extractor = TickerExtractor()
+    extractor = TickerExtractor(include_master=True)
     fetcher = PriceFetcher(cache_file=os.path.join(args.output, "price_cache.json"))
 
     recommendations, untrackable = build_recommendations(rec_tweets, extractor, fetcher)
@@ -7,16 +7,53 @@
 3. URLをキーに重複排除（llm_categories がある方を優先）
 4. マージ済みデータの統計を表示
 5. merged_all.json に保存
-6. viewer.html の EMBEDDED_DATA を更新
+6. viewer.html の表示データを月別シャード（output/viewer_data/）に書き出す
+
+増分ビルド（2026-10-19）:
+  毎日のパイプラインで全日付ディレクトリを読み直し、viewer.html に全件を埋め込み直していたため、
+  履歴が伸びるほどビルド時間もページの重さも伸びていた。
+  - output/merged_index.json に「キー → 採用レコード・採用元の日付と位置・キーが現れた日付ごとの
+    初出位置/LLM 分類済みの初出位置」と、日付ディレクトリごとの署名（ファイル名・mtime・サイズ・sha256）
+    を持ち、署名が変わった（追加・更新・削除された）ディレクトリだけを読み直す
+  - merge_tweets の規則（日付昇順・先勝ち・ただし LLM 分類なし→ありは後の方で置き換え）は
+    「LLM 分類済みの初出、無ければ初出」と同値なので、キーごとの日付別の要約から採用元を決め直せる。
+    採用元が変わったディレクトリだけ中身を読む（--verify で全件マージと突き合わせる）
+  - 表示データは posted_at の年月（UTC）ごとのシャード viewer_data/YYYY-MM.js に分け、
+    ページは新しい月から必要な分だけ読み込む。file:// でも読めるよう JSON を1行の JS 呼び出しで包む
+    （fetch は file:// で塞がれる）。中身が変わらない月は書き直さない
+  - --embed で従来どおり viewer.html へ全件を埋め込む
+
+使い方:
+    python3 scripts/merge_all_dates.py            # 増分（初回は全件）
+    python3 scripts/merge_all_dates.py --full     # 索引を捨てて作り直す
+    python3 scripts/merge_all_dates.py --verify   # 増分結果を全件マージと突き合わせる
+    python3 scripts/merge_all_dates.py --embed    # 従来の全件埋め込み
 """
 
+import argparse
+import hashlib
 import json
 import os
 import re
 import sys
+import tempfile
 from collections import defaultdict
 from pathlib import Path
 
+INDEX_VERSION = 1
+INDEX_NAME = "merged_index.json"
+SHARD_DIR_NAME = "viewer_data"
+MANIFEST_NAME = "manifest.js"
+DATE_DIR_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+def source_file_of(dir_path: Path):
+    """日付ディレクトリで読むファイル（classified_llm.json 優先）。無ければ None。"""
+    for name in ("classified_llm.json", "tweets.json"):
+        if (dir_path / name).exists():
+            return dir_path / name
+    return None
+
 
 def load_tweets_from_directory(dir_path: Path) -> list:
     """日付ディレクトリからツイートを読み込む。
@@ -75,8 +112,254 @@ def merge_tweets(all_tweets_by_date: dict) -> list:
     return list(url_to_tweet.values())
 
 
-def print_statistics(all_tweets_by_date: dict, merged: list):
-    """マージ済みデータの統計を表示する。"""
+def tweet_key(tweet: dict) -> str:
+    """merge_tweets と同じ重複排除キー（URL、無ければユーザー名+本文先頭50字）。"""
+    url = tweet.get("url", "")
+    if url:
+        return url
+    return f"{tweet.get('username', '')}_{tweet.get('text', '')[:50]}"
+
+
+# ---------------------------------------------------------------------------
+# 増分マージ索引
+# ---------------------------------------------------------------------------
+
+def _empty_index() -> dict:
+    return {"version": INDEX_VERSION, "dirs": {}, "records": {}}
+
+
+def load_index(index_path: Path) -> dict:
+    """索引を読む。無い・壊れている・版が違う時は空の索引（＝全件読み直し）。"""
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return _empty_index()
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return _empty_index()
+    if not isinstance(index.get("dirs"), dict) or not isinstance(index.get("records"), dict):
+        return _empty_index()
+    return index
+
+
+def _write_atomic(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def save_index(index_path: Path, index: dict):
+    _write_atomic(index_path, json.dumps(index, ensure_ascii=False, separators=(",", ":")))
+
+
+def _sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def changed_directories(output_dir: Path, index: dict) -> dict:
+    """署名が変わった日付ディレクトリ → 新しい署名（消えたディレクトリは None）。
+
+    ファイル名・mtime・サイズが同じなら読まない。どれかが違っても sha256 が同じなら
+    中身は同じとみなして署名だけ更新する（touch・コピーで mtime だけ変わった時）。
+    """
+    changed = {}
+    present = set()
+    for entry in sorted(output_dir.iterdir()):
+        if not (entry.is_dir() and DATE_DIR_RE.match(entry.name)):
+            continue
+        src = source_file_of(entry)
+        if src is None:
+            continue
+        present.add(entry.name)
+        st = src.stat()
+        sig = {"file": src.name, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+        old = index["dirs"].get(entry.name)
+        if old and all(old.get(k) == v for k, v in sig.items()):
+            continue
+        sig["sha256"] = _sha256_file(src)
+        if old and old.get("file") == sig["file"] and old.get("sha256") == sig["sha256"]:
+            old.update(sig)
+            continue
+        changed[entry.name] = sig
+    for date in index["dirs"]:
+        if date not in present:
+            changed[date] = None
+    return changed
+
+
+def _summarize(tweets: list) -> dict:
+    """キー → [初出位置, LLM 分類済みの初出位置 or None]（1ディレクトリ分）。
+
+    URL の無いツイートは merge_tweets と同じく置き換えないので、LLM 側の位置を持たない。
+    """
+    summary = {}
+    for pos, tweet in enumerate(tweets):
+        key = tweet_key(tweet)
+        entry = summary.setdefault(key, [pos, None])
+        if entry[1] is None and tweet.get("url", "") and has_llm_categories(tweet):
+            entry[1] = pos
+    return summary
+
+
+def _winner(seen: dict) -> list:
+    """日付別の要約から採用元 [日付, 位置] を決める（LLM 分類済みの初出、無ければ初出）。"""
+    for date in sorted(seen):
+        if seen[date][1] is not None:
+            return [date, seen[date][1]]
+    first = min(seen)
+    return [first, seen[first][0]]
+
+
+def update_index(output_dir: Path, index: dict, changed: dict) -> dict:
+    """署名が変わったディレクトリだけを読み、影響するキーの採用レコードを決め直す。
+
+    Returns:
+        {"read": 読んだディレクトリ数, "keys": 決め直したキー数}
+    """
+    loaded = {}
+
+    def tweets_of(date: str) -> list:
+        if date not in loaded:
+            loaded[date] = load_tweets_from_directory(output_dir / date)
+        return loaded[date]
+
+    records = index["records"]
+    affected = set()
+    new_summaries = {}
+    for date, sig in sorted(changed.items()):
+        affected.update(index["dirs"].get(date, {}).get("keys", []))
+        if sig is None:
+            index["dirs"].pop(date, None)
+            continue
+        summary = _summarize(tweets_of(date))
+        new_summaries[date] = summary
+        affected.update(summary)
+        index["dirs"][date] = dict(sig, count=len(loaded[date]), keys=list(summary))
+
+    for key in affected:
+        rec = records.get(key)
+        seen = {d: v for d, v in (rec["seen"].items() if rec else ()) if d not in changed}
+        for date, summary in new_summaries.items():
+            if key in summary:
+                seen[date] = summary[key]
+        if not seen:
+            records.pop(key, None)
+            continue
+        win = _winner(seen)
+        if rec is not None and rec["win"] == win and win[0] not in changed:
+            tweet = rec["tweet"]
+        else:
+            # 採用元が変わった時だけ、その日付のディレクトリを読む
+            tweet = tweets_of(win[0])[win[1]]
+        records[key] = {"tweet": tweet, "win": win, "seen": seen}
+    return {"read": len(loaded), "keys": len(affected)}
+
+
+def merged_from_index(index: dict) -> list:
+    """索引から merge_tweets と同じ並び（キーの初出順）のリストを作る。"""
+    def first_seen(item):
+        seen = item[1]["seen"]
+        date = min(seen)
+        return date, seen[date][0]
+
+    return [rec["tweet"] for _, rec in sorted(index["records"].items(), key=first_seen)]
+
+
+# ---------------------------------------------------------------------------
+# viewer の月別シャード
+# ---------------------------------------------------------------------------
+
+def month_of(tweet: dict) -> str:
+    """シャードの単位（posted_at の年月・UTC）。取れなければ "unknown"。"""
+    posted = tweet.get("posted_at") or ""
+    return posted[:7] if re.match(r"\d{4}-\d{2}", posted) else "unknown"
+
+
+def write_viewer_shards(shard_dir: Path, merged: list) -> dict:
+    """merged（新しい順）を月別シャードに書き、manifest を書く。
+
+    中身が同じシャードは書き直さない。無くなった月のシャードは消す。
+
+    Returns:
+        manifest（{"total", "months": [{"month", "file", "count", "sha"}...]}、新しい月が先）
+    """
+    by_month = defaultdict(list)
+    for tweet in merged:
+        by_month[month_of(tweet)].append(tweet)
+
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    months = []
+    written = 0
+    # "unknown"（投稿日時なし）は最後に読む
+    for month in sorted(by_month, key=lambda m: (m != "unknown", m), reverse=True):
+        rows = by_month[month]
+        payload = json.dumps(rows, ensure_ascii=False, separators=(",", ":"))
+        text = f"viewerShardLoaded({json.dumps(month)}, {payload});\n"
+        name = f"{month}.js"
+        path = shard_dir / name
+        if not path.exists() or path.read_text(encoding="utf-8") != text:
+            _write_atomic(path, text)
+            written += 1
+        months.append({
+            "month": month,
+            "file": name,
+            "count": len(rows),
+            "sha": hashlib.sha256(text.encode("utf-8")).hexdigest()[:12],
+        })
+
+    keep = {m["file"] for m in months} | {MANIFEST_NAME}
+    for stale in shard_dir.glob("*.js"):
+        if stale.name not in keep:
+            stale.unlink()
+
+    manifest = {"total": len(merged), "months": months}
+    _write_atomic(shard_dir / MANIFEST_NAME,
+                  "window.VIEWER_MANIFEST = "
+                  + json.dumps(manifest, ensure_ascii=False, indent=1) + ";\n")
+    print(f"\nviewer シャードを更新しました: {shard_dir}（{len(months)} か月・書き直し {written} 件）")
+    return manifest
+
+
+def validate_viewer_shards(shard_dir: Path) -> bool:
+    """manifest と各シャードの JSON が妥当で件数が合うか検証する。"""
+    try:
+        text = (shard_dir / MANIFEST_NAME).read_text(encoding="utf-8")
+        manifest = json.loads(text[text.index("=") + 1:].strip().rstrip(";"))
+        total = 0
+        for m in manifest["months"]:
+            body = (shard_dir / m["file"]).read_text(encoding="utf-8")
+            rows = json.loads(body[body.index(",") + 1:].strip().rstrip(";").rstrip(")"))
+            if len(rows) != m["count"]:
+                print(f"[ERROR] {m['file']}: 件数不一致 {len(rows)} != {m['count']}")
+                return False
+            total += len(rows)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[ERROR] viewer シャードの検証に失敗: {e}")
+        return False
+    if total != manifest["total"]:
+        print(f"[ERROR] シャード合計 {total} != manifest {manifest['total']}")
+        return False
+    print(f"\n[JSON検証] OK - {len(manifest['months'])} か月・{total} 件のツイートデータを確認")
+    return True
+
+
+def print_statistics(raw_counts: dict, merged: list):
+    """マージ済みデータの統計を表示する。
+
+    Args:
+        raw_counts: 日付ディレクトリ → 元件数（増分時は索引に持っている件数）
+    """
     print("\n" + "=" * 60)
     print("統計情報")
     print("=" * 60)
@@ -84,8 +367,7 @@ def print_statistics(all_tweets_by_date: dict, merged: list):
     # 各日付ディレクトリの元件数
     print("\n[各日付ディレクトリの元件数]")
     total_raw = 0
-    for date_dir, tweets in sorted(all_tweets_by_date.items()):
-        count = len(tweets)
+    for date_dir, count in sorted(raw_counts.items()):
         total_raw += count
         print(f"  {date_dir}: {count} 件")
     print(f"  合計（重複含む）: {total_raw} 件")
@@ -135,9 +417,10 @@ def update_viewer_html(viewer_path: Path, merged: list):
     replacement = f"const EMBEDDED_DATA = {json_str};"
 
     pattern = r'const EMBEDDED_DATA\s*=\s*\[.*?\]\s*;'
-    new_html = re.sub(pattern, lambda m: replacement, html_content, flags=re.DOTALL)
+    new_html, count = re.subn(pattern, lambda m: replacement, html_content, count=1, flags=re.DOTALL)
 
-    if new_html == html_content:
+    # シャード運用では毎回 [] を書くので「内容が同じ」は失敗ではない（マッチしない時だけ失敗）
+    if count == 0:
         print("\n[WARNING] EMBEDDED_DATA の置換パターンにマッチしませんでした！")
         return False
 
@@ -169,9 +452,19 @@ def validate_viewer_json(viewer_path: Path) -> bool:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="全日付ディレクトリの収集データを統合して viewer を更新")
+    parser.add_argument("--full", action="store_true", help="索引を捨てて全ディレクトリを読み直す")
+    parser.add_argument("--verify", action="store_true",
+                        help="増分結果を全ディレクトリの merge_tweets と突き合わせる（不一致なら終了コード1）")
+    parser.add_argument("--embed", action="store_true",
+                        help="シャードを使わず viewer.html の EMBEDDED_DATA に全件を埋め込む（従来動作）")
+    args = parser.parse_args()
+
     output_dir = Path(__file__).resolve().parent.parent / "output"
     viewer_path = output_dir / "viewer.html"
     merged_path = output_dir / "merged_all.json"
+    index_path = output_dir / INDEX_NAME
+    shard_dir = output_dir / SHARD_DIR_NAME
 
     if not output_dir.exists():
         print(f"[ERROR] output ディレクトリが見つかりません: {output_dir}")
@@ -181,43 +474,64 @@ def main():
         print(f"[ERROR] viewer.html が見つかりません: {viewer_path}")
         sys.exit(1)
 
-    # 1. 日付ディレクトリを探索してツイートを読み込み
+    # 1. 署名が変わった日付ディレクトリだけを読み込み
     print("=" * 60)
-    print("全日付ディレクトリからツイートを読み込み")
+    print("変更のあった日付ディレクトリからツイートを読み込み")
     print("=" * 60)
 
-    all_tweets_by_date = {}
-    for entry in sorted(output_dir.iterdir()):
-        if entry.is_dir() and re.match(r'\d{4}-\d{2}-\d{2}', entry.name):
-            tweets = load_tweets_from_directory(entry)
-            if tweets:
-                all_tweets_by_date[entry.name] = tweets
+    index = _empty_index() if args.full else load_index(index_path)
+    changed = changed_directories(output_dir, index)
+
+    # 2. マージ（URL重複排除）: 影響するキーだけ採用レコードを決め直す
+    stats = update_index(output_dir, index, changed)
+    print(f"  変更ディレクトリ {len(changed)} 件・読み込み {stats['read']} 件・"
+          f"決め直したキー {stats['keys']} 件")
 
-    if not all_tweets_by_date:
+    if not index["records"]:
         print("[ERROR] ツイートデータが見つかりませんでした")
         sys.exit(1)
 
-    # 2. マージ（URL重複排除）
-    merged = merge_tweets(all_tweets_by_date)
+    merged = merged_from_index(index)
+
+    if args.verify:
+        all_tweets_by_date = {}
+        for date in index["dirs"]:
+            tweets = load_tweets_from_directory(output_dir / date)
+            if tweets:
+                all_tweets_by_date[date] = tweets
+        if merge_tweets(all_tweets_by_date) != merged:
+            print("[ERROR] 増分マージの結果が全件マージと一致しません（--full で作り直してください）")
+            sys.exit(1)
+        print("\n[検証] 増分マージの結果は全件マージと一致")
+
+    save_index(index_path, index)
 
     # 投稿日時でソート（新しい順）
     merged.sort(key=lambda t: t.get("posted_at") or "", reverse=True)
 
     # 3. 統計表示
-    print_statistics(all_tweets_by_date, merged)
+    raw_counts = {d: v["count"] for d, v in index["dirs"].items() if v.get("count")}
+    print_statistics(raw_counts, merged)
 
     # 4. merged_all.json に保存
     with open(merged_path, "w", encoding="utf-8") as f:
         json.dump(merged, ensure_ascii=False, indent=2, fp=f)
     print(f"\nマージ済みデータを保存しました: {merged_path}")
 
-    # 5. viewer.html の EMBEDDED_DATA を更新
-    if not update_viewer_html(viewer_path, merged):
-        sys.exit(1)
+    # 5. viewer の表示データを更新（既定は月別シャード・EMBEDDED_DATA は空にする）
+    if args.embed:
+        if not update_viewer_html(viewer_path, merged):
+            sys.exit(1)
+    else:
+        write_viewer_shards(shard_dir, merged)
+        if not update_viewer_html(viewer_path, []):
+            sys.exit(1)
 
     # 6. JSON妥当性検証
     if not validate_viewer_json(viewer_path):
         sys.exit(1)
+    if not args.embed and not validate_viewer_shards(shard_dir):
+        sys.exit(1)
 
     print("\n完了！")
 
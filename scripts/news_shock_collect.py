@@ -9,25 +9,33 @@
 
 規約:
 - 台帳 data/news_shock/news_log.jsonl は append-only・(series, link) で重複スキップ
+- 既出キーは台帳の索引（*.seen.json）に持ち越し、毎回は台帳の追記分だけを読む。
+  RSS はクエリを並行取得し、ETag / Last-Modified の条件付き GET で変化なし（304）を判定ごと省く
 - 依存は標準ライブラリのみ（ホスト /usr/bin/python3 で動く・Docker 不要）
 - fail-closed: 全クエリ失敗で exit 1・通知失敗は握りつぶさず WARN をログに出す
 
 実行:
     python3 scripts/news_shock_collect.py               # 収集→判定→通知→台帳
     python3 scripts/news_shock_collect.py --dry-run     # 通知しない（台帳には書く）
+    python3 scripts/news_shock_collect.py --workers 1   # RSS を1本ずつ取る（既定は FETCH_WORKERS 本）
     python3 scripts/news_shock_collect.py --selftest    # 判定ロジックの固定テスト
 """
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import os
 import re
 import subprocess
 import sys
+import tempfile
+import urllib.error
 import urllib.parse
 import urllib.request
 import xml.etree.ElementTree as ET
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 APP = Path("/app") if Path("/app/scripts").exists() else Path(__file__).resolve().parent.parent
@@ -39,6 +47,20 @@ LEDGER = APP / "data/news_shock/news_log.jsonl"
 # R2「時計」: 高頻度ポーリング対照レーンの first_seen 台帳（本線と完全分離・
 # tasks/news_shock_preregister.md §7 が指標の正本）
 PROBE_LEDGER = APP / "data/news_shock/first_seen_probe.jsonl"
+# 既出キーの索引と条件付き GET の検証子（レーンごとに別・消えても台帳の全走査と全件取得に戻るだけ）。
+# 検証子を本線と probe で共有すると、片方が読んだ更新に他方が 304 を受けて取りこぼすため分ける
+SEEN_INDEX = APP / "data/news_shock/news_log.seen.json"
+PROBE_SEEN_INDEX = APP / "data/news_shock/first_seen_probe.seen.json"
+FEED_STATE = APP / "data/news_shock/feed_state.json"
+PROBE_FEED_STATE = APP / "data/news_shock/probe_feed_state.json"
+
+RSS_URL = "https://news.google.com/rss/search"
+# RSS の並行取得数（クエリ数は20前後。Google News への同時接続はこの本数まで）
+FETCH_WORKERS = 4
+# 判定して外れた記事を再判定しない期間。when:Nd の窓を抜けた記事は二度と返らないので、
+# 窓より十分長く持てば足りる（config が変われば期間によらず全件を判定し直す）
+MISS_TTL_DAYS = 14
+SEEN_INDEX_VERSION = 1
 
 _TAG = re.compile(r"<[^>]+>")
 
@@ -156,8 +178,12 @@ def event_id_of(series_ids: list[str], family: str, pubdate: str, run_at: str,
     return hashlib.sha256(raw.encode()).hexdigest()[:12]
 
 
-def fetch_rss(qe: dict, cfg: dict) -> list[dict]:
-    """1クエリ分の RSS を取得して item の (title, link, desc, pubdate) を返す。
+class NotModified(Exception):
+    """条件付き GET に 304 が返った（前回取得した RSS から変わっていない）。"""
+
+
+def feed_url(qe: dict, cfg: dict) -> str:
+    """1クエリ分の RSS の URL。
 
     v2: 検索の OR 句は cfg['search_or_phrases'] から合成（v1 のコード直書きは
     「凍結した語彙が取得母集団に効かない」バグだった・第3R A3対応）。
@@ -170,12 +196,14 @@ def fetch_rss(qe: dict, cfg: dict) -> list[dict]:
     else:
         subject = qe["term"]
     q = f"{subject} ({or_block}) when:{collect.get('when_days', 2)}d"
-    url = ("https://news.google.com/rss/search?q=" + urllib.parse.quote(q)
-           + f"&hl={collect.get('hl','en-US')}&gl={collect.get('gl','US')}"
-           + f"&ceid={urllib.parse.quote(collect.get('ceid','US:en'))}")
-    req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-    with urllib.request.urlopen(req, timeout=collect.get("timeout_sec", 20)) as res:
-        root = ET.fromstring(res.read())
+    return (RSS_URL + "?q=" + urllib.parse.quote(q)
+            + f"&hl={collect.get('hl','en-US')}&gl={collect.get('gl','US')}"
+            + f"&ceid={urllib.parse.quote(collect.get('ceid','US:en'))}")
+
+
+def parse_rss(body: bytes) -> list[dict]:
+    """RSS 本文から item の (title, link, desc, pubdate) を返す。"""
+    root = ET.fromstring(body)
     items = []
     for it in root.iter("item"):
         title = (it.findtext("title") or "").strip()
@@ -185,22 +213,216 @@ def fetch_rss(qe: dict, cfg: dict) -> list[dict]:
     return items
 
 
+def fetch_feed(qe: dict, cfg: dict, validators: dict | None = None) -> tuple[list[dict], dict]:
+    """1クエリ分の RSS を取得して (items, 今回の検証子 {url, etag, last_modified}) を返す。
+
+    validators が同じ URL の前回分なら If-None-Match / If-Modified-Since を付けて送り、
+    304 なら NotModified を投げる（本文を受け取らず判定も省ける）。
+    """
+    url = feed_url(qe, cfg)
+    headers = {"User-Agent": "Mozilla/5.0"}
+    if validators and validators.get("url") == url:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=cfg.get("collect", {}).get("timeout_sec", 20)) as res:
+            body = res.read()
+            etag, last_modified = res.headers.get("ETag", ""), res.headers.get("Last-Modified", "")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            raise NotModified(url) from None
+        raise
+    return parse_rss(body), {"url": url, "etag": etag or "", "last_modified": last_modified or ""}
+
+
+def fetch_rss(qe: dict, cfg: dict) -> list[dict]:
+    """1クエリ分の RSS を取得して item の (title, link, desc, pubdate) を返す（条件付き GET なし）。"""
+    return fetch_feed(qe, cfg)[0]
+
+
+def query_term(qe: dict) -> str:
+    """台帳の term（商品クエリ=商品名／施設クエリ=施設グループ名）。"""
+    return qe.get("term") or qe["facility_group"]
+
+
+class FeedState:
+    """クエリごとの条件付き GET の検証子と前回の取得件数（path に保存して次回へ持ち越す）。
+
+    config_sha が変わったら検証子を捨てる: 検索式が同じでも凍結語彙が変われば、
+    前回と同じ記事を新しい語彙で判定し直す必要があるため。
+    """
+
+    def __init__(self, path: Path | None, config_sha: str = ""):
+        self.path, self.config_sha = path, config_sha
+        self.feeds: dict[str, dict] = {}
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("config_sha") == config_sha:
+                    self.feeds = dict(data.get("feeds") or {})
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"WARN: feed_state を読めません（検証子なしで続行）: {e}", file=sys.stderr)
+
+    def validators_for(self, term: str) -> dict | None:
+        return self.feeds.get(term)
+
+    def remember(self, term: str, validators: dict, n_items: int) -> None:
+        self.feeds[term] = {**validators, "items": n_items}
+
+    def items(self, term: str) -> int | None:
+        return (self.feeds.get(term) or {}).get("items")
+
+    def save(self) -> None:
+        if self.path is not None:
+            _atomic_write_json(self.path, {"config_sha": self.config_sha, "feeds": self.feeds})
+
+
+def fetch_feeds(queries: list[dict], cfg: dict, state: FeedState,
+                workers: int = FETCH_WORKERS) -> list[tuple[list[dict] | None, dict | None, Exception | None]]:
+    """全クエリの RSS を workers 本で並行に取り、queries の順で (items, 検証子, 例外) を返す。
+
+    304 は (None, None, None)・失敗は (None, None, 例外)。台帳への書き込みと判定は呼び出し側が
+    クエリ順に1スレッドで行う（台帳の行順は逐次取得の時と同じ）。state は読むだけで、
+    検証子の更新は台帳を書き終えてから呼び出し側が remember する。
+    """
+    def one(qe: dict):
+        try:
+            items, validators = fetch_feed(qe, cfg, state.validators_for(query_term(qe)))
+            return items, validators, None
+        except NotModified:
+            return None, None, None
+        except Exception as e:                         # 1クエリの失敗で他を止めない（fail-closed は呼び出し側）
+            return None, None, e
+
+    if not queries:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(queries)))) as ex:
+        return list(ex.map(one, queries))
+
+
+def _atomic_write_json(path: Path, obj: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _ingest_line(line: str, seen: set, seen_events: set, key=lambda t, l: (t, l)) -> None:
+    if not line.strip():
+        return
+    try:
+        r = json.loads(line)
+    except json.JSONDecodeError:
+        return
+    seen.add(key(r.get("term", ""), r.get("link", "")))
+    if r.get("event_id"):
+        seen_events.add(r["event_id"])
+
+
 def load_seen(path: Path = LEDGER) -> tuple[set[tuple[str, str]], set[str]]:
     """既出の (term, link) と event_id を台帳から読む（後者は通知の重複抑止用）。"""
     seen, seen_events = set(), set()
     if path.exists():
         for line in path.read_text(encoding="utf-8").splitlines():
-            if line.strip():
-                try:
-                    r = json.loads(line)
-                    seen.add((r.get("term", ""), r.get("link", "")))
-                    if r.get("event_id"):
-                        seen_events.add(r["event_id"])
-                except json.JSONDecodeError:
-                    continue
+            _ingest_line(line, seen, seen_events)
     return seen, seen_events
 
 
+def _seen_key(term: str, link: str) -> str:
+    return hashlib.sha1(f"{term}\x1f{link}".encode()).hexdigest()[:16]
+
+
+class SeenIndex:
+    """台帳の既出 (term, link)・event_id と、判定して外れた記事の索引。
+
+    load_seen と同じ集合を、台帳を毎回全走査せずに持つ。索引は台帳のどこまでを読んだか
+    （offset と直前バイトの指紋）を覚えていて、開く時と save の時に追記分だけを読み足す。
+    台帳が縮んだ・書き換わった（指紋不一致）なら全走査で作り直す。台帳が正本で索引は
+    捨ててよい控え。外れ記事は config_sha ごと（語彙が変われば全件を判定し直す）・
+    MISS_TTL_DAYS 見なければ忘れる。
+    """
+
+    def __init__(self, ledger: Path, path: Path | None, config_sha: str = ""):
+        self.ledger, self.path, self.config_sha = ledger, path, config_sha
+        self.keys: set[str] = set()
+        self.events: set[str] = set()
+        self.misses: dict[str, str] = {}
+        self.offset = 0
+        self.rebuilt = True
+        data = {}
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                print(f"WARN: 既出索引を読めません（台帳から作り直し）: {e}", file=sys.stderr)
+        if (data.get("version") == SEEN_INDEX_VERSION
+                and data.get("tail_sha") == self._tail_sha(data.get("offset", -1))):
+            self.keys = set(data.get("keys") or [])
+            self.events = set(data.get("events") or [])
+            self.offset = data["offset"]
+            self.rebuilt = False
+            if data.get("config_sha") == config_sha:
+                self.misses = dict(data.get("misses") or {})
+        self._catch_up()
+
+    def _tail_sha(self, offset: int) -> str | None:
+        """台帳の offset 直前 256 バイトの指紋（offset が台帳の外なら None）。"""
+        if offset < 0 or not self.ledger.exists() or offset > self.ledger.stat().st_size:
+            return None
+        with self.ledger.open("rb") as f:
+            f.seek(max(0, offset - 256))
+            return hashlib.sha1(f.read(min(offset, 256))).hexdigest()[:16]
+
+    def _catch_up(self) -> None:
+        """offset 以降の追記分だけを読み足す。"""
+        if not self.ledger.exists():
+            return
+        with self.ledger.open("rb") as f:
+            f.seek(self.offset)
+            tail = f.read()
+        for line in tail.decode("utf-8", errors="replace").splitlines():
+            _ingest_line(line, self.keys, self.events, _seen_key)
+        self.offset += len(tail)
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return _seen_key(*key) in self.keys
+
+    def add(self, term: str, link: str) -> None:
+        self.keys.add(_seen_key(term, link))
+
+    def has_event(self, event_id: str) -> bool:
+        return event_id in self.events
+
+    def add_event(self, event_id: str) -> None:
+        self.events.add(event_id)
+
+    def judged(self, term: str, link: str) -> bool:
+        """この config で判定済みの外れ記事か。"""
+        return _seen_key(term, link) in self.misses
+
+    def mark_judged(self, term: str, link: str, day: str) -> None:
+        self.misses[_seen_key(term, link)] = day
+
+    def save(self, today: str) -> None:
+        """台帳の追記分を読み足し、古い外れ記事を忘れて保存する（台帳を閉じた後に呼ぶ）。"""
+        self._catch_up()
+        floor = (datetime.strptime(today, "%Y-%m-%d") - timedelta(days=MISS_TTL_DAYS)).strftime("%Y-%m-%d")
+        self.misses = {k: d for k, d in self.misses.items() if d >= floor}
+        if self.path is not None:
+            _atomic_write_json(self.path, {
+                "version": SEEN_INDEX_VERSION, "offset": self.offset,
+                "tail_sha": self._tail_sha(self.offset), "config_sha": self.config_sha,
+                "keys": sorted(self.keys), "events": sorted(self.events), "misses": self.misses})
+
+
 def notify(title: str, body: str) -> None:
     """macOS 通知。失敗は握りつぶさず WARN を出す（launchd ログに残る）。
 
@@ -342,11 +564,12 @@ def _selftest() -> int:
     return ng
 
 
-def run_probe() -> int:
+def run_probe(workers: int = FETCH_WORKERS) -> int:
     """R2時計の対照レーン: 同一クエリ・同一判定で first_seen だけを高頻度記録する。
 
     本線との違い（凍結・プレレジ§7）: 通知なし・受益引き当てなし・本線台帳に書かない。
     重複キーは (term, link)＝この台帳内で最初に見えた時刻だけが残る。
+    既出索引と検証子も本線とは別ファイル（PROBE_SEEN_INDEX / PROBE_FEED_STATE）。
     """
     import fcntl
     PROBE_LEDGER.parent.mkdir(parents=True, exist_ok=True)
@@ -360,31 +583,39 @@ def run_probe() -> int:
     vocab = cfg["vocab"]
     families = cfg.get("vocab_families", {})
     cfg_sha = __import__("hashlib").sha256(CONFIG.read_bytes()).hexdigest()[:12]
-    seen, _ = load_seen(PROBE_LEDGER)
+    seen = SeenIndex(PROBE_LEDGER, PROBE_SEEN_INDEX, cfg_sha)
+    feeds = FeedState(PROBE_FEED_STATE, cfg_sha)
     run_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
     n_new, n_err = 0, 0
-    items_per_term = {}
+    items_per_term, not_modified = {}, []
+    results = fetch_feeds(cfg["queries"], cfg, feeds, workers)
     with PROBE_LEDGER.open("a", encoding="utf-8") as fh:
-        for qe in cfg["queries"]:
-            term = qe.get("term") or qe["facility_group"]
+        for qe, (items, validators, err) in zip(cfg["queries"], results):
+            term = query_term(qe)
             terms = ([qe["term"]] if qe.get("term")
                      else [x.strip('"') for x in qe["or_terms"]])
-            try:
-                items = fetch_rss(qe, cfg)
-                items_per_term[term] = len(items)
-            except Exception as e:
+            if err is not None:
                 n_err += 1
                 fh.write(json.dumps({"first_seen_at": run_at, "term": term,
-                                     "status": "error", "error": str(e)[:200]},
+                                     "status": "error", "error": str(err)[:200]},
                                     ensure_ascii=False) + "\n")
                 continue
+            if items is None:                          # 304: 前回から変化なし＝新規記事なし
+                items_per_term[term] = feeds.items(term)
+                not_modified.append(term)
+                continue
+            items_per_term[term] = len(items)
+            feeds.remember(term, validators, len(items))
             for it in items:
+                if (term, it["link"]) in seen or seen.judged(term, it["link"]):
+                    continue
                 j = judge(f"{it['title']} {it['desc']}", terms, vocab,
                           terms_are_facilities=bool(qe.get("or_terms")))
-                if not j or (term, it["link"]) in seen:
+                if not j:
+                    seen.mark_judged(term, it["link"], run_at[:10])
                     continue
                 hit_term, v = j
-                seen.add((term, it["link"]))
+                seen.add(term, it["link"])
                 fam = vocab_family(v, families)
                 subject = hit_term if qe.get("or_terms") else ""
                 eid = event_id_of(qe["series_ids"], fam, it["pubdate"], run_at, subject)
@@ -398,9 +629,13 @@ def run_probe() -> int:
                 n_new += 1
         fh.write(json.dumps({"type": "run_summary", "run_at": run_at, "hit": n_new,
                              "ok": len(cfg["queries"]) - n_err, "error": n_err,
-                             "items": items_per_term, "config_version": cfg.get("version"),
+                             "items": items_per_term, "not_modified": not_modified,
+                             "config_version": cfg.get("version"),
                              "config_sha": cfg_sha}, ensure_ascii=False) + "\n")
-    print(f"[probe] first_seen 新規 {n_new} 件 / error {n_err}/{len(cfg['queries'])}")
+    seen.save(run_at[:10])
+    feeds.save()
+    print(f"[probe] first_seen 新規 {n_new} 件 / 変化なし {len(not_modified)} / "
+          f"error {n_err}/{len(cfg['queries'])}")
     return 1 if n_err > 3 else 0
 
 
@@ -410,13 +645,14 @@ def main() -> int:
     ap.add_argument("--dry-run", action="store_true", help="通知を出さない")
     ap.add_argument("--first-seen-probe", action="store_true",
                     help="R2時計: first_seen 記録だけの対照モード（通知・受益引き当て・本線台帳なし）")
+    ap.add_argument("--workers", type=int, default=FETCH_WORKERS, help="RSS の並行取得数")
     args = ap.parse_args()
     if args.selftest:
         ng = _selftest()
         print("OK: 全通過" if not ng else f"NG: {ng}件失敗")
         return 1 if ng else 0
     if args.first_seen_probe:
-        return run_probe()
+        return run_probe(args.workers)
 
     # 多重起動ロック（launchd と手動実行の重複で同じ行を二重追記しないため・Codex指摘）
     import fcntl
@@ -432,38 +668,49 @@ def main() -> int:
     vocab = cfg["vocab"]
     families = cfg.get("vocab_families", {})
     cfg_sha = __import__("hashlib").sha256(CONFIG.read_bytes()).hexdigest()[:12]
-    seen, seen_events = load_seen()
+    seen = SeenIndex(LEDGER, SEEN_INDEX, cfg_sha)
+    feeds = FeedState(FEED_STATE, cfg_sha)
     run_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
     n_hit, n_err = 0, 0
     items_per_term = {}    # recall のサイレント崩壊検知用（敵対R3 A10: 0件返答と事象なしを区別）
+    not_modified = []      # 304 のクエリ（items には前回の取得件数を入れる＝0件返答と区別する）
     hits_for_notify = []
+    # 取得だけ並行・判定と台帳への追記はクエリ順に逐次（行順は逐次取得の時と同じ）
+    results = fetch_feeds(cfg["queries"], cfg, feeds, args.workers)
     with LEDGER.open("a", encoding="utf-8") as fh:
-        for qe in cfg["queries"]:
-            term = qe.get("term") or qe["facility_group"]
+        for qe, (items, validators, err) in zip(cfg["queries"], results):
+            term = query_term(qe)
             # 判定対象語: 商品クエリ=商品名／施設クエリ=施設名群（引用符を剥がす）
             terms = ([qe["term"]] if qe.get("term")
                      else [x.strip('"') for x in qe["or_terms"]])
-            try:
-                items = fetch_rss(qe, cfg)
-                items_per_term[term] = len(items)
-            except Exception as e:                     # fail-closed: エラーは台帳に残す
+            if err is not None:                        # fail-closed: エラーは台帳に残す
                 n_err += 1
                 fh.write(json.dumps({"run_at": run_at, "term": term, "status": "error",
-                                     "error": str(e)[:200]}, ensure_ascii=False) + "\n")
-                print(f"[{term}] ERROR {e}", file=sys.stderr)
+                                     "error": str(err)[:200]}, ensure_ascii=False) + "\n")
+                print(f"[{term}] ERROR {err}", file=sys.stderr)
+                continue
+            if items is None:                          # 304: 前回から変化なし＝新規記事なし
+                items_per_term[term] = feeds.items(term)
+                not_modified.append(term)
                 continue
+            items_per_term[term] = len(items)
+            feeds.remember(term, validators, len(items))
             for it in items:
+                # 判定は新規記事だけ: 既出（台帳にある）と、この config で判定済みの外れは飛ばす
+                if (term, it["link"]) in seen or seen.judged(term, it["link"]):
+                    continue
                 j = judge(f"{it['title']} {it['desc']}", terms, vocab,
                           terms_are_facilities=bool(qe.get("or_terms")))
-                if not j or (term, it["link"]) in seen:
+                if not j:
+                    seen.mark_judged(term, it["link"], run_at[:10])
                     continue
                 hit_term, v = j
-                seen.add((term, it["link"]))
+                seen.add(term, it["link"])
                 fam = vocab_family(v, families)
                 subject = hit_term if qe.get("or_terms") else ""
                 eid = event_id_of(qe["series_ids"], fam, it["pubdate"], run_at, subject)
-                dup = eid in seen_events
-                seen_events.add(eid)
+                dup = seen.has_event(eid)
+                seen.add_event(eid)
                 bens = beneficiaries_of(qe["series_ids"])
                 # 版とconfig指紋を発火行へ焼き込む（語彙変更後も母集団を分離再現できる・Codex指摘）
                 rec = {"run_at": run_at, "term": term, "matched_term": hit_term,
@@ -487,14 +734,17 @@ def main() -> int:
         # 「Google 側の recall 崩壊」を疑う（敵対R3 A10）
         fh.write(json.dumps({"type": "run_summary", "run_at": run_at, "hit": n_hit,
                              "ok": len(cfg["queries"]) - n_err, "error": n_err,
-                             "items": items_per_term,
+                             "items": items_per_term, "not_modified": not_modified,
                              "config_version": cfg.get("version"), "config_sha": cfg_sha},
                             ensure_ascii=False) + "\n")
+    # 台帳を閉じてから索引と検証子を保存（途中で落ちても次回は台帳の追記分から読み足す）
+    seen.save(run_at[:10])
+    feeds.save()
     # 通知件数=ユニーク事象数（発火行数 n_hit ではない・Codex v2審 W2）。0件なら通知しない
     if hits_for_notify and not args.dry_run:
         notify(f"🛑 供給ショック検知: {len(hits_for_notify)}事象",
                " / ".join(hits_for_notify)[:200])
-    print(f"[done] hit={n_hit} error={n_err}/{len(cfg['queries'])}クエリ")
+    print(f"[done] hit={n_hit} not_modified={len(not_modified)} error={n_err}/{len(cfg['queries'])}クエリ")
     # 部分障害ゲート: 4クエリ以上失敗（ok<15/18）で異常終了→runner が失敗通知（Codex指摘）
     if n_err > 3:
         print(f"ERROR: 失敗クエリ {n_err}件（許容3）", file=sys.stderr)
@@ -8,6 +8,8 @@ requests で取得し、data/price_watch/universe_weekly.jsonl へ append。閾
 - 取得失敗(status=error)と値ゼロを混ぜない。全滅時のみ exit 1
 - TE は存在しないスラッグでも 200 を返すため、行スコープ + ラベル一致で実在判定
 - 前回値から±50%超の跳びは suspect（サイト構造変化の疑い）としてアラート対象外
+- 取得はホスト単位で並行・ホスト内は直列＋間隔（run_fetch_plan）。同一URLは1回だけ取り、
+  系列ごとの取得ミリ秒を台帳の fetch_ms / fetch_host に残す
 - 週次実行（手動）: docker compose run --rm xstock python scripts/price_universe_check.py
 
 出典設計: docs/price-watch-universe.md「実装注意」節・2026-07-28 実測（copper 6.35 等）。
@@ -17,9 +19,12 @@ from __future__ import annotations
 import json
 import re
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from urllib.parse import quote
+from urllib.parse import quote, urlsplit
 
 import requests
 
@@ -38,9 +43,85 @@ def strip_tags(html: str) -> str:
     return TAG_RE.sub(" ", html)
 
 
+# ---- 取得プランナ（2026-10-19）------------------------------------------------------
+# 月曜の週次実行は約60系列を1本ずつ直列に取っていたため、遅いホスト1つ（60秒タイムアウト）が
+# 全体を待たせていた。系列をホスト単位にまとめ、ホスト間は並行・ホスト内は直列＋間隔を守る。
+# 同一URLは1回の実行で1回だけ取る（TE一覧・FMBI で手でやっていた使い回しの一般化）。
+# パース・判定は従来どおり main の直列ループで行う（前倒しするのは取得だけ）。
+HOST_DELAY_SEC = 1.0   # 同一ホストへの連続リクエスト間隔（礼儀・並行化しても1ホストへの頻度は上げない）
+FETCH_WORKERS = 8      # 同時に走らせるホスト数の上限
+
+# series type → 取得先ホスト（グループ化のキー）。同じホストの type は同じ列に並ぶ
+# （boj と boj_bulk は同一ホスト＝直列。monthly_sources の一括キャッシュもこれで競合しない）
+SERIES_HOST = {
+    "te": "tradingeconomics.com",
+    "spread": "api.frankfurter.dev",   # TE 一覧は取得済みを使う。個別に取るのは FX だけ
+    "scfi": "en.sse.net.cn",
+    "jepx": "www.jepx.jp",
+    "fmbi": "www.furuyametals.co.jp",
+    "boj": "www.stat-search.boj.or.jp",
+    "boj_bulk": "www.stat-search.boj.or.jp",
+    "tokyosteel": "www.tokyosteel.co.jp",
+    "usda_ndpsr": "mpr.datamart.ams.usda.gov",
+    "tanaka": "gold.tanaka.co.jp",
+    "dramexchange": "www.dramexchange.com",
+    "uss": "www.ussnet.co.jp",
+    "yuyutei": "yuyu-tei.jp",
+    "jmtba": "www.jmtba.or.jp",
+    "seaj": "www.seaj.or.jp",
+    "jama": "jamaserv.jama.or.jp",
+    "miki": "www.e-miki.com",
+    "tamago": "www.jz-tamago.co.jp",
+    "rice": "www.maff.go.jp",
+    "jnto": "www.jnto.go.jp",
+    "estat_asp": "www.e-stat.go.jp",
+}
+
+_resp_cache: dict[str, requests.Response] = {}
+_host_locks: dict[str, threading.Lock] = {}
+_host_last: dict[str, float] = {}
+_state_lock = threading.Lock()
+
+
+def _reset_fetch_state() -> None:
+    """URLキャッシュとホスト間隔の記録を捨てる（1回の実行の先頭で呼ぶ）。"""
+    with _state_lock:
+        _resp_cache.clear()
+        _host_locks.clear()
+        _host_last.clear()
+
+
+def get(url: str, timeout: int = 30) -> requests.Response:
+    """同一実行内で同じURLを2回取りに行かない GET（ホスト単位で直列・HOST_DELAY_SEC 間隔）。
+
+    失敗（例外・HTTPエラー）はキャッシュしない＝別系列からの再取得は普通に試みる。
+    """
+    host = urlsplit(url).netloc
+    with _state_lock:
+        hit = _resp_cache.get(url)
+        lock = _host_locks.setdefault(host, threading.Lock())
+    if hit is not None:
+        return hit
+    with lock:
+        # ロック待ちの間に同じURLを別スレッドが取り終えていることがある
+        hit = _resp_cache.get(url)
+        if hit is not None:
+            return hit
+        wait = _host_last.get(host, 0.0) + HOST_DELAY_SEC - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            resp = requests.get(url, headers={"User-Agent": UA}, timeout=timeout)
+        finally:
+            _host_last[host] = time.monotonic()
+        resp.raise_for_status()
+        with _state_lock:
+            _resp_cache[url] = resp
+    return resp
+
+
 def fetch(url: str) -> str:
-    resp = requests.get(url, headers={"User-Agent": UA}, timeout=30)
-    resp.raise_for_status()
+    resp = get(url)
     if resp.encoding in (None, "ISO-8859-1"):
         resp.encoding = resp.apparent_encoding
     return resp.text
@@ -274,9 +355,7 @@ def parse_jepx(today: str) -> dict | None:
     daily: dict[str, list[float]] = {}
     for y in (fy, fy - 1):
         try:
-            raw = requests.get(f"https://www.jepx.jp/market/excel/spot_{y}.csv",
-                               headers={"User-Agent": UA}, timeout=60)
-            raw.raise_for_status()
+            raw = get(f"https://www.jepx.jp/market/excel/spot_{y}.csv", timeout=60)
         except Exception:  # noqa: BLE001  前年度分は存在しない/不要なこともある
             if y == fy:
                 raise
@@ -387,9 +466,8 @@ def parse_spread(index_html: str, s: dict) -> dict | None:
     if not num or not den or num.get("value") is None or den.get("value") is None:
         return None
     try:
-        fx = requests.get("https://api.frankfurter.dev/v1/latest?base=USD&symbols=CNY",
-                          headers={"User-Agent": UA}, timeout=30)
-        fx.raise_for_status()
+        # 3本のスプレッドで同じ FX を使う（get のURLキャッシュで1回だけ取る）
+        fx = get("https://api.frankfurter.dev/v1/latest?base=USD&symbols=CNY")
         usdcny = float(fx.json()["rates"]["CNY"])
     except Exception:  # noqa: BLE001  FXが取れなければ通貨換算できない＝値を捏造しない
         return None
@@ -625,6 +703,98 @@ def pass_through_cards(series: dict) -> list:
     return out
 
 
+def series_host(s: dict) -> str:
+    """系列の取得先ホスト（取得プランのグループキー）。未知の type は type 名をそのままキーにする。"""
+    return SERIES_HOST.get(s["type"], s["type"])
+
+
+def fetch_series(s: dict, te_index_html: str | None, today: str) -> dict | None:
+    """系列1本を取得してパースする（type → 取得先の明示対応）。失敗は例外のまま返す。"""
+    if s["type"] == "te":
+        parsed = parse_te(te_index_html, s["slug"], s["label"]) if te_index_html else None
+        if parsed is None:
+            parsed = parse_te(fetch(f"https://tradingeconomics.com/commodity/{s['slug']}"),
+                              s["slug"], s["label"])
+        return parsed
+    if s["type"] == "scfi":
+        return parse_scfi(json.loads(fetch("https://en.sse.net.cn/currentIndex?indexName=scfi")))
+    if s["type"] == "jepx":
+        return parse_jepx(today)
+    if s["type"] == "spread":
+        return parse_spread(te_index_html, s)
+    if s["type"] == "fmbi":
+        # Ir/Ru は同一エンドポイント＝get のURLキャッシュで1回だけ取って使い回す
+        return parse_fmbi(json.loads(fetch(FMBI_URL)), s["metal"], s.get("currency", "JPY"))
+    if s["type"] == "boj":
+        resp = get(f"https://www.stat-search.boj.or.jp/ssi/mtshtml/{s['page']}.html", timeout=60)
+        return parse_boj(resp.content.decode("shift_jis", errors="replace"), s["data_code"])
+    if s["type"] == "tokyosteel":
+        # 国内実勢（東京製鐵の自社公表建値）。PDFを解析するため別モジュールに分離。
+        # 標準ライブラリのみで動くので requests 依存とは独立
+        import tokyosteel_scrap
+        return tokyosteel_scrap.fetch_tokyosteel_scrap(today)
+    if s["type"] == "usda_ndpsr":
+        # 公的統計（認証不要）。レポート内の節をパスで指定する（クエリ指定は無視される実測）
+        return parse_usda_ndpsr(
+            json.loads(fetch("https://mpr.datamart.ams.usda.gov/services/v1.1/reports/"
+                             f"{s['report']}/{quote(s['section'])}")),
+            s["price_key"])
+    if s["type"] == "tanaka":
+        return parse_tanaka(fetch("https://gold.tanaka.co.jp/commodity/souba/"))
+    if s["type"] == "dramexchange":
+        return parse_dramexchange(fetch("https://www.dramexchange.com/"))
+    if s["type"] == "uss":
+        return parse_uss(fetch("https://www.ussnet.co.jp/ir/library/monthly/index.html"))
+    if s["type"] == "yuyutei":
+        return parse_yuyutei(fetch("https://yuyu-tei.jp/sell/poc/s/search?search_word=&rare=SAR"))
+    if s["type"] == "boj_bulk":
+        # 日銀の一括ファイル（CGPI/SPPI 全系列）から品目別を1本取る。主要時系列ページ
+        # （type="boj"）には総平均しか無く、細目はこちらでしか取れない（2026-08-19 実証）
+        import monthly_sources
+        return monthly_sources.fetch_boj_bulk(s["dataset"], s["data_code"], today[:7])
+    if s["type"] in ("jmtba", "seaj", "jama", "miki", "tamago", "rice", "jnto", "estat_asp"):
+        # 波2の月次データ源（30カテゴリ拡張・2026-08-02）。取得実装と fixtures は
+        # monthly_sources.py に分離。type名 → fetch_<type>() の明示対応（allowlist方式）
+        import monthly_sources
+        return getattr(monthly_sources, "fetch_" + s["type"])()
+    # 未知の type を既存パーサへ流すと別サイトの値を静かに記録する。
+    # 型を増やしたら分岐も足す（fail-fast・Codex軽微指摘）
+    raise ValueError(f"未知の series type: {s['type']}")
+
+
+def run_fetch_plan(series: list[dict], fetch_one,
+                   workers: int = FETCH_WORKERS) -> list[tuple[dict | None, Exception | None, int]]:
+    """系列をホスト単位の待ち行列にまとめ、ホスト間は並行・ホスト内は直列で取得する。
+
+    Args:
+        series: 系列 dict のリスト（config の順）。
+        fetch_one: 系列1本を取得・パースする関数（通常は fetch_series）。
+        workers: 同時に走らせるホスト数の上限。
+
+    Returns:
+        series と同じ順の (parsed, 例外 or None, 取得ミリ秒) のリスト。
+        例外はここで握りつぶさず返す＝系列単位 fail-soft の判定は main 側に残す。
+    """
+    queues: dict[str, list[int]] = {}
+    for i, s in enumerate(series):
+        queues.setdefault(series_host(s), []).append(i)
+    results: list = [None] * len(series)
+
+    def drain(idxs: list[int]) -> None:
+        for i in idxs:
+            t0 = time.monotonic()
+            try:
+                parsed, err = fetch_one(series[i]), None
+            except Exception as exc:  # noqa: BLE001  取得失敗は系列単位で返す
+                parsed, err = None, exc
+            results[i] = (parsed, err, round((time.monotonic() - t0) * 1000))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(queues)))) as ex:
+        for fut in [ex.submit(drain, idxs) for idxs in queues.values()]:
+            fut.result()
+    return results
+
+
 def main(only: list[str] | None = None) -> int:
     cfg = json.loads(CONFIG_PATH.read_text())
     # --only: 指定した系列だけ走らせる（新系列の初回投入用・2026-08-19 追加）。
@@ -639,6 +809,7 @@ def main(only: list[str] | None = None) -> int:
         cfg = {**cfg, "series": wanted}
     alert_cfg = cfg["alert"]
     history = load_history()
+    _reset_fetch_state()
     # 日付は **JST基準**（run_at はUTCのまま＝実行時刻の絶対記録）。
     # UTC日付だと launchd の月曜08:30 JST 実行が UTC では日曜になり、同じ日の手動再実行
     # （昼＝UTCでも月曜）が別日として記録される。前向き記録の同日重複排除もすり抜ける
@@ -660,66 +831,18 @@ def main(only: list[str] | None = None) -> int:
             print(f"[FATAL] TE一覧ページ取得失敗のため中断（誤列での記録を防ぐ）: {str(exc)[:100]}")
             return 1
 
-    fmbi_payload: list | None = None  # Ir/Ru は同一エンドポイント＝1回だけ取って使い回す
+    # 取得はホスト単位で並行（run_fetch_plan）。判定は下の直列ループで config 順に行う
+    plan = run_fetch_plan(cfg["series"], lambda s: fetch_series(s, te_index_html, today))
 
     rows, alerts = [], []
-    for s in cfg["series"]:
-        base = {"date": today, "id": s["id"], "jp": s["jp"], "run_at": run_at}
+    for s, (fetched, fetch_err, fetch_ms) in zip(cfg["series"], plan):
+        # fetch_ms は系列ごとの取得所要（ホスト待ち行列の待ち時間は含まない）。遅いソースを台帳で追う
+        base = {"date": today, "id": s["id"], "jp": s["jp"], "run_at": run_at,
+                "fetch_host": series_host(s), "fetch_ms": fetch_ms}
         try:
-            if s["type"] == "te":
-                parsed = parse_te(te_index_html, s["slug"], s["label"]) if te_index_html else None
-                if parsed is None:
-                    parsed = parse_te(fetch(f"https://tradingeconomics.com/commodity/{s['slug']}"),
-                                      s["slug"], s["label"])
-            elif s["type"] == "scfi":
-                parsed = parse_scfi(json.loads(fetch("https://en.sse.net.cn/currentIndex?indexName=scfi")))
-            elif s["type"] == "jepx":
-                parsed = parse_jepx(today)
-            elif s["type"] == "spread":
-                parsed = parse_spread(te_index_html, s)
-            elif s["type"] == "fmbi":
-                if fmbi_payload is None:
-                    fmbi_payload = json.loads(fetch(FMBI_URL))
-                parsed = parse_fmbi(fmbi_payload, s["metal"], s.get("currency", "JPY"))
-            elif s["type"] == "boj":
-                resp = requests.get(f"https://www.stat-search.boj.or.jp/ssi/mtshtml/{s['page']}.html",
-                                    headers={"User-Agent": UA}, timeout=60)
-                resp.raise_for_status()
-                parsed = parse_boj(resp.content.decode("shift_jis", errors="replace"), s["data_code"])
-            elif s["type"] == "tokyosteel":
-                # 国内実勢（東京製鐵の自社公表建値）。PDFを解析するため別モジュールに分離。
-                # 標準ライブラリのみで動くので requests 依存とは独立
-                import tokyosteel_scrap
-                parsed = tokyosteel_scrap.fetch_tokyosteel_scrap(today)
-            elif s["type"] == "usda_ndpsr":
-                # 公的統計（認証不要）。レポート内の節をパスで指定する（クエリ指定は無視される実測）
-                parsed = parse_usda_ndpsr(
-                    json.loads(fetch("https://mpr.datamart.ams.usda.gov/services/v1.1/reports/"
-                                     f"{s['report']}/{quote(s['section'])}")),
-                    s["price_key"])
-            elif s["type"] == "tanaka":
-                parsed = parse_tanaka(fetch("https://gold.tanaka.co.jp/commodity/souba/"))
-            elif s["type"] == "dramexchange":
-                parsed = parse_dramexchange(fetch("https://www.dramexchange.com/"))
-            elif s["type"] == "uss":
-                parsed = parse_uss(fetch("https://www.ussnet.co.jp/ir/library/monthly/index.html"))
-            elif s["type"] == "yuyutei":
-                parsed = parse_yuyutei(
-                    fetch("https://yuyu-tei.jp/sell/poc/s/search?search_word=&rare=SAR"))
-            elif s["type"] == "boj_bulk":
-                # 日銀の一括ファイル（CGPI/SPPI 全系列）から品目別を1本取る。主要時系列ページ
-                # （type="boj"）には総平均しか無く、細目はこちらでしか取れない（2026-08-19 実証）
-                import monthly_sources
-                parsed = monthly_sources.fetch_boj_bulk(s["dataset"], s["data_code"], today[:7])
-            elif s["type"] in ("jmtba", "seaj", "jama", "miki", "tamago", "rice", "jnto", "estat_asp"):
-                # 波2の月次データ源（30カテゴリ拡張・2026-08-02）。取得実装と fixtures は
-                # monthly_sources.py に分離。type名 → fetch_<type>() の明示対応（allowlist方式）
-                import monthly_sources
-                parsed = getattr(monthly_sources, "fetch_" + s["type"])()
-            else:
-                # 未知の type を既存パーサへ流すと別サイトの値を静かに記録する。
-                # 型を増やしたら分岐も足す（fail-fast・Codex軽微指摘）
-                raise ValueError(f"未知の series type: {s['type']}")
+            if fetch_err is not None:
+                raise fetch_err
+            parsed = fetched
             if parsed is None or parsed["value"] is None:
                 rows.append({**base, "status": "parse_fail"})
                 print(f"[parse_fail] {s['id']}")
@@ -922,6 +1045,11 @@ def main(only: list[str] | None = None) -> int:
     ok = sum(1 for r in rows if r["status"] == "ok")
     bad = [r for r in rows if r["status"] not in ("ok",)]
     print(f"\n[done] {ok}/{len(rows)} ok → {LEDGER_PATH}")
+    host_ms: dict[str, int] = {}
+    for r in rows:
+        host_ms[r["fetch_host"]] = host_ms.get(r["fetch_host"], 0) + r["fetch_ms"]
+    slow = sorted(host_ms.items(), key=lambda kv: -kv[1])[:3]
+    print("[fetch] 遅いホスト: " + ", ".join(f"{h} {ms / 1000:.1f}s" for h, ms in slow))
     if bad:
         print(f"⚠️ 要確認 {len(bad)} 件: " + ", ".join(f"{r['id']}({r['status']})" for r in bad))
     # ピークアウト発火は「値上がり受益」の前向き検定（n>=100・事前登録）に混ぜない。
@@ -79,7 +79,7 @@ def load_ledger(path: Path) -> list[dict]:
         try:
             row = json.loads(line)
         except json.JSONDecodeError:
-            continue  # 壊れ行は捨てる（x_watchlist_tracer.load_recent_snapshots と同じガード）
+            continue  # 壊れ行は捨てる（x_tracer_index._valid_row と同じガード）
         if not isinstance(row.get("date"), str) or not isinstance(row.get("query_id"), str):
             continue
         rows.append(row)
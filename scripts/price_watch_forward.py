@@ -37,8 +37,11 @@ sys.path.insert(0, str(APP / "scripts"))
 
 import jq_fetch  # noqa: E402  Canonical データローダ
 import measure_base_rate as mbr  # noqa: E402  Canonical カレンダー/bars
+from close_store import CloseStore, shift_day  # noqa: E402  Canonical 終値ストア
 
 LOG_PATH = APP / "data/price_watch/forward_log.jsonl"
+# 銘柄ごとの AdjC 列（bars の日次ファイルを読むのは足りない日の分を1回だけ・2026-10-19）
+CLOSE_STORE_DIR = APP / "data/price_watch/close_store/jp"
 SPEC_VERSION = 2  # v2=帰属プロトコル受益カード（2026-07-28）。v1発火とは別系列として集計する
 WINDOWS_BD = {"w8": 40, "w15": 75}  # 営業日（≒8週 / ≒15週）
 CODE_RE = re.compile(r"(?<![0-9A-Za-z])([0-9]{4}|[0-9]{3}[A-Z])(?![0-9A-Za-z])")
@@ -66,14 +69,47 @@ def latest_bar_day(bdays: list[str], on_or_before: str) -> str | None:
     return None
 
 
+def bars_closes_many(codes: list[str], start: str, end: str) -> dict[str, list[tuple[str, float]]]:
+    """bars の日次ファイルのうち [start, end)（YYYYMMDD）にあるものを1回ずつ読み、codes の AdjC を拾う。
+
+    全銘柄入りの日次ファイルを1回読めば要求された全コードが取れるので、コードの数だけ
+    読み直さない。ファイルの無い日は足が無いだけで、取れた範囲を返す。
+    """
+    wanted = set(codes)
+    out: dict[str, list[tuple[str, float]]] = {c: [] for c in codes}
+    for path in sorted((jq_fetch.DATA_ROOT / "bars").glob("*.json.gz")):
+        day = path.name[:8]
+        if not (start <= day < end):
+            continue
+        for rec in jq_fetch.read_json_gz(path).get("data") or []:
+            code = rec.get("Code")
+            if code in wanted and rec.get("AdjC"):
+                out[code].append((day, float(rec["AdjC"])))
+    return out
+
+
+def _bars_horizon(_sample: str) -> str:
+    """取得済みにしてよい終端＝手元にある最新の bars の翌日（まだ届いていない日は取得済みにしない）。"""
+    days = sorted(p.name[:8] for p in (jq_fetch.DATA_ROOT / "bars").glob("*.json.gz"))
+    return shift_day(days[-1], 1) if days else "00000101"
+
+
+_CLOSES: CloseStore | None = None
+
+
+def jp_closes() -> CloseStore:
+    """bars を取得元にした保存つき終値ストア（プロセス内で共有）。"""
+    global _CLOSES
+    if _CLOSES is None:
+        _CLOSES = CloseStore(bars_closes_many, CLOSE_STORE_DIR, horizon=_bars_horizon)
+    return _CLOSES
+
+
 def close_of(code5: str, day: str) -> float | None:
-    try:
-        rec = mbr.load_bars_day(day).get(code5)
-    except SystemExit:
-        return None
-    if not rec or not rec.get("AdjC"):
-        return None
-    return float(rec["AdjC"])
+    """day（YYYYMMDD）の AdjC。無ければ None。先に jp_closes().ensure で揃えてあれば読むだけ。"""
+    store = jp_closes()
+    store.ensure([code5], day, shift_day(day, 1))
+    return store.series(code5).on(day)
 
 
 def append(event: dict) -> None:
@@ -117,6 +153,23 @@ def ensure_preregistration() -> None:
     print(f"[forward] 事前宣言 v{SPEC_VERSION} を記録")
 
 
+def _jp_code_tiers(series: dict) -> tuple[list[str], list[tuple[str, str]]]:
+    """系列の記録対象を (海外カードの ticker 一覧, [(5桁コード, tier)]) で返す。"""
+    if "beneficiaries" in series:
+        # §16w（P-08c 裁定 2026-08-17）: 海外上場カードは**この台帳に入れない**。
+        # 本台帳は対TOPIX超過・日本の営業日で事前登録された検定（n>=100）であり、
+        # 基準指数も営業日も違う海外株を同じ分母に入れると検定が壊れる。
+        # 黙って落とすと「カードを作ったのに何も起きない」になるため理由を残す（fail-closed）。
+        positives = [b for b in series["beneficiaries"]
+                     if b.get("sign") == "+" and b.get("tier") in ("confirmed", "provisional")]
+        skipped_foreign = [str(b.get("ticker") or b.get("code"))
+                           for b in positives if (b.get("market") or "JP") != "JP"]
+        code_tiers = [(to_code5(b["code"]), b.get("tier", "confirmed"))
+                      for b in positives if (b.get("market") or "JP") == "JP"]
+        return skipped_foreign, code_tiers
+    return [], [(to_code5(c), "confirmed") for c in CODE_RE.findall(series.get("stocks", ""))]
+
+
 def record_firings(alerts: list, fire_date: str) -> int:
     """price_universe_check の発火を前向き記録する。alerts=[(series_cfg, row, triggers)]"""
     if not alerts:
@@ -139,26 +192,14 @@ def record_firings(alerts: list, fire_date: str) -> int:
     seen_codes = {s["code"] for e in read_log() if e.get("type") == "firing"
                   and e.get("fire_date") == fire_date for s in e.get("stocks", [])}
 
+    jp_closes().ensure([c5 for series, _row, _t in alerts for c5, _tier in _jp_code_tiers(series)[1]],
+                       base_day, shift_day(base_day, 1))
     n = 0
     for series, row, triggers in alerts:
         # 帰属プロトコルv2: 受益カードの sign=+ かつ confirmed/provisional を全件記録
         # （仮=provisional も記録に入れる裁定 2026-07-28。rejected は買いシグナル禁止で除外）。
         # 旧形式（stocks 自由文字列）の config にも後方互換
-        if "beneficiaries" in series:
-            # §16w（P-08c 裁定 2026-08-17）: 海外上場カードは**この台帳に入れない**。
-            # 本台帳は対TOPIX超過・日本の営業日で事前登録された検定（n>=100）であり、
-            # 基準指数も営業日も違う海外株を同じ分母に入れると検定が壊れる。
-            # 黙って落とすと「カードを作ったのに何も起きない」になるため理由を残す（fail-closed）。
-            positives = [b for b in series["beneficiaries"]
-                         if b.get("sign") == "+" and b.get("tier") in ("confirmed", "provisional")]
-            skipped_foreign = [str(b.get("ticker") or b.get("code"))
-                               for b in positives if (b.get("market") or "JP") != "JP"]
-            code_tiers = [(to_code5(b["code"]), b.get("tier", "confirmed"))
-                          for b in positives if (b.get("market") or "JP") == "JP"]
-        else:
-            skipped_foreign = []
-            code_tiers = [(to_code5(c), "confirmed")
-                          for c in CODE_RE.findall(series.get("stocks", ""))]
+        skipped_foreign, code_tiers = _jp_code_tiers(series)
         stocks, skipped_dup = [], []
         for c5, tier in code_tiers:
             if c5 in seen_codes:
@@ -198,6 +239,12 @@ def evaluate() -> int:
         return 0
     topix = load_topix()
     today = datetime.now().strftime("%Y%m%d")
+    # 評価待ちの銘柄の評価日の終値を、bars を1日1回だけ読んでまとめて揃える
+    due = [(f, d) for f in firings for win, d in (f.get("eval_days") or {}).items()
+           if d and d <= today and (f.get("spec_version"), f["fire_date"], f["series_id"], win) not in done]
+    if due:
+        jp_closes().ensure([s["code"] for f, _d in due for s in f.get("stocks", [])],
+                           min(d for _f, d in due), shift_day(max(d for _f, d in due), 1))
     n_new = 0
     for f in firings:
         for win, eval_day in (f.get("eval_days") or {}).items():
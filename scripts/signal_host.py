@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""常駐シグナル生成ホスト（volshock 系の状態を営業日ごとに進め、当日分を公開する）。
+
+朝の daily_screen は volshock 系（volshock_5x / volshock_x_above200 / volshock_x_above200_quiet）・
+次点候補（find_volshock_near_misses）・直近シグナルキャッシュの各所で
+kpi_volshock_signals.generate_volshock_signals を冷間起動し、そのたびに 260 営業日の
+ウォームアップ（bars 260 日分の解凍・Va 20 回 / AdjC 200 回の deque 再構築）をやり直していた。
+状態（銘柄ごとの直近 Va・AdjC 履歴と前日終値）はパラメータに依存しないので、1本の状態を
+ディスクに常駐させ、新しい営業日の bars だけを流し込んで当日の候補を公開する（2026-10-19）。
+
+    data/jquants/signal_host/volshock_state.json.gz   流し込み済みの状態
+    data/jquants/signal_host/volshock/<YYYYMM>.json.gz {日付: [候補行, ...]}
+
+  - 公開する候補は「Va >= 直近20回平均 × CANDIDATE_VOL_FLOOR」の銘柄（Va・平均・AdjC・AdjO・
+    前日終値・SMA200 付き）。各 KPI のパラメータ（倍率・前日比・200日線フィルタ）はこの候補への
+    絞り込みとして volshock_rows が適用する（倍率が床未満の指定は扱わない）
+  - 冷間生成と同じ結果: 当日 D の判定は generate_volshock_signals(D, D) と同じウォームアップ起点
+    （max(最古 bars, D - WARMUP_BDAYS)）より前の観測値を使わない。履歴は日付付きで持ち、起点で
+    切って使う（直近N回の deque を起点で切ったもの = 起点から積んだ deque）
+  - 区間指定（start_bd < end_bd）は区間先頭がウォームアップ起点になる冷間生成と一致しないので
+    扱わない（None を返し、呼び出し側が従来どおり生成器を呼ぶ）
+  - 保持中の bars が差し替わった・最古 bars やウィンドウ定数が変わった時は、変わった日の
+    ウォームアップ起点から状態を作り直し、その日以降の公開分も作り直す
+
+判定ルールそのものは kpi_volshock_signals.generate_volshock_signals と同じものを分解して
+持っている。`verify` で冷間生成との一致を日ごとに確かめられる。
+
+Usage:
+    python3 scripts/signal_host.py advance
+    python3 scripts/signal_host.py advance --through 20260930 --since 20260901
+    python3 scripts/signal_host.py verify --start 20260901 --end 20260930
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+from collections import deque
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+import jq_fetch  # noqa: E402  (Canonical Module: DATA_ROOT)
+import kpi_volshock_signals  # noqa: E402  (Canonical Module: ウィンドウ定数・最古 bars・冷間生成器)
+import measure_base_rate  # noqa: E402  (Canonical Module: カレンダー・bars読み込みを再利用)
+
+STATE_DIR = jq_fetch.DATA_ROOT / "signal_host"
+STATE_NAME = "volshock_state.json.gz"
+PUBLISH_DIR_NAME = "volshock"
+STATE_VERSION = 1
+# daily_screen.NEAR_MISS_VOL_MULTIPLIER_FLOOR（次点候補の下限 4.0 倍）と同値。
+# 観察リストの volshock 系はいずれも 5.0 倍なので、この床で全消費者を賄える
+CANDIDATE_VOL_FLOOR = 4.0
+
+
+def _windows() -> dict[str, Any]:
+    """状態の形を決める定数（変わったら作り直す）。"""
+    return {
+        "vol_window": kpi_volshock_signals.VOL_HISTORY_WINDOW,
+        "ma200_window": kpi_volshock_signals.MA200_WINDOW,
+        "warmup": kpi_volshock_signals.WARMUP_BDAYS,
+        "floor": CANDIDATE_VOL_FLOOR,
+    }
+
+
+def _write_gz_json(path: Path, obj: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+            f.write(json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _read_gz_json(path: Path) -> Any:
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, EOFError, ValueError):
+        return None
+
+
+def _bars_signature(day: str) -> list[int]:
+    st = (jq_fetch.DATA_ROOT / "bars" / f"{day}.json.gz").stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+class VolshockStream:
+    """volshock の逐次状態（銘柄ごとの [日付, Va] 直近20回・[日付, AdjC] 直近200回・前日終値）。"""
+
+    def __init__(self, state: Optional[dict] = None):
+        state = state or {}
+        vol_window = kpi_volshock_signals.VOL_HISTORY_WINDOW
+        ma200_window = kpi_volshock_signals.MA200_WINDOW
+        self.va: dict[str, deque] = {
+            c: deque((tuple(x) for x in h), maxlen=vol_window) for c, h in state.get("va", {}).items()
+        }
+        self.adjc: dict[str, deque] = {
+            c: deque((tuple(x) for x in h), maxlen=ma200_window) for c, h in state.get("adjc", {}).items()
+        }
+        self.prev_close: dict[str, Any] = dict(state.get("prev_close", {}))
+        self.last_day: Optional[str] = state.get("last_day")
+
+    def step(self, day: str, horizon: str, bars: dict[str, dict], prev_day: Optional[str]) -> list[dict]:
+        """営業日 day の bars を流し込み、horizon（ウォームアップ起点）以降の履歴で候補を返す。
+
+        generate_volshock_signals の1日分と同じ順序: AdjC 履歴は当日を含めてから、Va 履歴は
+        判定の後に積む。前日終値は直前に流し込んだ日が prev_day の時だけ使う。
+        """
+        vol_window = kpi_volshock_signals.VOL_HISTORY_WINDOW
+        ma200_window = kpi_volshock_signals.MA200_WINDOW
+        prev = self.prev_close if self.last_day is not None and self.last_day == prev_day else {}
+        rows: list[dict] = []
+        closes: dict[str, Any] = {}
+        for code, rec in bars.items():
+            va_d = rec.get("Va")
+            adjc_d = rec.get("AdjC")
+            if adjc_d is not None:
+                self.adjc.setdefault(code, deque(maxlen=ma200_window)).append((day, adjc_d))
+            hist = [v for d, v in self.va.get(code, ()) if d >= horizon]
+            if len(hist) == vol_window:
+                va_avg = sum(hist) / len(hist)
+                if va_d and va_avg > 0 and va_d >= va_avg * CANDIDATE_VOL_FLOOR:
+                    hist200 = [v for d, v in self.adjc.get(code, ()) if d >= horizon]
+                    rows.append({
+                        "code": code,
+                        "va": va_d,
+                        "va_avg20": va_avg,
+                        "adjc": adjc_d,
+                        "adjo": rec.get("AdjO"),
+                        "prev_close": prev.get(code),
+                        "sma200": sum(hist200) / len(hist200) if len(hist200) == ma200_window else None,
+                    })
+            if va_d:
+                self.va.setdefault(code, deque(maxlen=vol_window)).append((day, va_d))
+            closes[code] = adjc_d
+        self.prev_close = closes
+        self.last_day = day
+        return rows
+
+    def to_state(self, keep_from: str) -> dict:
+        """keep_from より前の観測値を落として保存形にする（以後の起点はこれより前に戻らない）。"""
+        def trim(hists: dict[str, deque]) -> dict[str, list]:
+            out = {}
+            for code, h in hists.items():
+                kept = [[d, v] for d, v in h if d >= keep_from]
+                if kept:
+                    out[code] = kept
+            return out
+        return {"va": trim(self.va), "adjc": trim(self.adjc),
+                "prev_close": self.prev_close, "last_day": self.last_day}
+
+
+def volshock_rows(
+    day: str, candidates: list[dict], vol_multiplier: float, day_ret_min: float, day_ret_max: float,
+    filter_ma200: Optional[str] = None,
+) -> list[dict]:
+    """公開候補に KPI のパラメータを当て、generate_volshock_signals と同じ行（同じ順）を返す。"""
+    rows = []
+    for c in candidates:
+        if not c["va"] >= c["va_avg20"] * vol_multiplier:
+            continue
+        adjc, adjo = c["adjc"], c["adjo"]
+        if not (adjc is not None and adjo is not None and adjc > adjo):
+            continue
+        prev_close = c["prev_close"]
+        if not prev_close:
+            continue
+        day_ret = adjc / prev_close - 1
+        if not day_ret_min <= day_ret <= day_ret_max:
+            continue
+        sma200 = c["sma200"]
+        dev200 = (adjc - sma200) / sma200 if sma200 else None
+        if filter_ma200 is not None:
+            if dev200 is None:
+                continue
+            if filter_ma200 == "above" and dev200 <= 0:
+                continue
+            if filter_ma200 == "below" and dev200 >= 0:
+                continue
+        rows.append({"signal_date": day, "code": c["code"], "va": c["va"], "va_avg20": c["va_avg20"],
+                     "day_ret": day_ret, "adjc": adjc, "adjo": adjo, "sma200": sma200, "dev200": dev200})
+    return rows
+
+
+class SignalHost:
+    """状態ファイルと公開チャンクの入出力。advance で最新営業日まで進める。"""
+
+    def __init__(self, state_dir: Path = STATE_DIR):
+        self.state_dir = state_dir
+        self.state_path = state_dir / STATE_NAME
+        self.publish_dir = state_dir / PUBLISH_DIR_NAME
+        self._chunks: dict[str, dict] = {}
+        self.verified: set[str] = set()  # このプロセスで bars 署名を確かめた公開日
+
+    def _chunk(self, ym: str) -> dict:
+        if ym not in self._chunks:
+            self._chunks[ym] = _read_gz_json(self.publish_dir / f"{ym}.json.gz") or {}
+        return self._chunks[ym]
+
+    def published(self, day: str) -> Optional[list[dict]]:
+        return self._chunk(day[:6]).get(day)
+
+    def advance(self, through: str, since: Optional[str] = None) -> dict[str, int]:
+        """through（YYYYMMDD営業日）まで状態を進めて公開する。
+
+        状態が無い・使えない時は since（既定 through）から公開できるよう、そのウォームアップ起点から
+        流し込む。戻り値 {fed, published, rebuilt}。
+        """
+        calendar_days = measure_base_rate.load_calendar_days()
+        all_bdays = measure_base_rate.all_business_days(calendar_days)
+        bday_index = {d: i for i, d in enumerate(all_bdays)}
+        floor_idx = bday_index[kpi_volshock_signals._earliest_bars_date()]
+        warmup = kpi_volshock_signals.WARMUP_BDAYS
+
+        def horizon(i: int) -> int:
+            return max(floor_idx, i - warmup)
+
+        target = bday_index[through]
+        first_pub = bday_index[since] if since is not None else target
+        raw = _read_gz_json(self.state_path)
+        state = None
+        if (isinstance(raw, dict) and raw.get("version") == STATE_VERSION and raw.get("windows") == _windows()
+                and raw.get("floor_day") == all_bdays[floor_idx] and raw.get("last_day") in bday_index):
+            changed = sorted(d for d, sig in raw["sigs"].items()
+                             if d not in bday_index or _bars_signature(d) != sig)
+            if not changed:
+                state = raw
+            else:
+                first_pub = min(first_pub, bday_index.get(changed[0], floor_idx))
+
+        rebuilt = 0
+        if state is not None:
+            start = bday_index[state["last_day"]] + 1
+            stream = VolshockStream(state)
+            sigs = dict(state["sigs"])
+            published_from = state["published_from"]
+        else:
+            start = horizon(first_pub)
+            stream = VolshockStream()
+            sigs = {}
+            published_from = all_bdays[first_pub]
+            rebuilt = 1 if raw is not None else 0
+
+        published = 0
+        for i in range(start, target + 1):
+            day = all_bdays[i]
+            bars = measure_base_rate.load_bars_day(day)
+            sigs[day] = _bars_signature(day)
+            rows = stream.step(day, all_bdays[horizon(i)], bars, all_bdays[i - 1] if i else None)
+            if day >= published_from:
+                self._chunk(day[:6])[day] = rows
+                published += 1
+        for ym in sorted({d[:6] for d in all_bdays[start:target + 1] if d >= published_from}):
+            _write_gz_json(self.publish_dir / f"{ym}.json.gz", self._chunks[ym])
+
+        last = bday_index[stream.last_day] if stream.last_day else target
+        keep_from = all_bdays[horizon(min(last + 1, len(all_bdays) - 1))]
+        sigs = {d: s for d, s in sigs.items() if d >= keep_from or d == stream.last_day}
+        if start <= target or rebuilt:
+            _write_gz_json(self.state_path, {
+                "version": STATE_VERSION, "windows": _windows(), "floor_day": all_bdays[floor_idx],
+                "published_from": published_from, "sigs": sigs, **stream.to_state(keep_from),
+            })
+        self.verified.update(d for d in sigs if d >= published_from and self.published(d) is not None)
+        return {"fed": max(0, target + 1 - start), "published": published, "rebuilt": rebuilt}
+
+    def volshock_signals(
+        self, start_bd: str, end_bd: str, vol_multiplier: float, day_ret_min: float, day_ret_max: float,
+        filter_ma200: Optional[str] = None,
+    ) -> Optional[pd.DataFrame]:
+        """generate_volshock_signals(start_bd, end_bd, ...)[0] と同じ DataFrame。扱えない時は None。"""
+        if start_bd != end_bd or start_bd not in self.verified or vol_multiplier < CANDIDATE_VOL_FLOOR:
+            return None
+        if filter_ma200 is not None and filter_ma200 not in kpi_volshock_signals.MA200_FILTER_CHOICES:
+            return None
+        rows = volshock_rows(start_bd, self.published(start_bd), vol_multiplier, day_ret_min, day_ret_max,
+                             filter_ma200)
+        return pd.DataFrame(rows)
+
+
+_shared: Optional[SignalHost] = None
+
+
+def prepare(through: str) -> Optional[SignalHost]:
+    """朝ジョブ用: through まで進めたホストをプロセス内で共有する（失敗は警告のみで None）。"""
+    global _shared
+    host = SignalHost()
+    try:
+        stats = host.advance(through)
+    except (Exception, SystemExit) as e:  # noqa: BLE001 (派生物。従来の冷間生成に落ちる)
+        print(f"WARN: シグナル生成ホストの更新失敗（冷間生成で続行）: {e}", file=sys.stderr)
+        _shared = None
+        return None
+    print(f"[signal_host] volshock fed={stats['fed']} published={stats['published']} rebuilt={stats['rebuilt']}")
+    _shared = host
+    return host
+
+
+def volshock_signals(start_bd: str, end_bd: str, **params) -> Optional[pd.DataFrame]:
+    """prepare 済みなら公開分から返す。prepare していない・扱えない指定なら None。"""
+    return _shared.volshock_signals(start_bd, end_bd, **params) if _shared is not None else None
+
+
+def _verify_specs() -> list[dict]:
+    import daily_screen  # 遅延 import（daily_screen がこのモジュールを import するため）
+
+    specs = []
+    for entry in daily_screen.load_watchlist():
+        if entry["kpi_name"] in daily_screen.VOLSHOCK_FAMILY_KPI_NAMES:
+            p = entry["params"]
+            spec = {"vol_multiplier": p["vol_multiplier"], "day_ret_min": p["day_ret_min"],
+                    "day_ret_max": p["day_ret_max"], "filter_ma200": p.get("filter_ma200")}
+            specs.append(spec)
+            specs.append({**spec, "vol_multiplier": daily_screen.NEAR_MISS_VOL_MULTIPLIER_FLOOR, "filter_ma200": None})
+    return [dict(t) for t in dict.fromkeys(tuple(s.items()) for s in specs)]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="常駐シグナル生成ホスト（volshock 系）")
+    parser.add_argument("--state-dir", type=Path, default=STATE_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_adv = sub.add_parser("advance", help="最新営業日（または --through）まで状態を進めて公開")
+    p_adv.add_argument("--through", help="YYYYMMDD（既定: bars のある最新営業日）")
+    p_adv.add_argument("--since", help="状態を作り直す時に公開を始める日（YYYYMMDD）")
+    p_ver = sub.add_parser("verify", help="公開分を冷間生成（1日ずつ）と突き合わせる")
+    p_ver.add_argument("--start", required=True, help="YYYYMMDD")
+    p_ver.add_argument("--end", required=True, help="YYYYMMDD")
+    args = parser.parse_args()
+
+    host = SignalHost(args.state_dir)
+    if args.cmd == "advance":
+        through = args.through
+        if through is None:
+            bars = sorted(p.name[:8] for p in (jq_fetch.DATA_ROOT / "bars").glob("*.json.gz"))
+            if not bars:
+                print("FATAL: bars キャッシュが1件もありません", file=sys.stderr)
+                return 1
+            through = bars[-1]
+        stats = host.advance(through, since=args.since)
+        print(f"through={through} fed={stats['fed']} published={stats['published']} rebuilt={stats['rebuilt']}")
+        return 0
+
+    host.advance(args.end, since=args.start)
+    all_bdays = measure_base_rate.all_business_days(measure_base_rate.load_calendar_days())
+    days = [d for d in all_bdays if args.start <= d <= args.end]
+    mismatches = 0
+    for spec in _verify_specs():
+        for d in days:
+            got = host.volshock_signals(d, d, **spec)
+            want, _diag = kpi_volshock_signals.generate_volshock_signals(d, d, **spec)
+            same = got is not None and got.to_dict("records") == want.to_dict("records")
+            if not same:
+                mismatches += 1
+                print(f"MISMATCH {d} {spec}: host={None if got is None else len(got)} cold={len(want)}")
+    print(f"days={len(days)} specs={len(_verify_specs())} mismatches={mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,15 +29,15 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 import measure_base_rate as mbr  # noqa: E402
+import disclosure_index  # noqa: E402  EDINET documents_all の索引引き
+import master_index  # noqa: E402  月次 master の時点索引
 
 SEED = 20260723
 EP_CSV = Path("output/reverse_lookup/surge_episodes_1y.csv")
 OUT = Path("output/reverse_lookup")
 FINS = Path("data/jquants/fins")
-EDINET = Path("data/edinet/documents_all")
 MALERT = Path("data/jquants/margin_alert")
 SSALE = Path("data/jquants/shortsale")
-MASTER = Path("data/jquants/master")
 
 AXES = ["fins", "edinet_lsh", "edinet_tob", "edinet_other", "margin_event", "shortsale", "sector_lead", "member_new"]
 
@@ -61,21 +61,13 @@ def fins_codes(d):
 
 _ed = {}
 def edinet_by_code(d):
-    """date(YYYYMMDD) -> {code5: set(docTypeCode)}"""
+    """date(YYYYMMDD) -> {code5: set(docTypeCode)}
+
+    日付ごとに documents_all の gzip を開いていたのを disclosure_index の索引引きに置き換え
+    （2026-10-19・コード正規化 secCode[:5].ljust(5,"0") と docTypeCode の str 化は同じ）。
+    """
     if d not in _ed:
-        o = _gz(EDINET / f"{d}.json.gz")
-        m = defaultdict(set)
-        if isinstance(o, dict):
-            recs = None
-            for v in o.values():
-                if isinstance(v, list) and v and isinstance(v[0], dict) and "docID" in v[0]:
-                    recs = v
-                    break
-            for r in recs or []:
-                sc = r.get("secCode")
-                if sc:
-                    m[str(sc)[:5].ljust(5, "0")].add(str(r.get("docTypeCode")))
-        _ed[d] = m
+        _ed[d] = defaultdict(set, disclosure_index.open_index().edinet_doc_types_by_code(d))
     return _ed[d]
 
 _ma = {}
@@ -94,22 +86,13 @@ def ssale_codes(d):
     return _ss[d]
 
 _master_cache = {}
-_master_files = sorted(MASTER.glob("*.json.gz"))
 def sector_map_asof(d):
-    """d以前で最新のmasterの code->S33"""
-    cand = None
-    for p in _master_files:
-        if p.name[:8] <= d:
-            cand = p
-        else:
-            break
-    if cand is None:
-        cand = _master_files[0]
-    k = cand.name
-    if k not in _master_cache:
-        o = _gz(cand)
-        _master_cache[k] = {r.get("Code"): r.get("S33") for r in (o or {}).get("data", []) if r.get("Code")}
-    return _master_cache[k]
+    """d以前で最新のmasterの code->S33（d以前が無ければ最古のmaster。master_index の時点索引から引く）"""
+    idx = master_index.open_index()
+    snap = idx.snapshot_date(d) or idx.snapshots[0]
+    if snap not in _master_cache:
+        _master_cache[snap] = {c: r["S33"] for c, r in idx.snapshot(snap, fields=["S33"]).items()}
+    return _master_cache[snap]
 
 def axis_hits(code, days, sector, ep_starts_by_sector, member_new_flag):
     """指定日集合における各軸ヒット(bool)"""
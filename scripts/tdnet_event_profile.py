@@ -21,9 +21,7 @@ from __future__ import annotations
 
 import argparse
 import csv
-import glob
 import gzip
-import json
 import re
 import sys
 from collections import defaultdict
@@ -32,8 +30,8 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "scripts"))
 import measure_base_rate as mbr  # noqa: E402  Canonical
+import disclosure_index  # noqa: E402  data/tdnet/index/ の索引引き
 
-INDEX_GLOB = str(ROOT / "data/tdnet/index/*/*.json.gz")
 UNIVERSES = ROOT / "output/base_rate/universes_w21.csv.gz"
 OUT_DIR = ROOT / "output/tdnet"
 
@@ -121,33 +119,32 @@ def main() -> int:
     print(f"[tdnet-profile] 価格データ範囲 {first_bd}〜{last_bd}（bars依存）")
 
     # 1) 開示 → (event, code, signal_date)
+    # 週次チャンクを全部展開し直す代わりに disclosure_index（SQLite 索引）から価格データ範囲の
+    # 項目だけをチャンク順・項目順で受け取る（2026-10-19・判定は従来と同じ）
+    idx = disclosure_index.open_index()
+    scanned = idx.tdnet_count()
     sig = []
-    scanned = 0
-    for f in sorted(glob.glob(INDEX_GLOB)):
-        for it in json.loads(gzip.open(f, "rb").read().decode()).get("items", []):
-            t = it.get("Tdnet", it)
-            scanned += 1
-            title = t.get("title") or ""
-            code = norm_code(t.get("company_code"))
-            pub = t.get("pubdate") or ""
-            if not code or len(pub) < 16:
-                continue
-            d, hh = pub[:10].replace("-", ""), int(pub[11:13])
-            if d < first_bd or d > last_bd:
+    for it in idx.tdnet_items(first_bd, last_bd):
+        t = it.get("Tdnet", it)
+        title = t.get("title") or ""
+        code = norm_code(t.get("company_code"))
+        pub = t.get("pubdate") or ""
+        if not code or len(pub) < 16:
+            continue
+        d, hh = pub[:10].replace("-", ""), int(pub[11:13])
+        if noise_rx.search(title):
+            continue  # 投信の定型日次開示・訂正は事象でない（2026-07-29 追加）
+        for name, rx in pats.items():
+            if not rx.search(title):
                 continue
-            if noise_rx.search(title):
-                continue  # 投信の定型日次開示・訂正は事象でない（2026-07-29 追加）
-            for name, rx in pats.items():
-                if not rx.search(title):
+            # 15時以降＝翌営業日をシグナル日（保守）。その日が非営業日なら次の営業日へ送る
+            base = d
+            if hh >= LATE_HOUR or base not in bset:
+                nxt = [x for x in bdays if x > base]
+                if not nxt:
                     continue
-                # 15時以降＝翌営業日をシグナル日（保守）。その日が非営業日なら次の営業日へ送る
-                base = d
-                if hh >= LATE_HOUR or base not in bset:
-                    nxt = [x for x in bdays if x > base]
-                    if not nxt:
-                        continue
-                    base = nxt[0]
-                sig.append((name, code, base))
+                base = nxt[0]
+            sig.append((name, code, base))
     print(f"[tdnet-profile] 走査 {scanned:,}件 → シグナル {len(sig):,}件")
 
     # 2) リターン評価（entry=T+1始値 / exit=+20bd終値）
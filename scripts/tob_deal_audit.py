@@ -20,9 +20,6 @@
 from __future__ import annotations
 
 import csv
-import glob
-import gzip
-import json
 import random
 import re
 import sys
@@ -32,8 +29,8 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "scripts"))
 import measure_base_rate as mbr  # noqa: E402  Canonical
+import disclosure_index  # noqa: E402  data/tdnet/index/ の索引引き
 
-INDEX_GLOB = str(ROOT / "data/tdnet/index/*/*.json.gz")
 OUT_DIR = ROOT / "output/tdnet"
 HORIZON = 20
 COST = 0.003
@@ -70,20 +67,19 @@ def main() -> int:
     first_bd, last_bd = bdays[0], bdays[-1]
 
     # 1) TOB関連開示を全部拾う（code別・時系列）
+    # 週次チャンクを全部展開し直さず、disclosure_index（SQLite 索引）で表題の TOB_ANY を
+    # 索引側に絞らせる（2026-10-19・並びはチャンク順・項目順で従来と同じ）
     events = defaultdict(list)     # code -> [(date, hh, title)]
-    scanned = 0
-    for f in sorted(glob.glob(INDEX_GLOB)):
-        for it in json.loads(gzip.open(f, "rb").read().decode()).get("items", []):
-            t = it.get("Tdnet", it)
-            scanned += 1
-            title = t.get("title") or ""
-            if not TOB_ANY.search(title):
-                continue
-            code = norm_code(t.get("company_code"))
-            pub = t.get("pubdate") or ""
-            if not code or len(pub) < 16:
-                continue
-            events[code].append((pub[:10].replace("-", ""), int(pub[11:13]), title))
+    idx = disclosure_index.open_index()
+    scanned = idx.tdnet_count()
+    for it in idx.tdnet_items(title_regex=TOB_ANY.pattern):
+        t = it.get("Tdnet", it)
+        title = t.get("title") or ""
+        code = norm_code(t.get("company_code"))
+        pub = t.get("pubdate") or ""
+        if not code or len(pub) < 16:
+            continue
+        events[code].append((pub[:10].replace("-", ""), int(pub[11:13]), title))
 
     # 2) code×90日窓で deal に束ねる
     deals = []
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""取引カレンダー（営業日の序数・月初/月末表・配列での営業日演算）。
+
+営業日の計算がスクリプトごとにばらばらだった（2026-10-19 時点）:
+jq_fetch.business_days_in_range / month_end_business_days_in_range は呼ぶたびに全カレンダーを
+内包表記で絞り込み、measure_base_rate.all_business_days の戻り値を各 KPI が bisect や
+その場の dict で引き、build_daily_reco.add_bdays は概算祝日表を1日ずつ進め、
+collector.business_days は土日だけを除く np.busday_offset だった。本モジュールは
+カレンダーを1回だけ序数化し、以降の演算を配列の整数加算と二分探索にする
+（jq_fetch 自体は標準ライブラリのみの取得器なので従来関数はそのまま残し、numpy を使う
+集計側をこちらへ寄せる。§6凍結の measure_base_rate も書き換えず、同じ結果をテストで固定する）。
+
+    TradingCalendar(days)
+      days[i]        i 番目の営業日（序数 i）
+      index / asof   日付 → 序数（非営業日は roll で前後に寄せる）。配列を渡すと配列で返す
+      offset         n 営業日後（序数 + n）。カレンダーの外は None
+      count / range  [start, end] の営業日数・営業日リスト（境界は "00010101" 等の文字列でもよい）
+      month_starts / month_ends / week_ends   各暦月の初日・最終営業日、各 ISO 週の最終営業日
+
+  - 日付の表記はカレンダーを作った表記に揃えて返す（JP: YYYYMMDD・US: YYYY-MM-DD）。
+    入力はどちらの表記でも date / np.datetime64 でもよい
+  - 暦日ごとの累積営業日数表を持つので、as-of・件数は O(1)（配列なら要素数に比例）
+  - 範囲の境界は文字列比較（jq_fetch の従来関数と同じ意味。実在しない日付でも上限として使える）
+
+JP は data/jquants/calendar.json.gz（HolDiv 1/2 を営業日）、US は data/us/prices の
+基準銘柄の取引日の和集合から作る（基準銘柄が未取得なら平日カレンダー＝collector.business_days と同じ）。
+
+Usage:
+    python3 scripts/trading_calendar.py offset 20240105 5
+    python3 scripts/trading_calendar.py count 20240101 20240131
+    python3 scripts/trading_calendar.py --market US offset 2024-07-03 1
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import csv
+import datetime
+import sys
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+import jq_fetch  # noqa: E402  (Canonical Module: DATA_ROOT / BUSINESS_HOLDIV / read_json_gz)
+
+JP_CALENDAR_PATH = jq_fetch.DATA_ROOT / "calendar.json.gz"
+US_PRICES_DIR = jq_fetch.PROJECT_ROOT / "data" / "us" / "prices"
+
+# US カレンダーの基準銘柄（us_price_fetch の CSV の date 列の和集合を取引日とみなす）
+US_CALENDAR_REFERENCE = ("SPY", "AAPL", "MSFT")
+# 基準銘柄が1つも無い時の平日カレンダーの期間
+US_WEEKDAY_START = "1990-01-01"
+US_WEEKDAY_YEARS_AHEAD = 2
+
+DateLike = Union[str, datetime.date, np.datetime64]
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def _key(value: DateLike) -> str:
+    """日付を YYYYMMDD の比較用キーにする。"""
+    if isinstance(value, str):
+        return value.replace("-", "")
+    if isinstance(value, np.datetime64):
+        return str(value.astype("datetime64[D]")).replace("-", "")
+    return value.strftime("%Y%m%d")
+
+
+def _epoch_day(key: str) -> int:
+    return (datetime.date(int(key[:4]), int(key[4:6]), int(key[6:8])) - _EPOCH).days
+
+
+def _is_scalar(value: Any) -> bool:
+    return isinstance(value, (str, datetime.date, np.datetime64))
+
+
+class TradingCalendar:
+    """営業日リストを序数化したカレンダー。"""
+
+    def __init__(self, days: Iterable[str], name: str = ""):
+        """
+        Args:
+            days: 営業日（YYYYMMDD か YYYY-MM-DD。表記は揃っていること・順不同・重複可）
+            name: 表示用の名前（"JP" / "US"）
+        """
+        self.name = name
+        self.days: list[str] = sorted(set(days))
+        self._keys = [_key(d) for d in self.days]
+        self._pos = {k: i for i, k in enumerate(self._keys)}
+        # 営業日（カレンダーの表記）→ 序数。従来の {d: i for i, d in enumerate(all_bdays)} の代わり
+        self.positions: dict[str, int] = self._pos if self._keys == self.days else {d: i for i, d in enumerate(self.days)}
+        self.epoch = np.array([_epoch_day(k) for k in self._keys], dtype=np.int64)
+        n = len(self.days)
+        self._first = int(self.epoch[0]) if n else 0
+        # 暦日 first+j までの営業日数（as-of と件数を O(1) にする）
+        marks = np.zeros(int(self.epoch[-1]) - self._first + 1 if n else 1, dtype=np.int32)
+        marks[self.epoch - self._first] = 1
+        self._cum = np.cumsum(marks, dtype=np.int32)
+
+        # 月・ISO 週が変わる位置から、各期間の最初/最後の営業日の序数表を作る
+        months = np.array([int(k[:6]) for k in self._keys], dtype=np.int64)
+        weeks = np.array([y * 100 + w for y, w, _ in (
+            datetime.date(int(k[:4]), int(k[4:6]), int(k[6:8])).isocalendar() for k in self._keys)], dtype=np.int64)
+        month_change = np.flatnonzero(np.diff(months)) + 1
+        tail = [n - 1] if n else []
+        self.month_start_index = np.concatenate(([0] if n else [], month_change)).astype(np.int64)
+        self.month_end_index = np.concatenate((month_change - 1, tail)).astype(np.int64)
+        self.week_end_index = np.concatenate((np.flatnonzero(np.diff(weeks)), tail)).astype(np.int64)
+        self._month_start_keys = [self._keys[i] for i in self.month_start_index]
+        self._month_end_keys = [self._keys[i] for i in self.month_end_index]
+        self._week_end_keys = [self._keys[i] for i in self.week_end_index]
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def __contains__(self, value: DateLike) -> bool:
+        return _key(value) in self._pos
+
+    @property
+    def first(self) -> str:
+        return self.days[0]
+
+    @property
+    def last(self) -> str:
+        return self.days[-1]
+
+    # --- 日付 ⇔ 序数 ------------------------------------------------------------
+
+    def _epochs(self, values: Sequence[DateLike]) -> np.ndarray:
+        return np.fromiter((_epoch_day(_key(v)) for v in values), dtype=np.int64, count=len(values))
+
+    def _asof_ordinals(self, epochs: np.ndarray) -> np.ndarray:
+        """epoch 日以前で最新の営業日の序数（カレンダーより前は -1）。"""
+        j = epochs - self._first
+        inside = np.clip(j, 0, len(self._cum) - 1)
+        out = self._cum[inside].astype(np.int64) - 1
+        return np.where(j < 0, -1, out)
+
+    def index(self, dates: Union[DateLike, Sequence[DateLike]], roll: str = "backward") -> Union[int, np.ndarray]:
+        """日付の序数。非営業日は roll="backward" なら直前、"forward" なら直後の営業日に寄せる。
+
+        Returns:
+            スカラーなら int、配列なら np.ndarray。寄せ先がカレンダーの外なら -1 / len(self)
+        """
+        if roll not in ("backward", "forward"):
+            raise ValueError(f"roll は backward / forward: {roll}")
+        scalar = _is_scalar(dates)
+        epochs = self._epochs([dates] if scalar else list(dates))
+        if roll == "backward":
+            out = self._asof_ordinals(epochs)
+        else:
+            out = self._asof_ordinals(epochs - 1) + 1
+        return int(out[0]) if scalar else out
+
+    def day(self, ordinal: int) -> Optional[str]:
+        """序数の営業日（範囲外は None）。"""
+        return self.days[ordinal] if 0 <= ordinal < len(self.days) else None
+
+    def days_at(self, ordinals: Iterable[int]) -> list[Optional[str]]:
+        """序数の配列 → 営業日のリスト（範囲外は None）。"""
+        n = len(self.days)
+        return [self.days[i] if 0 <= i < n else None for i in np.asarray(ordinals, dtype=np.int64).tolist()]
+
+    # --- 演算 --------------------------------------------------------------------
+
+    def is_business_day(self, dates: Union[DateLike, Sequence[DateLike]]) -> Union[bool, list[bool]]:
+        if _is_scalar(dates):
+            return _key(dates) in self._pos
+        return [_key(d) in self._pos for d in dates]
+
+    def asof(self, dates: Union[DateLike, Sequence[DateLike]]) -> Union[Optional[str], list[Optional[str]]]:
+        """date 以前で最新の営業日（カレンダーより前は None）。"""
+        if _is_scalar(dates):
+            return self.day(self.index(dates))
+        return self.days_at(self.index(dates))
+
+    def offset(
+        self,
+        dates: Union[DateLike, Sequence[DateLike]],
+        n: Union[int, Sequence[int]],
+        roll: str = "forward",
+    ) -> Union[Optional[str], list[Optional[str]]]:
+        """n 営業日後（負なら前）。非営業日の起点は roll で寄せてから数える。範囲外は None。
+
+        起点が営業日なら roll によらず「その日 + n 営業日」。
+        roll="forward" は np.busday_offset(roll="forward") と同じ数え方。
+        """
+        if _is_scalar(dates):
+            return self.day(self.index(dates, roll) + int(n))
+        return self.days_at(self.index(dates, roll) + np.asarray(n, dtype=np.int64))
+
+    def count(
+        self,
+        start: Union[DateLike, Sequence[DateLike]],
+        end: Union[DateLike, Sequence[DateLike]],
+    ) -> Union[int, np.ndarray]:
+        """[start, end]（両端含む）の営業日数。"""
+        scalar = _is_scalar(start) and _is_scalar(end)
+        s = self._epochs([start] if _is_scalar(start) else list(start))
+        e = self._epochs([end] if _is_scalar(end) else list(end))
+        out = np.maximum(self._asof_ordinals(e) - self._asof_ordinals(s - 1), 0)
+        return int(out[0]) if scalar else out
+
+    def _slice(self, keys: list[str], start: Optional[str], end: Optional[str]) -> slice:
+        lo = bisect.bisect_left(keys, _key(start)) if start is not None else 0
+        hi = bisect.bisect_right(keys, _key(end)) if end is not None else len(keys)
+        return slice(lo, hi)
+
+    def range(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> list[str]:
+        """[start, end] 内の営業日を昇順で返す（境界は文字列比較）。"""
+        return self.days[self._slice(self._keys, start, end)]
+
+    def _pick(self, keys: list[str], index: np.ndarray, start, end) -> list[str]:
+        return [self.days[i] for i in index[self._slice(keys, start, end)].tolist()]
+
+    def month_starts(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> list[str]:
+        """各暦月の最初の営業日のうち [start, end] 内のもの。"""
+        return self._pick(self._month_start_keys, self.month_start_index, start, end)
+
+    def month_ends(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> list[str]:
+        """各暦月の最終営業日のうち [start, end] 内のもの。"""
+        return self._pick(self._month_end_keys, self.month_end_index, start, end)
+
+    def week_ends(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> list[str]:
+        """各 ISO 週（月曜起点）の最終営業日のうち [start, end] 内のもの。"""
+        return self._pick(self._week_end_keys, self.week_end_index, start, end)
+
+
+# --- 構築・共有 -------------------------------------------------------------------
+
+_by_days: dict[int, tuple[list, int, frozenset, TradingCalendar]] = {}
+_by_file: dict[tuple, TradingCalendar] = {}
+
+
+def for_days(calendar_days: list[tuple[str, str]], business: Iterable[str] = jq_fetch.BUSINESS_HOLDIV) -> TradingCalendar:
+    """jq_fetch.load_calendar_days の (YYYYMMDD, HolDiv) リストからカレンダーを作る。
+
+    同じリストオブジェクトには同じカレンダーを返す（呼ぶたびに全件を絞り込まない）。
+    """
+    business = frozenset(business)
+    hit = _by_days.get(id(calendar_days))
+    if hit is not None and hit[0] is calendar_days and hit[1] == len(calendar_days) and hit[2] == business:
+        return hit[3]
+    cal = TradingCalendar((d for d, h in calendar_days if h in business), name="JP")
+    # リスト本体も持っておく（id の再利用で別のリストに当たらないように）
+    _by_days[id(calendar_days)] = (calendar_days, len(calendar_days), business, cal)
+    return cal
+
+
+def _file_sig(path: Path) -> tuple:
+    st = path.stat()
+    return (str(path), st.st_size, st.st_mtime_ns)
+
+
+def jp(path: Optional[Path] = None) -> TradingCalendar:
+    """J-Quants 取引カレンダー（calendar.json.gz）の JP カレンダー。ファイルが変わるまで共有する。
+
+    Raises:
+        FileNotFoundError: calendar.json.gz が無い（jq_fetch.py --only calendar で取得する）
+    """
+    path = Path(path or JP_CALENDAR_PATH)
+    sig = ("JP", *_file_sig(path))
+    cal = _by_file.get(sig)
+    if cal is None:
+        rows = jq_fetch.read_json_gz(path)["data"]
+        cal = TradingCalendar(
+            (r["Date"].replace("-", "") for r in rows if r["HolDiv"] in jq_fetch.BUSINESS_HOLDIV), name="JP")
+        _by_file[sig] = cal
+    return cal
+
+
+def us(prices_dir: Optional[Path] = None, reference: Sequence[str] = US_CALENDAR_REFERENCE) -> TradingCalendar:
+    """米国株の取引日カレンダー（YYYY-MM-DD）。
+
+    基準銘柄の CSV（us_price_fetch の出力）の date 列の和集合を取引日とする。
+    どれも無ければ平日カレンダー（祝日を知らない。collector.business_days と同じ近似）。
+    """
+    paths = [Path(prices_dir or US_PRICES_DIR) / f"{t}.csv" for t in reference]
+    paths = [p for p in paths if p.exists()]
+    sig = ("US", *(s for p in paths for s in _file_sig(p)))
+    cal = _by_file.get(sig)
+    if cal is not None:
+        return cal
+    days: set[str] = set()
+    for p in paths:
+        with p.open(newline="", encoding="utf-8") as f:
+            days.update(row["date"] for row in csv.DictReader(f) if row.get("date"))
+    if not days:
+        end = np.datetime64(f"{datetime.date.today().year + US_WEEKDAY_YEARS_AHEAD}-12-31")
+        span = np.arange(np.datetime64(US_WEEKDAY_START), end + 1, dtype="datetime64[D]")
+        days = {str(d) for d in span[np.is_busday(span)]}
+    cal = TradingCalendar(days, name="US")
+    _by_file[sig] = cal
+    return cal
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--market", choices=["JP", "US"], default="JP")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("offset", help="n 営業日後")
+    p.add_argument("date")
+    p.add_argument("n", type=int)
+    p = sub.add_parser("count", help="[start, end] の営業日数")
+    p.add_argument("start")
+    p.add_argument("end")
+    p = sub.add_parser("asof", help="date 以前で最新の営業日")
+    p.add_argument("date")
+    p = sub.add_parser("month-ends", help="[start, end] の月末営業日")
+    p.add_argument("start")
+    p.add_argument("end")
+    args = ap.parse_args()
+
+    try:
+        cal = jp() if args.market == "JP" else us()
+    except FileNotFoundError as e:
+        print(f"FATAL: カレンダーが見つかりません: {e}", file=sys.stderr)
+        return 1
+    if args.cmd == "offset":
+        print(cal.offset(args.date, args.n))
+    elif args.cmd == "count":
+        print(cal.count(args.start, args.end))
+    elif args.cmd == "asof":
+        print(cal.asof(args.date))
+    else:
+        print("\n".join(cal.month_ends(args.start, args.end)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""既試行の近傍検索索引（事前登録前の「それ、もう試した？」を機械で引く・2026-10-19）。
+
+trial_fingerprints.json は kpi_name 単位の署名表で、新しい KPI 案が既存 family の再実行
+（同じシグナル・同じ期間・同じパラメータを別名で）かどうかの照合は目視だった。
+本スクリプトは trials.jsonl の各行から次の特徴を取り、類似試行を数ミリ秒で引ける索引
+data/kpi_trials/trial_similarity_index.json を作る。
+
+特徴（1行＝1試行）:
+- tokens: kpi_name の語（"_" 区切り）＋ family とその FAMILY_KEYWORDS（KNOWN_TRIALS にある時だけ）
+- params: 数値パラメータと短いカテゴリ値（seed・sha256・注記などの帳簿項目は除く）
+- period: 検証期間の月範囲
+- signals: シグナル母集団（returns.csv の (signal_date, code) 集合）の MinHash 署名。
+  params.source_returns_csv、無ければ output/kpi/<kpi_name>/returns.csv があれば読む
+
+照合: 候補は LSH（署名を帯に分けたバケット）・語の転置索引・同 family から集め、
+  signals の推定 Jaccard・params 類似度・tokens の Jaccard・period の重なりの加重平均で並べる
+  （欠けた成分は重みから外す）。結果は kpi_name ごとに最も近い1行。
+
+増分更新: trials.jsonl は追記専用の台帳。索引は読み終えたバイト位置とそこまでの sha256 を持ち、
+  追記分だけを解析する（先頭側が書き換わっていたら作り直す）。母集団 CSV は mtime/サイズで
+  変わった時だけ読み直す。索引の破損・版違いも作り直し（失うのは時間だけ）。
+
+Usage:
+    python scripts/trial_similarity.py update
+    python scripts/trial_similarity.py query --like volshock_x_above200_quiet
+    python scripts/trial_similarity.py query --name my_new_kpi --family 出来高ショック \\
+        --params '{"vol_multiplier": 3.0}' --period 2016-11:2018-12 --signals path/to/returns.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from build_trial_fingerprints import FAMILY_KEYWORDS, KNOWN_TRIALS, TRIALS_JSONL
+
+INDEX_PATH = Path("data/kpi_trials/trial_similarity_index.json")
+INDEX_VERSION = 1
+
+NUM_PERM = 64
+LSH_BANDS = 16           # 16帯×4行: 推定 Jaccard ≈0.5 前後から候補に上がる
+LSH_ROWS = NUM_PERM // LSH_BANDS
+_MERSENNE = (1 << 61) - 1
+# MinHash の置換 (a, b) は固定種から決定論的に作る（索引を作り直しても署名が変わらない）
+_PERMS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % (_MERSENNE - 1) + 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE)
+    for i in range(NUM_PERM)
+]
+
+WEIGHTS = {"signals": 0.4, "params": 0.25, "tokens": 0.2, "period": 0.15}
+
+# 仮説の中身ではない帳簿項目（再実行判定に効かせない）
+_IGNORED_PARAM_KEYS = {"seed", "n_boot", "duplicate_of", "superseded_by", "source_returns_csv"}
+_IGNORED_PARAM_SUFFIXES = ("_sha256", "_commit", "_note", "_path")
+_MAX_CATEGORICAL_LEN = 40
+
+
+# ---------------------------------------------------------------------------
+# 特徴量
+# ---------------------------------------------------------------------------
+
+def name_tokens(kpi_name: str) -> list[str]:
+    return sorted({t for t in re.split(r"[_\-\s]+", (kpi_name or "").lower()) if t})
+
+
+def row_tokens(kpi_name: str, family: str | None = None) -> list[str]:
+    """語の集合。family は明示指定 > KNOWN_TRIALS の順（どちらも無ければ名前の語だけ）。"""
+    tokens = set(name_tokens(kpi_name))
+    if family is None:
+        family = (KNOWN_TRIALS.get(kpi_name) or {}).get("family")
+    if family and family != "その他":
+        tokens.add(f"family:{family}")
+        tokens.update(k.lower() for k in FAMILY_KEYWORDS.get(family, []))
+    return sorted(tokens)
+
+
+def param_features(params: dict[str, Any] | None) -> dict[str, Any]:
+    """比較に使うパラメータ（数値と短いカテゴリ値）。"""
+    out: dict[str, Any] = {}
+    for key, value in (params or {}).items():
+        if key in _IGNORED_PARAM_KEYS or key.endswith(_IGNORED_PARAM_SUFFIXES):
+            continue
+        if isinstance(value, bool):
+            out[key] = str(value).lower()
+        elif isinstance(value, (int, float)):
+            out[key] = float(value)
+        elif isinstance(value, str) and 0 < len(value) <= _MAX_CATEGORICAL_LEN:
+            out[key] = value
+    return out
+
+
+def _month_ordinal(text: Any) -> int | None:
+    m = re.match(r"(\d{4})-(\d{2})", str(text or ""))
+    return int(m.group(1)) * 12 + int(m.group(2)) - 1 if m else None
+
+
+def period_range(period: dict[str, Any] | None) -> list[int] | None:
+    """{"start": "2016-11", "end": "2018-12"} → [月序数, 月序数]（取れなければ None）。"""
+    if not isinstance(period, dict):
+        return None
+    start, end = _month_ordinal(period.get("start")), _month_ordinal(period.get("end"))
+    if start is None or end is None or end < start:
+        return None
+    return [start, end]
+
+
+def _item_hash(item: str) -> int:
+    return int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def minhash(items) -> list[int] | None:
+    """集合の MinHash 署名（空集合は None）。"""
+    hashes = [_item_hash(i) for i in set(items)]
+    if not hashes:
+        return None
+    return [min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PERMS]
+
+
+def read_signal_population(path: Path) -> set[str]:
+    """returns.csv 等の (signal_date, code) 集合。列が無ければ空集合。"""
+    out: set[str] = set()
+    with path.open(encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            date, code = (row.get("signal_date") or "").strip(), (row.get("code") or "").strip()
+            if date and code:
+                out.add(f"{code}|{date[:10]}")
+    return out
+
+
+def population_path_for(row: dict[str, Any]) -> Path | None:
+    params = row.get("params") or {}
+    explicit = params.get("source_returns_csv")
+    if isinstance(explicit, str) and explicit:
+        path = Path(explicit)
+    else:
+        path = Path("output/kpi") / str(row.get("kpi_name") or "") / "returns.csv"
+    return path if path.exists() else None
+
+
+# ---------------------------------------------------------------------------
+# 類似度
+# ---------------------------------------------------------------------------
+
+def jaccard(a, b) -> float | None:
+    a, b = set(a or ()), set(b or ())
+    if not a and not b:
+        return None
+    return len(a & b) / len(a | b)
+
+
+def signature_similarity(a: list[int] | None, b: list[int] | None) -> float | None:
+    if not a or not b:
+        return None
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def param_similarity(a: dict[str, Any], b: dict[str, Any]) -> float | None:
+    """共通キーは値の近さ（数値は相対差・カテゴリは一致）、片側だけのキーは 0 として平均。"""
+    keys = set(a) | set(b)
+    if not keys:
+        return None
+    total = 0.0
+    for key in keys:
+        if key not in a or key not in b:
+            continue
+        x, y = a[key], b[key]
+        if isinstance(x, float) and isinstance(y, float):
+            scale = max(abs(x), abs(y), 1e-9)
+            total += 1.0 - min(1.0, abs(x - y) / scale)
+        elif x == y:
+            total += 1.0
+    return total / len(keys)
+
+
+def period_overlap(a: list[int] | None, b: list[int] | None) -> float | None:
+    if not a or not b:
+        return None
+    inter = min(a[1], b[1]) - max(a[0], b[0]) + 1
+    union = max(a[1], b[1]) - min(a[0], b[0]) + 1
+    return max(0, inter) / union
+
+
+def similarity(probe: dict[str, Any], entry: dict[str, Any], signatures: dict[str, Any]) -> dict[str, Any]:
+    """加重類似度と成分。欠けた成分（どちらかに無い）は重みから外す。"""
+    components = {
+        "signals": signature_similarity(probe.get("signature"), signatures.get(entry.get("population") or "")),
+        "params": param_similarity(probe["params"], entry["params"]),
+        "tokens": jaccard(probe["tokens"], entry["tokens"]),
+        "period": period_overlap(probe.get("period"), entry.get("period")),
+    }
+    present = {k: v for k, v in components.items() if v is not None}
+    weight = sum(WEIGHTS[k] for k in present)
+    score = sum(WEIGHTS[k] * v for k, v in present.items()) / weight if weight else 0.0
+    return {"score": round(score, 4), "components": {k: round(v, 4) for k, v in present.items()}}
+
+
+# ---------------------------------------------------------------------------
+# 索引
+# ---------------------------------------------------------------------------
+
+def _empty_index() -> dict[str, Any]:
+    return {"version": INDEX_VERSION, "offset": 0, "prefix_sha256": hashlib.sha256(b"").hexdigest(),
+            "lines": 0, "entries": [], "populations": {}}
+
+
+def load_index(path: Path = INDEX_PATH) -> dict[str, Any]:
+    try:
+        with path.open(encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return _empty_index()
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return _empty_index()
+    return index
+
+
+def save_index(index: dict[str, Any], path: Path = INDEX_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def entry_for_row(row: dict[str, Any], line_no: int) -> dict[str, Any]:
+    population = population_path_for(row)
+    return {
+        "run_id": row.get("run_id") or row.get("trial_id") or f"line{line_no}",
+        "kpi_name": row.get("kpi_name"),
+        "line": line_no,
+        "tokens": row_tokens(row.get("kpi_name") or ""),
+        "params": param_features(row.get("params")),
+        "period": period_range(row.get("period")),
+        "population": str(population) if population else None,
+        "verdict": row.get("verdict"),
+    }
+
+
+def _refresh_populations(index: dict[str, Any]) -> int:
+    """参照される母集団 CSV の署名を、mtime/サイズが変わった分だけ作り直す。読んだ件数を返す。"""
+    pops = index["populations"]
+    wanted = {e["population"] for e in index["entries"] if e.get("population")}
+    for stale in set(pops) - wanted:
+        del pops[stale]
+    read = 0
+    for p in sorted(wanted):
+        path = Path(p)
+        try:
+            st = path.stat()
+        except OSError:
+            pops.pop(p, None)
+            continue
+        old = pops.get(p)
+        if old and old.get("mtime_ns") == st.st_mtime_ns and old.get("size") == st.st_size:
+            continue
+        items = read_signal_population(path)
+        pops[p] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "n": len(items),
+                   "signature": minhash(items)}
+        read += 1
+    return read
+
+
+def update_index(index: dict[str, Any], trials_path: Path = TRIALS_JSONL) -> dict[str, int]:
+    """trials.jsonl の追記分だけを索引に足す。先頭側が変わっていたら作り直す。
+
+    Returns:
+        {"parsed": 解析した行数, "rebuilt": 作り直したら 1, "populations_read": 読んだ母集団 CSV 数}
+    """
+    content = trials_path.read_bytes()
+    offset = int(index.get("offset", 0))
+    rebuilt = 0
+    if offset > len(content) or hashlib.sha256(content[:offset]).hexdigest() != index.get("prefix_sha256"):
+        index.clear()
+        index.update(_empty_index())
+        offset, rebuilt = 0, 1
+    # 書きかけの最終行（改行なし）は次回に回す
+    end = content.rfind(b"\n") + 1
+    if end < offset:
+        end = offset
+    parsed = 0
+    line_no = int(index.get("lines", 0))
+    for raw in content[offset:end].splitlines():
+        line_no += 1
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError:
+            continue
+        if not isinstance(row, dict) or not row.get("kpi_name"):
+            continue
+        index["entries"].append(entry_for_row(row, line_no))
+        parsed += 1
+    index["offset"] = end
+    index["prefix_sha256"] = hashlib.sha256(content[:end]).hexdigest()
+    index["lines"] = line_no
+    return {"parsed": parsed, "rebuilt": rebuilt, "populations_read": _refresh_populations(index)}
+
+
+class SimilarityIndex:
+    """照合用のメモリ上の索引（LSH バケット・語の転置索引・family 別）。"""
+
+    def __init__(self, index: dict[str, Any]):
+        self.entries = index["entries"]
+        self.signatures = {p: v.get("signature") for p, v in index["populations"].items()}
+        self.buckets: dict[tuple, list[int]] = {}
+        self.by_token: dict[str, list[int]] = {}
+        for i, e in enumerate(self.entries):
+            sig = self.signatures.get(e.get("population") or "")
+            if sig:
+                for band in _bands(sig):
+                    self.buckets.setdefault(band, []).append(i)
+            for t in e["tokens"]:
+                self.by_token.setdefault(t, []).append(i)
+
+    def candidates(self, probe: dict[str, Any]) -> set[int]:
+        out: set[int] = set()
+        if probe.get("signature"):
+            for band in _bands(probe["signature"]):
+                out.update(self.buckets.get(band, ()))
+        for t in probe["tokens"]:
+            out.update(self.by_token.get(t, ()))
+        if not out:
+            out = set(range(len(self.entries)))
+        return out
+
+    def query(self, probe: dict[str, Any], top: int = 10, min_score: float = 0.3,
+              exclude_name: str | None = None) -> list[dict[str, Any]]:
+        """kpi_name ごとに最も近い1行を、類似度の高い順に返す。"""
+        best: dict[str, dict[str, Any]] = {}
+        for i in self.candidates(probe):
+            e = self.entries[i]
+            if exclude_name and e["kpi_name"] == exclude_name:
+                continue
+            sim = similarity(probe, e, self.signatures)
+            if sim["score"] < min_score:
+                continue
+            cur = best.get(e["kpi_name"])
+            if cur is None or sim["score"] > cur["score"]:
+                best[e["kpi_name"]] = {"kpi_name": e["kpi_name"], "run_id": e["run_id"],
+                                       "line": e["line"], "verdict": e.get("verdict"), **sim}
+        return sorted(best.values(), key=lambda r: (-r["score"], r["line"]))[:top]
+
+
+def _bands(signature: list[int]) -> list[tuple]:
+    return [(b, struct.pack(f">{LSH_ROWS}Q", *signature[b * LSH_ROWS:(b + 1) * LSH_ROWS]))
+            for b in range(LSH_BANDS)]
+
+
+def make_probe(kpi_name: str, family: str | None = None, params: dict[str, Any] | None = None,
+               period: dict[str, Any] | None = None, signals: set[str] | None = None) -> dict[str, Any]:
+    """照合する新しい KPI 案を trials.jsonl の行と同じ特徴にする。"""
+    return {
+        "tokens": row_tokens(kpi_name, family),
+        "params": param_features(params),
+        "period": period_range(period),
+        "signature": minhash(signals) if signals else None,
+    }
+
+
+def probe_from_entry(entry: dict[str, Any], signatures: dict[str, Any]) -> dict[str, Any]:
+    return {"tokens": entry["tokens"], "params": entry["params"], "period": entry["period"],
+            "signature": signatures.get(entry.get("population") or "")}
+
+
+def refresh(trials_path: Path = TRIALS_JSONL, index_path: Path = INDEX_PATH) -> tuple[dict[str, Any], dict[str, int]]:
+    """索引を読み、追記分を足して保存する（build_trial_fingerprints からも呼ぶ）。"""
+    index = load_index(index_path)
+    stats = update_index(index, trials_path)
+    if stats["parsed"] or stats["rebuilt"] or stats["populations_read"]:
+        save_index(index, index_path)
+    return index, stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="既試行の近傍検索索引")
+    parser.add_argument("--trials", type=Path, default=TRIALS_JSONL)
+    parser.add_argument("--index", type=Path, default=INDEX_PATH)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("update", help="trials.jsonl の追記分を索引に足す")
+    q = sub.add_parser("query", help="類似試行を引く")
+    q.add_argument("--like", help="既存の kpi_name（最後の行）を問い合わせに使う")
+    q.add_argument("--name", help="新しい KPI 案の名前")
+    q.add_argument("--family", help="family（FAMILY_KEYWORDS のキー）")
+    q.add_argument("--params", default="{}", help="パラメータ（JSON）")
+    q.add_argument("--period", help="検証期間 YYYY-MM:YYYY-MM")
+    q.add_argument("--signals", type=Path, help="シグナル母集団 CSV（signal_date, code 列）")
+    q.add_argument("--top", type=int, default=10)
+    q.add_argument("--min-score", type=float, default=0.3)
+    q.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if not args.trials.exists():
+        raise SystemExit(f"trials.jsonlが見つかりません: {args.trials}")
+    index, stats = refresh(args.trials, args.index)
+    if args.cmd == "update":
+        print(f"索引: {args.index}（{len(index['entries'])} 試行・追記解析 {stats['parsed']} 行・"
+              f"作り直し {stats['rebuilt']}・母集団読込 {stats['populations_read']}）")
+        return 0
+
+    t0 = time.perf_counter()
+    sim = SimilarityIndex(index)
+    if args.like:
+        rows = [e for e in index["entries"] if e["kpi_name"] == args.like]
+        if not rows:
+            raise SystemExit(f"kpi_name が索引にありません: {args.like}")
+        probe = probe_from_entry(rows[-1], sim.signatures)
+        exclude = args.like
+    else:
+        if not args.name:
+            raise SystemExit("--like か --name が必要です")
+        period = None
+        if args.period:
+            start, _, end = args.period.partition(":")
+            period = {"start": start, "end": end}
+        signals = read_signal_population(args.signals) if args.signals else None
+        probe = make_probe(args.name, args.family, json.loads(args.params), period, signals)
+        exclude = None
+    results = sim.query(probe, top=args.top, min_score=args.min_score, exclude_name=exclude)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    if args.json:
+        json.dump({"elapsed_ms": round(elapsed_ms, 2), "results": results}, sys.stdout,
+                  ensure_ascii=False, indent=2)
+        print()
+        return 0
+    print(f"類似試行 {len(results)} 件（{len(index['entries'])} 試行から {elapsed_ms:.1f}ms）")
+    for r in results:
+        comps = " ".join(f"{k}={v:.2f}" for k, v in r["components"].items())
+        print(f"  {r['score']:.3f}  {r['kpi_name']}  [{r['verdict']}]  line {r['line']}  ({comps})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
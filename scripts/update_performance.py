@@ -488,7 +488,7 @@ def main():
     args = parser.parse_args()
 
     store = RecommendationStore(base_dir=args.output_dir)
-    extractor = TickerExtractor()
+    extractor = TickerExtractor(include_master=True)
     fetcher = PriceFetcher(cache_file=args.price_cache)
 
     if args.mode in ("register", "full"):
@@ -37,7 +37,12 @@ Usage:
     python3 scripts/us_price_fetch.py --tickers AAPL,MSFT
     python3 scripts/us_price_fetch.py --tickers-file config/us_universe_seed.json
     python3 scripts/us_price_fetch.py --provider yahoo --limit 5
+    python3 scripts/us_price_fetch.py --full --workers 1
     python3 scripts/us_price_fetch.py --status
+
+既存 CSV がある銘柄は既定で差分取得（保存済み最終日の少し前から取り直して末尾に足す）。
+provider ごとに送信間隔を守りつつ銘柄は並行に回し、条件付き GET の 304 と差分なしの応答は
+ファイルを書き換えずに unchanged で終える（2026-10-19）。
 """
 from __future__ import annotations
 
@@ -49,11 +54,13 @@ import io
 import json
 import os
 import sys
+import threading
 import time
 import urllib.error
 import urllib.parse
 import urllib.request
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -61,6 +68,8 @@ PROJECT_ROOT = Path(__file__).parent.parent
 DATA_ROOT = PROJECT_ROOT / "data" / "us"
 DEFAULT_OUTDIR = DATA_ROOT / "prices"
 RECEIPTS_PATH = DATA_ROOT / "receipts.jsonl"
+# 条件付き GET の検証子（ETag / Last-Modified）を銘柄ごとに持つ。消えても全件取り直すだけ
+FETCH_STATE_PATH = DATA_ROOT / "fetch_state.json"
 DEFAULT_UNIVERSE = PROJECT_ROOT / "config" / "us_universe_seed.json"
 
 JST = datetime.timezone(datetime.timedelta(hours=9))
@@ -70,13 +79,20 @@ TIMEOUT_SECONDS = 30
 REQUEST_INTERVAL_SECONDS = 1.0
 SERVER_ERROR_WAIT_SECONDS = 5
 SERVER_ERROR_MAX_RETRIES = 2
+# 並行数の既定。送信間隔は provider ごとに守るので、並行で稼げるのは応答待ちと provider 間の重なり
+DEFAULT_WORKERS = 4
+# 差分取得で保存済み最終日の何日前から取り直すか。重なった行を突合して遡及改訂（分割・配当の
+# 調整やり直しは過去の行ごと変わる）を検出したら全期間を取り直す。暦日 7 日＝概ね 5 取引日
+INCREMENTAL_OVERLAP_DAYS = 7
 
 USER_AGENT = "influx-us-tier1/0.1 (research; contact via repo owner)"
 
 STOOQ_URL = "https://stooq.com/q/d/l/?s={symbol}&i=d"
+# 差分取得時に STOOQ_URL へ足す期間指定（YYYYMMDD）
+STOOQ_RANGE_PARAMS = "&d1={d1}&d2={d2}"
 YAHOO_URL = (
     "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-    "?period1=0&period2=9999999999&interval=1d&events=div%2Csplit"
+    "?period1={period1}&period2=9999999999&interval=1d&events=div%2Csplit"
 )
 
 CSV_HEADER = ["date", "open", "high", "low", "close", "adj_close", "volume", "provider"]
@@ -103,41 +119,94 @@ class ProviderError(Exception):
     """提供元からデータを取得できなかった（HTTP エラー・空応答・パース失敗）。"""
 
 
+class NotModified(Exception):
+    """条件付き GET に 304 が返った（前回保存した内容から変わっていない）。"""
+
+
 def now_jst() -> datetime.datetime:
     """現在時刻を JST で返す（zoneinfo 非依存、固定オフセットのみ）。"""
     return datetime.datetime.now(JST)
 
 
-def http_get(url: str) -> Tuple[bytes, int]:
-    """URL を GET し、(body, status) を返す。成功後は必ず自制インターバルを置く。
+class ProviderPacer:
+    """provider ごとの送信間隔（REQUEST_INTERVAL_SECONDS）を全スレッドで共有する。
+
+    枠は呼び出し順に 1 つずつ払い出す（x_metrics_lib._RateLimiter と同じ方式）。provider が
+    違えば枠も別なので、stooq と yahoo への要求は互いを待たずに並行して進む。
+    """
+
+    def __init__(self) -> None:
+        self._next = 0.0
+        self._lock = threading.Lock()
 
-    5xx・接続エラーは SERVER_ERROR_WAIT_SECONDS 秒待って最大 SERVER_ERROR_MAX_RETRIES 回再試行。
-    4xx は即 ProviderError（銘柄が存在しない等、再試行しても直らないため）。
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + REQUEST_INTERVAL_SECONDS
+        if slot > now:
+            time.sleep(slot - now)
+
+    def defer(self, seconds: float) -> None:
+        """provider 全体を seconds 秒止める（5xx の待機は同じ provider を叩く全スレッドが守る）。"""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+def http_get(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    pacer: Optional[ProviderPacer] = None,
+) -> Tuple[bytes, int, Dict[str, str]]:
+    """URL を GET し、(body, status, レスポンスヘッダ) を返す。
+
+    pacer を渡すと送信前にその provider の枠を待つ。渡さなければ従来どおり各応答の後に
+    自制インターバルを置く。5xx・接続エラーは SERVER_ERROR_WAIT_SECONDS 秒待って最大
+    SERVER_ERROR_MAX_RETRIES 回再試行。4xx は即 ProviderError（銘柄が存在しない等、
+    再試行しても直らないため）。304（条件付き GET で変化なし）は本文なしでそのまま返す。
 
     Args:
         url: 取得先 URL。
+        headers: 追加の要求ヘッダ（If-None-Match / If-Modified-Since 等）。
+        pacer: provider ごとの送信間隔。
 
     Returns:
-        (レスポンスボディ, HTTP ステータスコード)。
+        (レスポンスボディ, HTTP ステータスコード, レスポンスヘッダ)。
 
     Raises:
         ProviderError: リトライ上限に達した、または 4xx が返った場合。
     """
+
+    def pause(seconds: float) -> None:
+        if pacer is not None:
+            pacer.defer(seconds)
+        else:
+            time.sleep(seconds)
+
     retries = 0
     while True:
+        if pacer is not None:
+            pacer.wait()
         try:
-            req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+            req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT, **(headers or {})})
             with urllib.request.urlopen(req, timeout=TIMEOUT_SECONDS) as resp:
                 body = resp.read()
                 status = resp.status
-            time.sleep(REQUEST_INTERVAL_SECONDS)
-            return body, status
+                resp_headers = dict(resp.headers.items())
+            if pacer is None:
+                time.sleep(REQUEST_INTERVAL_SECONDS)
+            return body, status, resp_headers
         except urllib.error.HTTPError as e:
+            if e.code == 304:
+                if pacer is None:
+                    time.sleep(REQUEST_INTERVAL_SECONDS)
+                return b"", 304, dict(e.headers.items()) if e.headers else {}
             try:
                 detail = e.read()[:200].decode("utf-8", errors="replace")
             except Exception:  # noqa: BLE001 — 診断用の best effort
                 detail = ""
-            time.sleep(REQUEST_INTERVAL_SECONDS)
+            if pacer is None:
+                time.sleep(REQUEST_INTERVAL_SECONDS)
             if e.code >= 500:
                 retries += 1
                 if retries > SERVER_ERROR_MAX_RETRIES:
@@ -147,7 +216,7 @@ def http_get(url: str) -> Tuple[bytes, int]:
                     f"({retries}/{SERVER_ERROR_MAX_RETRIES})",
                     file=sys.stderr,
                 )
-                time.sleep(SERVER_ERROR_WAIT_SECONDS)
+                pause(SERVER_ERROR_WAIT_SECONDS)
                 continue
             raise ProviderError(f"HTTP {e.code}: {detail}") from None
         except (urllib.error.URLError, TimeoutError, OSError) as e:
@@ -159,10 +228,35 @@ def http_get(url: str) -> Tuple[bytes, int]:
                 f"({retries}/{SERVER_ERROR_MAX_RETRIES})",
                 file=sys.stderr,
             )
-            time.sleep(SERVER_ERROR_WAIT_SECONDS)
+            pause(SERVER_ERROR_WAIT_SECONDS)
             continue
 
 
+def _conditional_get(
+    url: str, validators: Optional[Dict[str, str]], pacer: Optional[ProviderPacer],
+) -> Tuple[bytes, Dict[str, str]]:
+    """前回と同じ URL なら保存済みの検証子で条件付き GET する。
+
+    Returns:
+        (レスポンスボディ, 今回の検証子 {url, etag, last_modified})。
+
+    Raises:
+        NotModified: 304 が返った場合。
+        ProviderError: http_get に同じ。
+    """
+    headers: Dict[str, str] = {}
+    if validators and validators.get("url") == url:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    body, status, resp_headers = http_get(url, headers=headers, pacer=pacer)
+    if status == 304:
+        raise NotModified(url)
+    lowered = {k.lower(): v for k, v in resp_headers.items()}
+    return body, {"url": url, "etag": lowered.get("etag", ""), "last_modified": lowered.get("last-modified", "")}
+
+
 # --- provider: stooq ---------------------------------------------------------
 
 
@@ -171,21 +265,32 @@ def stooq_symbol(ticker: str) -> str:
     return ticker.strip().lower().replace(".", "-") + ".us"
 
 
-def fetch_stooq(ticker: str) -> Tuple[List[Dict[str, str]], str]:
+def fetch_stooq(
+    ticker: str,
+    since: Optional[datetime.date] = None,
+    validators: Optional[Dict[str, str]] = None,
+    pacer: Optional[ProviderPacer] = None,
+) -> Tuple[List[Dict[str, str]], str, Dict[str, str]]:
     """Stooq の日次 CSV を取得して Canonical 行リストに正規化する。
 
     Args:
         ticker: 大文字ティッカー（例 "AAPL"）。
+        since: 指定するとこの日以降だけを取得する（差分取得）。
+        validators: 前回の検証子（`_conditional_get`）。
+        pacer: provider の送信間隔。
 
     Returns:
-        (行リスト, 使用した URL)。行は CSV_HEADER のキーを持つ dict。
+        (行リスト, 使用した URL, 今回の検証子)。行は CSV_HEADER のキーを持つ dict。
 
     Raises:
+        NotModified: 条件付き GET に 304 が返った場合。
         ProviderChallenge: ボット検証ゲートの HTML が返った場合（迂回しない）。
         ProviderError: 取得・パースに失敗した場合。
     """
     url = STOOQ_URL.format(symbol=urllib.parse.quote(stooq_symbol(ticker)))
-    body, _ = http_get(url)
+    if since is not None:
+        url += STOOQ_RANGE_PARAMS.format(d1=since.strftime("%Y%m%d"), d2=now_jst().strftime("%Y%m%d"))
+    body, received = _conditional_get(url, validators, pacer)
     text = body.decode("utf-8", errors="replace").strip()
 
     lowered = text[:2000].lower()
@@ -216,7 +321,7 @@ def fetch_stooq(ticker: str) -> Tuple[List[Dict[str, str]], str]:
         })
     if not rows:
         raise ProviderError("Stooq が 0 行を返しました")
-    return rows, url
+    return rows, url, received
 
 
 # --- provider: yahoo ---------------------------------------------------------
@@ -231,24 +336,37 @@ def _fmt(value: Optional[float]) -> str:
     return f"{float(value):.6f}".rstrip("0").rstrip(".")
 
 
-def fetch_yahoo(ticker: str) -> Tuple[List[Dict[str, str]], str]:
-    """Yahoo Finance chart API（v8・キー不要）から全期間の日次バーを取得する。
+def fetch_yahoo(
+    ticker: str,
+    since: Optional[datetime.date] = None,
+    validators: Optional[Dict[str, str]] = None,
+    pacer: Optional[ProviderPacer] = None,
+) -> Tuple[List[Dict[str, str]], str, Dict[str, str]]:
+    """Yahoo Finance chart API（v8・キー不要）から日次バーを取得する（既定は全期間）。
 
     close は提供元仕様で「分割調整済み・配当未調整」、adjclose は「分割＋配当調整済み」。
     どちらも遡及改訂されうる（PIT ではない）点は docs/us-tier1-price-foundation.md に明記。
 
     Args:
         ticker: 大文字ティッカー（例 "AAPL"）。
+        since: 指定するとこの日（UTC 0 時）以降だけを取得する（差分取得）。
+        validators: 前回の検証子（`_conditional_get`）。
+        pacer: provider の送信間隔。
 
     Returns:
-        (行リスト, 使用した URL)。
+        (行リスト, 使用した URL, 今回の検証子)。
 
     Raises:
+        NotModified: 条件付き GET に 304 が返った場合。
         ProviderChallenge: HTML のボット検証ゲートが返った場合。
         ProviderError: 取得・パースに失敗した場合。
     """
-    url = YAHOO_URL.format(symbol=urllib.parse.quote(ticker.strip().upper()))
-    body, _ = http_get(url)
+    period1 = 0
+    if since is not None:
+        period1 = int(datetime.datetime(since.year, since.month, since.day,
+                                        tzinfo=datetime.timezone.utc).timestamp())
+    url = YAHOO_URL.format(symbol=urllib.parse.quote(ticker.strip().upper()), period1=period1)
+    body, received = _conditional_get(url, validators, pacer)
     text = body.decode("utf-8", errors="replace")
     if text.lstrip().startswith("<"):
         raise ProviderChallenge("Yahoo が HTML（ボット検証ゲートの可能性）を返しました")
@@ -296,7 +414,7 @@ def fetch_yahoo(ticker: str) -> Tuple[List[Dict[str, str]], str]:
         })
     if not rows:
         raise ProviderError("有効な日次バーが 0 行")
-    return rows, url
+    return rows, url, received
 
 
 PROVIDERS = {"stooq": fetch_stooq, "yahoo": fetch_yahoo}
@@ -318,9 +436,10 @@ def rows_to_csv_bytes(rows: List[Dict[str, str]]) -> bytes:
 
 
 def read_existing_summary(path: Path) -> Optional[Dict[str, object]]:
-    """既存 CSV の {rows, first_date, last_date, sha256, by_date} を返す。
+    """既存 CSV の {rows, first_date, last_date, provider, sha256, by_date} を返す。
 
-    by_date は {日付: 行dict} で、冪等判定（既存 vs 新規の突合）に使う。
+    by_date は {日付: 行dict} で、冪等判定（既存 vs 新規の突合）に使う。provider は最終行の出所
+    （差分取得はこの provider に問い合わせる）。
     ファイルが無い・空・壊れている場合は None（＝新規取得扱い）。
     """
     if not path.exists():
@@ -338,6 +457,7 @@ def read_existing_summary(path: Path) -> Optional[Dict[str, object]]:
         "rows": len(rows),
         "first_date": dates[0],
         "last_date": dates[-1],
+        "provider": next(r for r in rows if r["date"] == dates[-1]).get("provider") or "",
         "sha256": hashlib.sha256(content).hexdigest(),
         "by_date": {r["date"]: r for r in rows},
     }
@@ -392,6 +512,43 @@ def has_material_change(existing: Dict[str, object], new_rows: List[Dict[str, st
     return False
 
 
+def merge_increment(
+    existing: Dict[str, object], new_rows: List[Dict[str, str]],
+) -> Optional[Tuple[List[Dict[str, str]], bool]]:
+    """差分取得した行を既存 CSV の行に足す。
+
+    保存済み最終日より後の行は追加し、最終日の行は値が変わっていれば差し替える（取引時間中に
+    取った未確定の足を確定値で上書きするため）。それより前の重なり行は既存の行をそのまま残す
+    （提供元の float ゆらぎでバイトが動かないように）。重なり行が REVISION_RTOL を超えて
+    変わっている、または既存に無い過去日が現れた場合は遡及改訂とみなして None を返す
+    （呼び出し側が全期間を取り直す）。
+
+    Args:
+        existing: `read_existing_summary` の戻り値。
+        new_rows: 差分取得した Canonical 行リスト。
+
+    Returns:
+        (マージ後の行リスト, 既存から変わったか)。遡及改訂なら None。
+    """
+    by_date: Dict[str, Dict[str, str]] = existing["by_date"]  # type: ignore[assignment]
+    last_date = existing["last_date"]
+    merged = dict(by_date)
+    changed = False
+    for row in new_rows:
+        old_row = by_date.get(row["date"])
+        if old_row is None:
+            if row["date"] < last_date:  # type: ignore[operator]
+                return None
+            merged[row["date"]] = row
+            changed = True
+        elif any(_values_differ(old_row.get(f, ""), row.get(f, "")) for f in CSV_HEADER[1:]):
+            if row["date"] != last_date:
+                return None
+            merged[row["date"]] = row
+            changed = True
+    return list(merged.values()), changed
+
+
 def write_csv_atomic(path: Path, content: bytes) -> None:
     """同一ディレクトリの .tmp に書いてから os.replace でアトミックに配置する。"""
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -402,28 +559,177 @@ def write_csv_atomic(path: Path, content: bytes) -> None:
     os.replace(tmp_path, path)
 
 
+_RECEIPTS_LOCK = threading.Lock()
+
+
 def append_receipt(record: Dict[str, object]) -> None:
     """receipts.jsonl に 1 行追記。書き込み失敗は本処理を止めず警告のみ（監視が本処理を壊さない原則）。"""
     try:
-        RECEIPTS_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with open(RECEIPTS_PATH, "a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        with _RECEIPTS_LOCK:
+            RECEIPTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(RECEIPTS_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
     except OSError as e:
         print(f"WARN: receipts 書き込み失敗: {e}", file=sys.stderr)
 
 
+def _display_path(path: Path) -> str:
+    try:
+        return str(path.relative_to(PROJECT_ROOT))
+    except ValueError:
+        return str(path)
+
+
+class FetchSession:
+    """1 回の実行で銘柄をまたいで共有する状態。
+
+    - provider ごとの送信間隔（ProviderPacer）
+    - ボット検証ゲートを返した provider（その実行では以後問い合わせない）
+    - 条件付き GET の検証子（FETCH_STATE_PATH に保存して次回に持ち越す）
+    """
+
+    def __init__(self, state_path: Optional[Path] = None) -> None:
+        self.state_path = state_path
+        self.pacers = {name: ProviderPacer() for name in PROVIDERS}
+        self.challenged: set = set()
+        self.validators: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        if state_path is not None and state_path.exists():
+            try:
+                data = json.loads(state_path.read_text(encoding="utf-8"))
+                self.validators = dict(data.get("validators") or {})
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"WARN: fetch_state を読めません（検証子なしで続行）: {e}", file=sys.stderr)
+
+    def mark_challenged(self, provider: str) -> None:
+        with self._lock:
+            self.challenged.add(provider)
+
+    def validators_for(self, ticker: str, provider: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            entry = self.validators.get(ticker)
+        return entry if entry and entry.get("provider") == provider else None
+
+    def remember(self, ticker: str, provider: str, validators: Dict[str, str]) -> None:
+        """ファイルが検証子どおりの内容になった（保存・unchanged）ときだけ呼ぶ。"""
+        with self._lock:
+            if validators.get("etag") or validators.get("last_modified"):
+                self.validators[ticker] = {"provider": provider, **validators}
+            else:
+                self.validators.pop(ticker, None)
+
+    def forget(self, ticker: str) -> None:
+        with self._lock:
+            self.validators.pop(ticker, None)
+
+    def save(self) -> None:
+        if self.state_path is None:
+            return
+        with self._lock:
+            payload = {"validators": dict(sorted(self.validators.items()))}
+        try:
+            write_csv_atomic(self.state_path, json.dumps(payload, ensure_ascii=False, indent=1).encode("utf-8"))
+        except OSError as e:
+            print(f"WARN: fetch_state 書き込み失敗: {e}", file=sys.stderr)
+
+
+def _refresh_incremental(
+    ticker: str, path: Path, existing: Dict[str, object], providers: List[str],
+    run_id: str, session: FetchSession,
+) -> Optional[str]:
+    """保存済み最終日の INCREMENTAL_OVERLAP_DAYS 日前から取り直して CSV の末尾に足す。
+
+    問い合わせるのは CSV の最終行を出した provider だけ（提供元で列の意味が違うため混ぜない）。
+
+    Returns:
+        "appended" | "unchanged"。差分取得できなかった（provider が使えない・取得失敗・
+        遡及改訂を検出）場合は None で、呼び出し側が全期間取得に切り替える。
+    """
+    provider = str(existing["provider"])
+    if provider not in providers or provider in session.challenged:
+        return None
+    last = datetime.date.fromisoformat(str(existing["last_date"]))
+    since = last - datetime.timedelta(days=INCREMENTAL_OVERLAP_DAYS)
+    base = {"run_id": run_id, "ticker": ticker, "provider": provider, "mode": "incremental"}
+    try:
+        rows, url, validators = PROVIDERS[provider](
+            ticker, since=since, validators=session.validators_for(ticker, provider),
+            pacer=session.pacers[provider],
+        )
+    except NotModified as e:
+        append_receipt({
+            **base, "ts": now_jst().isoformat(), "url": str(e), "status": "unchanged",
+            "rows": existing["rows"], "first_date": existing["first_date"],
+            "last_date": existing["last_date"], "sha256": existing["sha256"],
+            "bytes": None, "error": None,
+        })
+        print(f"[{ticker}] unchanged（304 / 最終 {existing['last_date']} / {provider}）")
+        return "unchanged"
+    except ProviderChallenge as e:
+        session.mark_challenged(provider)
+        append_receipt({
+            **base, "ts": now_jst().isoformat(), "url": None, "status": "provider_challenge",
+            "rows": None, "first_date": None, "last_date": None,
+            "sha256": None, "bytes": None, "error": str(e),
+        })
+        print(f"WARN: [{ticker}] {provider}: {e}", file=sys.stderr)
+        return None
+    except ProviderError as e:
+        print(f"WARN: [{ticker}] {provider} 差分取得失敗（全期間取得に切替）: {e}", file=sys.stderr)
+        return None
+
+    merged = merge_increment(existing, rows)
+    if merged is None:
+        session.forget(ticker)
+        print(f"[{ticker}] 重なり区間に遡及改訂を検出。全期間を取り直します（{provider}）")
+        return None
+    merged_rows, changed = merged
+    if not changed:
+        session.remember(ticker, provider, validators)
+        append_receipt({
+            **base, "ts": now_jst().isoformat(), "url": url, "status": "unchanged",
+            "rows": existing["rows"], "first_date": existing["first_date"],
+            "last_date": existing["last_date"], "sha256": existing["sha256"],
+            "bytes": None, "error": None,
+        })
+        print(f"[{ticker}] unchanged（差分なし / 最終 {existing['last_date']} / {provider}）")
+        return "unchanged"
+
+    content = rows_to_csv_bytes(merged_rows)
+    digest = hashlib.sha256(content).hexdigest()
+    sorted_dates = sorted(r["date"] for r in merged_rows)
+    write_csv_atomic(path, content)
+    session.remember(ticker, provider, validators)
+    append_receipt({
+        **base, "ts": now_jst().isoformat(), "url": url, "status": "appended",
+        "rows": len(merged_rows), "first_date": sorted_dates[0], "last_date": sorted_dates[-1],
+        "sha256": digest, "bytes": len(content), "fetched_rows": len(rows), "error": None,
+    })
+    print(
+        f"[{ticker}] appended: {len(merged_rows) - int(existing['rows'])} 行追加 "
+        f"最終 {sorted_dates[-1]} ({provider}) -> {_display_path(path)}"
+    )
+    return "appended"
+
+
 def fetch_one(
     ticker: str, outdir: Path, providers: List[str], run_id: str,
     skip_existing: bool, force: bool = False,
+    incremental: bool = False, session: Optional[FetchSession] = None,
 ) -> str:
     """1 銘柄を取得・保存し、receipt を残す。戻り値は status 文字列。
 
     冪等契約:
       - `--skip-existing` 指定時、既存ファイルがあればネットワークアクセスもせずスキップ。
-      - 既定では取得したうえで既存 CSV と突合し、**行数・初日・最終日が同じで数値も
-        実質同一なら書き込まない**（status="unchanged"）。差分があるときだけアトミックに
+      - incremental=True で既存 CSV があれば、最終日の少し前からの差分だけを取得して末尾に
+        足す（`merge_increment`）。足す行が無ければ書き込まない（status="unchanged"）。
+        差分取得できない・遡及改訂を検出した場合は以下の全期間取得に切り替える。
+      - 全期間取得では既存 CSV と突合し、**行数・初日・最終日が同じで数値も実質同一なら
+        書き込まない**（status="unchanged"）。差分があるときだけアトミックに
         置き換えるため、何度再実行してもファイルの mtime は無意味に動かない。
-      - `--force` 指定時は突合結果によらず必ず書き直す。
+      - 前回と同じ URL には条件付き GET を送り、304 なら本文を受け取らずに unchanged。
+      - `--force` 指定時は突合結果・検証子によらず全期間を取得して必ず書き直す。
+      - ボット検証ゲートを返した provider は session 内で以後問い合わせない。
 
     Args:
         ticker: 大文字ティッカー。
@@ -432,13 +738,17 @@ def fetch_one(
         run_id: 実行 ID（receipt の突合用）。
         skip_existing: True なら既存ファイルがある銘柄をネットワーク前にスキップ。
         force: True なら差分の有無によらず書き直す。
+        incremental: True なら既存 CSV がある銘柄を差分取得する。
+        session: 実行中に共有する状態。省略時はこの呼び出しだけの使い捨て。
 
     Returns:
-        "saved" | "unchanged" | "skipped_exists" | "provider_challenge" | "error"
+        "saved" | "appended" | "unchanged" | "skipped_exists" | "provider_challenge" | "error"
     """
     path = outdir / f"{ticker}.csv"
     ts_start = now_jst()
     existing = read_existing_summary(path)
+    if session is None:
+        session = FetchSession()
 
     if skip_existing and existing is not None:
         append_receipt({
@@ -450,11 +760,35 @@ def fetch_one(
         print(f"[{ticker}] skipped_exists（{existing['rows']} 行 / 最終 {existing['last_date']}）")
         return "skipped_exists"
 
+    if incremental and existing is not None and not force:
+        status = _refresh_incremental(ticker, path, existing, providers, run_id, session)
+        if status is not None:
+            return status
+
     errors: List[str] = []
     for provider in providers:
+        if provider in session.challenged:
+            errors.append(f"{provider}: この実行で既にボット検証ゲートを返したため省略")
+            continue
+        validators = None
+        if existing is not None and not force:
+            validators = session.validators_for(ticker, provider)
         try:
-            rows, url = PROVIDERS[provider](ticker)
+            rows, url, received = PROVIDERS[provider](
+                ticker, validators=validators, pacer=session.pacers[provider],
+            )
+        except NotModified as e:
+            append_receipt({
+                "run_id": run_id, "ts": now_jst().isoformat(), "ticker": ticker,
+                "provider": provider, "url": str(e), "status": "unchanged",
+                "rows": existing["rows"], "first_date": existing["first_date"],  # type: ignore[index]
+                "last_date": existing["last_date"], "sha256": existing["sha256"],  # type: ignore[index]
+                "bytes": None, "error": None,
+            })
+            print(f"[{ticker}] unchanged（304 / {provider}）")
+            return "unchanged"
         except ProviderChallenge as e:
+            session.mark_challenged(provider)
             errors.append(f"{provider}: challenge: {e}")
             append_receipt({
                 "run_id": run_id, "ts": now_jst().isoformat(), "ticker": ticker,
@@ -476,6 +810,7 @@ def fetch_one(
         first_date, last_date = sorted_dates[0], sorted_dates[-1]
 
         if existing is not None and not force and not has_material_change(existing, rows):
+            session.remember(ticker, provider, received)
             append_receipt({
                 "run_id": run_id, "ts": now_jst().isoformat(), "ticker": ticker,
                 "provider": provider, "url": url, "status": "unchanged",
@@ -489,6 +824,7 @@ def fetch_one(
             return "unchanged"
 
         write_csv_atomic(path, content)
+        session.remember(ticker, provider, received)
         append_receipt({
             "run_id": run_id, "ts": now_jst().isoformat(), "ticker": ticker,
             "provider": provider, "url": url, "status": "saved",
@@ -497,7 +833,7 @@ def fetch_one(
         })
         print(
             f"[{ticker}] saved: {len(rows)} 行 {first_date}〜{last_date} "
-            f"({provider}) -> {path.relative_to(PROJECT_ROOT)}"
+            f"({provider}) -> {_display_path(path)}"
         )
         return "saved"
 
@@ -511,6 +847,47 @@ def fetch_one(
     return "error"
 
 
+def fetch_all(
+    tickers: List[str], outdir: Path, providers: List[str], run_id: str,
+    skip_existing: bool = False, force: bool = False, incremental: bool = True,
+    workers: int = DEFAULT_WORKERS, session: Optional[FetchSession] = None,
+) -> List[str]:
+    """銘柄を workers 本で並行に fetch_one し、status を tickers の順で返す。
+
+    送信間隔は provider ごとに session の ProviderPacer が守るので、並行数を上げても 1 つの
+    提供元への要求は REQUEST_INTERVAL_SECONDS より詰まらない。stooq 由来の CSV と yahoo 由来の
+    CSV の差分取得はそれぞれの provider に流れ、互いを待たない。終了時に検証子を保存する。
+    """
+    if session is None:
+        session = FetchSession(FETCH_STATE_PATH)
+    statuses: List[Optional[str]] = [None] * len(tickers)
+    done = 0
+    done_lock = threading.Lock()
+
+    def work(idx: int) -> None:
+        nonlocal done
+        ticker = tickers[idx]
+        try:
+            statuses[idx] = fetch_one(
+                ticker, outdir, providers, run_id, skip_existing, force,
+                incremental=incremental, session=session,
+            )
+        except Exception as e:  # noqa: BLE001 — 1 銘柄の想定外の失敗で他の銘柄を止めない
+            print(f"WARN: [{ticker}] 想定外の失敗: {e}", file=sys.stderr)
+            statuses[idx] = "error"
+        with done_lock:
+            done += 1
+            if done % 25 == 0 or done == len(tickers):
+                print(f"進捗: {done}/{len(tickers)} ({done / len(tickers) * 100:.1f}%)")
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tickers) or 1))) as ex:
+            list(ex.map(work, range(len(tickers))))
+    finally:
+        session.save()
+    return [s or "error" for s in statuses]
+
+
 # --- ティッカー一覧の読み込み ------------------------------------------------
 
 
@@ -602,6 +979,14 @@ def main() -> int:
         "--force", action="store_true",
         help="既存 CSV と差分が無くても書き直す（調整係数の遡及改訂を疑うときの手動リフレッシュ用）",
     )
+    parser.add_argument(
+        "--full", action="store_true",
+        help="既存 CSV があっても差分取得せず全期間を取得して突合する",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help=f"並行数（既定 {DEFAULT_WORKERS}。送信間隔は provider ごとに守る）",
+    )
     parser.add_argument("--status", action="store_true", help="取得済み状態を表示して終了")
     args = parser.parse_args()
 
@@ -644,11 +1029,11 @@ def main() -> int:
     })
 
     tally: Dict[str, int] = {}
-    for idx, ticker in enumerate(tickers, start=1):
-        status = fetch_one(ticker, outdir, providers, run_id, args.skip_existing, args.force)
+    for status in fetch_all(
+        tickers, outdir, providers, run_id, args.skip_existing, args.force,
+        incremental=not args.full, workers=args.workers,
+    ):
         tally[status] = tally.get(status, 0) + 1
-        if idx % 25 == 0 or idx == len(tickers):
-            print(f"進捗: {idx}/{len(tickers)} ({idx / len(tickers) * 100:.1f}%)")
 
     summary = " / ".join(f"{k}={v}" for k, v in sorted(tally.items()))
     print(f"[us_price_fetch] 完了: {summary}")
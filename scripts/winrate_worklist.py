@@ -127,7 +127,7 @@ def load_processed_tweet_urls(research_dir: str) -> set:
 
 def build_worklist(tweets_glob: str, research_dir: str) -> dict:
     """未抽出ツイートのワークリストを構築する。"""
-    extractor = TickerExtractor()
+    extractor = TickerExtractor(include_master=True)
     extracted_urls = load_extracted_tweet_urls(research_dir)
     processed_urls = load_processed_tweet_urls(research_dir)
     contrarian_usernames = load_contrarian_usernames()
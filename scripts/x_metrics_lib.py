@@ -22,19 +22,31 @@
 使い方:
   python3 scripts/x_metrics_lib.py <url-or-status-id> [...]   # 1行1件の JSONL を stdout へ
   from x_metrics_lib import fetch_metrics                     # ライブラリとして
+  from x_metrics_lib import fetch_metrics_many                # 数百件の一括計測（並行・経路別レート制限）
 
-標準ライブラリのみ・読み取り専用（どこにも保存しない。保存は呼び出し側の責務）。
+一括計測（2026-10-19）: 24h/72h 計測や syndication 救済で数百件を1件ずつ直列に取ると分単位かかる。
+fetch_metrics_many は有界スレッドプールで両経路を並行に取り、経路ごとに最小間隔と Retry-After
+（429/5xx の待機を全スレッドで共有）を守る。cache_dir を渡した時だけ、取得済み payload を
+TTL 付きでディスクに置く（captured_at は実際に取った時刻のまま＝キャッシュで新しく見せない）。
+一括の呼び出し元（この CLI・x_search_collect_twittora の syndication 救済）は DEFAULT_CACHE_DIR を
+渡す。期限切れのファイルは一括計測のたびに消す（ディレクトリは直近 TTL 分だけ）。
+
+標準ライブラリのみ。計測値そのものはどこにも保存しない（保存は呼び出し側の責務）。
 """
 from __future__ import annotations
 
 import json
+import os
 import re
 import sys
+import threading
 import time
 import urllib.error
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Optional
+from pathlib import Path
+from typing import Any, Iterable, Optional
 
 SYNDICATION_URL = "https://cdn.syndication.twimg.com/tweet-result?id={}&lang=ja&token=a"
 FXTWITTER_URL = "https://api.fxtwitter.com/i/status/{}"
@@ -46,7 +58,13 @@ STATUS_RE = re.compile(r"/status/(\d+)")
 MAX_RETRIES = 3
 BACKOFF_BASE = 2
 TIMEOUT = 15
-REQUEST_INTERVAL = 0.8  # CLI で連続照会する時の礼儀（既存 normalize_master_posts.py と同値）
+MAX_WORKERS = 8        # 一括計測の同時リクエスト上限（両経路合計）
+RATE_PER_SEC = 4.0     # 一括計測の経路ごとの上限（req/s）。経路が別ホストなので合計は2倍
+CACHE_TTL_SEC = 600    # 一括計測のディスクキャッシュ有効期間（計測値が古くなりすぎない範囲）
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "x_metrics_cache"
+
+# 経路名 → URL テンプレート（sources / キャッシュのディレクトリ名もこの名前）
+ENDPOINTS = {"syndication": SYNDICATION_URL, "fxtwitter": FXTWITTER_URL}
 
 METRIC_FIELDS = ("likes", "replies", "views", "bookmarks", "retweets", "quotes")
 
@@ -60,9 +78,37 @@ def status_id_of(url_or_id: str) -> Optional[str]:
     return m.group(1) if m else None
 
 
-def _get_json(url: str, errors: list) -> Optional[dict]:
-    """再試行・バックオフつき GET。失敗は errors に1行残して None。"""
+class _RateLimiter:
+    """経路ごとの最小リクエスト間隔と Retry-After による一時停止を全スレッドで共有する。"""
+
+    def __init__(self, per_sec: float):
+        self.interval = 1.0 / per_sec if per_sec > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """次の送信枠まで待つ（枠は呼び出し順に1つずつ払い出す）。"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def defer(self, seconds: float) -> None:
+        """経路全体を seconds 秒止める（429 の Retry-After は1スレッドだけでなく全員が守る）。"""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+def _get_json(url: str, errors: list, limiter: Optional[_RateLimiter] = None) -> Optional[dict]:
+    """再試行・バックオフつき GET。失敗は errors に1行残して None。
+
+    limiter を渡すと送信前に経路の枠を待ち、429/5xx の待機は経路全体の一時停止になる。
+    """
     for attempt in range(MAX_RETRIES):
+        if limiter is not None:
+            limiter.wait()
         try:
             req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
             with urllib.request.urlopen(req, timeout=TIMEOUT) as r:
@@ -76,7 +122,10 @@ def _get_json(url: str, errors: list) -> Optional[dict]:
                 retry_after = e.headers.get("Retry-After") if e.headers else None
                 if retry_after and str(retry_after).isdigit():
                     wait = max(wait, int(retry_after))
-                time.sleep(wait)
+                if limiter is not None:
+                    limiter.defer(wait)  # 次の limiter.wait() で待つ（他スレッドも同じだけ待つ）
+                else:
+                    time.sleep(wait)
                 continue
             errors.append(f"{url.split('/')[2]}: HTTP{e.code}")
             return None
@@ -156,21 +205,148 @@ def fetch_metrics(url_or_id: str) -> Optional[dict]:
     return build_record(sid, syn, fx, errors, captured_at)
 
 
+def _cache_path(cache_dir: Path, source: str, sid: str) -> Path:
+    return Path(cache_dir) / source / f"{sid}.json"
+
+
+def _cache_get(cache_dir: Optional[Path], source: str, sid: str,
+               ttl_sec: float) -> Optional[tuple[dict, str]]:
+    """TTL 内のキャッシュがあれば (payload, fetched_at) を返す。壊れた・期限切れは無いものとする。"""
+    if cache_dir is None:
+        return None
+    try:
+        entry = json.loads(_cache_path(cache_dir, source, sid).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or not isinstance(entry.get("payload"), dict) \
+            or time.time() - float(entry.get("ts", 0)) > ttl_sec:
+        return None
+    return entry.get("payload"), entry.get("fetched_at")
+
+
+def _cache_put(cache_dir: Optional[Path], source: str, sid: str, payload: dict,
+               fetched_at: str) -> None:
+    """取得成功した payload だけを置く（失敗・404 は置かない＝次回も取りに行く）。原子的に置換。"""
+    if cache_dir is None:
+        return
+    path = _cache_path(cache_dir, source, sid)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".tmp{threading.get_ident()}")
+        tmp.write_text(json.dumps({"ts": time.time(), "fetched_at": fetched_at, "payload": payload},
+                                  ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass  # キャッシュは最適化に過ぎない＝書けなくても計測は続ける
+
+
+def _cache_prune(cache_dir: Path, ttl_sec: float) -> None:
+    """更新から TTL（CACHE_TTL_SEC より短ければ CACHE_TTL_SEC）を過ぎたキャッシュを消す。"""
+    cutoff = time.time() - max(ttl_sec, CACHE_TTL_SEC)
+    for src in ENDPOINTS:
+        src_dir = Path(cache_dir) / src
+        if not src_dir.is_dir():
+            continue
+        for path in src_dir.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass  # 並行する別プロセスが先に消した等（キャッシュは最適化に過ぎない）
+
+
+def fetch_payloads_many(sids: Iterable[str], sources: Iterable[str] = tuple(ENDPOINTS), *,
+                        workers: int = MAX_WORKERS, rate_per_sec: float = RATE_PER_SEC,
+                        cache_dir: Optional[Path] = None,
+                        ttl_sec: float = CACHE_TTL_SEC) -> dict[str, dict]:
+    """複数投稿の生 payload を経路ごとに並行取得する（fetch_metrics_many の下請け）。
+
+    Args:
+        sids: status ID の列（重複は1回だけ取る）。
+        sources: 取る経路（ENDPOINTS のキー）。syndication 救済だけなら ("syndication",)。
+        workers: 同時リクエスト上限（全経路合計）。
+        rate_per_sec: 経路ごとの上限 req/s。
+        cache_dir: 指定時のみディスクキャッシュを使う。
+        ttl_sec: キャッシュ有効期間（秒）。
+
+    Returns:
+        {sid: {<source>: payload|None, "errors": [...], "fetched_at": {source: iso}}}
+    """
+    sources = tuple(sources)
+    uniq = list(dict.fromkeys(str(s) for s in sids))
+    got: dict[tuple[str, str], tuple[Optional[dict], list, Optional[str]]] = {}
+    limiters = {src: _RateLimiter(rate_per_sec) for src in sources}
+    if cache_dir is not None and uniq:
+        _cache_prune(cache_dir, ttl_sec)
+
+    def one(sid: str, src: str) -> None:
+        hit = _cache_get(cache_dir, src, sid, ttl_sec)
+        errs: list = []
+        if hit is not None:
+            payload, fetched_at = hit
+        else:
+            payload = _get_json(ENDPOINTS[src].format(sid), errs, limiters[src])
+            fetched_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            if payload is not None:
+                _cache_put(cache_dir, src, sid, payload, fetched_at)
+        got[(sid, src)] = (payload, errs, fetched_at if payload is not None else None)
+
+    # 1投稿の両経路も別タスク＝並行に取る。経路ごとの礼儀は limiter が守る
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        futs = [ex.submit(one, sid, src) for sid in uniq for src in sources]
+        for f in futs:
+            f.result()
+    # errors は完了順でなく sources の順に並べる（直列版 fetch_metrics と同じ並び）
+    out: dict[str, dict] = {}
+    for sid in uniq:
+        rec: dict = {"errors": [], "fetched_at": {}}
+        for src in sources:
+            payload, errs, fetched_at = got[(sid, src)]
+            rec[src] = payload
+            rec["errors"].extend(errs)
+            if fetched_at:
+                rec["fetched_at"][src] = fetched_at
+        out[sid] = rec
+    return out
+
+
+def fetch_metrics_many(ids: Iterable[str], *, workers: int = MAX_WORKERS,
+                       rate_per_sec: float = RATE_PER_SEC, cache_dir: Optional[Path] = None,
+                       ttl_sec: float = CACHE_TTL_SEC) -> list[Optional[dict]]:
+    """複数投稿の指標を契約形で一括取得する（入力順・ID が取れない入力は None）。
+
+    captured_at は成功した経路のうち古い方の取得時刻（キャッシュ由来でも実測時刻のまま）。
+    両経路とも落ちた投稿は呼び出し時刻。errors の並びは syndication → fxtwitter の順。
+    """
+    ids = list(ids)
+    sids = [status_id_of(x) for x in ids]
+    got = fetch_payloads_many([s for s in sids if s], workers=workers, rate_per_sec=rate_per_sec,
+                              cache_dir=cache_dir, ttl_sec=ttl_sec)
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    out: list[Optional[dict]] = []
+    for sid in sids:
+        if not sid:
+            out.append(None)
+            continue
+        g = got[sid]
+        captured_at = min(g["fetched_at"].values()) if g["fetched_at"] else now
+        out.append(build_record(sid, g["syndication"], g["fxtwitter"], g["errors"], captured_at))
+    return out
+
+
 def main(argv: list) -> int:
     if not argv:
         print("usage: x_metrics_lib.py <url-or-status-id> [...]", file=sys.stderr)
         return 2
     rc = 0
-    for i, arg in enumerate(argv):
-        rec = fetch_metrics(arg)
+    # 複数件は一括計測（経路ごとのレート制限が礼儀を担う＝固定 sleep は不要）
+    for arg, rec in zip(argv, fetch_metrics_many(argv, cache_dir=DEFAULT_CACHE_DIR)):
         if rec is None:
             print(json.dumps({"input": arg, "error": "status_id を抽出できない"},
                              ensure_ascii=False))
             rc = 1
             continue
         print(json.dumps(rec, ensure_ascii=False))
-        if i < len(argv) - 1:
-            time.sleep(REQUEST_INTERVAL)
     return rc
 
 
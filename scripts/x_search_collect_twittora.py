@@ -33,6 +33,11 @@
     build_norm_fields の判定を適用し、原文と異なれば syndication 原文で置換
     （元文は content_preview に退避・content_normalized=True）
 
+2026-10-19 GraphQL 傍受（collector.graphql_timeline・fetch_bookmarks の方式を共有化）:
+  SearchTimeline 応答から id・原文（長文は note_tweet 全文）・整数指標を直接取り、DOM は応答に
+  無かったカードだけ読む。応答由来の行は content_source="graphql"（翻訳/切断が無い）で
+  apply_syndication_pass の正規化対象から外れる＝救済は傍受できなかった行だけに縮む
+
 実行（xstock-vnc コンテナ内・DISPLAY 必須）:
   docker exec -e DISPLAY=:99 xstock-vnc python3 /app/scripts/x_search_collect_twittora.py --days 7
 """
@@ -60,6 +65,8 @@ from bookmarks_keyword_digest_collect_browser import (  # 基盤部品を再利
 )
 from grok_collect_twittora import DEFAULT_MIN_LIKES, DEFAULT_QUERIES  # クエリ正本を共有
 import normalize_master_posts  # syndication救済・翻訳/切断正規化を再利用（2026-07-26 Fix1/4）
+import x_metrics_lib  # syndication の一括取得（並行・レート制限・2026-10-19）
+from collector.graphql_timeline import TimelineCapture, card_status_hrefs  # 検索応答の傍受（2026-10-19）
 
 JST = timezone(timedelta(hours=9))
 TWEET_CARD_SELECTOR = '[data-testid="tweet"]'
@@ -198,15 +205,50 @@ def parse_aria_metrics(aria: str | None) -> dict:
     return out
 
 
-def scrape_cards_rich(page) -> list[dict]:
+def row_from_graphql(t: dict) -> dict:
+    """傍受した SearchTimeline のツイート（graphql_timeline.parse_tweet_result）を収集行にする。
+
+    scrape_cards_rich と同じ形。指標の欠測は parse_aria_metrics と同じく 0＋metrics_missing。
+    本文は応答の原文（翻訳表示・長文切断が無い）なので content_source="graphql" を立て、
+    apply_syndication_pass の正規化対象から外す。X Articles は title+preview_text を
+    content_source="x_article" で入れる（syndication 救済と同じ扱い）。
+    """
+    metrics = {"replies": t["replies"], "retweets": t["retweets"], "likes": t["likes"],
+               "bookmarks": t["bookmarks"], "impressions": t["impressions"]}
+    missing = [k for k, v in metrics.items() if v is None]
+    row = {
+        "id": t["id"],
+        "url": f"https://x.com/{t['screen_name']}/status/{t['id']}",
+        "author": t["screen_name"],
+        "display_name": t["name"],
+        "content": t["text"],
+        "content_source": "graphql",
+        "posted_at": t["created_at"][:10],
+        **{k: (v or 0) for k, v in metrics.items()},
+        "metrics_missing": missing,
+    }
+    article = t.get("article")
+    if article:
+        row["content"] = f"{article['title']}\n\n{article['preview_text']}".strip()
+        row["content_source"] = "x_article"
+    return row
+
+
+def scrape_cards_rich(page, skip_ids: set | None = None) -> list[dict]:
     """表示中カードから url/author/本文/正確指標を抽出（buzz 収集専用のリッチ版）。
 
     digest 系の scrape_search_results_from_dom は likes 表示文字列のみの軽量契約のため
     共有関数は変更せず、本スクリプト専用に aria ベースの正確抽出を持つ。
+    skip_ids（GraphQL で取り込み済みの id）のカードは locator を1往復もせずに飛ばす。
     """
     results = []
     cards = page.locator(TWEET_CARD_SELECTOR)
+    hrefs = card_status_hrefs(page, TWEET_CARD_SELECTOR) if skip_ids else None
     for i in range(cards.count()):
+        if hrefs is not None and i < len(hrefs):
+            m = _STATUS_ID_RE.search(hrefs[i] or "")
+            if m and m.group(1) in skip_ids:
+                continue
         try:
             card = cards.nth(i)
             url = ""
@@ -261,12 +303,17 @@ def scrape_cards_rich(page) -> list[dict]:
 
 
 def collect_query(page, q: str, since: str, until: str, min_likes: int, per_query: int,
-                  lang: str | None = None, tab: str = "top") -> list[dict]:
+                  lang: str | None = None, tab: str = "top",
+                  capture: TimelineCapture | None = None) -> list[dict]:
     """1クエリ収集。スクロール毎に取り込み・id マージ（仮想化による本文喪失の対策）。
 
     tab は build_buzz_search_url() にそのまま渡す（"top"=話題 / "live"=最新）。
+    capture（SearchTimeline の傍受）があれば応答 JSON の行を正とし、応答に無かった
+    カードだけを DOM から読む（2026-10-19）。
     """
     url = build_buzz_search_url(q, since, until, min_likes, lang, tab)
+    if capture is not None:
+        capture.clear()  # 前のクエリの応答を混ぜない
     page.goto(url, wait_until="domcontentloaded", timeout=45_000)
     time.sleep(random.uniform(3.0, 5.0))
     if is_login_wall_url(page.url):
@@ -276,9 +323,16 @@ def collect_query(page, q: str, since: str, until: str, min_likes: int, per_quer
     except Exception:
         return []  # 0件（正常系）
     by_id: dict[str, dict] = {}
+    gql_ids: set[str] = set()
 
     def ingest():
-        for c in scrape_cards_rich(page):
+        if capture is not None:
+            for t in capture.take():
+                by_id[t["id"]] = row_from_graphql(t)
+                gql_ids.add(t["id"])
+        for c in scrape_cards_rich(page, gql_ids):
+            if c["id"] in gql_ids:
+                continue  # 応答由来の行（原文・整数指標）を DOM で上書きしない
             prev = by_id.get(c["id"])
             # 既取得の本文を空で上書きしない（仮想化で後から空になるケース）
             if prev and prev.get("content") and not c.get("content"):
@@ -350,8 +404,8 @@ def refetch_content(page, url: str) -> str:
 def apply_syndication_pass(rows: list[dict], empty_cap: int) -> dict:
     """syndication API のみで空本文の救済と DOM本文の翻訳/切断正規化を行う（ブラウザ不要）。
 
-    normalize_master_posts.fetch_syndication / build_norm_fields を再利用する
-    （ロジック複製を避ける・ライブ収集の後段にも遡及適用にも同じ関数を流用できる設計）。
+    取得は x_metrics_lib.fetch_payloads_many、判定は normalize_master_posts.build_norm_fields を
+    再利用する（ロジック複製を避ける・ライブ収集の後段にも遡及適用にも同じ関数を流用できる設計）。
 
     - 空本文行（likes降順・empty_cap 件まで）: payload.article があれば title+preview_text
       を content にし content_source="x_article"（X Articles・本文が物理的に無いツイート）。
@@ -364,10 +418,16 @@ def apply_syndication_pass(rows: list[dict], empty_cap: int) -> dict:
     dom_valid = [r for r in rows if r.get("content") and not r.get("content_source")]
     targets = empties[:empty_cap] + dom_valid
 
+    # 一括取得（x_metrics_lib.fetch_payloads_many・2026-10-19）: 旧実装は1件ごとに固定1秒 sleep を
+    # 挟んで直列取得していた。経路ごとのレート制限と Retry-After 共有で節度は保ったまま並行に取る
+    # 取得済み payload は TTL 内なら再取得しない（同じ行への遡及適用・再実行でリクエストを重ねない）
+    fetched = x_metrics_lib.fetch_payloads_many([str(r["id"]) for r in targets],
+                                                sources=("syndication",),
+                                                cache_dir=x_metrics_lib.DEFAULT_CACHE_DIR)
     for r in targets:
-        status, payload = normalize_master_posts.fetch_syndication(r["id"])
-        time.sleep(1.0)  # syndication は無認証だが節度を保つ
-        # Critical(2026-07-26 validator指摘): fetch_syndication は JSON妥当な非dict
+        payload = fetched[str(r["id"])]["syndication"]
+        status = "ok" if payload is not None else "error"
+        # Critical(2026-07-26 validator指摘): 取得側は JSON妥当な非dict
         # （配列等）を "ok" で素通しすることを実証済み。dict保証をここで強制する
         # （payload.get 呼び出しで例外化 → 呼び出し元 :420 まで伝播し収集全損する不具合の根治）。
         if status != "ok" or not isinstance(payload, dict):
@@ -476,11 +536,12 @@ def main() -> int:
             context = browser.new_context(**build_context_kwargs())
             context.add_cookies(cookies)
             page = context.new_page()
+            capture = TimelineCapture(operations=("SearchTimeline",)).attach(page)
             for i, (q, ml, lang, tab) in enumerate(tasks):
                 label = f"{q!r} [{tab}]" + (f" [lang:{lang} min:{ml}]" if lang else "")
                 print(f"  → searching: {label}")
                 try:
-                    rows = collect_query(page, q, since, until, ml, args.per_query, lang, tab)
+                    rows = collect_query(page, q, since, until, ml, args.per_query, lang, tab, capture)
                 except LoginWallError as exc:
                     print(f"  ✗ {exc}", file=sys.stderr)
                     wall_errors += 1
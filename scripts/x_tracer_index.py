@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""x_tracer_index — ライブ・バズトレーサーの「最終観測」索引と速度モデル（2026-10-19 新設）。
+
+背景:
+  x_watchlist_tracer は1日3回の巡回ごとに直近3日分の tracer-YYYY-MM-DD.jsonl を全行読み直し、
+  tweet_id → 全行リストを組んでから detect で末尾1行しか使っていなかった。履歴とウォッチリストが
+  伸びるほど検知前の読み込みが重くなる。
+
+本モジュール:
+  - output/x_tracer/tracer-index.json に tweet_id → 観測点列 [[scraped_at, likes, impressions], ...]
+    （時刻昇順・1投稿あたり最大 max_points 点・窓 days 日）を持つ
+  - 各 JSONL を「どこまで索引に反映したか」のバイト位置（offsets）も持ち、読み込み時は
+    その位置以降の末尾だけを追いつかせる（索引の書き込みが落ちても次回に自己修復する）
+  - 索引が無い・壊れている・版が違う時は窓内の JSONL から作り直す（= 旧 load_recent_snapshots と同値）
+  - velocity は観測点列全体から likes/時 を出す（model=last は従来の「前回との差分」そのもの）
+
+JSONL が正本・索引は派生物（消しても次回に作り直される）。標準ライブラリのみ。
+"""
+from __future__ import annotations
+
+import datetime as _dt
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+INDEX_NAME = "tracer-index.json"
+INDEX_VERSION = 1
+HISTORY_DAYS = 3          # 旧 load_recent_snapshots(days=3) と同じ窓（当日＋3日前まで）
+MAX_POINTS = 24           # 1投稿あたりの保持点数（3巡回/日×4日=12点に余裕を持たせた上限）
+MIN_SPAN_HOURS = 0.25     # 15分未満の再計測は速度ノイズ（従来の detect と同じ）
+VELOCITY_MODELS = ("last", "ols", "ewma")
+
+
+def _valid_row(row) -> bool:
+    """dict 以外・必須キー欠落は履歴に採用しない (2026-07-21 Codex R1 W1)。"""
+    return isinstance(row, dict) and bool(row.get("tweet_id")) and bool(row.get("scraped_at"))
+
+
+def _empty() -> dict:
+    return {"version": INDEX_VERSION, "offsets": {}, "ids": {}}
+
+
+def _window_files(today: _dt.date, days: int) -> list[str]:
+    return [f"tracer-{today - _dt.timedelta(days=i)}.jsonl" for i in range(days, -1, -1)]
+
+
+def add_row(index: dict, row: dict, max_points: int = MAX_POINTS) -> None:
+    """スナップショット1行を索引へ反映する（壊れ行は黙って捨てる）。"""
+    if not _valid_row(row):
+        return
+    pts = index["ids"].setdefault(row["tweet_id"], [])
+    pts.append([row["scraped_at"], row.get("likes"), row.get("impressions")])
+    del pts[:-max_points]
+
+
+def _consume(index: dict, path: Path, max_points: int) -> None:
+    """path の未反映分（offsets 以降の完全な行）だけを読む。"""
+    name = path.name
+    off = index["offsets"].get(name, 0)
+    size = path.stat().st_size
+    if size <= off:
+        return
+    with open(path, "rb") as fh:
+        fh.seek(off)
+        tail = fh.read(size - off)
+    end = tail.rfind(b"\n") + 1  # 書きかけの最終行は次回に回す
+    for line in tail[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        add_row(index, row, max_points)
+    index["offsets"][name] = off + end
+
+
+def _evict(index: dict, today: _dt.date, days: int) -> None:
+    """窓の外（days 日より前）のファイル位置と観測点を落とす。索引の大きさを窓内に保つ。"""
+    keep = set(_window_files(today, days))
+    index["offsets"] = {k: v for k, v in index["offsets"].items() if k in keep}
+    cutoff = (today - _dt.timedelta(days=days)).isoformat()
+    for tid in list(index["ids"]):
+        pts = [p for p in index["ids"][tid] if str(p[0])[:10] >= cutoff]
+        if pts:
+            index["ids"][tid] = pts
+        else:
+            del index["ids"][tid]
+
+
+def load_index(out_dir: Path, days: int = HISTORY_DAYS, max_points: int = MAX_POINTS,
+               today: Optional[_dt.date] = None) -> dict:
+    """索引を読み、JSONL の未反映分だけ追いつかせて返す（保存はしない）。
+
+    JSONL がバイト位置より短い（手で削った・書き直した）時は整合が取れないので作り直す。
+    """
+    today = today or _dt.date.today()
+    try:
+        index = json.loads((Path(out_dir) / INDEX_NAME).read_text(encoding="utf-8"))
+        if not isinstance(index, dict) or index.get("version") != INDEX_VERSION \
+                or not isinstance(index.get("ids"), dict) or not isinstance(index.get("offsets"), dict):
+            index = _empty()
+    except (OSError, ValueError):
+        index = _empty()
+    files = [Path(out_dir) / n for n in _window_files(today, days)]
+    if any(f.exists() and f.stat().st_size < index["offsets"].get(f.name, 0) for f in files):
+        index = _empty()
+    for f in files:
+        if f.exists():
+            _consume(index, f, max_points)
+    _evict(index, today, days)
+    return index
+
+
+def save_index(out_dir: Path, index: dict) -> None:
+    """索引を原子的に書く（書きかけの索引を次回に読まない）。"""
+    path = Path(out_dir) / INDEX_NAME
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(index, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def append_rows(out_dir: Path, snap_path: Path, rows: list[dict], index: dict,
+                max_points: int = MAX_POINTS) -> None:
+    """スナップショット行を JSONL へ追記し、同じ行を索引へ反映して保存する。
+
+    追記した JSONL の末尾位置を offsets に記録する＝次回の load_index は読み直さない。
+    """
+    with open(snap_path, "a", encoding="utf-8") as f:
+        for r in rows:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    # 追記前に別プロセスが書いた行があれば先にそれを取り込む（位置を飛ばさない）
+    _consume(index, Path(snap_path), max_points)
+    save_index(out_dir, index)
+
+
+def last_seen(index: dict, tweet_id: str) -> Optional[dict]:
+    """tweet_id の最終観測（scraped_at / likes / impressions）。未観測は None。"""
+    pts = index["ids"].get(tweet_id)
+    if not pts:
+        return None
+    scraped_at, likes, impressions = pts[-1]
+    return {"scraped_at": scraped_at, "likes": likes, "impressions": impressions}
+
+
+def _points_hours(points: list, cur: dict) -> list[tuple[float, float]]:
+    """観測点列＋今回を (現在からの経過時間[h・負], likes) に直す。数値でない likes は捨てる。"""
+    seq = list(points) + [[cur.get("scraped_at"), cur.get("likes"), cur.get("impressions")]]
+    try:
+        t_cur = _dt.datetime.fromisoformat(cur["scraped_at"])
+    except (KeyError, TypeError, ValueError):
+        return []
+    out = []
+    for scraped_at, likes, _imp in seq:
+        if isinstance(likes, bool) or not isinstance(likes, (int, float)):
+            continue  # 数値でない likes は速度計算に使わない (Codex R1 W1)
+        try:
+            t = _dt.datetime.fromisoformat(scraped_at)
+        except (TypeError, ValueError):
+            continue
+        out.append(((t - t_cur).total_seconds() / 3600, float(likes)))
+    return out
+
+
+def velocity(points: list, cur: dict, cfg: dict) -> Optional[float]:
+    """観測点列と今回の行から likes/時 を出す。判定できない時は None。
+
+    cfg（configs/x_watchlist.json）:
+      velocity_model: "last"（既定・前回との差分＝従来の detect）|
+                      "ols"（窓内の全点に最小二乗で直線を当てた傾き・単発の計測ぶれに強い）|
+                      "ewma"（区間ごとの増分を新しい区間ほど重く加重した速度・加速に早く反応）
+      velocity_window_hours: ols/ewma が使う過去の幅（既定 6）
+      velocity_halflife_hours: ewma の半減期（既定 2）
+    いずれも今回と最古の採用点の間が15分未満なら None（速度ノイズ）。
+    """
+    model = cfg.get("velocity_model", "last")
+    if model not in VELOCITY_MODELS:
+        raise ValueError(f"未知の velocity_model: {model}")
+    if not points:
+        return None
+    if model == "last":
+        # 従来の detect と同値（likes 欠測は 0 扱い・数値でない likes は判定しない）
+        last = points[-1]
+        try:
+            dt_h = (_dt.datetime.fromisoformat(cur["scraped_at"])
+                    - _dt.datetime.fromisoformat(last[0])).total_seconds() / 3600
+        except (KeyError, ValueError, TypeError):
+            return None
+        if dt_h < MIN_SPAN_HOURS:
+            return None
+        try:
+            return ((cur.get("likes") or 0) - (last[1] or 0)) / dt_h
+        except TypeError:
+            return None
+    window = float(cfg.get("velocity_window_hours", 6))
+    pts = [p for p in _points_hours(points, cur) if p[0] >= -window]
+    if len(pts) < 2 or pts[-1][0] != 0.0 or -pts[0][0] < MIN_SPAN_HOURS:
+        return None  # 今回の likes が数値でない・窓内に過去点が無い・間隔が短すぎる
+    if model == "ols":
+        n = len(pts)
+        mt = sum(t for t, _ in pts) / n
+        ml = sum(v for _, v in pts) / n
+        var = sum((t - mt) ** 2 for t, _ in pts)
+        if var <= 0:
+            return None
+        return sum((t - mt) * (v - ml) for t, v in pts) / var
+    half = float(cfg.get("velocity_halflife_hours", 2))
+    num = den = 0.0
+    for (t0, l0), (t1, l1) in zip(pts, pts[1:]):
+        if t1 <= t0:
+            continue
+        w = 0.5 ** (-t1 / half) if half > 0 else 1.0   # 区間の終端が新しいほど重い
+        num += w * (l1 - l0)
+        den += w * (t1 - t0)
+    return num / den if den > 0 else None
@@ -19,16 +19,17 @@
 """
 from __future__ import annotations
 
-import glob
-import gzip
 import json
+import sys
 from collections import defaultdict
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import cross_section  # noqa: E402  日次 bars の横断面キャッシュ（直近の Va 列）
+import master_index  # noqa: E402  月次 master の時点索引（最新スナップショットの普通株・社名）
+
 APP = Path("/app") if Path("/app/scripts").exists() else Path(__file__).resolve().parent.parent
 
-BARS_GLOB = str(APP / "data/jquants/bars/*.json.gz")
-MASTER_GLOB = str(APP / "data/jquants/master/*.json.gz")
 CENTER_PIN = APP / "data/center_pin/center_pin.jsonl"
 SHORTAGE_MAP = APP / "configs/x_shortage_map.json"
 OUT = APP / "data/x_price_watch/universe_trade500.jsonl"
@@ -45,18 +46,22 @@ def to4(code5: str) -> str:
 
 
 def main() -> int:
-    files = sorted(glob.glob(BARS_GLOB))[-WINDOW_DAYS:]
+    # 直近 WINDOW_DAYS 日の Va は横断面キャッシュの列から読む（bars 60日分を解凍しない）
+    store = cross_section.open_store()
+    days = store.days()[-WINDOW_DAYS:]
+    if not days:
+        raise SystemExit("FATAL: bars がありません（data/jquants/bars・cross_section）")
     va: dict[str, list[float]] = defaultdict(list)
-    for f in files:
-        with gzip.open(f, "rt") as fh:
-            for r in json.load(fh)["data"]:
-                if r.get("Va"):
-                    va[r["Code"]].append(r["Va"])
+    for d in days:
+        cols = store.columns(d)
+        for code, v in zip(cols["codes"], cols["va"]):
+            if v:
+                va[code].append(v)
     avg = {c: sum(v) / len(v) for c, v in va.items() if len(v) >= MIN_TRADED_DAYS}
 
-    with gzip.open(sorted(glob.glob(MASTER_GLOB))[-1], "rt") as fh:
-        d = json.load(fh)
-    master = {r["Code"]: r for r in (d["info"] if "info" in d else d["data"])}
+    master = master_index.open_index().latest(fields=["ProdCat", "CoName"])
+    if not master:
+        raise SystemExit("FATAL: 月次 master がありません（data/jquants/master・master_index）")
 
     stocks = [c for c in sorted(avg, key=avg.get, reverse=True)
               if master.get(c, {}).get("ProdCat") == COMMON_STOCK]
@@ -66,7 +71,7 @@ def main() -> int:
     m = json.loads(SHORTAGE_MAP.read_text())
     bene = {b["code"] for s in m["subjects"] for b in s.get("beneficiaries", [])}
 
-    period = f"{files[0].split('/')[-1][:8]}-{files[-1].split('/')[-1][:8]}"
+    period = f"{days[0]}-{days[-1]}"
     OUT.parent.mkdir(parents=True, exist_ok=True)
     n_new = 0
     with OUT.open("w", encoding="utf-8") as fh:
@@ -13,6 +13,13 @@
 出力:
   - output/x_tracer/tracer-YYYY-MM-DD.jsonl  … スナップショット行（1投稿×1巡回=1行）
   - output/x_tracer/alerts-YYYY-MM-DD.jsonl  … 検知行（rising / official_new）
+  - output/x_tracer/tracer-index.json      … 直近窓の tweet_id → 観測点列（x_tracer_index・派生物）
+
+取得: プロフィールの UserTweets 応答（GraphQL）を傍受して id・本文・整数指標を直接読む。
+  応答が取れなかった時だけ従来の article カード解析へ戻る（collector.graphql_timeline）。
+
+巡回: ハンドルごとに独立したページを configs の scheduler.workers 本まで並行に開く
+  （collector.collect_scheduler・全体の毎分訪問上限つき・同一ハンドルへは同時1ページまで）。
 
 実行場所: influx xstock-vnc コンテナ内（fetch_followers.py と同じ・headless）。
   docker exec xstock-vnc python3 /app/scripts/x_watchlist_tracer.py
@@ -30,7 +37,10 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from tier3_posting.shared.cookie_crypto import load_cookies_or_raise  # noqa: E402
 from x_search_collect_twittora import parse_aria_metrics  # noqa: E402  # aria正確指標を再利用
+import x_tracer_index  # noqa: E402  # 最終観測の索引と速度モデル（2026-10-19）
 
+from collector.collect_scheduler import CollectScheduler, ScheduledJob  # noqa: E402
+from collector.graphql_timeline import TimelineCapture  # noqa: E402
 from playwright.sync_api import sync_playwright  # noqa: E402
 
 APP = Path("/app") if Path("/app/scripts").exists() else Path(__file__).resolve().parent.parent
@@ -49,34 +59,44 @@ def load_config() -> dict:
     return json.loads(CONFIG.read_text())
 
 
-def load_recent_snapshots(days: int = 3) -> dict:
-    """直近 days 日のスナップショットを tweet_id → [rows(時刻昇順)] で返す。"""
-    by_id: dict[str, list[dict]] = {}
-    today = _dt.date.today()
-    for i in range(days, -1, -1):
-        f = OUT_DIR / f"tracer-{today - _dt.timedelta(days=i)}.jsonl"
-        if not f.exists():
-            continue
-        for line in f.read_text().splitlines():
-            if not line.strip():
-                continue
-            try:
-                row = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            # dict 以外・必須キー欠落は履歴に採用しない (2026-07-21 Codex R1 W1)
-            if not isinstance(row, dict) or not row.get("tweet_id") or not row.get("scraped_at"):
-                continue
-            by_id.setdefault(row["tweet_id"], []).append(row)
-    return by_id
+def _row_from_graphql(t: dict, handle: str) -> dict:
+    """傍受したツイートを DOM 経路と同じスナップショット行にする（指標の欠測は 0＋metrics_missing）。"""
+    met = {"replies": t["replies"], "retweets": t["retweets"], "likes": t["likes"],
+           "bookmarks": t["bookmarks"], "impressions": t["impressions"]}
+    author, tweet_id = t["screen_name"], t["id"]
+    return {
+        "tweet_id": tweet_id,
+        "handle": handle,
+        "author": author,
+        "url": f"https://x.com/{author}/status/{tweet_id}",
+        "posted_at": t["created_at"] or None,
+        "text": t["text"][:280],
+        "is_repost": author.lower() != handle.lower(),
+        "social_context": "",  # バッジ文言は DOM にしか無い（判定は author で行うので不要）
+        **{k: (v or 0) for k, v in met.items()},
+        "metrics_missing": [k for k, v in met.items() if v is None],
+        "scraped_at": now_iso(),
+    }
 
 
-def scrape_profile(page, handle: str, max_posts: int) -> list[dict]:
-    """プロフィールタイムライン先頭の投稿を最大 max_posts 件取得。fail-soft。"""
+def scrape_profile(page, handle: str, max_posts: int,
+                   capture: TimelineCapture | None = None) -> list[dict]:
+    """プロフィールタイムライン先頭の投稿を最大 max_posts 件取得。fail-soft。
+
+    capture（UserTweets の傍受）に応答が届いていればそこから読み、無ければカードを解析する。
+    """
     rows: list[dict] = []
+    if capture is not None:
+        capture.clear()  # 同じワーカーが直前に開いた別ハンドルの応答を混ぜない
     page.goto(f"https://x.com/{handle}", wait_until="domcontentloaded", timeout=45_000)
     page.wait_for_selector("article", timeout=25_000)
     page.wait_for_timeout(1500)
+    if capture is not None and len(capture):
+        for t in capture.tweets():
+            rows.append(_row_from_graphql(t, handle))
+            if len([r for r in rows if not r["is_repost"]]) >= max_posts:
+                break
+        return rows
     for art in page.locator("article").all()[: max_posts + 4]:  # pinned/RT ぶん余分に見る
         try:
             link = art.locator('a[href*="/status/"]').first
@@ -124,7 +144,11 @@ def scrape_profile(page, handle: str, max_posts: int) -> list[dict]:
 
 
 def detect(rows: list[dict], history: dict, cfg: dict, lane: str) -> list[dict]:
-    """rising（速度超過）と official_new（公式の新投稿）を検知する。"""
+    """rising（速度超過）と official_new（公式の新投稿）を検知する。
+
+    history は x_tracer_index.load_index の索引。速度は configs の velocity_model で
+    観測点列全体から出す（既定 last = 前回スナップショットとの差分）。
+    """
     alerts: list[dict] = []
     thr = cfg.get("rising_likes_per_hour_ja", 15) if lane == "ja" else cfg.get("rising_likes_per_hour", 30)
     new_win_h = cfg.get("official_new_within_hours", 24)
@@ -132,7 +156,7 @@ def detect(rows: list[dict], history: dict, cfg: dict, lane: str) -> list[dict]:
     for r in rows:
         if r["is_repost"]:
             continue
-        prev = history.get(r["tweet_id"]) or []
+        prev = history["ids"].get(r["tweet_id"]) or []
         # official_new: 履歴に無い＋投稿が新しい
         if lane == "official" and not prev and r.get("posted_at"):
             try:
@@ -142,24 +166,10 @@ def detect(rows: list[dict], history: dict, cfg: dict, lane: str) -> list[dict]:
             if age_h is not None and 0 <= age_h <= new_win_h:  # 未来時刻は時計ずれ (Codex R1 W2)
                 alerts.append({"reason": "official_new", "age_hours": round(age_h, 1), **_alert_base(r)})
                 continue
-        # rising: 前回スナップショットとの差分速度
-        if prev:
-            last = prev[-1]
-            try:
-                dt_h = (
-                    _dt.datetime.fromisoformat(r["scraped_at"]) - _dt.datetime.fromisoformat(last["scraped_at"])
-                ).total_seconds() / 3600
-            except (ValueError, TypeError):
-                continue
-            if dt_h < 0.25:  # 15分未満の再計測は速度ノイズ
-                continue
-            try:
-                dl = (r.get("likes") or 0) - (last.get("likes") or 0)
-            except TypeError:
-                continue  # 数値でない likes は速度計算に使わない (Codex R1 W1)
-            lph = dl / dt_h
-            if lph >= thr:
-                alerts.append({"reason": "rising", "likes_per_hour": round(lph, 1), **_alert_base(r)})
+        # rising: 観測点列からの速度（15分未満・数値でない likes は判定しない）
+        lph = x_tracer_index.velocity(prev, r, cfg)
+        if lph is not None and lph >= thr:
+            alerts.append({"reason": "rising", "likes_per_hour": round(lph, 1), **_alert_base(r)})
     return alerts
 
 
@@ -178,39 +188,62 @@ def main() -> int:
     snap_f = OUT_DIR / f"tracer-{today}.jsonl"
     alert_f = OUT_DIR / f"alerts-{today}.jsonl"
 
-    history = load_recent_snapshots()
+    # 直近3日の JSONL を毎回全行読まない: 索引を読み、未反映の末尾だけ追いつかせる
+    history = x_tracer_index.load_index(OUT_DIR)
     cookies = load_cookies_or_raise(Path(PROFILE) / "cookies.json")
 
-    all_rows: list[dict] = []
-    all_alerts: list[dict] = []
-    failed: list[str] = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
+    # 並行巡回（2026-10-19）: ワーカーごとに独立したコンテキスト/ページを開き、全体の訪問数は
+    # 毎分の予算で縛る。同じハンドルへは同時に1ページまで＝ハンドル単位の訪問頻度は上げない
+    sched_cfg = cfg.get("scheduler", {})
+    scheduler = CollectScheduler(
+        workers=sched_cfg.get("workers", 1),
+        requests_per_minute=sched_cfg.get("requests_per_minute", 6),
+        max_attempts=sched_cfg.get("max_attempts", 1),
+        backoff_sec=sched_cfg.get("backoff_sec", {"default": 120}),
+    )
+
+    def open_worker():
+        pw = sync_playwright().start()
+        browser = pw.chromium.launch(headless=True)
+        context = browser.new_context(service_workers="block")  # GraphQL 応答を傍受するため
         context.add_cookies(cookies)
         page = context.new_page()
-        for h in cfg["handles"]:
-            handle, lane = h["handle"], h.get("lane", "en")
-            try:
-                rows = scrape_profile(page, handle, cfg.get("max_posts_per_handle", 10))
-                own = [r for r in rows if not r["is_repost"]]
-                all_alerts.extend(detect(rows, history, cfg, lane))
-                all_rows.extend(rows)
-                print(f"[{handle}] {len(own)}件（+repost {len(rows)-len(own)}）")
-            except Exception as e:  # per-handle fail-soft
-                failed.append(handle)
-                print(f"[{handle}] FAIL: {type(e).__name__}: {str(e)[:80]}", file=sys.stderr)
+        return pw, browser, page, TimelineCapture(operations=("UserTweets",)).attach(page)
+
+    def close_worker(res):
+        pw, browser, _page, _capture = res
         browser.close()
+        pw.stop()
+
+    def handler(h: dict, res) -> list[dict]:
+        return scrape_profile(res[2], h["handle"], cfg.get("max_posts_per_handle", 10), res[3])
+
+    jobs = [ScheduledJob(key=h["handle"].lower(), payload=h) for h in cfg["handles"]]
+    all_rows: list[dict] = []
+    all_alerts: list[dict] = []
+    failed: list[str] = []
+    # 出力は巡回の完了順でなくウォッチリスト順（台帳の並びを実行ごとに揺らさない）
+    for out in scheduler.run(jobs, handler, open_worker=open_worker, close_worker=close_worker):
+        handle, lane = out.job.payload["handle"], out.job.payload.get("lane", "en")
+        if out.status != "completed":  # per-handle fail-soft
+            failed.append(handle)
+            print(f"[{handle}] FAIL: {out.error_type or out.status}: {out.error_message[:80]}",
+                  file=sys.stderr)
+            continue
+        rows = out.result
+        own = [r for r in rows if not r["is_repost"]]
+        all_alerts.extend(detect(rows, history, cfg, lane))
+        all_rows.extend(rows)
+        print(f"[{handle}] {len(own)}件（+repost {len(rows)-len(own)}）")
 
-    with open(snap_f, "a", encoding="utf-8") as f:
-        for r in all_rows:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    # 検知の後で追記と索引の更新を一緒に行う（今回の行を今回の比較相手にしない）
+    n_series = sum(1 for r in all_rows if not r["is_repost"] and history["ids"].get(r["tweet_id"]))
+    x_tracer_index.append_rows(OUT_DIR, snap_f, all_rows, history)
     if all_alerts:
         with open(alert_f, "a", encoding="utf-8") as f:
             for a in all_alerts:
                 f.write(json.dumps(a, ensure_ascii=False) + "\n")
 
-    n_series = sum(1 for r in all_rows if not r["is_repost"] and history.get(r["tweet_id"]))
     print(f"--- self-check: rows={len(all_rows)} 時系列2点目以降={n_series} "
           f"alerts={len(all_alerts)} failed_handles={failed or 'なし'}")
     # 全滅のみ失敗扱い（0件偽装の再発防止・grok収集の教訓）
@@ -337,6 +337,91 @@ class TestLedgerIO(unittest.TestCase):
         self.assertEqual(common.read_ledger(self.ledger_path), [])
 
 
+class TestReplaySnapshot(unittest.TestCase):
+    """load_replay_state（スナップショット+末尾replay）が replay(read_ledger()) と同値であること。"""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.ledger_path = os.path.join(self._tmpdir.name, "ledger.jsonl")
+
+    def _full(self):
+        return common.replay(common.read_ledger(self.ledger_path))
+
+    def _seed(self, gen, qid, urls):
+        common.append_event(self.ledger_path, {
+            "type": "generation", "generation": gen, "revision": 0, "generation_reason": "delta",
+            "source_snapshot": {"urls_sha256": f"sha-{gen}"}, "delta_urls": urls,
+            "consumed_evaluation_keys": [["qid", "q-1", "✅", None]] if gen > 1 else [],
+            "active_clusters": [{"cluster_id": "c1", "queries": [{"query_id": qid}]}],
+            "proposals": [{"proposal_id": f"p-{gen}"}],
+        })
+        common.append_event(self.ledger_path, {
+            "type": "evaluation_batch", "note_revision": None,
+            "evaluations": [{"id_type": "qid", "id": qid, "mark": "✅"}],
+        })
+        common.append_event(self.ledger_path, {
+            "type": "digest", "run_id": f"r{gen}",
+            "items": [{"url": f"https://x.com/a/status/{gen}00", "cluster_id": "c1"}],
+        })
+
+    def test_missing_ledger_is_empty_state(self):
+        self.assertEqual(common.load_replay_state(self.ledger_path), common.replay([]))
+        self.assertFalse(common.replay_snapshot_path(self.ledger_path).exists())
+
+    def test_snapshot_then_tail_equals_full_replay(self):
+        self._seed(1, "q-1", ["status:1"])
+        first = common.load_replay_state(self.ledger_path)
+        self.assertEqual(first, self._full())
+        snap = json.loads(common.replay_snapshot_path(self.ledger_path).read_text(encoding="utf-8"))
+        self.assertEqual(snap["offset"], os.path.getsize(self.ledger_path))
+
+        self._seed(2, "q-2", ["status:2"])
+        common.append_event(self.ledger_path, {"type": "fetch_run", "status": "SUCCESS"})
+        state = common.load_replay_state(self.ledger_path, verify=True)
+        self.assertEqual(state, self._full())
+        self.assertEqual(state["known_eval_ids"], {("qid", "q-1"), ("qid", "q-2"), ("pid", "p-1"), ("pid", "p-2")})
+        self.assertEqual(state["last_source_snapshot"], {"urls_sha256": "sha-2"})
+        self.assertEqual([e["id"] for e in state["pending_evaluations"]], ["q-2"])
+
+    def test_tail_corruption_still_detected(self):
+        self._seed(1, "q-1", ["status:1"])
+        common.load_replay_state(self.ledger_path)
+        with open(self.ledger_path, "a", encoding="utf-8") as f:
+            f.write("{not valid json\n")
+        with self.assertRaises(common.LedgerTailCorruption):
+            common.load_replay_state(self.ledger_path)
+        common.append_event(self.ledger_path, {"type": "fetch_run", "status": "SUCCESS"})
+        try:
+            common.load_replay_state(self.ledger_path)
+            self.fail("途中行の破損を検出しなかった")
+        except common.LedgerCorruption as exc:
+            self.assertNotIsInstance(exc, common.LedgerTailCorruption)
+            self.assertIn("行4", str(exc))  # 行番号は先頭からの通し番号のまま
+
+    def test_rewritten_prefix_falls_back_to_full_replay(self):
+        self._seed(1, "q-1", ["status:1"])
+        common.load_replay_state(self.ledger_path)
+        with open(self.ledger_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        with open(self.ledger_path, "w", encoding="utf-8") as f:
+            f.write("{broken\n" + "".join(lines[1:]))
+        with self.assertRaises(common.LedgerCorruption):
+            common.load_replay_state(self.ledger_path)
+
+    def test_verify_detects_stale_snapshot(self):
+        self._seed(1, "q-1", ["status:1"])
+        common.load_replay_state(self.ledger_path)
+        path = common.replay_snapshot_path(self.ledger_path)
+        snap = json.loads(path.read_text(encoding="utf-8"))
+        snap["state"]["baseline_urls"] = ["status:999"]  # 先頭shaは一致するが中身が食い違う
+        path.write_text(json.dumps(snap), encoding="utf-8")
+        with self.assertRaises(common.LedgerSnapshotMismatch):
+            common.load_replay_state(self.ledger_path, verify=True)
+        self.assertFalse(path.exists())
+        self.assertEqual(common.main(["--verify-snapshot", self.ledger_path]), 0)
+
+
 class TestPipelineLock(unittest.TestCase):
     """P1-1: pipeline_lockのflock(LOCK_EX)排他区間。"""
 
@@ -779,7 +864,7 @@ class TestWebExportHarvest(unittest.TestCase):
         events = common.read_ledger(self.ledger_path)
         replay_state = common.replay(events)
         return worklist.harvest_web_exports(
-            self.downloads_dir, self.ledger_path, events, replay_state, "run-1"
+            self.downloads_dir, self.ledger_path, replay_state, "run-1"
         )
 
     def test_normal_export_creates_evaluation_batch_and_moves_to_processed(self):
@@ -975,7 +1060,7 @@ class TestWebExportHarvest(unittest.TestCase):
         events = common.read_ledger(self.ledger_path)
         replay_state = common.replay(events)
         result = worklist.harvest_web_exports(
-            os.path.join(self._tmpdir.name, "does-not-exist"), self.ledger_path, events, replay_state, "run-1"
+            os.path.join(self._tmpdir.name, "does-not-exist"), self.ledger_path, replay_state, "run-1"
         )
         self.assertEqual(result, {"processed": 0, "rejected": 0, "appended_events": 0})
 
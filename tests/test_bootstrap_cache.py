@@ -0,0 +1,95 @@
+"""bootstrap_cache（ブートストラップ p値・CI の内容アドレス型キャッシュ）のテスト。
+
+固定する契約:
+  1. キャッシュ経由の p値・lift/EV CI はキャッシュ無しの計算と完全に同じ値（別インスタンスは
+     ディスクから読み、計算し直さない）
+  2. 入力列の1値・行順・seed・n_boot・ベースレートのどれかが変われば別の鍵（再計算）
+  3. 返した dict を書き換えても保存済みの結果は変わらない
+
+実行:
+    python3 -m unittest tests.test_bootstrap_cache -v
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import bootstrap_cache  # noqa: E402
+import kpi_event_study  # noqa: E402
+import kpi_screen_batch  # noqa: E402
+
+
+def _cell(seed: int = 0, n: int = 120) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    months = [f"2018-{m:02d}" for m in range(1, 13)]
+    return pd.DataFrame({"month": rng.choice(months, size=n), "ret": rng.normal(0.01, 0.12, size=n)})
+
+
+class TestBootstrapCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        self.base_rate = {f"2018-{m:02d}": 0.05 + m / 1000 for m in range(1, 13)}
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _cache(self) -> bootstrap_cache.BootstrapCache:
+        return bootstrap_cache.BootstrapCache(self.dir)
+
+    def test_same_values_as_uncached_and_reused_from_disk(self):
+        df = _cell()
+        want_p = kpi_screen_batch.compute_null_centered_pvalue(df, n_boot=2000, seed=42)  # BOOT_CACHE は既定で無効
+        want_lift = kpi_event_study.bootstrap_lift_ci(df, self.base_rate, n_boot=300, seed=42)
+        want_ev = kpi_event_study.bootstrap_ev_ci(df, n_boot=300, seed=42, ci_level=0.999)
+        for _ in range(2):
+            cache = self._cache()
+            with mock.patch.object(kpi_screen_batch, "BOOT_CACHE", cache):
+                self.assertEqual(kpi_screen_batch.compute_null_centered_pvalue(df, n_boot=2000, seed=42), want_p)
+            self.assertEqual(cache.lift_ci(df, self.base_rate, n_boot=300, seed=42), want_lift)
+            self.assertEqual(cache.ev_ci(df, n_boot=300, seed=42, ci_level=0.999), want_ev)
+        self.assertEqual((cache.hits, cache.misses), (3, 0))
+
+    def test_any_input_change_is_a_new_key(self):
+        cache = self._cache()
+        df = _cell()
+        cache.ev_ci(df, n_boot=200)
+        changed = df.copy()
+        changed.loc[5, "ret"] += 1e-12
+        variants = [
+            lambda: cache.ev_ci(changed, n_boot=200),
+            lambda: cache.ev_ci(df.iloc[::-1].reset_index(drop=True), n_boot=200),
+            lambda: cache.ev_ci(df, n_boot=200, seed=43),
+            lambda: cache.ev_ci(df, n_boot=201),
+            lambda: cache.lift_ci(df, self.base_rate, n_boot=200),
+            lambda: cache.lift_ci(df, {**self.base_rate, "2018-03": float("nan")}, n_boot=200),
+        ]
+        for i, run in enumerate(variants, start=2):
+            run()
+            self.assertEqual(cache.misses, i)
+        cache.ev_ci(df, n_boot=200)
+        self.assertEqual(cache.hits, 1)
+
+    def test_returned_dict_is_not_shared(self):
+        df = _cell()
+        cache = self._cache()
+        first = cache.lift_ci(df, {**self.base_rate, "2018-01": None}, n_boot=100)
+        first["excluded_months"].append("mutated")
+        first["point_lift"] = -1
+        again = cache.lift_ci(df, {**self.base_rate, "2018-01": None}, n_boot=100)
+        self.assertEqual(again["excluded_months"], ["2018-01"])
+        self.assertNotEqual(again["point_lift"], -1)
+        self.assertEqual(bootstrap_cache.BootstrapCache(self.dir, enabled=False).lift_ci(
+            df, self.base_rate, n_boot=100), kpi_event_study.bootstrap_lift_ci(df, self.base_rate, n_boot=100))
+
+
+if __name__ == "__main__":
+    unittest.main()
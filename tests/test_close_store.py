@@ -0,0 +1,213 @@
+"""close_store（銘柄ごとの終値ストア）と前向き評価2本のテスト。
+
+固定する契約:
+  1. 足りない頭と尻だけを取り、複数銘柄は1回でまとめて取る。保存して次回は取りに行かない。
+     尻の重なりで過去行の遡及改訂を見つけたら取り直し、最終行だけの変化は差し替える
+  2. foreign_forward の評価・backfill は保存つきストアでも history_fn 差し替えの経路と同じ行を書き、
+     取得回数は台帳の行数によらない
+  3. price_watch_forward の評価は bars の日次ファイルを1日1回しか読まず、
+     揃えた区間の close_of はファイルを読まない
+
+実行:
+    python3 -m unittest tests.test_close_store -v
+"""
+from __future__ import annotations
+
+import contextlib
+import gzip
+import io
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import foreign_forward  # noqa: E402
+import jq_fetch  # noqa: E402
+import price_watch_forward  # noqa: E402
+from close_store import CloseSeries, CloseStore  # noqa: E402
+
+
+def _weekdays(start: date, n: int, fmt: str = "%Y-%m-%d") -> list[str]:
+    out, day = [], start
+    while len(out) < n:
+        if day.weekday() < 5:
+            out.append(day.strftime(fmt))
+        day += timedelta(days=1)
+    return out
+
+
+class FakeSource:
+    """取得元の代役。要求された区間だけを返し、呼び出しを記録する。"""
+
+    def __init__(self, data: dict[str, list[tuple[str, float]]]):
+        self.data = data
+        self.calls: list[tuple[list[str], str, str]] = []
+
+    def fetch_many(self, symbols, start, end):
+        self.calls.append((sorted(symbols), start, end))
+        return {s: [(d, v) for d, v in self.data[s] if start <= d < end] for s in symbols if s in self.data}
+
+    def history(self, symbol, start, end):
+        return self.fetch_many([symbol], start, end).get(symbol, [])
+
+
+class TestCloseStore(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_fetches_only_missing_ranges_and_detects_revisions(self):
+        days = _weekdays(date(2024, 1, 1), 60)
+        src = FakeSource({"A": [(d, 100.0 + i) for i, d in enumerate(days)],
+                          "B": [(d, 50.0 + i) for i, d in enumerate(days)]})
+        horizon = ["2024-02-15"]
+        store = CloseStore(src.fetch_many, self.dir, horizon=lambda _s: horizon[0])
+
+        store.ensure(["A", "B", "X"], "2024-01-10", "2024-01-20")
+        self.assertEqual(src.calls, [(["A", "B", "X"], "2024-01-10", "2024-01-20")])
+        store.ensure(["A", "B"], "2024-01-12", "2024-01-19")
+        self.assertEqual(len(src.calls), 1)
+        store.ensure(["X"], "2024-01-10", "2024-01-20")  # 返ってこなかった銘柄は取り直す
+        self.assertEqual(len(src.calls), 2)
+
+        src.calls.clear()
+        store.ensure(["A", "B"], "2024-01-03", "2024-03-01")
+        self.assertEqual(src.calls, [(["A", "B"], "2024-01-03", "2024-01-10"),
+                                     (["A", "B"], "2024-01-13", "2024-03-01")])
+        self.assertEqual(store.covered("A"), ("2024-01-03", "2024-02-15"))
+        self.assertEqual(store.series("A").pairs(), [p for p in src.data["A"] if "2024-01-03" <= p[0] < "2024-03-01"])
+
+        src.calls.clear()
+        reopened = CloseStore(src.fetch_many, self.dir, horizon=lambda _s: horizon[0])
+        self.assertEqual(reopened.history("B", "2024-01-05", "2024-02-01"),
+                         [p for p in src.data["B"] if "2024-01-05" <= p[0] < "2024-02-01"])
+        self.assertEqual(src.calls, [])
+
+        # 最終行だけ変わった → 差し替え。過去行が変わった（配当落ちの調整）→ 取り直し
+        last = store.series("A").dates[-1]
+        src.data["A"] = [(d, v + 1 if d == last else v) for d, v in src.data["A"]]
+        src.data["B"] = [(d, v * 0.98) for d, v in src.data["B"]]
+        horizon[0] = "2024-03-20"
+        src.calls.clear()
+        reopened.ensure(["A", "B"], "2024-01-03", "2024-03-20")
+        self.assertEqual(src.calls[-1], (["B"], "2024-01-03", "2024-03-20"))
+        self.assertEqual(len(src.calls), 2)
+        for sym in ("A", "B"):
+            self.assertEqual(reopened.series(sym).pairs(),
+                             [p for p in src.data[sym] if "2024-01-03" <= p[0] < "2024-03-20"])
+
+        series = CloseSeries.from_pairs([("2024-01-05", 2.0), ("2024-01-02", 1.0), ("2024-01-08", 3.0)])
+        self.assertEqual(series.on_or_before("2024-01-06"), (2.0, "2024-01-05"))
+        self.assertEqual(series.on_or_before("2024-01-06", floor="2024-01-06"), (None, None))
+        self.assertEqual(series.after("2024-01-02", 2), (3.0, "2024-01-08"))
+        self.assertEqual(series.after("2024-01-03", 1), (None, None))
+        self.assertIsNone(series.on("2024-01-06"))
+
+    def test_foreign_forward_matches_per_row_history(self):
+        days = _weekdays(date(2026, 5, 1), 90)
+        src = FakeSource({
+            "S1": [(d, 100.0 + i) for i, d in enumerate(days)],
+            "S2": [(d, 80.0 - i * 0.1) for i, d in enumerate(days) if i % 7],   # 休場日が違う
+            "^B": [(d, 1000.0 + 2 * i) for i, d in enumerate(days)],
+        })
+        ledger = self.dir / "ledger.jsonl"
+        fire_dates = days[3:33:2]
+        for fd in fire_dates:
+            for ticker in ("S1", "S2"):
+                foreign_forward.append_row({
+                    "type": "firing", "fire_date": fd, "ticker": ticker, "benchmark": "^B",
+                    "entry_close": None, "benchmark_entry": None, "entry_date_used": None,
+                    "windows_bd": {"w5": 5, "w20": 20}}, ledger)
+        baseline = self.dir / "baseline.jsonl"
+        shutil.copy(ledger, baseline)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            n_back = foreign_forward.backfill_missing(baseline, src.history)
+            n_eval = foreign_forward.evaluate(days[-1], baseline, src.history)
+
+        src.calls.clear()
+        store = CloseStore(src.fetch_many, self.dir / "store")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(foreign_forward.backfill_missing(ledger, store=store), n_back)
+            self.assertEqual(foreign_forward.evaluate(days[-1], ledger, store=store), n_eval)
+        strip = lambda rows: [{k: v for k, v in r.items() if k != "recorded_at"} for r in rows]  # noqa: E731
+        self.assertEqual(strip(foreign_forward.read_log(ledger)), strip(foreign_forward.read_log(baseline)))
+        self.assertGreater(n_eval, 30)
+        self.assertLessEqual(len(src.calls), len(fire_dates) + 1)  # backfill は発火日ごと・評価は1回
+
+        # 台帳が伸びても、揃った区間の評価は取りに行かない
+        src.calls.clear()
+        for ticker in ("S1", "S2"):
+            foreign_forward.append_row({
+                "type": "firing", "fire_date": days[40], "ticker": ticker, "benchmark": "^B",
+                "entry_close": 1.0, "benchmark_entry": 1.0, "entry_date_used": days[40],
+                "windows_bd": {"w5": 5}}, ledger)
+        with contextlib.redirect_stdout(io.StringIO()):
+            foreign_forward.evaluate(days[-1], ledger, store=CloseStore(src.fetch_many, self.dir / "store"))
+        self.assertEqual(src.calls, [])
+
+    def test_price_watch_forward_reads_each_bars_day_once(self):
+        root = self.dir / "jq"
+        (root / "bars").mkdir(parents=True)
+        days = _weekdays(date(2026, 6, 1), 30, "%Y%m%d")
+        codes = ["16050", "16620", "57130"]
+        for i, d in enumerate(days):
+            rows = [{"Code": c, "AdjC": 100 + i + k} for k, c in enumerate(codes) if not (c == "57130" and i == 20)]
+            with gzip.open(root / "bars" / f"{d}.json.gz", "wt", encoding="utf-8") as fh:
+                json.dump({"data": rows}, fh)
+        with gzip.open(root / "topix.json.gz", "wt", encoding="utf-8") as fh:
+            json.dump({"data": [{"Date": f"{d[:4]}-{d[4:6]}-{d[6:]}", "C": 2000 + i} for i, d in enumerate(days)]}, fh)
+
+        log = self.dir / "forward_log.jsonl"
+        with log.open("w", encoding="utf-8") as fh:
+            for k in range(8):
+                fh.write(json.dumps({
+                    "type": "firing", "spec_version": 2, "fire_date": f"2026-06-{k + 1:02d}",
+                    "series_id": f"s{k}", "series_jp": f"系列{k}", "topix_entry": 2000.0,
+                    "eval_days": {"w8": days[10 + k], "w15": days[20]},
+                    "stocks": [{"code": c, "entry_close": 100.0} for c in codes],
+                }, ensure_ascii=False) + "\n")
+
+        reads: list[str] = []
+        real_read = jq_fetch.read_json_gz
+
+        def counting_read(path):
+            reads.append(Path(path).name)
+            return real_read(path)
+
+        with mock.patch.object(jq_fetch, "DATA_ROOT", root), \
+                mock.patch.object(jq_fetch, "read_json_gz", counting_read), \
+                mock.patch.object(price_watch_forward, "LOG_PATH", log), \
+                mock.patch.object(price_watch_forward, "CLOSE_STORE_DIR", self.dir / "jp_store"), \
+                mock.patch.object(price_watch_forward, "_CLOSES", None), \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(price_watch_forward.evaluate(), 16)
+            bars_reads = [r for r in reads if r != "topix.json.gz"]
+            self.assertEqual(sorted(bars_reads), sorted(set(bars_reads)))
+            self.assertEqual(set(bars_reads), {f"{d}.json.gz" for d in days[10:21]})
+
+            reads.clear()
+            self.assertEqual(price_watch_forward.close_of("16620", days[12]), 100 + 12 + 1)
+            self.assertIsNone(price_watch_forward.close_of("57130", days[20]))
+            self.assertEqual(reads, [])
+            self.assertIsNone(price_watch_forward.close_of("16050", "20991231"))  # bars が無い日
+
+        evals = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()
+                 if json.loads(line)["type"] == "evaluation"]
+        first = next(e for e in evals if e["series_id"] == "s0" and e["window"] == "w8")
+        self.assertEqual([r["ret_pct"] for r in first["results"]], [10.0, 11.0, 12.0])
+        late = next(e for e in evals if e["window"] == "w15")
+        self.assertEqual(late["results"][2], {"code": "57130", "status": "no_data"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,216 @@
+"""collector.collect_scheduler（並行収集スケジューラ）のテスト。
+
+固定する契約:
+  1. 同時実行はワーカー数まで・同じキー（アカウント/URL）は同時に1つまで
+  2. 全体の訪問数は毎分予算で縛られる（枠は等間隔に払い出す）
+  3. ブロック系エラー（BLOCK_ERROR_PATTERNS）はキー単位でバックオフして再試行し、
+     他のキーは止めない。ブロックでない例外は再試行しない
+  4. fatal_errors は全体を止めて再送出する・結果は入力順
+
+ブラウザ部分は tests/fixtures/x_profile_timeline.html をローカルから開いて検証する
+（Playwright のブラウザ実体が無い環境ではスキップ）。
+
+実行:
+    python3 -m unittest tests.test_collect_scheduler -v
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from collector.collect_scheduler import (  # noqa: E402
+    CollectScheduler,
+    RequestBudget,
+    ScheduledJob,
+    classify_block_error,
+)
+from collector.exceptions import CookieExpiredError  # noqa: E402
+from collector.x_collector import SafeXCollector  # noqa: E402
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "x_profile_timeline.html"
+
+
+def _fast(**kw) -> CollectScheduler:
+    opts = dict(workers=3, requests_per_minute=6000, max_attempts=3,
+                backoff_sec={"default": 0.2, "429": 0.3}, global_pause_errors=[])
+    opts.update(kw)
+    return CollectScheduler(**opts)
+
+
+class TestClassify(unittest.TestCase):
+    def test_same_as_collector(self):
+        c = SafeXCollector.__new__(SafeXCollector)
+        for msg in ("net::ERR_CONNECTION_RESET at https://x.com", "HTTP 429 Too Many", "Timeout"):
+            self.assertEqual(classify_block_error(msg), c._classify_error(msg))
+        self.assertEqual(classify_block_error("Timeout 30000ms exceeded"), "")
+
+
+class TestScheduler(unittest.TestCase):
+    def test_parallel_bounded_and_per_key_serial(self):
+        lock = threading.Lock()
+        active, peak, key_active, key_peak = [0], [0], {}, {}
+
+        def handler(payload, _res):
+            key = payload["key"]
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+                key_active[key] = key_active.get(key, 0) + 1
+                key_peak[key] = max(key_peak.get(key, 0), key_active[key])
+            time.sleep(0.1)
+            with lock:
+                active[0] -= 1
+                key_active[key] -= 1
+            return payload["n"]
+
+        jobs = [ScheduledJob(key=k, payload={"key": k, "n": i})
+                for i, k in enumerate(["a", "a", "b", "c", "d", "a"])]
+        t0 = time.monotonic()
+        outs = _fast(workers=3).run(jobs, handler)
+        self.assertEqual([o.result for o in outs], list(range(6)))
+        self.assertTrue(all(o.status == "completed" for o in outs))
+        self.assertLessEqual(peak[0], 3)
+        self.assertGreater(peak[0], 1)
+        self.assertEqual(max(key_peak.values()), 1)
+        self.assertLess(time.monotonic() - t0, 0.55)  # 直列なら 0.6s
+
+    def test_requests_per_minute_budget(self):
+        starts = []
+        lock = threading.Lock()
+
+        def handler(payload, _res):
+            with lock:
+                starts.append(time.monotonic())
+
+        jobs = [ScheduledJob(key=str(i), payload=i) for i in range(4)]
+        _fast(workers=4, requests_per_minute=600).run(jobs, handler)  # 0.1s 間隔
+        starts.sort()
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        self.assertTrue(all(g >= 0.09 for g in gaps), gaps)
+
+    def test_block_backoff_per_key_others_continue(self):
+        calls = []
+        lock = threading.Lock()
+
+        def handler(payload, _res):
+            with lock:
+                calls.append((payload, time.monotonic()))
+                n = sum(1 for p, _ in calls if p == payload)
+            if payload == "blocked" and n == 1:
+                raise RuntimeError("page.goto: net::ERR_CONNECTION_RESET")
+            return payload
+
+        jobs = [ScheduledJob(key="blocked", payload="blocked"),
+                ScheduledJob(key="ok1", payload="ok1"), ScheduledJob(key="ok2", payload="ok2")]
+        outs = _fast(workers=1).run(jobs, handler)
+        self.assertEqual([o.status for o in outs], ["completed"] * 3)
+        order = [p for p, _ in calls]
+        # バックオフ中に他のキーが先に進む
+        self.assertEqual(order, ["blocked", "ok1", "ok2", "blocked"])
+        t_first = calls[0][1]
+        t_retry = calls[-1][1]
+        self.assertGreaterEqual(t_retry - t_first, 0.19)
+        self.assertEqual(outs[0].job.attempts, 2)
+
+    def test_block_exhausts_attempts_and_keeps_partials(self):
+        def handler(payload, _res):
+            return {"status": "blocked", "tweets": [payload]}
+
+        outs = _fast(max_attempts=2).run(
+            [ScheduledJob(key="k", payload="p")], handler,
+            blocked_of=lambda r: "429" if r["status"] == "blocked" else "")
+        self.assertEqual(outs[0].status, "blocked")
+        self.assertEqual(outs[0].error_type, "429")
+        self.assertEqual(len(outs[0].attempt_results), 2)
+
+    def test_non_block_error_not_retried(self):
+        calls = []
+
+        def handler(payload, _res):
+            calls.append(payload)
+            raise ValueError("selector not found")
+
+        outs = _fast().run([ScheduledJob(key="k", payload="p")], handler)
+        self.assertEqual(outs[0].status, "failed")
+        self.assertEqual(calls, ["p"])
+
+    def test_fatal_propagates(self):
+        def handler(payload, _res):
+            if payload == 2:
+                raise CookieExpiredError.login_redirect("https://x.com/login")
+            return payload
+
+        jobs = [ScheduledJob(key=str(i), payload=i) for i in range(5)]
+        with self.assertRaises(CookieExpiredError):
+            _fast(workers=2, fatal_errors=(CookieExpiredError,)).run(jobs, handler)
+
+    def test_worker_resources_opened_and_closed_per_thread(self):
+        opened, closed = [], []
+        lock = threading.Lock()
+
+        def open_worker():
+            with lock:
+                opened.append(threading.get_ident())
+            return threading.get_ident()
+
+        def handler(payload, res):
+            self.assertEqual(res, threading.get_ident())  # 資源は開いたスレッドでだけ使う
+            return payload
+
+        jobs = [ScheduledJob(key=str(i), payload=i) for i in range(6)]
+        _fast(workers=3).run(jobs, handler, open_worker=open_worker,
+                             close_worker=lambda r: closed.append(r))
+        self.assertEqual(sorted(opened), sorted(closed))
+        self.assertLessEqual(len(opened), 3)
+
+    def test_global_pause(self):
+        b = RequestBudget(6000)
+        b.pause(0.2)
+        t0 = time.monotonic()
+        b.acquire()
+        self.assertGreaterEqual(time.monotonic() - t0, 0.18)
+
+
+def _browser_available() -> bool:
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            p.chromium.launch(headless=True).close()
+        return True
+    except Exception:
+        return False
+
+
+@unittest.skipUnless(_browser_available(), "Playwright のブラウザ実体が無い")
+class TestSchedulerWithBrowser(unittest.TestCase):
+    def test_isolated_pages_on_fixture(self):
+        from playwright.sync_api import sync_playwright
+
+        def open_worker():
+            pw = sync_playwright().start()
+            browser = pw.chromium.launch(headless=True)
+            return pw, browser, browser.new_context().new_page()
+
+        def close_worker(res):
+            res[1].close()
+            res[0].stop()
+
+        def handler(handle, res):
+            page = res[2]
+            page.goto(FIXTURE.as_uri())
+            hrefs = [a.get_attribute("href") for a in page.locator("article a").all()]
+            return [h for h in hrefs if h.startswith(f"/{handle}/")]
+
+        jobs = [ScheduledJob(key=h, payload=h) for h in ("fixture_user", "other_user", "nobody")]
+        outs = CollectScheduler(workers=2, requests_per_minute=600).run(
+            jobs, handler, open_worker=open_worker, close_worker=close_worker)
+        self.assertEqual([len(o.result) for o in outs], [2, 1, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+"""cross_section（日次 bars の横断面統計キャッシュ）のテスト。
+
+固定する契約:
+  1. 売買代金トレーリング順位は measure_base_rate.build_universe の集計（窓内を日付順・Code 順に
+     Va を足して降順の安定ソート）と同額の並びまで一致する。ProdCat で絞った TOP-N は
+     build_universe（§6凍結・読み替えない）の selected と同じ
+  2. 20営業日リターンは influencer_rescore.ret20_cross_section と同じ値・同じ Code 順
+  3. 変わった bars だけ読み直し、窓・ラグの届く営業日の統計だけ作り直す（全再構築と一致）。
+     窓内に bars が欠けた日は統計なし（None）
+
+stdlib のみ（build_universe との突き合わせだけ measure_base_rate 経由で pandas を使う）。
+
+実行:
+    python3 -m unittest tests.test_cross_section -v
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import random
+import sys
+import tempfile
+import unittest
+from collections import defaultdict
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import cross_section as xs  # noqa: E402
+import measure_base_rate as mbr  # noqa: E402
+
+W = xs.TURNOVER_WINDOWS[0]
+LAG = xs.RETURN_LAGS[0]
+
+
+def _reference_ranking(bars_by_day: dict, win_days: list[str]) -> list[tuple[str, float]]:
+    turnover: dict[str, float] = defaultdict(float)
+    for d in win_days:
+        for code, rec in bars_by_day[d].items():
+            va = rec.get("Va")
+            if va:
+                turnover[code] += va
+    return sorted(turnover.items(), key=lambda x: -x[1])
+
+
+def _reference_returns(bt: dict, bp: dict) -> dict[str, float]:
+    out = {}
+    for code, row in bt.items():
+        c1, c0 = xs._num(row.get("AdjC")), xs._num(bp.get(code, {}).get("AdjC"))
+        if c1 and c0 and c0 > 0:
+            out[code] = c1 / c0 - 1.0
+    return out
+
+
+class TestCrossSection(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        base = Path(self._tmp.name)
+        self.bars = base / "bars"
+        self.store_dir = base / "xsec"
+        self.bdays = [f"2024{m:02d}{d:02d}" for m in (1, 2, 3) for d in range(1, 29) if d % 7 not in (0, 6)]
+        self.data: dict[str, dict] = {}
+        self.rng = random.Random(20261019)
+        for d in self.bdays:
+            self._put(d)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _put(self, d: str):
+        codes = [f"{1000 + i}0" for i in range(15)]
+        self.rng.shuffle(codes)  # ファイル内の並びは日によって違う
+        rows = [{"Code": c, "Va": self.rng.choice([0, None, 100.0, 200.0, 100.0, 0.1, 0.2]),
+                 "AdjC": self.rng.choice([None, 0, 10.0, 11.5, "x", 9.75])}
+                for c in codes if self.rng.random() > 0.1]
+        self.bars.mkdir(exist_ok=True)
+        with gzip.open(self.bars / f"{d}.json.gz", "wt", encoding="utf-8") as f:
+            json.dump({"data": rows}, f)
+        self.data[d] = {r["Code"]: r for r in rows}
+
+    def _store(self) -> xs.CrossSectionStore:
+        return xs.CrossSectionStore(self.store_dir, self.bars, bdays=self.bdays)
+
+    def _check_all(self, store: xs.CrossSectionStore):
+        for i, d in enumerate(self.bdays):
+            got = store.turnover_ranking(d, W)
+            if i < W - 1:
+                self.assertIsNone(got)
+            else:
+                self.assertEqual(got, _reference_ranking(self.data, self.bdays[i - W + 1:i + 1]), d)
+                self.assertEqual(store.window_days(d, W), self.bdays[i - W + 1:i + 1])
+            ret = store.returns(d, LAG)
+            if i < LAG:
+                self.assertIsNone(ret)
+            else:
+                want = _reference_returns(self.data[d], self.data[self.bdays[i - LAG]])
+                self.assertEqual(list(ret.items()), list(want.items()), d)
+
+    def test_matches_raw_aggregation_and_reopens(self):
+        store = self._store()
+        self.assertEqual(store.sync()["read"], len(self.bdays))
+        self._check_all(store)
+        again = self._store()
+        self.assertEqual(again.sync(), {"read": 0, "removed": 0, "stats": 0})
+        self._check_all(again)
+        d = self.bdays[-1]
+        self.assertEqual(again.value(d, "10000", "va"), self.data[d].get("10000", {}).get("Va"))
+        ranks = again.turnover_ranks(d, W)
+        first = again.turnover_ranking(d, W)[0][0]
+        self.assertEqual(ranks[first], (1, 1 / len(ranks)))
+
+    def test_ranking_matches_frozen_build_universe(self):
+        store = self._store()
+        store.sync()
+        master = {c: {"Code": c, "ProdCat": mbr.PROD_CAT_STOCK if int(c[:4]) % 3 else "0999"}
+                  for c in {c for day in self.data.values() for c in day}}
+        stock = {c for c, rec in master.items() if rec["ProdCat"] == mbr.PROD_CAT_STOCK}
+        bday_index = {d: i for i, d in enumerate(self.bdays)}
+        with mock.patch.object(mbr, "load_bars_day", lambda d: self.data[d]), \
+                mock.patch.object(mbr, "load_master_day", lambda d: master):
+            for d in self.bdays[W - 1:]:
+                want, _stats = mbr.build_universe(d, bday_index, self.bdays, W, top_n=5)
+                got = [(c, tv) for c, tv in store.turnover_ranking(d, W) if c in stock][:5]
+                self.assertEqual(got, want, d)
+
+    def test_incremental_update_touches_only_reach(self):
+        store = self._store()
+        store.sync()
+        mid = self.bdays[30]
+        self._put(mid)
+        stats = self._store().sync()
+        self.assertEqual(stats["read"], 1)
+        self.assertEqual(stats["stats"], max(W - 1, LAG) + 1)
+        self._check_all(self._store())
+
+    def test_missing_day_blocks_window(self):
+        hole = self.bdays[25]
+        (self.bars / f"{hole}.json.gz").unlink()
+        store = self._store()
+        store.sync()
+        self.assertIsNone(store.turnover_ranking(self.bdays[25 + W - 1], W))
+        self.assertIsNotNone(store.turnover_ranking(self.bdays[25 + W], W))
+        self.assertIsNone(store.returns(self.bdays[25 + LAG], LAG))
+        self.assertIsNone(store.columns(hole))
+
+
+if __name__ == "__main__":
+    unittest.main()
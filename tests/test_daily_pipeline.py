@@ -0,0 +1,128 @@
+"""daily_pipeline の同一プロセス実行（--in-process）のテスト。
+
+固定する契約:
+  1. ステップ内の sys.exit はその exit code、例外は 1 として返し、パイプライン本体は止まらない。
+     ステップは PROJECT_ROOT をカレントにして走り、終われば（失敗でも）元のカレントに戻る。
+     Python 3.11 専用の contextlib.chdir に依存しない
+  2. collect が返したツイートはそのまま（ファイルを読み直さず）classify に渡る。
+     _log_run / _summarize_log の記録は従来どおり
+  3. classify_tweets.main にツイートを渡すと入力ファイルを読まずに分類し、classified_llm.json を
+     入力と同じフォルダに保存する
+
+実行:
+    python3 -m unittest tests.test_daily_pipeline -v
+"""
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import classify_tweets  # noqa: E402
+import daily_pipeline  # noqa: E402
+from collector.classifier import TweetClassifier  # noqa: E402
+
+TWEETS = [
+    {"username": "alice", "text": "トヨタ株を買いました。7203 買い増し", "url": "https://x.com/alice/status/1"},
+    {"username": "bob", "text": "今日は天気がいい", "url": "https://x.com/bob/status/2"},
+]
+
+
+class _FakeSteps:
+    def __init__(self):
+        self.seen = None
+
+    def collect(self, argv):
+        self.cwd = Path.cwd()
+        self.argv = argv
+        return Path("output/2026-10-19/tweets.json"), TWEETS
+
+    def classify(self, collected):
+        self.seen = collected
+        return "output/2026-10-19/classified_llm.json"
+
+
+class TestDailyPipelineInProcess(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_run_inprocess_contains_failures(self):
+        def exit2():
+            sys.exit(2)
+
+        def boom():
+            raise RuntimeError("step crashed")
+
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()) as err:
+            self.assertEqual(daily_pipeline._run_inprocess(exit2, "collect"), (2, None))
+            self.assertEqual(daily_pipeline._run_inprocess(boom, "classify"), (1, None))
+            self.assertEqual(daily_pipeline._run_inprocess(lambda: sys.exit(), "x"), (0, None))
+            self.assertEqual(daily_pipeline._run_inprocess(lambda: Path.cwd(), "x"), (0, daily_pipeline.PROJECT_ROOT))
+        self.assertIn("step crashed", err.getvalue())
+
+    def test_run_inprocess_restores_cwd_without_contextlib_chdir(self):
+        prev = os.getcwd()
+        self.addCleanup(os.chdir, prev)
+        os.chdir(self.dir)
+        start = Path.cwd()
+
+        def boom():
+            raise RuntimeError("step crashed")
+
+        ns = vars(contextlib)
+        with mock.patch.dict(ns), contextlib.redirect_stdout(io.StringIO()), \
+                contextlib.redirect_stderr(io.StringIO()):
+            ns.pop("chdir", None)  # 3.10 以前の contextlib を再現
+            self.assertEqual(daily_pipeline._run_inprocess(Path.cwd, "collect"), (0, daily_pipeline.PROJECT_ROOT))
+            self.assertEqual(Path.cwd(), start)
+            self.assertEqual(daily_pipeline._run_inprocess(boom, "classify"), (1, None))
+            self.assertEqual(Path.cwd(), start)
+
+    def test_collected_tweets_pass_to_classify_in_memory(self):
+        fake = _FakeSteps()
+        log_dir = self.dir / "output" / "pipeline_log"
+        argv = ["daily_pipeline.py", "--in-process", "--skip-compose", "--scrolls", "3",
+                "--posting-output", str(self.dir / "posting")]
+        with mock.patch.object(sys, "argv", argv), \
+                mock.patch.object(daily_pipeline, "_load_in_process_steps", return_value=fake), \
+                mock.patch.object(daily_pipeline, "PROJECT_ROOT", self.dir), \
+                contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(daily_pipeline.main(), 0)
+        self.assertIs(fake.seen[1], TWEETS)
+        self.assertEqual(fake.cwd.resolve(), self.dir.resolve())
+        self.assertEqual(fake.argv, ["--groups", "all", "--scrolls", "3", "--output", "output"])
+
+        records = [json.loads(line) for f in log_dir.glob("*.jsonl") for line in f.read_text().splitlines()]
+        run_id = records[0]["run_id"]
+        self.assertEqual([r["step"] for r in records], ["pipeline_start", "collect", "classify", "pipeline_metric"])
+        self.assertEqual([r.get("exit_code") for r in records if "exit_code" in r], [0, 0])
+        summary = daily_pipeline._summarize_log(next(log_dir.glob("*.jsonl")), run_id)
+        self.assertEqual(set(summary["steps"]), {"collect", "classify"})
+
+    def test_classify_main_uses_given_tweets_and_classifiers(self):
+        input_file = self.dir / "2026-10-19" / "tweets.json"  # 存在しない（読まれないこと）
+        input_file.parent.mkdir()
+        keyword = TweetClassifier()
+        with contextlib.redirect_stdout(io.StringIO()):
+            out = classify_tweets.main(["--input", str(input_file), "--no-viewer"],
+                                       tweets=[dict(t) for t in TWEETS], classifiers=(keyword, None))
+        self.assertEqual(out, os.path.join(str(input_file.parent), "classified_llm.json"))
+        saved = json.loads(Path(out).read_text(encoding="utf-8"))
+        self.assertEqual(saved, TweetClassifier().classify_all([dict(t) for t in TWEETS]))
+        self.assertFalse(input_file.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
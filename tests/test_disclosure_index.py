@@ -0,0 +1,132 @@
+"""disclosure_index（EDINET / TDnet キャッシュの SQLite 索引）のテスト。
+
+固定する契約:
+  1. edinet_documents はファイルを日付順に開いて results を繋いだのと同じ並び・同じ dict を返す
+     （<date>.revN.json.gz の退避ファイルは読まない）
+  2. 台帳（fetch_log / receipts）が伸びていなければキャッシュを歩かない。伸びたら変わった
+     ファイルだけ読み直し、消えたファイルは索引から外す
+  3. 銘柄×期間・表題の正規表現・TOB キーワード（edinet_fetch._matches_tob_keywords と同じ）で引ける
+  4. surge_origin_attribution.edinet_by_code と同じ {code5: {docTypeCode}} を返せる
+
+stdlib のみ（ネットワーク不要）。
+
+実行:
+    python3 -m unittest tests.test_disclosure_index -v
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import disclosure_index as di  # noqa: E402
+
+
+def _gz(path: Path, obj) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False)
+
+
+def _doc(doc_id: str, sec, doc_type: str, desc, submit: str) -> dict:
+    return {"docID": doc_id, "secCode": sec, "docTypeCode": doc_type, "docDescription": desc,
+            "submitDateTime": submit, "edinetCode": "E00001", "filerName": "提出者"}
+
+
+def _item(item_id: str, code: str, title: str, pub: str) -> dict:
+    return {"Tdnet": {"id": item_id, "company_code": code, "company_name": "社名", "title": title,
+                      "pubdate": pub}}
+
+
+class TestDisclosureIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        base = Path(self._tmp.name)
+        self.all_root = base / "edinet/documents_all"
+        self.tdnet_root = base / "tdnet/index"
+        self.log = base / "edinet/fetch_log.jsonl"
+        self.receipts = base / "tdnet/receipts.jsonl"
+        self.docs = {
+            "20240105": [_doc("S1", "72030", "240", "公開買付届出書", "2024-01-05 09:00"),
+                         _doc("S2", None, "120", "有価証券報告書", "2024-01-05 10:00"), "broken"],
+            "20240104": [_doc("S0", "1301", "350", "大量保有報告書", "2024-01-04 15:00")],
+        }
+        for d, recs in self.docs.items():
+            _gz(self.all_root / f"{d}.json.gz", {"date": d, "results": recs})
+        _gz(self.all_root / "20240105.rev1.json.gz", {"results": [_doc("OLD", "72030", "240", "x", "")]})
+        _gz(self.tdnet_root / "2024/20240101_20240107.json.gz", {"items": [
+            _item("T1", "7203", "公開買付けの開始に関するお知らせ", "2024-01-05 15:30:00"),
+            _item("T2", "13010", "業績予想の修正に関するお知らせ", "2024-01-04 13:00:00"),
+            _item("T3", "7203", "壊れた時刻", "bad"),
+        ]})
+        self._log_line()
+        self.idx = di.DisclosureIndex(base / "index.sqlite3", edinet_all_root=self.all_root,
+                                      edinet_holdings_root=base / "edinet", tdnet_root=self.tdnet_root,
+                                      edinet_log=self.log, tdnet_receipts=self.receipts)
+
+    def tearDown(self):
+        self.idx.close()
+        self._tmp.cleanup()
+
+    def _log_line(self):
+        self.log.parent.mkdir(parents=True, exist_ok=True)
+        with self.log.open("a", encoding="utf-8") as f:
+            f.write('{"status": "run_start"}\n')
+
+    def test_edinet_same_order_as_files_and_rev_ignored(self):
+        self.idx.refresh()
+        expected = self.docs["20240104"] + self.docs["20240105"]
+        self.assertEqual(self.idx.edinet_documents(), expected)
+        self.assertEqual(self.idx.edinet_documents("20240105", "20240105", file_dates={"20240104"}), [])
+        self.assertEqual(self.idx.edinet_files(), {"20240104", "20240105"})
+
+    def test_queries(self):
+        self.idx.refresh()
+        self.assertEqual([d["docID"] for d in self.idx.edinet_documents(tob_only=True)], ["S1"])
+        self.assertEqual([d["docID"] for d in self.idx.edinet_documents(code="7203")], ["S1"])
+        self.assertEqual(self.idx.edinet_doc_types_by_code("20240105"), {"72030": {"240"}})
+        self.assertEqual(self.idx.edinet_doc_types_by_code("20240104"), {"13010": {"350"}})
+        self.assertEqual(self.idx.tdnet_count(), 3)
+        self.assertEqual([i["Tdnet"]["id"] for i in self.idx.tdnet_items(title_regex="公開買付")], ["T1"])
+        self.assertEqual([i["Tdnet"]["id"] for i in self.idx.tdnet_items("20240101", "20241231")],
+                         ["T1", "T2"])  # 時刻の壊れた項目は期間指定では出ない
+        hits = self.idx.documents_for_code("7203", "20240101", "20240131")
+        self.assertEqual([(h["source"], h["doc_id"]) for h in hits], [("edinet", "S1"), ("tdnet", "T1")])
+        self.assertEqual(hits[1]["tob_keyword"], 1)
+
+    def test_incremental_refresh(self):
+        self.assertEqual(self.idx.refresh()["indexed"], 3)
+        self.assertEqual(self.idx.refresh(), {"walked": 0, "indexed": 0, "removed": 0})
+
+        # 台帳が伸びないまま書き換わっても歩かない（rescan で拾う）
+        _gz(self.all_root / "20240104.json.gz", {"results": [_doc("S0b", "1301", "360", "訂正", "")]})
+        self.assertEqual(self.idx.refresh()["walked"], 0)
+        self.assertEqual(self.idx.refresh(rescan=True)["indexed"], 1)
+        self.assertEqual(self.idx.edinet_documents("20240104", "20240104")[0]["docID"], "S0b")
+
+        (self.all_root / "20240105.json.gz").unlink()
+        self.receipts.parent.mkdir(parents=True, exist_ok=True)
+        self.receipts.write_text('{"status": "run_end"}\n', encoding="utf-8")
+        stats = self.idx.refresh()
+        self.assertEqual((stats["walked"], stats["indexed"], stats["removed"]), (1, 0, 1))
+        self.assertEqual([d["docID"] for d in self.idx.edinet_documents()], ["S0b"])
+
+    def test_reopen_keeps_index(self):
+        self.idx.refresh()
+        again = di.DisclosureIndex(self.idx.con.execute("PRAGMA database_list").fetchone()[2],
+                                   edinet_all_root=self.all_root, tdnet_root=self.tdnet_root,
+                                   edinet_log=self.log, tdnet_receipts=self.receipts)
+        try:
+            self.assertEqual(again.refresh()["walked"], 0)
+            self.assertEqual(again.tdnet_count(), 3)
+        finally:
+            again.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,259 @@
+"""forward_eval（フォワード評価の一括エンジン）と採点スクリプト3本のテスト。
+
+固定する契約:
+  1. base_rate 規則は measure_base_rate.compute_forward_return_for_code と同じ値を返す
+     （欠損日・欠損値・ギャップダウン・上場廃止を含む）。重複した要求は1回だけ計算し、
+     bars は窓の和集合の日を1日1回だけ読む
+  2. 結果は保存して次のエンジン（別スクリプト）が読まずに使う。bars の署名が変わった日を
+     窓に含む結果だけを計算し直し、規則の版が変われば全部計算し直す
+  3. candidate_score.evaluate_forward・rescore.forward_reach・leaderboard.evaluate_rows は
+     1行ずつ bars を引いていた従来の定義と同じ結果（打ち切り・除外の理由も同じ）
+
+実行:
+    python3 -m unittest tests.test_forward_eval -v
+"""
+from __future__ import annotations
+
+import bisect
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import forward_eval  # noqa: E402
+import jq_fetch  # noqa: E402
+import measure_base_rate as mbr  # noqa: E402
+
+_load_bars_day = mbr.load_bars_day
+import influencer_rescore  # noqa: E402  (influencer_pick_profile が mbr.load_bars_day を無制限 memo に差し替える)
+mbr.load_bars_day = _load_bars_day
+import influencer_candidate_score  # noqa: E402
+import influencer_leaderboard  # noqa: E402
+
+CODES = [f"{1300 + 10 * k}0" for k in range(10)]
+
+
+def _weekdays(start: date, n: int) -> list[str]:
+    out, day = [], start
+    while len(out) < n:
+        if day.weekday() < 5:
+            out.append(day.strftime("%Y%m%d"))
+        day += timedelta(days=1)
+    return out
+
+
+def _write_bars(bars_dir: Path, days: list[str], seed: int = 0) -> None:
+    rng = random.Random(seed)
+    price = {c: 1000.0 for c in CODES}
+    for i, d in enumerate(days):
+        rows = []
+        for k, code in enumerate(CODES):
+            if k == 0 and i > 40:                     # 上場廃止
+                continue
+            if k == 1:                                # 横ばい・終値なしの急落日だけ（窓内最後の AdjC より後の安値）
+                rows.append({"Code": code, "AdjO": 500.0, "AdjH": 505.0, "AdjL": 250.0 if i == 30 else 495.0,
+                             "AdjC": None if i == 30 else 500.0})
+                continue
+            if rng.random() < 0.08:                   # 売買停止（行なし）
+                continue
+            price[code] *= 1 + rng.choice([-0.12, -0.04, -0.01, 0.0, 0.02, 0.05, 0.15])
+            p = round(price[code], 1)
+            rec = {"Code": code, "AdjO": p * 1.005, "AdjH": p * 1.03, "AdjL": p * 0.98, "AdjC": p}
+            if rng.random() < 0.08:
+                rec["AdjO"] = rng.choice([None, 0])   # 始値なし
+            if rng.random() < 0.08:
+                rec["AdjH"] = rec["AdjL"] = None
+            if rng.random() < 0.05:
+                rec["AdjC"] = None
+            rows.append(rec)
+        with gzip.open(bars_dir / f"{d}.json.gz", "wt", encoding="utf-8") as f:
+            json.dump({"data": rows}, f)
+
+
+def _ref_section0(code, post_date, bdays, last_bar_day):
+    """influencer_candidate_score.evaluate_forward の従来実装（1日ずつ bars を引く）。"""
+    to_float = influencer_candidate_score.to_float
+    signal_idx = bisect.bisect_right(bdays, post_date)
+    if signal_idx >= len(bdays):
+        return {"status": "censored", "reason": "signal_not_arrived"}
+    entry_idx, base = signal_idx + 1, {"signal_date": bdays[signal_idx]}
+    exit_idx = entry_idx + 20
+    if entry_idx >= len(bdays) or bdays[entry_idx] > last_bar_day:
+        return {**base, "status": "censored", "reason": "entry_not_arrived"}
+    if exit_idx >= len(bdays) or bdays[exit_idx] > last_bar_day:
+        return {**base, "entry_date": bdays[entry_idx], "status": "censored", "reason": "20bd_not_matured"}
+    head = {**base, "entry_date": bdays[entry_idx], "exit_date": bdays[exit_idx]}
+    entry = to_float(mbr.load_bars_day(bdays[entry_idx]).get(code, {}).get("AdjO"))
+    if entry is None or entry <= 0:
+        return {**head, "status": "excluded", "reason": "entry_adj_open_missing"}
+    exit_close = to_float(mbr.load_bars_day(bdays[exit_idx]).get(code, {}).get("AdjC"))
+    highs = [h for h in (to_float(mbr.load_bars_day(d).get(code, {}).get("AdjH"))
+                         for d in bdays[entry_idx:exit_idx + 1]) if h is not None]
+    if exit_close is None or not highs:
+        return {**head, "status": "excluded", "reason": "forward_price_missing"}
+    gross, mfe = exit_close / entry - 1.0, max(highs) / entry - 1.0
+    return {**head, "entry_adj_open": entry, "exit_adj_close": exit_close, "gross_return": gross,
+            "net_return": gross - 0.003, "mfe": mfe, "touch_20pct": mfe >= 0.20,
+            "close_20pct": gross >= 0.20, "status": "scored", "reason": ""}
+
+
+def _ref_reach(code, bdays, bidx, signal, last_bar):
+    """influencer_rescore.forward_reach の従来実装。"""
+    fnum = influencer_rescore.fnum
+    si = bidx.get(signal)
+    if si is None:
+        return None
+    ei, xi = si + 1, si + 21
+    if xi >= len(bdays) or bdays[xi] > last_bar:
+        return None
+    entry = fnum(mbr.load_bars_day(bdays[ei]).get(code, {}).get("AdjO"))
+    if not entry or entry <= 0:
+        return None
+    exit_c = fnum(mbr.load_bars_day(bdays[xi]).get(code, {}).get("AdjC"))
+    if not exit_c:
+        return None
+    touch = any((h := fnum(mbr.load_bars_day(d).get(code, {}).get("AdjH"))) is not None and h >= entry * 1.2
+                for d in bdays[ei:xi + 1])
+    gross = exit_c / entry - 1.0
+    return {"close20": gross >= 0.20, "touch": touch, "ret": gross - mbr.ROUND_TRIP_COST}
+
+
+class TestForwardEval(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name) / "jquants"
+        (self.root / "bars").mkdir(parents=True)
+        self.bdays = _weekdays(date(2025, 3, 3), 70)
+        self.bidx = {d: i for i, d in enumerate(self.bdays)}
+        self.bars_days = self.bdays[:60]               # 最後の10営業日は bars 未取得
+        _write_bars(self.root / "bars", self.bars_days)
+        patcher = mock.patch.object(jq_fetch, "DATA_ROOT", self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        mbr.load_bars_day.cache_clear()
+        self.addCleanup(mbr.load_bars_day.cache_clear)
+        self.reads: list[str] = []
+
+    def _engine(self, cache: bool = True) -> forward_eval.ForwardEngine:
+        def counting(d):
+            self.reads.append(d)
+            return mbr.load_bars_day(d)
+        return forward_eval.ForwardEngine(self.root / "forward_eval" if cache else None, load_day=counting)
+
+    def _base_rate_requests(self) -> list[tuple]:
+        signals = self.bdays[:38]
+        reqs = [(code, t, 20, "base_rate") for code in CODES for t in signals]
+        return reqs + reqs[::3]                        # 別アカウントが同じ銘柄×日を挙げた分
+
+    def test_base_rate_matches_canonical_in_one_pass(self):
+        engine = self._engine(cache=False)
+        reqs = self._base_rate_requests()
+        results = engine.evaluate(reqs, self.bdays, self.bidx)
+        for code, t, _h, _rule in set(reqs):
+            self.assertEqual(results[(code, t, 20, "base_rate")],
+                             mbr.compute_forward_return_for_code(code, t, self.bidx, self.bdays), (code, t))
+        outcomes = Counter("none" if r is None else ("delisted" if r["delisted_flag"] else "ok")
+                           for r in results.values())
+        self.assertGreater(min(outcomes["none"], outcomes["delisted"], outcomes["ok"]), 0)
+        self.assertGreater(sum(1 for r in results.values() if r and r["ret_stop8"] != r["ret"] - 0.003), 0)
+        self.assertEqual(engine.stats["computed"], len(set(reqs)))
+        self.assertEqual(sorted(self.reads), sorted(set(self.reads)))
+        self.assertEqual(set(self.reads), set(self.bdays[1:59]))
+        with self.assertRaises(SystemExit):            # カレンダー外は従来どおり FATAL
+            engine.evaluate([(CODES[1], self.bdays[60], 20, "base_rate")], self.bdays, self.bidx)
+
+    def test_results_persist_and_invalidate_by_bars_signature(self):
+        reqs = self._base_rate_requests()
+        first = self._engine().evaluate(reqs, self.bdays, self.bidx)
+        self.reads.clear()
+        reopened = self._engine()
+        self.assertEqual(reopened.evaluate(reqs, self.bdays, self.bidx), first)
+        self.assertEqual(self.reads, [])
+        self.assertEqual(reopened.stats["computed"], 0)
+
+        # 1日分の bars が取り直された → その日を窓に含む結果だけ計算し直す
+        changed = self.bdays[30]
+        path = self.root / "bars" / f"{changed}.json.gz"
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            obj = json.load(f)
+        for rec in obj["data"]:
+            rec["AdjC"] = rec["AdjC"] and rec["AdjC"] * 1.5
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(obj, f)
+        os.utime(path, ns=(1, 1))
+        mbr.load_bars_day.cache_clear()
+        self.reads.clear()
+        again = self._engine()
+        results = again.evaluate(reqs, self.bdays, self.bidx)
+        touched = {(c, t) for c, t, _h, _r in reqs if self.bidx[t] + 1 <= 30 <= self.bidx[t] + 21}
+        self.assertEqual(again.stats["computed"], len(touched))
+        self.assertNotIn(self.bdays[5], self.reads)
+        for code, t, _h, _r in set(reqs):
+            self.assertEqual(results[(code, t, 20, "base_rate")],
+                             mbr.compute_forward_return_for_code(code, t, self.bidx, self.bdays))
+
+        with mock.patch.dict(forward_eval.RULES, {"base_rate": (99, forward_eval.rule_base_rate)}):
+            bumped = self._engine()
+            bumped.evaluate(reqs, self.bdays, self.bidx)
+        self.assertEqual(bumped.stats["computed"], len(set(reqs)))
+
+    def test_scripts_match_row_by_row_definitions(self):
+        last_bar = self.bars_days[-1]
+        rng = random.Random(7)
+        calendar_days = [(d, "1") for d in self.bdays]
+        post_dates = [(date(2025, 3, 1) + timedelta(days=i)).strftime("%Y%m%d") for i in range(100)]
+        mentions = [(rng.choice(CODES), rng.choice(post_dates)) for _ in range(150)]
+
+        engine = self._engine()
+        got = influencer_candidate_score.evaluate_forward_many(mentions, self.bdays, last_bar, engine)
+        want = [_ref_section0(c, d, self.bdays, last_bar) for c, d in mentions]
+        self.assertEqual(got, want)
+        self.assertEqual({r["status"] for r in got}, {"censored", "excluded", "scored"})
+        with mock.patch.object(forward_eval, "_shared", engine):
+            self.assertEqual(influencer_candidate_score.evaluate_forward(*mentions[0], self.bdays, last_bar), want[0])
+
+        pairs = [(rng.choice(CODES), rng.choice(self.bdays[:45])) for _ in range(150)]
+        reach = influencer_rescore.forward_reach_many(pairs, self.bdays, self.bidx, last_bar, engine)
+        for code, t in pairs:
+            self.assertEqual(reach[(code, t)], _ref_reach(code, self.bdays, self.bidx, t, last_bar))
+        self.assertTrue(any(r and r["touch"] for r in reach.values()))
+
+        rows = [{"account": f"a{i % 4}", "mention_date": f"{d[:4]}-{d[4:6]}-{d[6:]}", "code": c}
+                for i, (c, d) in enumerate(mentions)]
+        all_bdays = mbr.all_business_days(calendar_days)
+        bidx = {d: i for i, d in enumerate(all_bdays)}
+        kept, excl = influencer_leaderboard.evaluate_rows(rows, all_bdays, bidx, last_bar, {}, engine)
+        ref_kept, ref_excl = [], Counter()
+        for row in rows:
+            t = influencer_leaderboard.resolve_signal_bday(row["mention_date"], all_bdays)
+            if t is None or bidx[t] + 21 >= len(all_bdays):
+                ref_excl["calendar_out_of_range"] += 1
+            elif all_bdays[bidx[t] + 21] > last_bar:
+                ref_excl["censored"] += 1
+            elif (res := mbr.compute_forward_return_for_code(row["code"], t, bidx, all_bdays)) is None:
+                ref_excl["entry_missing"] += 1
+            else:
+                ref_kept.append({**row, **res, "signal_date": t,
+                                 "universe_month_ref": influencer_leaderboard.prev_year_month(row["mention_date"]),
+                                 "in_universe_top500": None})
+        self.assertEqual(kept, ref_kept)
+        self.assertEqual(excl, ref_excl)
+
+        self.reads.clear()                             # 次の実行（別スクリプト・別プロセス）は読まない
+        influencer_leaderboard.evaluate_rows(rows, all_bdays, bidx, last_bar, {}, self._engine())
+        influencer_rescore.forward_reach_many(pairs, self.bdays, self.bidx, last_bar, self._engine())
+        self.assertEqual(self.reads, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""collector.graphql_timeline（タイムライン GraphQL 応答の傍受・共有抽出器）のテスト。
+
+固定する契約:
+  1. 応答 JSON から id・表示本文（返信先 @ とメディア t.co を除き、t.co は展開・HTML 実体参照を
+     戻す）・長文（note_tweet の全文）・整数指標・投稿時刻（<time datetime> と同形式）を取る
+  2. リポストはカードと同じく元投稿を返す・可視性ラッパーと新しい core 形式を外す・
+     固定ポストの印・X Articles の title/preview_text
+  3. TimelineCapture は対象の操作名だけを取り込み、take() は前回以降の新着・clear() で前ページを捨てる
+  4. 収集行への変換は従来の DOM 経路と同じ形（x_search_collect_twittora.row_from_graphql）
+
+tests/fixtures/x_graphql_user_tweets.json は UserTweets 応答を模した最小の fixture。
+Playwright・ネットワーク不要。
+
+実行:
+    python3 -m unittest tests.test_graphql_timeline -v
+"""
+from __future__ import annotations
+
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from collector.graphql_timeline import (  # noqa: E402
+    TimelineCapture,
+    find_tweet_results,
+    operation_of,
+    parse_timeline_response,
+)
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "x_graphql_user_tweets.json"
+USER_TWEETS_URL = "https://x.com/i/api/graphql/AbC123/UserTweets?variables=%7B%7D"
+
+
+def _data() -> dict:
+    return json.loads(FIXTURE.read_text(encoding="utf-8"))
+
+
+class _Response:
+    def __init__(self, url: str, data=None, broken: bool = False):
+        self.url = url
+        self._data = data
+        self._broken = broken
+
+    def json(self):
+        if self._broken:
+            raise ValueError("not json")
+        return self._data
+
+
+class TestParse(unittest.TestCase):
+    def setUp(self):
+        self.tweets = {t["id"]: t for t in parse_timeline_response(_data())}
+
+    def test_order_and_pinned(self):
+        ids = [t["id"] for t in parse_timeline_response(_data())]
+        self.assertEqual(ids, ["2001", "2002", "2003", "9001", "2005"])
+        self.assertTrue(self.tweets["2001"]["pinned"])
+        self.assertFalse(self.tweets["2002"]["pinned"])
+
+    def test_display_text_and_metrics(self):
+        t = self.tweets["2002"]
+        self.assertEqual(t["text"], "返信です & リンク https://example.com/a を見て")
+        self.assertEqual((t["likes"], t["retweets"], t["replies"], t["bookmarks"], t["impressions"]),
+                         (120, 3, 12, 5, 12345))
+        self.assertEqual(t["created_at"], "2026-10-19T00:00:00.000Z")
+        self.assertEqual(t["screen_name"], "fixture_user")
+
+    def test_note_tweet_full_text_and_missing_views(self):
+        t = self.tweets["2003"]
+        self.assertEqual(t["text"], "長文" * 200)
+        self.assertTrue(t["is_long_form"])
+        self.assertIsNone(t["impressions"])  # 欠測は 0 にしない
+
+    def test_repost_returns_original(self):
+        t = self.tweets["9001"]
+        self.assertEqual((t["screen_name"], t["reposted_by"], t["text"]),
+                         ("other_user", "fixture_user", "元の投稿"))
+        self.assertNotIn("2004", self.tweets)
+
+    def test_visibility_wrapper_new_core_and_article(self):
+        t = self.tweets["2005"]
+        self.assertEqual(t["screen_name"], "fixture_user")
+        self.assertEqual(t["article"], {"title": "記事タイトル", "preview_text": "記事の冒頭"})
+
+    def test_bookmarks_deep_find_is_shared(self):
+        import fetch_bookmarks
+        self.assertEqual(len(fetch_bookmarks._deep_find_tweets(_data())), len(find_tweet_results(_data())))
+
+
+class TestCapture(unittest.TestCase):
+    def test_operation_filter_take_and_clear(self):
+        cap = TimelineCapture(operations=("UserTweets",))
+        cap._on_response(_Response("https://x.com/i/api/graphql/AbC123/TweetDetail?x=1", _data()))
+        cap._on_response(_Response("https://abs.twimg.com/x.js"))
+        cap._on_response(_Response(USER_TWEETS_URL, broken=True))  # 壊れた応答は黙って捨てる
+        self.assertEqual(len(cap), 0)
+        cap._on_response(_Response(USER_TWEETS_URL, _data()))
+        self.assertEqual(len(cap.take()), 5)
+        self.assertEqual(cap.take(), [])
+        self.assertEqual(cap.get("2002")["likes"], 120)
+        cap.clear()
+        self.assertIsNone(cap.get("2002"))
+
+    def test_refetch_updates_metrics_keeps_order(self):
+        cap = TimelineCapture()
+        cap.ingest(_data())
+        again = _data()
+        entries = again["data"]["user"]["result"]["timeline_v2"]["timeline"]["instructions"][2]["entries"]
+        entries[0]["content"]["itemContent"]["tweet_results"]["result"]["legacy"]["favorite_count"] = 130
+        self.assertEqual(cap.ingest(again), 0)
+        self.assertEqual(cap.get("2002")["likes"], 130)
+        self.assertTrue(cap.get("2001")["pinned"])
+        self.assertEqual([t["id"] for t in cap.tweets()][:2], ["2001", "2002"])
+
+    def test_operation_of(self):
+        self.assertEqual(operation_of(USER_TWEETS_URL), "UserTweets")
+        self.assertEqual(operation_of("https://x.com/home"), "")
+
+
+class TestSearchRow(unittest.TestCase):
+    def test_row_matches_dom_shape(self):
+        import x_search_collect_twittora as xs
+        tweets = {t["id"]: t for t in parse_timeline_response(_data())}
+        row = xs.row_from_graphql(tweets["2003"])
+        self.assertEqual(row["url"], "https://x.com/fixture_user/status/2003")
+        self.assertEqual(row["posted_at"], "2026-10-18")
+        self.assertEqual(row["content_source"], "graphql")
+        self.assertEqual(row["impressions"], 0)
+        self.assertEqual(row["metrics_missing"], ["impressions"])
+        article = xs.row_from_graphql(tweets["2005"])
+        self.assertEqual(article["content"], "記事タイトル\n\n記事の冒頭")
+        self.assertEqual(article["content_source"], "x_article")
+        # 応答由来の行は syndication の正規化に回らない（DOM 由来だけが対象）
+        stats = xs.apply_syndication_pass([row, article], empty_cap=0)
+        self.assertEqual(sum(stats.values()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+"""collector.grok_client（並行バッチ・ハンドル単位キャッシュ付きの発見/スクリーニング）のテスト。
+
+固定する契約:
+  1. 並行実行の結果は逐次（concurrency=1）と同じ候補・同じ順（バッチの完了順によらない）。
+     同時に投げるバッチは concurrency 本まで
+  2. TTL 内にスクリーニング済みのハンドルは API に送らず、出力はキャッシュ無しの実行と同じ。
+     TTL 切れは再スクリーニング、失敗したバッチは保存しない。期間を明示したスクリーニングは
+     同じ期間の保存結果だけを使う
+  3. 発見（キーワード）もバッチ順にマージする
+
+xai-sdk のクライアントは定型の構造化結果を返す偽物に差し替える。
+
+実行:
+    python3 -m unittest tests.test_grok_client -v
+"""
+from __future__ import annotations
+
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from collector.grok_client import GrokClient  # noqa: E402
+
+
+def _score(handle: str) -> int:
+    return sum(map(ord, handle)) % 101
+
+
+class _FakeChat:
+    def __init__(self, owner: "FakeClient", tools):
+        self.owner, self.tools, self.messages = owner, tools, []
+
+    def append(self, message):
+        self.messages.append(message)
+
+    def parse(self, result_cls):
+        return None, self.owner.respond(result_cls, self.tools, str(self.messages[-1]))
+
+
+class FakeClient:
+    """chat.create(...).parse(ScreeningResult/DiscoveryResult) に定型の結果を返す。"""
+
+    def __init__(self, seed: int = 0):
+        self.chat = self
+        self.rng = random.Random(seed)
+        self.handles_sent: list[str] = []
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def create(self, model, tools):
+        return _FakeChat(self, tools)
+
+    def respond(self, result_cls, tools, prompt: str):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            delay = self.rng.uniform(0, 0.03)
+        try:
+            time.sleep(delay)  # 完了順をばらす
+            if result_cls.__name__ == "ScreeningResult":
+                handles = list(tools[0].x_search.allowed_x_handles)
+                if "boom" in handles:
+                    raise RuntimeError("upstream 503")
+                with self._lock:
+                    self.handles_sent.extend(handles)
+                return result_cls(candidates=[
+                    {"username": f"@{h.upper()}", "investment_relevance_score": _score(h),
+                     "screening_summary": f"summary {h}"}
+                    for h in handles if not h.startswith("z")  # z* は評価が返らない
+                ])
+            words = re.findall(r"kw(\d+)", prompt)
+            return result_cls(candidates=[
+                {"username": f"acct{int(w) % 4}", "display_name": f"kw{w}", "score": 1 + int(w) % 9,
+                 "estimated_followers": 5000 + int(w), "evidence": [f"kw{w}"]}
+                for w in words
+            ])
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class TestGrokClient(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_file = str(Path(self._tmp.name) / "grok_screen_cache.json")
+        self.handles = [f"user{i:02d}" for i in range(24)] + ["zed", "@User03"]
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _client(self, fake: FakeClient, concurrency: int = 4) -> GrokClient:
+        client = GrokClient(client=fake, concurrency=concurrency, requests_per_minute=60000, max_retries=1)
+        client.screen_cache_file = self.cache_file
+        return client
+
+    def test_concurrent_screening_matches_sequential(self):
+        want = self._client(FakeClient(1), concurrency=1).screen_candidates(self.handles, batch_size=5, use_cache=False)
+        fake = FakeClient(2)
+        got = self._client(fake).screen_candidates(self.handles, batch_size=5, use_cache=False)
+        self.assertEqual(got["candidates"], want["candidates"])
+        self.assertEqual(len(got["candidates"]), 24)
+        self.assertEqual(got["meta"]["batch_count"], 5)
+        self.assertGreater(fake.max_in_flight, 1)
+        self.assertLessEqual(fake.max_in_flight, 4)
+
+    def test_rescreening_costs_only_new_handles(self):
+        self._client(FakeClient()).screen_candidates(self.handles, batch_size=5)
+        pool = self.handles + ["user90", "user91", "zz_new"]
+        cold = self._client(FakeClient()).screen_candidates(pool, batch_size=5, use_cache=False)
+
+        fake = FakeClient()
+        warm = self._client(fake).screen_candidates(pool, batch_size=5)
+        self.assertEqual(sorted(fake.handles_sent), ["user90", "user91", "zz_new"])
+        self.assertEqual((warm["meta"]["cached_handles"], warm["meta"]["batch_count"]), (25, 1))
+        self.assertEqual(warm["candidates"], cold["candidates"])
+
+        fake = FakeClient()
+        expired = self._client(fake)
+        expired.screen_cache_ttl_sec = 0
+        expired.screen_candidates(pool, batch_size=5)
+        self.assertEqual(len(fake.handles_sent), 28)
+
+        failing = self._client(FakeClient()).screen_candidates(["boom", "user99"], batch_size=5)
+        self.assertEqual((failing["candidates"], len(failing["errors"])), ([], 1))
+        fake = FakeClient()
+        self._client(fake).screen_candidates(["user99"], batch_size=5)
+        self.assertEqual(fake.handles_sent, ["user99"])
+
+    def test_explicit_window_is_part_of_cache_key(self):
+        handles = ["user01", "user02"]
+        self._client(FakeClient()).screen_candidates(handles)
+        for window, sent in (
+            (("2026-01-01", "2026-01-10"), handles),   # 既定の直近窓の保存結果は使わない
+            (("2026-01-01", "2026-01-10"), []),
+            (("2026-02-01", "2026-02-10"), handles),
+        ):
+            fake = FakeClient()
+            self._client(fake).screen_candidates(handles, from_date=window[0], to_date=window[1])
+            self.assertEqual(sorted(fake.handles_sent), sent)
+        fake = FakeClient()
+        self._client(fake).screen_candidates(handles)
+        self.assertEqual(fake.handles_sent, [])
+
+    def test_keyword_discovery_merges_in_batch_order(self):
+        keywords = [f"kw{i}" for i in range(12)]
+        want = self._client(FakeClient(3), concurrency=1).discover_by_keywords(keywords, max_candidates=10)
+        got = self._client(FakeClient(4), concurrency=4).discover_by_keywords(keywords, max_candidates=10)
+        self.assertEqual(got["candidates"], want["candidates"])
+        self.assertEqual({c["username"] for c in got["candidates"]}, {"acct0", "acct1", "acct2", "acct3"})
+        self.assertTrue(all(len(c["evidence"]) > 1 for c in got["candidates"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
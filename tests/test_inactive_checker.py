@@ -0,0 +1,152 @@
+"""collector.inactive_checker（アカウント単位の保存結果・並行確認）のテスト。
+
+固定する契約:
+  1. 要確認のアカウントは複数ページ並行に確認し（同時に開くページは workers 枚まで・全て閉じる）、
+     結果は get_all_usernames の順。保存結果と日付ディレクトリの全件結果を書き出す
+  2. 状態ごとの鮮度内の保存結果は再訪問しない。active は最終投稿日+閾値日数で期限切れ、
+     error は保存しない。use_cache=False は全件を再確認する
+  3. ブロック系エラーはアカウント単位で再試行し、他のアカウントの確認は止めない
+
+ブラウザ（_open_page）と check_account_status は偽物に差し替える。
+
+実行:
+    python3 -m unittest tests.test_inactive_checker -v
+"""
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from collector import inactive_checker  # noqa: E402
+
+USERS = [f"user{i:02d}" for i in range(12)]
+
+
+class FakeBrowser:
+    """check_account_status の代役。訪問の記録と同時訪問数を数える。"""
+
+    def __init__(self, fail_once: tuple[str, ...] = ()):
+        self.visits: list[str] = []
+        self.pages_open = 0
+        self.pages_opened = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_once = set(fail_once)
+        self._lock = threading.Lock()
+
+    def open_page(self, cookies, headless):
+        with self._lock:
+            self.pages_open += 1
+            self.pages_opened += 1
+        return None, None, f"page-{self.pages_opened}"
+
+    def close_page(self, resource):
+        with self._lock:
+            self.pages_open -= 1
+
+    def check(self, page, username):
+        with self._lock:
+            self.visits.append(username)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            fail = username in self.fail_once
+            self.fail_once.discard(username)
+        try:
+            time.sleep(0.02)
+            result = {"username": username, "status": "active", "last_post_date": None,
+                      "last_post_text": None, "error": None}
+            if fail:
+                result.update(status="error", error="net::ERR_CONNECTION_RESET at https://x.com")
+            elif username.endswith("3"):
+                result["status"] = "suspended"
+            elif username.endswith("7"):
+                result.update(status="error", error="Timeout 30000ms exceeded")
+            else:
+                result["last_post_date"] = datetime.now().strftime("%Y-%m-%dT09:00:00.000Z")
+            return result
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class TestInactiveChecker(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output_dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _run(self, fake: FakeBrowser, **kw) -> list:
+        opts = dict(output_dir=self.output_dir, workers=4, requests_per_minute=60000)
+        opts.update(kw)
+        with mock.patch.object(inactive_checker, "get_all_usernames", return_value=list(USERS)), \
+                mock.patch.object(inactive_checker, "_load_cookies", return_value=[]), \
+                mock.patch.object(inactive_checker, "_open_page", fake.open_page), \
+                mock.patch.object(inactive_checker, "_close_page", fake.close_page), \
+                mock.patch.object(inactive_checker, "check_account_status", fake.check), \
+                mock.patch.dict(inactive_checker.INACTIVE_CHECK_CONFIG, backoff_sec={"default": 0}), \
+                contextlib.redirect_stdout(io.StringIO()):
+            return inactive_checker.run_inactive_check(**opts)
+
+    def test_concurrent_check_keeps_account_order(self):
+        fake = FakeBrowser()
+        results = self._run(fake)
+        self.assertEqual([r["username"] for r in results], USERS)
+        self.assertEqual(sorted(fake.visits), USERS)
+        self.assertGreater(fake.max_in_flight, 1)
+        self.assertLessEqual(fake.pages_opened, 4)
+        self.assertEqual(fake.pages_open, 0)
+
+        store = inactive_checker.load_status_store(self.output_dir)
+        self.assertEqual(sorted(store), [u for u in USERS if not u.endswith("7")])  # error は保存しない
+        daily = Path(self.output_dir) / datetime.now().strftime("%Y-%m-%d") / "inactive_check_result.json"
+        self.assertEqual(json.loads(daily.read_text(encoding="utf-8")), results)
+        self.assertEqual(inactive_checker.detect_inactive_accounts(results), {"user03", "user07"})
+
+    def test_rerun_visits_only_stale_accounts(self):
+        self._run(FakeBrowser())
+        fake = FakeBrowser()
+        self._run(fake)
+        self.assertEqual(fake.visits, ["user07"])
+
+        now = datetime.now()
+        store = inactive_checker.load_status_store(self.output_dir)
+        store["user01"]["checked_at"] = (now - timedelta(days=10)).isoformat()   # active の鮮度切れ
+        store["user02"]["last_post_date"] = (now - timedelta(days=8)).strftime("%Y-%m-%d")  # 閾値超え
+        store["user03"]["checked_at"] = (now - timedelta(days=20)).isoformat()   # 凍結はまだ鮮度内
+        inactive_checker.save_status_store(store, self.output_dir)
+        self.assertTrue(inactive_checker.is_fresh(store["user03"], now))
+        self.assertFalse(inactive_checker.is_fresh(store["user02"], now))
+        self.assertTrue(inactive_checker.is_fresh(store["user02"], now, threshold_days=30))
+
+        fake = FakeBrowser()
+        self._run(fake)
+        self.assertEqual(sorted(fake.visits), ["user01", "user02", "user07"])
+
+        fake = FakeBrowser()
+        self._run(fake, use_cache=False)
+        self.assertEqual(sorted(fake.visits), USERS)
+
+    def test_block_errors_retry_per_account(self):
+        fake = FakeBrowser(fail_once=("user04",))
+        results = self._run(fake)
+        self.assertEqual(fake.visits.count("user04"), 2)
+        self.assertEqual(results[4]["status"], "active")
+        self.assertEqual(fake.visits.count("user07"), 1)  # ブロック以外のエラーは再試行しない
+        self.assertEqual(results[7]["status"], "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
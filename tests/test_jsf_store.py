@@ -0,0 +1,126 @@
+"""jsf_store（日証金アーカイブの解析済み列指向ストア）のテスト。
+
+固定する契約:
+  1. 配信 CSV の注記行を読み飛ばし、数値・"*****"・空欄を型付きで取り込む（コード列は文字列のまま）
+  2. 同じ data_date の確報差し替え（_rN）は最大の rN だけを載せる。原本が消えたら次点に戻る
+  3. 署名が変わらないファイルは読まない。as_of は data_date <= 指定日で最新の行を返す
+  4. check_jsf_gaps.find_data_gaps は manifest だけで日付列ありデータセットの未収録日を返す
+  5. zandaka の取引所別の行（同一コード・同一日）は全て残し、as_of は主市場の行を返す
+
+stdlib のみ。
+
+実行:
+    python3 -m unittest tests.test_jsf_store -v
+"""
+from __future__ import annotations
+
+import gzip
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import check_jsf_gaps  # noqa: E402
+import jsf_store  # noqa: E402
+
+SHINA_HEAD = (
+    "品貸料率一覧,,,\r\n"
+    "（注）注記行,,,\r\n"
+    "貸借申込日,決済日,コード,銘柄名,当日品貸料率（円）,貸株超過株数\r\n"
+)
+
+
+def _shina(date: str, rows) -> bytes:
+    body = "".join(f"{date},{date},{code},名{code},{rate},{excess}\r\n" for code, rate, excess in rows)
+    return (SHINA_HEAD + body + ",,,,,\r\n").encode("cp932")
+
+ZANDAKA_HEAD = "申込日,決済日,銘柄コード,銘柄名,取引所区分名,融資残高株数,貸株残高株数\r\n"
+
+
+def _zandaka(date: str, rows) -> bytes:
+    body = "".join(f"{date},{date},{code},名{code},{ex},{long},{short}\r\n" for code, ex, long, short in rows)
+    return (ZANDAKA_HEAD + body).encode("cp932")
+
+
+class TestJsfStore(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        base = Path(self._tmp.name)
+        self.archive = base / "jsf"
+        self.root = base / "jsf/store"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _put(self, name: str, content: bytes) -> Path:
+        path = self.archive / name.split("_")[0] / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def _sync(self) -> dict:
+        return jsf_store.sync(["shina"], root=self.root, archive_root=self.archive)
+
+    def test_parse_types(self):
+        fields, rows = jsf_store.parse_csv("shina", _shina("20260803", [("130A", "*****", "\"1,048\"")]))
+        self.assertEqual(fields[:3], ["貸借申込日", "決済日", "コード"])
+        code, values = rows[0]
+        self.assertEqual(len(rows), 1)  # 末尾の空行は捨てる
+        self.assertEqual((code, values[0], values[4], values[5]), ("130A", "20260803", None, 1048))
+
+    def test_revisions_incremental_and_as_of(self):
+        self._put("shina_20260731.csv.gz", _shina("20260731", [("1320", "0.00", "0")]))
+        self._put("shina_20260803.csv.gz", _shina("20260803", [("1320", "5.00", "10"), ("7203", "*****", "0")]))
+        rev2 = self._put("shina_20260803_r2.csv.gz", _shina("20260803", [("1320", "7.50", "12")]))
+        self.assertEqual(self._sync()["read"], 2)  # 0803 は r2 だけ読む
+        self.assertEqual(self._sync()["read"], 0)
+
+        cols = jsf_store.read_columns("shina", fields=["当日品貸料率（円）"], root=self.root)
+        self.assertEqual(cols["data_date"], ["20260731", "20260803"])
+        self.assertEqual(cols["当日品貸料率（円）"], [0.0, 7.5])
+        self.assertEqual(jsf_store.as_of("shina", "20260802", root=self.root)["1320"]["data_date"], "20260731")
+        self.assertEqual(jsf_store.as_of("shina", "20260803", root=self.root)["1320"]["当日品貸料率（円）"], 7.5)
+
+        rev2.unlink()
+        self._sync()
+        latest = jsf_store.as_of("shina", "20260803", codes=["7203", "1320"], root=self.root)
+        self.assertEqual(sorted(latest), ["1320", "7203"])
+        self.assertIsNone(latest["7203"]["当日品貸料率（円）"])
+
+    def test_month_chunks_and_gap_query(self):
+        self._put("shina_20260731.csv.gz", _shina("20260731", [("1320", "0.00", "0")]))
+        self._put("shina_20260804.csv.gz", _shina("20260804", [("1320", "1.00", "0")]))
+        self._sync()
+        self.assertEqual(sorted(p.name for p in (self.root / "shina").iterdir()), ["202607.json.gz", "202608.json.gz"])
+        self.assertEqual(jsf_store.read_columns("shina", "20260801", root=self.root)["data_date"], ["20260804"])
+
+        manifest = jsf_store.load_manifest(self.root)
+        gaps = check_jsf_gaps.find_data_gaps(manifest, ["2026-07-31", "2026-08-03", "2026-08-04"])
+        self.assertIn(("2026-08-03", "shina"), gaps)
+        self.assertNotIn(("2026-08-04", "shina"), gaps)
+        self.assertIn(("2026-07-31", "zandaka"), gaps)  # 未取込データセットは全日欠損
+        self.assertFalse([g for g in gaps if g[1] == "seigenichiran"])
+
+    def test_as_of_prefers_primary_exchange(self):
+        self._put("zandaka_20260731.csv.gz", _zandaka("2026/07/31", [("7203", "東証およびＰＴＳ", 900, 50)]))
+        self._put("zandaka_20260803.csv.gz", _zandaka("2026/08/03", [
+            ("7203", "東証およびＰＴＳ", 1000, 100), ("7203", "名証", 30, 0), ("7203", "札証", 0, 0),
+            ("9999", "札証", 5, 0), ("9999", "福証", 7, 0),
+        ]))
+        jsf_store.sync(["zandaka"], root=self.root, archive_root=self.archive)
+
+        cols = jsf_store.read_columns("zandaka", "20260803", fields=["融資残高株数"], root=self.root)
+        self.assertEqual(cols["取引所区分名"], ["東証およびＰＴＳ", "名証", "札証", "札証", "福証"])
+        self.assertEqual(cols["融資残高株数"], [1000, 30, 0, 5, 7])
+
+        latest = jsf_store.as_of("zandaka", "20260803", fields=["融資残高株数"], root=self.root)
+        self.assertEqual(latest["7203"], {"data_date": "20260803", "取引所区分名": "東証およびＰＴＳ", "融資残高株数": 1000})
+        self.assertEqual((latest["9999"]["取引所区分名"], latest["9999"]["融資残高株数"]), ("札証", 5))  # 主市場なし=先頭行
+        self.assertEqual(jsf_store.as_of("zandaka", "20260802", root=self.root)["7203"]["融資残高株数"], 900)
+
+
+if __name__ == "__main__":
+    unittest.main()
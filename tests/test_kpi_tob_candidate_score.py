@@ -0,0 +1,91 @@
+"""kpi_tob_candidate_score.load_edinet_documents_all（凍結仕様の EDINET 入力）のテスト。
+
+固定する契約:
+  1. 全営業日のキャッシュがあれば disclosure_index から日付昇順・ファイル内の順で返す
+  2. ファイルの無い営業日があれば FATAL（SystemExit）で止まる
+  3. ファイルはあっても壊れて索引から外れた営業日があれば FATAL で止まる（黙って落とさない）
+
+stdlib のみ（ネットワーク不要）。
+
+実行:
+    python3 -m unittest tests.test_kpi_tob_candidate_score -v
+"""
+from __future__ import annotations
+
+import contextlib
+import gzip
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import disclosure_index as di  # noqa: E402
+import kpi_tob_candidate_score as tob  # noqa: E402
+
+BUSINESS_DAYS = ["20240104", "20240105", "20240109"]
+
+
+def _gz(path: Path, payload: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wb") as f:
+        f.write(payload)
+
+
+class TestLoadEdinetDocumentsAll(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        base = Path(self._tmp.name)
+        self.all_root = base / "edinet/documents_all"
+        for d in BUSINESS_DAYS:
+            _gz(self.all_root / f"{d}.json.gz",
+                json.dumps({"results": [{"docID": f"S{d}", "secCode": "72030"}]}).encode("utf-8"))
+        idx = di.DisclosureIndex(base / "index.sqlite3", edinet_all_root=self.all_root,
+                                 edinet_holdings_root=base / "edinet/holdings", tdnet_root=base / "tdnet",
+                                 edinet_log=base / "edinet/fetch_log.jsonl",
+                                 tdnet_receipts=base / "tdnet/receipts.jsonl")
+        self.addCleanup(idx.close)
+
+        def open_index(rescan: bool = False):
+            idx.refresh(rescan=rescan)
+            return idx
+
+        for target, name, value in (
+            (tob.mbr, "load_calendar_days", lambda: None),
+            (tob.mbr, "all_business_days", lambda _days: ["20240103"] + BUSINESS_DAYS + ["20240110"]),
+            (tob.edinet_fetch, "ALL_DOCS_DATA_ROOT", self.all_root),
+            (tob.disclosure_index, "open_index", open_index),
+        ):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _load(self) -> list[dict]:
+        with contextlib.redirect_stderr(io.StringIO()):
+            return tob.load_edinet_documents_all(BUSINESS_DAYS[0], BUSINESS_DAYS[-1])
+
+    def test_all_days_present(self):
+        self.assertEqual([r["docID"] for r in self._load()], [f"S{d}" for d in BUSINESS_DAYS])
+
+    def test_missing_file_is_fatal(self):
+        (self.all_root / "20240105.json.gz").unlink()
+        with self.assertRaises(SystemExit) as cm:
+            self._load()
+        self.assertIn("1/3", str(cm.exception.code))
+
+    def test_corrupt_file_is_fatal(self):
+        self.assertEqual(len(self._load()), 3)
+        _gz(self.all_root / "20240109.json.gz", b"{not json")
+        with self.assertRaises(SystemExit) as cm:
+            self._load()
+        self.assertIn("20240109", str(cm.exception.code))
+        self.assertIn("FATAL", str(cm.exception.code))
+
+
+if __name__ == "__main__":
+    unittest.main()
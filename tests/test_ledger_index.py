@@ -0,0 +1,101 @@
+"""ledger_index（JSONL 台帳の逐次読み・キー索引）のテスト。
+
+固定する契約:
+  1. キー照会は全行読み＋絞り込みと同じ行・同じ順（サイドカーを読み直した別インスタンスでも同じ）
+  2. 追記は伸びた分だけ索引に足す。書き換え（全件置換・短縮）は作り直す
+  3. rows_since は以前の end より後の行だけを返し、改行で終わっていない末尾行はまだ返さない
+
+実行:
+    python3 -m unittest tests.test_ledger_index -v
+"""
+from __future__ import annotations
+
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import ledger_index  # noqa: E402
+
+
+def _row(rng: random.Random, i: int) -> dict:
+    return {"i": i, "kpi_name": rng.choice(["volshock", "pead_gap8_vol3", "f03"]),
+            "status": rng.choice(["pending_entry", "open", "closed", "skipped"]),
+            "signal_date": f"2026-10-{rng.randint(1, 9):02d}", "code": rng.choice(["72030", "67580", 1301])}
+
+
+class TestLedgerIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "ledger.jsonl"
+        self.rng = random.Random(20261019)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _scan(self) -> list[dict]:
+        return [json.loads(line) for line in self.path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    def test_lookup_matches_full_scan(self):
+        ledger_index.append(self.path, [_row(self.rng, i) for i in range(200)])
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write("\n")  # 空行は飛ばす
+        ledger_index.append(self.path, [_row(self.rng, i) for i in range(200, 260)])
+        for ledger in (ledger_index.Ledger(self.path), ledger_index.Ledger(self.path)):
+            rows = self._scan()
+            self.assertEqual(len(ledger), len(rows))
+            self.assertEqual(ledger.lookup_any("status", ("pending_entry", "open")),
+                             [r for r in rows if r["status"] in ("pending_entry", "open")])
+            self.assertEqual(ledger.lookup("code", 1301), [r for r in rows if r["code"] == 1301])
+            self.assertEqual(ledger.lookup("kpi_name", "missing"), [])
+            self.assertEqual(list(ledger.rows()), rows)
+        with self.assertRaises(KeyError):
+            ledger.lookup("i", 3)
+
+    def test_append_is_incremental_and_rewrite_rebuilds(self):
+        ledger_index.append(self.path, [_row(self.rng, i) for i in range(50)])
+        ledger = ledger_index.Ledger(self.path)
+        self.assertEqual(ledger.refresh(), {"added": 0, "rebuilt": 0})
+        with self.path.open("a", encoding="utf-8") as f:  # 索引を通さない追記も拾う
+            for i in range(50, 55):
+                f.write(json.dumps(_row(self.rng, i)) + "\n")
+        self.assertEqual(ledger.refresh(), {"added": 5, "rebuilt": 0})
+
+        kept = [r for r in self._scan() if r["status"] != "closed"]
+        tmp = self.path.with_suffix(".tmp")  # paper_eval.write_ledger_atomic と同じ全件置換
+        tmp.write_text("".join(json.dumps(r) + "\n" for r in kept), encoding="utf-8")
+        os.replace(tmp, self.path)
+        stats = ledger_index.Ledger(self.path).refresh()
+        self.assertEqual(stats, {"added": len(kept), "rebuilt": 1})
+        self.assertEqual(ledger_index.Ledger(self.path).lookup("status", "closed"), [])
+
+        self.path.write_text(json.dumps({"status": "open"}) + "\n", encoding="utf-8")  # 同じ inode で短縮
+        ledger = ledger_index.Ledger(self.path)
+        self.assertEqual(ledger.lookup("status", "open"), [{"status": "open"}])
+        self.assertEqual(len(ledger), 1)
+
+    def test_rows_since_skips_partial_tail(self):
+        ledger_index.append(self.path, [_row(self.rng, i) for i in range(10)])
+        mark = ledger_index.Ledger(self.path).end
+        ledger_index.append(self.path, [_row(self.rng, i) for i in range(10, 13)])
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write('{"i": 13, "status": "op')  # 追記途中
+        ledger = ledger_index.Ledger(self.path)
+        rows, end = ledger.rows_since(mark)
+        self.assertEqual([r["i"] for r in rows], [10, 11, 12])
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write('en"}\n')
+        ledger.refresh()
+        rows, end2 = ledger.rows_since(end)
+        self.assertEqual(rows, [{"i": 13, "status": "open"}])
+        self.assertEqual(ledger.rows_since(end2), ([], end2))
+        self.assertEqual(ledger.lookup("status", "open")[-1], {"i": 13, "status": "open"})
+
+
+if __name__ == "__main__":
+    unittest.main()
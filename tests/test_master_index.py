@@ -0,0 +1,115 @@
+"""master_index（J-Quants 月次 master の時点索引）のテスト。
+
+固定する契約:
+  1. snapshot(date) は「date 以前で最新の月次ファイル」を Code で辞書化したのと同じ中身
+     （社名変更・業種変更・上場廃止・再上場を経ても。strict=True は date 当日を使わない）
+  2. 末尾追加は新しいファイルだけ読む。途中のファイルが変わったら作り直す
+  3. members は属性の一致条件・任意の述語で時点の掲載銘柄を絞る
+
+stdlib のみ。
+
+実行:
+    python3 -m unittest tests.test_master_index -v
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import master_index as mi  # noqa: E402
+
+
+class TestMasterIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        base = Path(self._tmp.name)
+        self.dir = base / "master"
+        self.index_path = base / "master_index.json.gz"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, date: str, rows: list[dict], key: str = "data"):
+        self.dir.mkdir(exist_ok=True)
+        with gzip.open(self.dir / f"{date}.json.gz", "wt", encoding="utf-8") as f:
+            json.dump({key: [{"Date": date, **r} for r in rows]}, f, ensure_ascii=False)
+
+    def _refresh(self):
+        return mi.refresh(self.index_path, self.dir)
+
+    def _direct(self, date: str, strict: bool = False) -> dict:
+        dates = sorted(p.name[:8] for p in self.dir.glob("*.json.gz"))
+        dates = [d for d in dates if (d < date if strict else d <= date)]
+        if not dates:
+            return {}
+        with gzip.open(self.dir / f"{dates[-1]}.json.gz", "rt", encoding="utf-8") as f:
+            rows = mi.master_rows(json.load(f))
+        return {r["Code"]: {k: v for k, v in r.items() if k != "Date"} for r in rows}
+
+    def _same(self, idx, date: str, strict: bool = False):
+        got = idx.snapshot(date, strict=strict)
+        want = self._direct(date, strict)
+        self.assertEqual(set(got), set(want), date)
+        for code, rec in want.items():
+            self.assertEqual({k: v for k, v in got[code].items() if v is not None or k in rec}, rec)
+
+    def test_changes_delisting_and_strict(self):
+        self._write("20240131", [{"Code": "72030", "CoName": "トヨタ", "S33": "3700", "ProdCat": "011"},
+                                 {"Code": "13010", "CoName": "極洋", "S33": "0050", "ProdCat": "011"}])
+        self._write("20240229", [{"Code": "72030", "CoName": "トヨタ自動車", "S33": "3700", "ProdCat": "011"}],
+                    key="info")
+        self._write("20240329", [{"Code": "72030", "CoName": "トヨタ自動車", "S33": "3700", "ProdCat": "011"},
+                                 {"Code": "13010", "CoName": "極洋", "S33": "0050", "ProdCat": "011"}])
+        idx, stats = self._refresh()
+        self.assertEqual(stats, {"read": 3, "rebuilt": 0})
+        for d in ("20240130", "20240131", "20240215", "20240229", "20240329", "20991231"):
+            self._same(idx, d)
+            self._same(idx, d, strict=True)
+        self.assertIsNone(idx.asof("13010", "20240229"))  # 一時的に消えた = 未掲載
+        self.assertEqual(idx.asof("13010", "20240401")["CoName"], "極洋")
+        self.assertEqual(idx.asof("72030", "20240229", strict=True)["CoName"], "トヨタ")
+        self.assertEqual(idx.snapshot_date("20240301", strict=True), "20240229")
+        self.assertEqual(idx.members("20240401", {"S33": "3700"}), ["72030"])
+        self.assertEqual(idx.members("20240401", lambda r: r["CoName"].startswith("極")), ["13010"])
+        self.assertEqual(set(idx.latest(fields=["CoName"])["72030"]), {"Code", "CoName"})
+
+    def test_incremental_append_and_rebuild(self):
+        self._write("20240131", [{"Code": "72030", "S33": "3700"}])
+        self._refresh()
+        self._write("20240229", [{"Code": "72030", "S33": "3650"}])
+        idx, stats = self._refresh()
+        self.assertEqual(stats, {"read": 1, "rebuilt": 0})
+        self.assertEqual(self._refresh()[1], {"read": 0, "rebuilt": 0})
+        self.assertEqual(idx.asof("72030", "20240215")["S33"], "3700")
+
+        # 途中のファイルが差し替わった → 作り直し
+        self._write("20240131", [{"Code": "72030", "S33": "3800"}, {"Code": "99840", "S33": "5250"}])
+        idx, stats = self._refresh()
+        self.assertEqual(stats, {"read": 2, "rebuilt": 1})
+        self.assertEqual(idx.asof("72030", "20240215")["S33"], "3800")
+        self.assertIsNone(idx.asof("99840", "20240229"))
+
+    def test_randomized_against_direct_reads(self):
+        rng = random.Random(20261019)
+        codes = [f"{1000 + i}0" for i in range(12)]
+        dates = [f"2023{m:02d}28" for m in range(1, 13)]
+        for d in dates:
+            rows = [{"Code": c, "S33": rng.choice(["0050", "3700"]), "Mkt": rng.choice(["0111", "0112"]),
+                     "CoName": f"社{c}" + rng.choice(["", "HD"])}
+                    for c in codes if rng.random() > 0.2]
+            self._write(d, rows)
+            idx, _ = self._refresh()
+        for d in dates + ["20221231", "20230315", "20240101"]:
+            self._same(idx, d)
+            self._same(idx, d, strict=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
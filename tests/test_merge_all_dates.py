@@ -0,0 +1,153 @@
+"""merge_all_dates（全日付統合の増分索引と viewer の月別シャード）のテスト。
+
+固定する契約:
+  1. 増分索引から作ったリストは、全ディレクトリを merge_tweets した結果と並びまで一致する
+     （追加・途中の日付の書き換え・削除・LLM 分類の後付けのどれでも）
+  2. 署名が変わらないディレクトリは読まない（mtime だけ変わっても sha256 が同じなら読まない）
+  3. シャードは年月ごと・新しい月が先。中身が同じ月は書き直さず、無くなった月は消す
+
+stdlib のみ。
+
+実行:
+    python3 -m unittest tests.test_merge_all_dates -v
+"""
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import merge_all_dates as mad  # noqa: E402
+
+
+def _tweet(n: int, month: str = "2026-10", llm=None, url: bool = True) -> dict:
+    t = {"username": f"user{n % 3}", "text": f"post {n}", "posted_at": f"{month}-0{n % 9 + 1}T00:00:00Z",
+         "url": f"https://x.com/u/status/{n}" if url else ""}
+    if llm is not None:
+        t["llm_categories"] = llm
+    return t
+
+
+class TestIncrementalMerge(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.out = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, date: str, tweets: list, name: str = "tweets.json"):
+        d = self.out / date
+        d.mkdir(exist_ok=True)
+        (d / name).write_text(json.dumps(tweets, ensure_ascii=False), encoding="utf-8")
+
+    def _full(self) -> list:
+        by_date = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for d in sorted(self.out.iterdir()):
+                if d.is_dir():
+                    tweets = mad.load_tweets_from_directory(d)
+                    if tweets:
+                        by_date[d.name] = tweets
+        return mad.merge_tweets(by_date)
+
+    def _run(self, index: dict) -> dict:
+        with contextlib.redirect_stdout(io.StringIO()):
+            changed = mad.changed_directories(self.out, index)
+            stats = mad.update_index(self.out, index, changed)
+        # 索引は JSON で保存して読み戻すので、往復しても同じ結果になること
+        mad.save_index(self.out / mad.INDEX_NAME, index)
+        index.clear()
+        index.update(mad.load_index(self.out / mad.INDEX_NAME))
+        self.assertEqual(mad.merged_from_index(index), self._full())
+        return stats
+
+    def test_matches_full_merge_through_edits(self):
+        self._write("2026-10-01", [_tweet(1), _tweet(2), _tweet(3, url=False)])
+        self._write("2026-10-02", [_tweet(2, llm=["ipo"]), _tweet(4), _tweet(1)])
+        index = mad.load_index(self.out / mad.INDEX_NAME)
+        self.assertEqual(self._run(index)["read"], 2)
+
+        # 新しい日付の追加だけ → そのディレクトリだけ読む
+        self._write("2026-10-03", [_tweet(4, llm=["market_trend"]), _tweet(5), _tweet(3, url=False)])
+        self.assertEqual(self._run(index)["read"], 1)
+
+        # 途中の日付を分類済みに差し替え（classified_llm.json が優先される）
+        self._write("2026-10-01", [_tweet(1, llm=["ipo"]), _tweet(2, llm=["x"])], "classified_llm.json")
+        self._run(index)
+
+        # 採用元だった日付が消える → 次点の日付から採り直す
+        os.remove(self.out / "2026-10-01" / "classified_llm.json")
+        os.remove(self.out / "2026-10-01" / "tweets.json")
+        self._run(index)
+        self.assertNotIn("2026-10-01", index["dirs"])
+
+    def test_randomized_against_full_merge(self):
+        rng = random.Random(20261019)
+        index = mad.load_index(self.out / mad.INDEX_NAME)
+        dates = [f"2026-09-{d:02d}" for d in range(1, 8)]
+        for _ in range(25):
+            date = rng.choice(dates)
+            if rng.random() < 0.15 and (self.out / date).exists():
+                for f in (self.out / date).iterdir():
+                    f.unlink()
+            else:
+                tweets = [_tweet(rng.randrange(12), llm=rng.choice([None, [], ["ipo"]]),
+                                 url=rng.random() > 0.1) for _ in range(rng.randrange(6))]
+                self._write(date, tweets, rng.choice(["tweets.json", "classified_llm.json"]))
+            self._run(index)
+
+    def test_unchanged_dirs_not_read(self):
+        self._write("2026-10-01", [_tweet(1)])
+        index = mad.load_index(self.out / mad.INDEX_NAME)
+        self._run(index)
+        self.assertEqual(self._run(index)["read"], 0)
+        path = self.out / "2026-10-01" / "tweets.json"
+        os.utime(path, ns=(1, 1))  # mtime だけ変わった
+        self.assertEqual(self._run(index)["read"], 0)
+
+    def test_broken_index_rebuilds(self):
+        (self.out / mad.INDEX_NAME).write_text("{broken")
+        self.assertEqual(mad.load_index(self.out / mad.INDEX_NAME), mad._empty_index())
+
+
+class TestViewerShards(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name) / "viewer_data"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, merged):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return mad.write_viewer_shards(self.dir, merged)
+
+    def test_months_newest_first_and_roundtrip(self):
+        merged = [_tweet(1, "2026-10"), _tweet(2, "2026-09"), _tweet(3, "2026-10"), {"text": "日時なし"}]
+        manifest = self._write(merged)
+        self.assertEqual([m["month"] for m in manifest["months"]], ["2026-10", "2026-09", "unknown"])
+        self.assertEqual([m["count"] for m in manifest["months"]], [2, 1, 1])
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(mad.validate_viewer_shards(self.dir))
+
+    def test_unchanged_month_not_rewritten_and_stale_removed(self):
+        self._write([_tweet(1, "2026-10"), _tweet(2, "2026-09")])
+        sep = self.dir / "2026-09.js"
+        os.utime(sep, ns=(1, 1))
+        self._write([_tweet(1, "2026-10"), _tweet(5, "2026-10"), _tweet(2, "2026-09")])
+        self.assertEqual(sep.stat().st_mtime_ns, 1)
+        self._write([_tweet(1, "2026-10")])
+        self.assertFalse(sep.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,226 @@
+"""news_shock_collect（RSS の並行・条件付き取得と既出索引）のテスト。
+
+固定する契約:
+  1. fetch_feeds は全クエリを並行に取り queries の順で返す。前回の検証子で 304 なら本文なし・
+     config_sha が変われば検証子を捨てて取り直す
+  2. SeenIndex は load_seen と同じ既出集合を持ち、次回は台帳の追記分だけを読む。台帳が
+     書き換わったら作り直す。外れ記事は config_sha ごと・MISS_TTL_DAYS で忘れる
+  3. main は新規記事だけを判定し（304 のクエリと既出・判定済みの記事は judge を呼ばない）、
+     索引と検証子を消しても同じ記事を台帳へ二度書かない
+
+実行:
+    python3 -m unittest tests.test_news_shock_collect -v
+"""
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import news_shock_collect as nsc  # noqa: E402
+
+_RSS = """<?xml version="1.0"?><rss><channel>{items}</channel></rss>"""
+_ITEM = ("<item><title>{title}</title><link>http://news.test/{slug}</link>"
+         "<description>&lt;b&gt;{title}&lt;/b&gt;</description>"
+         "<pubDate>Fri, 14 Aug 2026 11:30:00 GMT</pubDate></item>")
+
+
+class FixtureFeed:
+    """Google News RSS の代役。全クエリに同じ記事群を返し、ETag が一致すれば 304。"""
+
+    def __init__(self, delay: float = 0.0):
+        self.titles = ["Congo announces copper export ban", "Copper price hits record high on demand",
+                       "Gold miners strike enters second week"]
+        self.version = 1
+        self.delay = delay
+        self.queries: list[str] = []
+        self.statuses: list[int] = []
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fixture.handle(self)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/rss/search"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, req: BaseHTTPRequestHandler) -> None:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.queries.append(urllib.parse.parse_qs(urllib.parse.urlsplit(req.path).query)["q"][0])
+        time.sleep(self.delay)
+        etag = f'"v{self.version}"'
+        status = 304 if req.headers.get("If-None-Match") == etag else 200
+        with self._lock:
+            self.active -= 1
+            self.statuses.append(status)
+        req.send_response(status)
+        req.send_header("ETag", etag)
+        if status == 304:
+            req.end_headers()
+            return
+        body = _RSS.format(items="".join(_ITEM.format(title=t, slug=i) for i, t in enumerate(self.titles)))
+        req.send_header("Content-Type", "application/rss+xml")
+        req.send_header("Content-Length", str(len(body.encode())))
+        req.end_headers()
+        req.wfile.write(body.encode())
+
+
+class TestNewsShockCollect(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        self.addCleanup(self._tmp.cleanup)
+
+    def _feed(self, delay: float = 0.0) -> FixtureFeed:
+        feed = FixtureFeed(delay)
+        self.addCleanup(feed.close)
+        patcher = mock.patch.object(nsc, "RSS_URL", feed.url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return feed
+
+    def test_fetch_feeds_concurrent_and_conditional(self):
+        feed = self._feed(delay=0.2)
+        cfg = nsc.load_config()
+        queries = cfg["queries"][:8]
+        state = nsc.FeedState(self.dir / "feed_state.json", "sha-a")
+
+        t0 = time.monotonic()
+        results = nsc.fetch_feeds(queries, cfg, state, workers=4)
+        self.assertLess(time.monotonic() - t0, 0.2 * len(queries) * 0.75)
+        self.assertEqual(feed.peak, 4)
+        self.assertTrue(all(err is None and len(items) == 3 for items, _v, err in results))
+        for qe, (_items, validators, _err) in zip(queries, results):
+            self.assertEqual(validators["url"], nsc.feed_url(qe, cfg))   # 結果は queries の順
+            self.assertEqual(validators["etag"], '"v1"')
+            state.remember(nsc.query_term(qe), validators, 3)
+        state.save()
+
+        reopened = nsc.FeedState(self.dir / "feed_state.json", "sha-a")
+        feed.statuses.clear()
+        self.assertEqual(nsc.fetch_feeds(queries, cfg, reopened, workers=4), [(None, None, None)] * len(queries))
+        self.assertEqual(feed.statuses, [304] * len(queries))
+        self.assertEqual(reopened.items(nsc.query_term(queries[0])), 3)
+
+        feed.statuses.clear()
+        other = nsc.FeedState(self.dir / "feed_state.json", "sha-b")       # 語彙が変わった
+        self.assertTrue(all(items for items, _v, _e in nsc.fetch_feeds(queries, cfg, other, workers=4)))
+        self.assertEqual(feed.statuses, [200] * len(queries))
+
+        feed.close()
+        failed = nsc.fetch_feeds(queries[:2], cfg, reopened, workers=2)
+        self.assertTrue(all(items is None and isinstance(err, Exception) for items, _v, err in failed))
+
+    def test_seen_index_matches_ledger_and_reads_only_appends(self):
+        ledger, path = self.dir / "news_log.jsonl", self.dir / "news_log.seen.json"
+
+        def append(*rows):
+            with ledger.open("a", encoding="utf-8") as fh:
+                for r in rows:
+                    fh.write((r if isinstance(r, str) else json.dumps(r, ensure_ascii=False)) + "\n")
+
+        append({"term": "copper", "link": "http://v1", "status": "hit"},
+               {"term": "gold", "link": "http://v2", "event_id": "abc"}, "壊れた行",
+               {"type": "run_summary", "hit": 2})
+        idx = nsc.SeenIndex(ledger, path, "sha-a")
+        self.assertTrue(idx.rebuilt)
+        idx.mark_judged("copper", "http://miss", "2026-10-01")
+        idx.mark_judged("copper", "http://old", "2026-09-01")
+        append({"term": "zinc", "link": "http://v3", "event_id": "def"})    # 保存前の追記も拾う
+        idx.save("2026-10-10")
+
+        append({"term": "nickel", "link": "http://v4", "event_id": "ghi"})
+        reads: list[int] = []
+        real_catch_up = nsc.SeenIndex._catch_up
+
+        def counting(self):
+            reads.append(ledger.stat().st_size - self.offset)
+            real_catch_up(self)
+
+        with mock.patch.object(nsc.SeenIndex, "_catch_up", counting):
+            reopened = nsc.SeenIndex(ledger, path, "sha-a")
+        self.assertFalse(reopened.rebuilt)
+        self.assertEqual(reads, [len(json.dumps({"term": "nickel", "link": "http://v4", "event_id": "ghi"})) + 1])
+        seen, events = nsc.load_seen(ledger)
+        self.assertTrue(all(key in reopened for key in seen))
+        self.assertEqual(len(reopened.keys), len(seen))
+        self.assertEqual(reopened.events, events)
+        self.assertNotIn(("gold", "http://v1"), reopened)
+        self.assertTrue(reopened.judged("copper", "http://miss"))
+        self.assertFalse(reopened.judged("copper", "http://old"))           # TTL 切れ
+        self.assertFalse(nsc.SeenIndex(ledger, path, "sha-b").judged("copper", "http://miss"))
+
+        ledger.write_text(json.dumps({"term": "lead", "link": "http://v9"}) + "\n" * 400, encoding="utf-8")
+        rewritten = nsc.SeenIndex(ledger, path, "sha-a")
+        self.assertTrue(rewritten.rebuilt)
+        self.assertIn(("lead", "http://v9"), rewritten)
+        self.assertNotIn(("copper", "http://v1"), rewritten)
+
+    def test_main_judges_only_new_items(self):
+        feed = self._feed()
+        ledger = self.dir / "news_shock" / "news_log.jsonl"
+        paths = {"LEDGER": ledger, "SEEN_INDEX": self.dir / "news_shock" / "news_log.seen.json",
+                 "FEED_STATE": self.dir / "news_shock" / "feed_state.json"}
+        n_queries = len(nsc.load_config()["queries"])
+
+        def run() -> int:
+            with contextlib.ExitStack() as stack:
+                for name, value in paths.items():
+                    stack.enter_context(mock.patch.object(nsc, name, value))
+                stack.enter_context(mock.patch.object(nsc, "beneficiaries_of", lambda _ids: []))
+                stack.enter_context(mock.patch.object(sys, "argv", ["news_shock_collect.py", "--dry-run"]))
+                judge = stack.enter_context(mock.patch.object(nsc, "judge", wraps=nsc.judge))
+                stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+                self.assertEqual(nsc.main(), 0)
+            return judge.call_count
+
+        def rows(kind: str) -> list[dict]:
+            out = [json.loads(line) for line in ledger.read_text(encoding="utf-8").splitlines()]
+            return [r for r in out if r.get("status") == kind or r.get("type") == kind]
+
+        self.assertEqual(run(), 3 * n_queries)
+        hits = rows("hit")
+        self.assertEqual(sorted(h["term"] for h in hits), ["copper", "gold"])
+
+        self.assertEqual(run(), 0)                                        # 全クエリ 304
+        summary = rows("run_summary")[-1]
+        self.assertEqual(len(summary["not_modified"]), n_queries)
+        self.assertEqual(set(summary["items"].values()), {3})
+
+        feed.titles.append("Explosion at Zambia copper mine halts output")
+        feed.version = 2
+        self.assertEqual(run(), n_queries)                                # 新しい1件だけ判定
+        self.assertEqual(len(rows("hit")), 3)
+
+        for name in ("SEEN_INDEX", "FEED_STATE"):
+            paths[name].unlink()
+        self.assertEqual(run(), 4 * n_queries - 3)                        # 索引なし=外れは判定し直す
+        self.assertEqual(len(rows("hit")), 3)                             # 既出は台帳から復元
+        self.assertEqual(rows("run_summary")[-1]["not_modified"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+"""price_universe_check の取得プランナ（ホスト単位の並行取得）のテスト。
+
+ローカルの HTTP fixture サーバを実サイトの代わりに立て、次の3点を固定する:
+  1. 同一URLは1回の実行で1回しか取りに行かない（TE一覧・FMBI の使い回しの一般化）
+  2. 同一ホストへは直列＋HOST_DELAY_SEC の間隔を守る（並行化しても1ホストへの頻度は上げない）
+  3. 別ホストは並行に走り、結果は config 順・例外は系列単位で返る（fail-soft の判定は main 側）
+
+外部ネットワーク不要。
+
+実行:
+    python3 -m unittest tests.test_price_universe_fetch_plan -v
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import price_universe_check as puc  # noqa: E402
+
+
+class _FixtureServer:
+    """パスごとの到着時刻を記録するだけのローカル HTTP サーバ。"""
+
+    def __init__(self):
+        hits: list[tuple[str, float]] = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802
+                hits.append((self.path, time.monotonic()))
+                if self.path.startswith("/missing"):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = f"<html>{self.path}</html>".encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.hits = hits
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TestGet(unittest.TestCase):
+    def setUp(self):
+        self.srv = _FixtureServer()
+        self._delay = puc.HOST_DELAY_SEC
+        puc.HOST_DELAY_SEC = 0.2
+        puc._reset_fetch_state()
+
+    def tearDown(self):
+        puc.HOST_DELAY_SEC = self._delay
+        puc._reset_fetch_state()
+        self.srv.close()
+
+    def test_same_url_fetched_once(self):
+        a = puc.fetch(self.srv.base + "/index")
+        b = puc.fetch(self.srv.base + "/index")
+        self.assertEqual(a, b)
+        self.assertEqual([p for p, _ in self.srv.hits], ["/index"])
+
+    def test_same_url_concurrent_callers_fetch_once(self):
+        threads = [threading.Thread(target=puc.fetch, args=(self.srv.base + "/fmbi",))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(self.srv.hits), 1)
+
+    def test_same_host_keeps_delay(self):
+        puc.fetch(self.srv.base + "/a")
+        puc.fetch(self.srv.base + "/b")
+        (_, t1), (_, t2) = self.srv.hits
+        self.assertGreaterEqual(t2 - t1, 0.18)
+
+    def test_http_error_not_cached(self):
+        with self.assertRaises(Exception):
+            puc.fetch(self.srv.base + "/missing")
+        with self.assertRaises(Exception):
+            puc.fetch(self.srv.base + "/missing")
+        self.assertEqual(len(self.srv.hits), 2)
+
+
+class TestRunFetchPlan(unittest.TestCase):
+    def test_hosts_parallel_within_host_serial(self):
+        # tanaka / uss / dramexchange は別ホスト、te 2本は同一ホスト
+        series = [{"id": "te1", "type": "te"}, {"id": "tanaka", "type": "tanaka"},
+                  {"id": "te2", "type": "te"}, {"id": "uss", "type": "uss"},
+                  {"id": "dram", "type": "dramexchange"}]
+        active: dict[str, int] = {}
+        peak: dict[str, int] = {}
+        lock = threading.Lock()
+
+        def fetch_one(s):
+            host = puc.series_host(s)
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+            time.sleep(0.2)
+            with lock:
+                active[host] -= 1
+            return {"value": s["id"]}
+
+        t0 = time.monotonic()
+        out = puc.run_fetch_plan(series, fetch_one)
+        elapsed = time.monotonic() - t0
+        self.assertEqual([p["value"] for p, _, _ in out], [s["id"] for s in series])
+        self.assertEqual(max(peak.values()), 1)
+        # 直列なら 1.0s。TE の2本だけが直列＝約0.4s
+        self.assertLess(elapsed, 0.8)
+        self.assertTrue(all(ms >= 150 for _, _, ms in out))
+
+    def test_exception_returned_per_series(self):
+        def fetch_one(s):
+            if s["id"] == "bad":
+                raise RuntimeError("boom")
+            return {"value": 1.0}
+
+        out = puc.run_fetch_plan([{"id": "bad", "type": "scfi"}, {"id": "ok", "type": "jepx"}],
+                                 fetch_one)
+        self.assertIsNone(out[0][0])
+        self.assertIsInstance(out[0][1], RuntimeError)
+        self.assertEqual(out[1][:2], ({"value": 1.0}, None))
+
+    def test_unknown_type_has_own_queue(self):
+        self.assertEqual(puc.series_host({"type": "nope"}), "nope")
+        self.assertEqual(puc.series_host({"type": "boj"}), puc.series_host({"type": "boj_bulk"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""collector.signal_extractor（並行・キャッシュ付きのシグナル抽出）のテスト。
+
+固定する契約:
+  1. 並行抽出の結果は逐次（concurrency=1・バッチごとの extract_batch）と同じ行・同じ順。
+     同時に投げるバッチは concurrency 本まで
+  2. 抽出済みのツイート（本文・ユーザー名・逆指標フラグ・プロンプト版が同じ）は API に送らない。
+     失敗したバッチ・応答に載らなかったツイート（打ち切り・欠け）は保存せず次回に再抽出する
+  3. キャッシュは保存から SIGNAL_CACHE_MAX_AGE_DAYS を過ぎた分を捨て、SIGNAL_CACHE_MAX_ENTRIES 件
+     （新しい順）に収める
+  4. 429 は Retry-After の間すべてのバッチの送信を止めてから再試行し、結果は欠けない
+
+通信は StubTransport で置き換える。
+
+実行:
+    python3 -m unittest tests.test_signal_extractor -v
+"""
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from collector import signal_extractor  # noqa: E402
+from collector.signal_extractor import SignalExtractor, StubTransport  # noqa: E402
+
+
+def _tweets(start: int, stop: int) -> list[dict]:
+    tickers = ["AAPL", "MSFT", "NVDA", "7203.T"]
+    return [
+        {"username": f"user{i % 5}", "text": f"tweet {i} ${tickers[i % 4]}" if i % 4 != 3 else f"tweet {i} 7203.T 買い",
+         "url": f"https://x.com/u/status/{i}", "posted_at": f"2026-10-{1 + i % 9:02d}",
+         "is_contrarian": i % 7 == 0}
+        for i in range(start, stop)
+    ]
+
+
+class TestSignalExtractor(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_file = str(Path(self._tmp.name) / "signal_cache.json")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _extractor(self, transport: StubTransport, **kw) -> SignalExtractor:
+        opts = dict(batch_size=5, concurrency=4, requests_per_minute=60000, cache_file=self.cache_file)
+        opts.update(kw)
+        return SignalExtractor(transport=transport, **opts)
+
+    def test_concurrent_matches_sequential(self):
+        tweets = _tweets(0, 48)
+        seq = self._extractor(StubTransport(), concurrency=1, cache_file=None)
+        want = []
+        for i in range(0, len(tweets), 5):
+            want.extend(seq.extract_batch(tweets[i:i + 5]))
+        stub = StubTransport(latency=0.05)
+        got = self._extractor(stub, cache_file=None).extract_all(tweets)
+        self.assertEqual(got, want)
+        self.assertEqual(len(got), 48)
+        self.assertEqual({s["direction"] for s in got if s["is_contrarian"]}, {"SHORT"})
+        self.assertEqual(stub.calls, 10)
+        self.assertGreater(stub.max_in_flight, 1)
+        self.assertLessEqual(stub.max_in_flight, 4)
+
+    def test_cache_skips_extracted_tweets(self):
+        stub = StubTransport()
+        first = self._extractor(stub).extract_all(_tweets(0, 20))
+        self.assertEqual(stub.tweets_sent, 20)
+
+        stub = StubTransport()
+        again = self._extractor(stub)
+        self.assertEqual(again.extract_all(_tweets(0, 20)), first)
+        self.assertEqual((stub.calls, again.cache_hits, again.cache_misses), (0, 20, 0))
+
+        overlap = _tweets(10, 30) + _tweets(10, 12)  # 日付窓の重なり・同じツイートの重複
+        overlap[0] = {**overlap[0], "is_contrarian": not overlap[0]["is_contrarian"]}
+        self.assertEqual(len(again.extract_all(overlap)), 22)
+        self.assertEqual(stub.tweets_sent, 11)  # 新規10件 + 逆指標フラグが変わった1件
+
+        def broken(tweets):
+            raise ValueError("upstream error")
+
+        failing = self._extractor(StubTransport(responder=broken))
+        failing.max_retries = 1
+        self.assertEqual(failing.extract_all(_tweets(100, 105)), [])
+        stub = StubTransport()
+        self.assertEqual(len(self._extractor(stub).extract_all(_tweets(100, 105))), 5)
+        self.assertEqual(stub.tweets_sent, 5)
+
+    def test_tweets_missing_from_response_are_retried(self):
+        def truncated(tweets):
+            return StubTransport._default_responder(tweets)[:2]  # 応答が途中で切れた
+
+        stub = StubTransport(responder=truncated)
+        self.assertEqual(len(self._extractor(stub).extract_all(_tweets(0, 5))), 2)
+        stub = StubTransport()
+        again = self._extractor(stub)
+        self.assertEqual(len(again.extract_all(_tweets(0, 5))), 5)
+        self.assertEqual((stub.tweets_sent, again.cache_hits), (3, 2))
+
+    def test_cache_is_pruned_by_age_and_size(self):
+        self._extractor(StubTransport()).extract_all(_tweets(0, 10))
+        with open(self.cache_file, encoding="utf-8") as f:
+            payload = json.load(f)
+        entries = payload["entries"]
+        self.assertEqual(len(entries), 10)
+        stale = sorted(entries)[:3]
+        for key in stale:
+            entries[key]["at"] -= (signal_extractor.SIGNAL_CACHE_MAX_AGE_DAYS + 1) * 86400
+        with open(self.cache_file, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+
+        with mock.patch.object(signal_extractor, "SIGNAL_CACHE_MAX_ENTRIES", 8):
+            self._extractor(StubTransport()).extract_all(_tweets(10, 12))
+        with open(self.cache_file, encoding="utf-8") as f:
+            kept = json.load(f)["entries"]
+        self.assertEqual(len(kept), 8)
+        self.assertFalse(set(stale) & set(kept))
+
+    def test_rate_limit_pauses_all_batches(self):
+        stub = StubTransport(rate_limit_every=4, retry_after=0.3)
+        extractor = self._extractor(stub, cache_file=None)
+        extractor.retry_backoff_base = 0.01
+        t0 = time.monotonic()
+        got = extractor.extract_all(_tweets(0, 30))
+        self.assertEqual(len(got), 30)
+        self.assertGreaterEqual(stub.rate_limited, 1)
+        self.assertEqual(stub.calls, 6 + stub.rate_limited)
+        self.assertGreaterEqual(time.monotonic() - t0, 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
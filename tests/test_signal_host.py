@@ -0,0 +1,127 @@
+"""signal_host（volshock 系の常駐シグナル生成ホスト）のテスト。
+
+固定する契約:
+  1. 1営業日ずつ流し込んだ公開分は、各パラメータで generate_volshock_signals(D, D) の冷間生成と
+     同じ行・同じ順（売買停止で履歴が疎な銘柄・200日線フィルタを含む）
+  2. 再実行は新しい営業日だけ流し込む。保持中の bars が差し替わったらその日から作り直す
+  3. 区間指定・床未満の倍率・未公開日は None（呼び出し側が生成器に落ちる）
+
+ウィンドウ定数は小さく差し替えて検証する（判定ルールは定数の値に依らない）。
+
+実行:
+    python3 -m unittest tests.test_signal_host -v
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import jq_fetch  # noqa: E402
+import kpi_volshock_signals  # noqa: E402
+import signal_host  # noqa: E402
+
+SPECS = [
+    {"vol_multiplier": 5.0, "day_ret_min": 0.02, "day_ret_max": 0.08, "filter_ma200": None},
+    {"vol_multiplier": 5.0, "day_ret_min": 0.02, "day_ret_max": 0.08, "filter_ma200": "above"},
+    {"vol_multiplier": 4.0, "day_ret_min": 0.02, "day_ret_max": 0.08, "filter_ma200": "below"},
+]
+
+
+class TestSignalHost(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.state_dir = self.root / "signal_host"
+        (self.root / "bars").mkdir()
+        self.rng = random.Random(20261019)
+        self.n_signals = 0
+        cal = [f"2024{m:02d}{d:02d}" for m in (1, 2, 3) for d in range(1, 29)]
+        self.bdays = [d for i, d in enumerate(cal) if i % 7 not in (5, 6)]
+        with gzip.open(self.root / "calendar.json.gz", "wt", encoding="utf-8") as f:
+            json.dump({"data": [{"Date": d, "HolDiv": "1" if d in self.bdays else "0"} for d in cal]}, f)
+        self.close = {f"{1000 + i}0": 100.0 for i in range(40)}
+        for d in self.bdays:
+            self._put(d)
+        for patch in (
+            mock.patch.object(jq_fetch, "DATA_ROOT", self.root),
+            mock.patch.object(kpi_volshock_signals, "VOL_HISTORY_WINDOW", 3),
+            mock.patch.object(kpi_volshock_signals, "MA200_WINDOW", 6),
+            mock.patch.object(kpi_volshock_signals, "WARMUP_BDAYS", 10),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _put(self, d: str):
+        rows = []
+        for code, prev in self.close.items():
+            if code == "10000" and self.rng.random() < 0.6:
+                continue  # 売買停止がちの銘柄（履歴が疎）
+            ret = self.rng.choice([0.0, 0.03, 0.05, -0.04, 0.1])
+            close = round(prev * (1 + ret), 2)
+            self.close[code] = close
+            va = self.rng.choice([100.0, 120.0, 90.0, 800.0, 450.0, None, 0])
+            rows.append({"Code": code, "AdjO": round(prev * self.rng.choice([0.99, 1.0, 1.2]), 2),
+                         "AdjC": close if self.rng.random() > 0.05 else None, "Va": va})
+        self.rng.shuffle(rows)
+        with gzip.open(self.root / "bars" / f"{d}.json.gz", "wt", encoding="utf-8") as f:
+            json.dump({"data": rows}, f)
+
+    def _assert_matches_cold(self, host: signal_host.SignalHost, days: list[str]):
+        for d in days:
+            for spec in SPECS:
+                got = host.volshock_signals(d, d, **spec)
+                want, _ = kpi_volshock_signals.generate_volshock_signals(d, d, **spec)
+                self.assertIsNotNone(got, d)
+                self.assertEqual(got.to_dict("records"), want.to_dict("records"), (d, spec))
+                self.n_signals += len(want)
+
+    def test_daily_feed_matches_cold_generation(self):
+        host = signal_host.SignalHost(self.state_dir)
+        first = self.bdays[12]
+        self.assertEqual(host.advance(first)["fed"], 11)  # 起点(first-10)から
+        self._assert_matches_cold(host, [first])
+        for d in self.bdays[13:]:
+            host = signal_host.SignalHost(self.state_dir)  # 朝ジョブ1回 = 1プロセス
+            stats = host.advance(d)
+            self.assertEqual((stats["fed"], stats["published"], stats["rebuilt"]), (1, 1, 0))
+            self._assert_matches_cold(host, [d])
+        self.assertGreater(self.n_signals, 20)
+
+    def test_replaced_bars_rebuild_from_that_day(self):
+        signal_host.SignalHost(self.state_dir).advance(self.bdays[-1], since=self.bdays[20])
+        changed = self.bdays[-4]
+        self.rng.seed(7)
+        self._put(changed)
+        st = os.stat(self.root / "bars" / f"{changed}.json.gz")
+        os.utime(self.root / "bars" / f"{changed}.json.gz", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        host = signal_host.SignalHost(self.state_dir)
+        stats = host.advance(self.bdays[-1])
+        self.assertEqual((stats["rebuilt"], stats["published"]), (1, 4))
+        self._assert_matches_cold(host, self.bdays[-4:])
+
+    def test_unservable_requests_return_none(self):
+        host = signal_host.SignalHost(self.state_dir)
+        host.advance(self.bdays[-1])
+        spec = SPECS[0]
+        self.assertIsNone(host.volshock_signals(self.bdays[-2], self.bdays[-1], **spec))
+        self.assertIsNone(host.volshock_signals(self.bdays[-2], self.bdays[-2], **spec))  # 未公開日
+        self.assertIsNone(host.volshock_signals(self.bdays[-1], self.bdays[-1], **{**spec, "vol_multiplier": 3.0}))
+        self.assertIsNotNone(host.volshock_signals(self.bdays[-1], self.bdays[-1], **spec))
+        self.assertIsNone(signal_host.SignalHost(self.state_dir).volshock_signals(
+            self.bdays[-1], self.bdays[-1], **spec))  # advance していないプロセス
+
+
+if __name__ == "__main__":
+    unittest.main()
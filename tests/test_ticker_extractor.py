@@ -0,0 +1,131 @@
+"""collector.ticker_extractor（オートマトンによる銘柄名照合）のテスト。
+
+固定する契約:
+  1. 抽出結果は従来の「長い表記から順に `name in text`」と同じ行・同じ順
+     （包含する表記も出現扱い・同じティッカーは先に当たった表記だけ）
+  2. オートマトンは重なり・包含を含む全出現を1回の走査で拾い、JSON に往復しても同じ結果
+  3. master 込みは社名（3文字以上・一意・既存辞書にないもの）を足し、組み立て結果を保存して
+     次回は読み込むだけ。master が変わったら組み直す
+
+実行:
+    python3 -m unittest tests.test_ticker_extractor -v
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from collector import ticker_extractor  # noqa: E402
+from collector.ticker_automaton import TickerAutomaton  # noqa: E402
+from collector.ticker_extractor import ETF_MAP, JAPANESE_TICKER_MAP, TickerExtractor  # noqa: E402
+
+
+def _reference_extract(extractor: TickerExtractor, tweet: dict) -> list[dict]:
+    """オートマトン化する前の照合（表記ごとの部分文字列検索）。"""
+    text = tweet.get("text", "")
+    if not text:
+        return []
+    results, seen = [], set()
+    context = extractor._get_context(tweet)
+    for match in extractor.ticker_pattern.finditer(text):
+        if match.group(1) not in seen:
+            seen.add(match.group(1))
+            results.append({"ticker": match.group(1), "source": "regex", "context": context,
+                            "matched_text": match.group(0)})
+    for table, source in ((JAPANESE_TICKER_MAP, "jp_mapping"), (ETF_MAP, "etf_mapping")):
+        for name, ticker in sorted(table.items(), key=lambda x: len(x[0]), reverse=True):
+            if name in text and ticker not in seen:
+                seen.add(ticker)
+                results.append({"ticker": ticker, "source": source, "context": context, "matched_text": name})
+    return results
+
+
+class TestTickerExtractor(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        ticker_extractor._AUTOMATA.clear()
+
+    def tearDown(self):
+        ticker_extractor._AUTOMATA.clear()
+        self._tmp.cleanup()
+
+    def test_matches_substring_scan(self):
+        extractor = TickerExtractor()
+        rng = random.Random(0)
+        words = list(JAPANESE_TICKER_MAP) + list(ETF_MAP) + [
+            "$AAPL", "$NVDA", "買い増し", "。", "ナス", "ソフトバンク", "メ", "タプラネット", "本日", "$x"]
+        tweets = [
+            {"text": "メタプラネットとソフトバンクグループ、トヨタ自動車を買った", "categories": ["purchased_assets"]},
+            {"text": "ナスダック100とナスダック、ダウ平均", "llm_categories": ["bullish_assets", "ipo"]},
+            {"text": ""},
+        ]
+        tweets += [{"text": "".join(rng.choice(words) for _ in range(rng.randint(1, 8)))} for _ in range(300)]
+        for tweet in tweets:
+            self.assertEqual(extractor.extract(tweet), _reference_extract(extractor, tweet), tweet["text"])
+
+        got = extractor.extract(tweets[0])
+        self.assertEqual([r["ticker"] for r in got], ["9984.T", "3350.T", "7203.T", "META"])
+        self.assertEqual({r["context"] for r in got}, {"購入"})
+
+    def test_automaton_finds_overlaps_and_round_trips(self):
+        entries = [("he", "H", "t"), ("she", "S", "t"), ("his", "I", "t"), ("hers", "R", "t"), ("", "E", "t")]
+        automaton = TickerAutomaton.build(entries)
+        self.assertEqual(automaton.find("ushers"), {0, 1, 3})
+        self.assertEqual([e[1] for e in automaton.matches("ahishers")], ["H", "S", "I", "R"])
+        self.assertEqual(automaton.find("xyz"), set())
+
+        restored = TickerAutomaton.from_dict(json.loads(json.dumps(automaton.to_dict(), ensure_ascii=False)))
+        for text in ("ushers", "ahishers", "shhe", "hehehis"):
+            self.assertEqual(restored.find(text), automaton.find(text))
+
+    def test_master_names_are_built_once_and_reloaded(self):
+        master_dir = self.dir / "master"
+        master_dir.mkdir()
+        rows = [
+            {"Code": "72030", "CoName": "トヨタ自動車"},      # 既存の辞書にある
+            {"Code": "59110", "CoName": "横河ブリッジホールディングス"},
+            {"Code": "285A0", "CoName": "キオクシアホールディングス"},
+            {"Code": "99990", "CoName": "ＡＢ"},                # 短すぎる
+            {"Code": "11110", "CoName": "同名商事"},
+            {"Code": "22220", "CoName": "同名商事"},            # 曖昧
+        ]
+        master = master_dir / "20261001.json.gz"
+        with gzip.open(master, "wt", encoding="utf-8") as f:
+            json.dump({"data": rows}, f, ensure_ascii=False)
+        cache_file = str(self.dir / "ticker_automaton.json")
+
+        def extract(text):
+            with mock.patch.object(ticker_extractor, "JQUANTS_MASTER_DIR", master_dir), \
+                    mock.patch.object(ticker_extractor, "TICKER_AUTOMATON_FILE", cache_file):
+                extractor = TickerExtractor(include_master=True)
+            return [(r["ticker"], r["source"]) for r in extractor.extract({"text": text})]
+
+        text = "横河ブリッジホールディングスとトヨタ自動車、同名商事、ＡＢ、キオクシアホールディングス"
+        self.assertEqual(extract(text), [("7203.T", "jp_mapping"), ("285A.T", "jp_mapping"),
+                                         ("5911.T", "master_mapping")])
+        self.assertTrue(os.path.exists(cache_file))
+        self.assertEqual(TickerExtractor().extract({"text": "横河ブリッジホールディングス"}), [])
+
+        ticker_extractor._AUTOMATA.clear()
+        with mock.patch.object(TickerAutomaton, "build", side_effect=AssertionError("rebuilt")):
+            self.assertEqual(extract("横河ブリッジホールディングス"), [("5911.T", "master_mapping")])
+
+        ticker_extractor._AUTOMATA.clear()
+        rows.append({"Code": "33330", "CoName": "新規上場産業"})
+        with gzip.open(master, "wt", encoding="utf-8") as f:
+            json.dump({"data": rows}, f, ensure_ascii=False)
+        self.assertEqual(extract("新規上場産業"), [("3333.T", "master_mapping")])
+
+
+if __name__ == "__main__":
+    unittest.main()
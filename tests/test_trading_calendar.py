@@ -0,0 +1,170 @@
+"""trading_calendar（序数化した取引カレンダー）のテスト。
+
+固定する契約:
+  1. 範囲・月初・月末・週末の営業日は jq_fetch の従来関数と同じ（実在しない日付の境界も同じ意味）。
+     measure_base_rate（§6凍結・読み替えない）の全営業日・月末/月初表・序数とも一致する
+  2. offset / count / asof は1日ずつ数えた結果と同じ。配列で渡しても要素ごとのスカラー結果と同じ。
+     カレンダーの外は None。平日カレンダーの offset は np.busday_offset(roll="forward") と同じ
+  3. jp() は calendar.json.gz が変わるまで共有し、build_daily_reco の営業日加算はそれで数える
+     （無ければ従来の概算）。us() は基準銘柄の取引日の和集合（無ければ平日）
+
+実行:
+    python3 -m unittest tests.test_trading_calendar -v
+"""
+from __future__ import annotations
+
+import datetime as dt
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import build_daily_reco  # noqa: E402
+import jq_fetch  # noqa: E402
+import measure_base_rate  # noqa: E402
+import trading_calendar  # noqa: E402
+from trading_calendar import TradingCalendar  # noqa: E402
+
+
+def _calendar_days(seed: int = 0, start: dt.date = dt.date(2023, 12, 20), n: int = 500) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        d = start + dt.timedelta(days=i)
+        if d.weekday() >= 5:
+            hol = "0"
+        else:
+            hol = rng.choices(["1", "2", "0", "3"], weights=[90, 3, 5, 2])[0]
+        out.append((d.strftime("%Y%m%d"), hol))
+    return out
+
+
+def _brute_offset(days: list[str], date: str, n: int) -> str | None:
+    """date の翌日から（n<0 なら前日から遡って）|n| 営業日目。date が営業日で n=0 ならその日。"""
+    if n == 0:
+        return date if date in days else None
+    if n > 0:
+        after = [d for d in days if d > date]
+        return after[n - 1] if len(after) >= n else None
+    before = [d for d in days if d < date]
+    return before[n] if len(before) >= -n else None
+
+
+class TestTradingCalendar(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_ranges_match_jq_fetch(self):
+        cal_days = _calendar_days()
+        cal = trading_calendar.for_days(cal_days)
+        self.assertIs(trading_calendar.for_days(cal_days), cal)
+        self.assertEqual(cal.days, jq_fetch.business_days_in_range(cal_days, "00010101", "99991231"))
+
+        rng = random.Random(1)
+        bounds = [d for d, _ in cal_days] + ["00010101", "99991231", "20240231", "20240931"]
+        for _ in range(200):
+            start, end = sorted(rng.sample(bounds, 2))
+            self.assertEqual(cal.range(start, end), jq_fetch.business_days_in_range(cal_days, start, end))
+            self.assertEqual(cal.month_ends(start, end),
+                             jq_fetch.month_end_business_days_in_range(cal_days, start, end))
+            self.assertEqual(cal.month_starts(start, end),
+                             jq_fetch.month_start_business_days_in_range(cal_days, start, end))
+            self.assertEqual(cal.week_ends(start, end),
+                             jq_fetch.week_end_business_days_in_range(cal_days, start, end))
+        self.assertEqual(TradingCalendar([]).range(), [])
+
+    def test_matches_frozen_measure_base_rate(self):
+        cal_days = _calendar_days(seed=3, n=900)
+        cal = trading_calendar.for_days(cal_days)
+        all_bdays = measure_base_rate.all_business_days(cal_days)
+        self.assertEqual(cal.days, all_bdays)
+        self.assertEqual(cal.positions, {d: i for i, d in enumerate(all_bdays)})
+        months = sorted({f"{d[:4]}-{d[4:6]}" for d, _ in cal_days})
+        rng = random.Random(4)
+        for _ in range(50):
+            start, end = sorted(rng.sample(months, 2))
+            lo, hi = start.replace("-", "") + "01", end.replace("-", "") + "31"
+            self.assertEqual(cal.month_ends(lo, hi), measure_base_rate.month_ends_in_range(cal_days, start, end))
+            self.assertEqual(cal.month_starts(lo, hi), measure_base_rate.month_starts_in_range(cal_days, start, end))
+
+    def test_offsets_and_counts_match_day_by_day(self):
+        cal = trading_calendar.for_days(_calendar_days(seed=2))
+        days = cal.days
+        every = [(dt.date(2023, 12, 10) + dt.timedelta(days=i)).strftime("%Y%m%d") for i in range(530)]
+        rng = random.Random(3)
+        for date in rng.sample(every, 120):
+            for n in (1, 5, 20, -1, -7, 400):
+                # 非営業日は直前/直後の営業日に寄せてから数える（寄せた日が「前日から/翌日から1営業日目」）
+                holiday = date not in days
+                back = n - 1 if holiday and n < 0 else n
+                fwd = n + 1 if holiday and n > 0 else n
+                self.assertEqual(cal.offset(date, n, roll="backward"), _brute_offset(days, date, back), (date, n))
+                self.assertEqual(cal.offset(date, n), _brute_offset(days, date, fwd), (date, n))
+            self.assertEqual(cal.asof(date), max((d for d in days if d <= date), default=None))
+            end = rng.choice(every)
+            self.assertEqual(cal.count(date, end), sum(1 for d in days if date <= d <= end))
+
+        sample = rng.sample(every, 50)
+        self.assertEqual(cal.offset(sample, 10), [cal.offset(d, 10) for d in sample])
+        self.assertEqual(cal.asof(sample), [cal.asof(d) for d in sample])
+        ordinals = cal.index(sample, roll="forward")
+        self.assertEqual(cal.days_at(ordinals + 3), [cal.offset(d, 3) for d in sample])
+        self.assertEqual(list(cal.count(sample, ["99991231"] * 50)), [cal.count(d, "99991231") for d in sample])
+        self.assertIsNone(cal.offset(days[-1], 1))
+        self.assertIsNone(cal.asof("20000101"))
+        self.assertEqual(cal.offset(dt.date(2024, 1, 5), 0), cal.offset("2024-01-05", 0))
+
+        weekdays = trading_calendar.us(self.dir / "no_prices")
+        for date in rng.sample(every, 60):
+            iso = f"{date[:4]}-{date[4:6]}-{date[6:]}"
+            for n in (1, 3, 15, -4):
+                want = str(np.busday_offset(np.datetime64(iso), n, roll="forward"))
+                self.assertEqual(weekdays.offset(iso, n), want)
+                self.assertEqual(weekdays.offset(date, n), want)
+
+    def test_jp_loader_and_daily_reco_use_calendar_file(self):
+        cal_days = _calendar_days(seed=4)
+        path = self.dir / "calendar.json.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump({"data": [{"Date": f"{d[:4]}-{d[4:6]}-{d[6:]}", "HolDiv": h} for d, h in cal_days]}, f)
+        with mock.patch.object(trading_calendar, "JP_CALENDAR_PATH", path):
+            cal = trading_calendar.jp()
+            self.assertIs(trading_calendar.jp(), cal)
+            self.assertEqual(cal.days, trading_calendar.for_days(cal_days).days)
+            holiday = next(d for d, h in cal_days if h == "3")
+            start = dt.date(int(holiday[:4]), int(holiday[4:6]), int(holiday[6:]))
+            self.assertEqual(build_daily_reco.add_bdays(start, 3).strftime("%Y%m%d"),
+                             _brute_offset(cal.days, holiday, 3))
+            self.assertEqual(build_daily_reco.recent_bday_floor(start, 2).strftime("%Y%m%d"),
+                             _brute_offset(cal.days, holiday, -2))
+
+            os.utime(path, ns=(0, 0))
+            self.assertIsNot(trading_calendar.jp(), cal)
+        with mock.patch.object(trading_calendar, "JP_CALENDAR_PATH", self.dir / "missing.json.gz"):
+            self.assertEqual(build_daily_reco.add_bdays(dt.date(2026, 8, 7), 2), dt.date(2026, 8, 12))
+
+        prices = self.dir / "prices"
+        prices.mkdir()
+        (prices / "SPY.csv").write_text("date,close\n2024-07-02,1\n2024-07-03,1\n2024-07-05,1\n", encoding="utf-8")
+        (prices / "AAPL.csv").write_text("date,close\n2024-07-01,1\n2024-07-05,1\n", encoding="utf-8")
+        us = trading_calendar.us(prices)
+        self.assertEqual(us.days, ["2024-07-01", "2024-07-02", "2024-07-03", "2024-07-05"])
+        self.assertEqual(us.offset("20240703", 1), "2024-07-05")  # 独立記念日を跨ぐ
+        self.assertEqual(us.month_ends(), ["2024-07-05"])
+
+
+if __name__ == "__main__":
+    unittest.main()
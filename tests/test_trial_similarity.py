@@ -0,0 +1,128 @@
+"""trial_similarity（既試行の近傍検索索引）のテスト。
+
+固定する契約:
+  1. 別名・同パラメータ・同期間の再実行が最上位に来る。母集団が同じなら名前が似ていなくても
+     LSH で候補に上がる
+  2. MinHash の一致率は Jaccard の推定になっている（決定論的な置換）
+  3. trials.jsonl の追記分だけを解析し、先頭側が書き換わったら作り直す。書きかけの行は次回
+  4. 母集団 CSV は mtime/サイズが変わった時だけ読み直す
+
+stdlib のみ。
+
+実行:
+    python3 -m unittest tests.test_trial_similarity -v
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import trial_similarity as ts  # noqa: E402
+
+
+def _row(name: str, params: dict, period=("2016-11", "2018-12"), **kw) -> dict:
+    row = {"run_id": f"run-{name}", "kpi_name": name, "params": params,
+           "period": {"start": period[0], "end": period[1]}, "verdict": "pending"}
+    row.update(kw)
+    return row
+
+
+class TestSimilarity(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        self.trials = self.dir / "trials.jsonl"
+        self.index_path = self.dir / "index.json"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _csv(self, name: str, pairs) -> str:
+        path = self.dir / f"{name}.csv"
+        with path.open("w", encoding="utf-8") as f:
+            f.write("signal_date,code,ret\n")
+            for code, date in pairs:
+                f.write(f"{date},{code},0.01\n")
+        return str(path)
+
+    def _append(self, *rows, partial: str = ""):
+        with self.trials.open("a", encoding="utf-8") as f:
+            for r in rows:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+            f.write(partial)
+
+    def test_minhash_estimates_jaccard(self):
+        a = {f"{i}|2020-01-01" for i in range(400)}
+        b = {f"{i}|2020-01-01" for i in range(200, 600)}  # Jaccard = 1/3
+        est = ts.signature_similarity(ts.minhash(a), ts.minhash(b))
+        self.assertAlmostEqual(est, 1 / 3, delta=0.15)
+        self.assertEqual(ts.minhash(a), ts.minhash(set(a)))
+        self.assertIsNone(ts.minhash(set()))
+
+    def test_renamed_rerun_ranks_first_and_lsh_finds_population(self):
+        pop = [(str(1000 + i), f"2017-0{i % 9 + 1}-01") for i in range(300)]
+        self._append(
+            _row("pead_initial_gap8_vol3", {"gap_threshold": 0.08, "vol_multiplier": 3.0, "seed": 1}),
+            _row("volshock_quiet", {"vol_multiplier": 5.0}, ("2019-01", "2024-12")),
+            _row("zz_unrelated_name", {"lookback": 60}, ("2019-01", "2024-12")),
+        )
+        rows = [json.loads(line) for line in self.trials.read_text(encoding="utf-8").splitlines()]
+        rows[2]["params"]["source_returns_csv"] = self._csv("pop", pop)
+        self.trials.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+        index, _ = ts.refresh(self.trials, self.index_path)
+        sim = ts.SimilarityIndex(index)
+        probe = ts.make_probe("earnings_gap_rerun", "SUE/PEAD",
+                              {"gap_threshold": 0.08, "vol_multiplier": 3.0, "seed": 99},
+                              {"start": "2016-11", "end": "2018-12"})
+        top = sim.query(probe)
+        self.assertEqual(top[0]["kpi_name"], "pead_initial_gap8_vol3")
+        self.assertEqual(top[0]["components"]["params"], 1.0)  # seed は比較しない
+
+        # 名前も family も違うが母集団がほぼ同じ → LSH 経由で引ける
+        probe = ts.make_probe("qq", signals={f"{c}|{d}" for c, d in pop[:290]})
+        self.assertIn(2, sim.candidates(probe))
+        self.assertEqual(sim.query(probe)[0]["kpi_name"], "zz_unrelated_name")
+
+    def test_incremental_append_and_rewrite(self):
+        self._append(_row("a_one", {"x": 1.0}), partial='{"kpi_name": "b_tw')
+        index, stats = ts.refresh(self.trials, self.index_path)
+        self.assertEqual((stats["parsed"], len(index["entries"])), (1, 1))
+
+        with self.trials.open("a", encoding="utf-8") as f:
+            f.write('o", "params": {}}\n')
+        self._append(_row("c_three", {}))
+        index, stats = ts.refresh(self.trials, self.index_path)
+        self.assertEqual((stats["parsed"], stats["rebuilt"]), (2, 0))
+        self.assertEqual([e["kpi_name"] for e in index["entries"]], ["a_one", "b_two", "c_three"])
+        self.assertEqual([e["line"] for e in index["entries"]], [1, 2, 3])
+
+        # 先頭行の書き換え → 作り直し
+        text = self.trials.read_text(encoding="utf-8").replace("a_one", "a_uno")
+        self.trials.write_text(text, encoding="utf-8")
+        index, stats = ts.refresh(self.trials, self.index_path)
+        self.assertEqual((stats["parsed"], stats["rebuilt"]), (3, 1))
+        self.assertEqual(index["entries"][0]["kpi_name"], "a_uno")
+
+    def test_population_reread_only_when_changed(self):
+        path = self._csv("pop", [("1301", "2020-01-06")])
+        self._append(_row("k", {"source_returns_csv": path}))
+        _, stats = ts.refresh(self.trials, self.index_path)
+        self.assertEqual(stats["populations_read"], 1)
+        _, stats = ts.refresh(self.trials, self.index_path)
+        self.assertEqual(stats["populations_read"], 0)
+        self._csv("pop", [("1301", "2020-01-06"), ("7203", "2020-01-07")])
+        os.utime(path, ns=(10**18, 10**18))
+        index, stats = ts.refresh(self.trials, self.index_path)
+        self.assertEqual(stats["populations_read"], 1)
+        self.assertEqual(index["populations"][path]["n"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,277 @@
+"""us_price_fetch（差分取得・provider ごとの送信間隔・条件付き GET）のテスト。
+
+固定する契約:
+  1. 既存 CSV は保存済み最終日の少し前からの差分だけを取得し、新しい日を末尾に足す
+     （既存行のバイトは動かさない）。足す行が無い・304 のときは書き込まずに unchanged
+  2. 重なり区間の過去行が変わっていたら（分割・配当の遡及改訂）全期間を取り直す。
+     最終行だけの変化（未確定の足）は差し替えて追記で済ませる
+  3. 銘柄は並行に回しても provider ごとの送信間隔は REQUEST_INTERVAL_SECONDS を下回らず、
+     stooq と yahoo への要求は重なって進む。ボット検証ゲートを返した provider は以後使わない
+
+提供元は手元の HTTP サーバ（stooq の CSV と yahoo の chart JSON を模したもの）で代用する。
+
+実行:
+    python3 -m unittest tests.test_us_price_fetch -v
+"""
+from __future__ import annotations
+
+import contextlib
+import datetime as dt
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import us_price_fetch  # noqa: E402
+
+
+def _bars(start: dt.date, n: int, base: float = 100.0) -> list[dict]:
+    out, day = [], start
+    while len(out) < n:
+        if day.weekday() < 5:
+            close = base + len(out)
+            out.append({"date": day.isoformat(), "close": close, "adj": round(close * 0.9, 4)})
+        day += dt.timedelta(days=1)
+    return out
+
+
+class FixtureProviders:
+    """stooq（CSV・d1/d2）と yahoo（chart JSON・period1）を模した提供元。ETag を返し 304 に応じる。"""
+
+    def __init__(self):
+        self.stooq: dict[str, list[dict]] = {}
+        self.yahoo: dict[str, list[dict]] = {}
+        self.stooq_challenge = False
+        self.delay = 0.0
+        self.requests: list[tuple[str, str, float]] = []
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fixture.handle(self)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def calls(self, provider: str) -> list[tuple[str, float]]:
+        return [(path, t) for p, path, t in self.requests if p == provider]
+
+    def handle(self, req: BaseHTTPRequestHandler) -> None:
+        url = urllib.parse.urlsplit(req.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        provider = url.path.split("/")[1]
+        with self._lock:
+            self.requests.append((provider, req.path, time.monotonic()))
+        time.sleep(self.delay)
+        if provider == "stooq":
+            if self.stooq_challenge:
+                return self.reply(req, 200, b"<html><script>verify()</script></html>", "text/html")
+            bars = self.stooq.get(query["s"].removesuffix(".us").upper())
+            if bars is None:
+                return self.reply(req, 404, b"not found", "text/plain")
+            lo = query.get("d1", "00000000")
+            hi = query.get("d2", "99999999")
+            lines = ["Date,Open,High,Low,Close,Volume"]
+            lines += [f"{b['date']},{b['close']},{b['close']},{b['close']},{b['close']},1000"
+                      for b in bars if lo <= b["date"].replace("-", "") <= hi]
+            return self.reply(req, 200, ("\n".join(lines) + "\n").encode(), "text/csv")
+        bars = self.yahoo.get(url.path.split("/")[2])
+        if bars is None:
+            return self.reply(req, 404, b"{}", "application/json")
+        period1 = int(query.get("period1", "0"))
+        picked = []
+        for b in bars:
+            day = dt.date.fromisoformat(b["date"])
+            ts = int(dt.datetime(day.year, day.month, day.day, 14, 30, tzinfo=dt.timezone.utc).timestamp())
+            if ts >= period1:
+                picked.append((ts, b))
+        closes = [b["close"] for _, b in picked]
+        payload = {"chart": {"error": None, "result": [{
+            "timestamp": [ts for ts, _ in picked],
+            "indicators": {
+                "quote": [{"open": closes, "high": closes, "low": closes, "close": closes,
+                           "volume": [1000] * len(picked)}],
+                "adjclose": [{"adjclose": [b["adj"] for _, b in picked]}],
+            },
+        }]}}
+        self.reply(req, 200, json.dumps(payload).encode(), "application/json")
+
+    def reply(self, req: BaseHTTPRequestHandler, code: int, body: bytes, ctype: str) -> None:
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if code == 200 and req.headers.get("If-None-Match") == etag:
+            with self._lock:
+                self.not_modified += 1
+            req.send_response(304)
+            req.send_header("ETag", etag)
+            req.end_headers()
+            return
+        req.send_response(code)
+        req.send_header("Content-Type", ctype)
+        req.send_header("Content-Length", str(len(body)))
+        if code == 200:
+            req.send_header("ETag", etag)
+        req.end_headers()
+        req.wfile.write(body)
+
+
+class TestUsPriceFetch(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        self.outdir = self.dir / "prices"
+        self.fixture = FixtureProviders()
+        self.addCleanup(self.fixture.close)
+        base = self.fixture.base
+        for patcher in (
+            mock.patch.object(us_price_fetch, "STOOQ_URL", base + "/stooq?s={symbol}&i=d"),
+            mock.patch.object(us_price_fetch, "YAHOO_URL",
+                              base + "/yahoo/{symbol}?period1={period1}&period2=9999999999&interval=1d"),
+            mock.patch.object(us_price_fetch, "RECEIPTS_PATH", self.dir / "receipts.jsonl"),
+            mock.patch.object(us_price_fetch, "FETCH_STATE_PATH", self.dir / "fetch_state.json"),
+            mock.patch.object(us_price_fetch, "REQUEST_INTERVAL_SECONDS", 0.0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _fetch(self, tickers, **kw) -> list[str]:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            return us_price_fetch.fetch_all(tickers, self.outdir, ["stooq", "yahoo"], "run", **kw)
+
+    def _rows(self, ticker: str) -> list[dict]:
+        summary = us_price_fetch.read_existing_summary(self.outdir / f"{ticker}.csv")
+        return [summary["by_date"][d] for d in sorted(summary["by_date"])]
+
+    def test_incremental_refresh_appends_and_skips_unchanged(self):
+        bars = _bars(dt.date(2024, 1, 2), 60)
+        self.fixture.stooq["AAA"] = bars[:50]
+        self.fixture.yahoo["BBB"] = [dict(b) for b in bars[:50]]
+        self.assertEqual(self._fetch(["AAA", "BBB"]), ["saved", "saved"])
+        self.assertEqual(self._rows("AAA")[-1]["provider"], "stooq")
+        self.assertEqual(self._rows("BBB")[-1]["adj_close"], str(bars[49]["adj"]))
+        before = {t: (self.outdir / f"{t}.csv").read_bytes() for t in ("AAA", "BBB")}
+
+        self.fixture.stooq["AAA"] = bars[:53]
+        self.fixture.yahoo["BBB"] = [dict(b) for b in bars[:52]]
+        self.fixture.requests.clear()
+        self.assertEqual(self._fetch(["AAA", "BBB"]), ["appended", "appended"])
+        self.assertEqual(len(self._rows("AAA")), 53)
+        self.assertEqual(len(self._rows("BBB")), 52)
+        for ticker in ("AAA", "BBB"):
+            self.assertTrue((self.outdir / f"{ticker}.csv").read_bytes().startswith(before[ticker]))
+        # 差分取得は CSV を出した provider にだけ、期間を絞って問い合わせる
+        self.assertEqual(len(self.fixture.calls("stooq")), 1)
+        self.assertIn("d1=", self.fixture.calls("stooq")[0][0])
+        self.assertEqual(len(self.fixture.calls("yahoo")), 1)
+        self.assertNotIn("period1=0&", self.fixture.calls("yahoo")[0][0])
+
+        mtimes = {t: (self.outdir / f"{t}.csv").stat().st_mtime_ns for t in ("AAA", "BBB")}
+        self.assertEqual(self._fetch(["AAA", "BBB"]), ["unchanged", "unchanged"])
+        self.assertEqual(self.fixture.not_modified, 0)  # 最終日が進んだので問い合わせ期間も変わる
+        self.assertEqual(self._fetch(["AAA", "BBB"]), ["unchanged", "unchanged"])
+        self.assertEqual(self.fixture.not_modified, 2)  # 同じ URL への再問い合わせは 304
+        os.remove(self.dir / "fetch_state.json")
+        self.assertEqual(self._fetch(["AAA", "BBB"]), ["unchanged", "unchanged"])
+        self.assertEqual(self.fixture.not_modified, 2)
+        for ticker, mtime in mtimes.items():
+            self.assertEqual((self.outdir / f"{ticker}.csv").stat().st_mtime_ns, mtime)
+
+        receipts = [json.loads(line) for line in (self.dir / "receipts.jsonl").read_text().splitlines()]
+        self.assertEqual([r["status"] for r in receipts if r["ticker"] == "BBB"],
+                         ["saved", "appended", "unchanged", "unchanged", "unchanged"])
+
+    def test_revision_in_overlap_refetches_full_history(self):
+        bars = _bars(dt.date(2024, 1, 2), 40)
+        self.fixture.yahoo["CCC"] = [dict(b) for b in bars[:30]]
+        self.assertEqual(self._fetch(["CCC"]), ["saved"])
+
+        # 最終行だけ変わった（未確定の足の確定）→ 差し替えて追記
+        self.fixture.yahoo["CCC"][29]["close"] += 0.5
+        self.fixture.yahoo["CCC"].append(dict(bars[30]))
+        self.fixture.requests.clear()
+        self.assertEqual(self._fetch(["CCC"]), ["appended"])
+        self.assertEqual(float(self._rows("CCC")[29]["close"]), bars[29]["close"] + 0.5)
+        self.assertEqual(len(self.fixture.calls("yahoo")), 1)
+
+        # 配当落ちで過去の adj_close が全部変わった → 全期間を取り直す
+        revised = [dict(b, adj=round(b["adj"] * 0.98, 4)) for b in self.fixture.yahoo["CCC"]]
+        revised.append(dict(bars[31], adj=round(bars[31]["adj"] * 0.98, 4)))
+        self.fixture.yahoo["CCC"] = revised
+        self.fixture.requests.clear()
+        self.assertEqual(self._fetch(["CCC"]), ["saved"])
+        paths = [path for path, _ in self.fixture.calls("yahoo")]
+        self.assertEqual(len(paths), 2)
+        self.assertIn("period1=0&", paths[1])
+        self.assertEqual([float(r["adj_close"]) for r in self._rows("CCC")], [b["adj"] for b in revised])
+
+        # --force は差分取得も条件付き GET も使わず全期間を書き直す
+        self.fixture.requests.clear()
+        self.assertEqual(self._fetch(["CCC"], force=True), ["saved"])
+        self.assertIn("period1=0&", self.fixture.calls("yahoo")[0][0])
+
+    def test_providers_are_paced_independently(self):
+        interval = 0.12
+        bars = _bars(dt.date(2024, 3, 1), 20)
+        stooq_tickers = [f"S{i}" for i in range(4)]
+        yahoo_tickers = [f"Y{i}" for i in range(4)]
+        for t in stooq_tickers:
+            self.fixture.stooq[t] = bars[:15]
+        for t in yahoo_tickers:
+            self.fixture.yahoo[t] = bars[:15]
+        tickers = [t for pair in zip(stooq_tickers, yahoo_tickers) for t in pair]
+        self.assertEqual(self._fetch(tickers, workers=1), ["saved"] * 8)
+
+        for t in stooq_tickers:
+            self.fixture.stooq[t] = bars
+        for t in yahoo_tickers:
+            self.fixture.yahoo[t] = bars
+        self.fixture.requests.clear()
+        self.fixture.delay = 0.03
+        started = time.monotonic()
+        with mock.patch.object(us_price_fetch, "REQUEST_INTERVAL_SECONDS", interval):
+            self.assertEqual(self._fetch(tickers, workers=4), ["appended"] * 8)
+        elapsed = time.monotonic() - started
+        for provider in ("stooq", "yahoo"):
+            times = [t for _, t in self.fixture.calls(provider)]
+            self.assertEqual(len(times), 4)
+            self.assertGreaterEqual(min(b - a for a, b in zip(times, times[1:])), interval * 0.75)  # 到着時刻のゆらぎ分だけ緩める
+        # 2 つの provider の枠は別なので、直列（8 回ぶんの間隔）より明らかに早く終わる
+        self.assertLess(elapsed, 7 * interval)
+
+        self.fixture.stooq_challenge = True
+        self.fixture.delay = 0.0
+        self.fixture.requests.clear()
+        new = [f"N{i}" for i in range(6)]
+        for t in new:
+            self.fixture.yahoo[t] = bars
+        with mock.patch.object(us_price_fetch, "REQUEST_INTERVAL_SECONDS", 0.05):
+            self.assertEqual(self._fetch(new, workers=3), ["saved"] * 6)
+        self.assertLessEqual(len(self.fixture.calls("stooq")), 3)  # 判明前に並行で出た分だけ
+        self.assertEqual(len(self.fixture.calls("yahoo")), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,30 @@
 """x_metrics_lib の純関数テスト（ネットワーク・Docker 不要・stdlib unittest のみ）。
 
+一括計測（fetch_metrics_many）はローカルのスタブサーバを両経路の代わりに立てて検証する。
+
 実行:
   python3 -m unittest tests.test_x_metrics_lib -v
 """
 from __future__ import annotations
 
+import json
+import os
 import sys
+import tempfile
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
 
-from x_metrics_lib import METRIC_FIELDS, build_record, status_id_of  # noqa: E402
+import x_metrics_lib  # noqa: E402
+from x_metrics_lib import (  # noqa: E402
+    METRIC_FIELDS, build_record, fetch_metrics_many, status_id_of,
+)
 
 CAPTURED = "2026-08-19T00:00:00+00:00"
 
@@ -88,5 +101,138 @@ class TestBuildRecord(unittest.TestCase):
         self.assertEqual(rec["captured_at"], CAPTURED)
 
 
+class _StubServer:
+    """syndication / fxtwitter の代役。id "429" の syndication は初回だけ Retry-After: 1 で断る。"""
+
+    def __init__(self, delay: float = 0.0):
+        hits: list[tuple[str, str, float]] = []
+        refused: set = set()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802
+                u = urlsplit(self.path)
+                if u.path == "/syn":
+                    src, sid = "syn", parse_qs(u.query)["id"][0]
+                else:
+                    src, sid = "fx", u.path.rsplit("/", 1)[-1]
+                hits.append((src, sid, time.monotonic()))
+                time.sleep(delay)
+                if sid == "404":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                if src == "syn" and sid == "429" and sid not in refused:
+                    refused.add(sid)
+                    self.send_response(429)
+                    self.send_header("Retry-After", "1")
+                    self.end_headers()
+                    return
+                if src == "syn":
+                    payload = {"favorite_count": int(sid) * 10, "conversation_count": 1}
+                else:
+                    payload = {"tweet": {"likes": int(sid) * 10, "views": int(sid) * 100}}
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.hits = hits
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.endpoints = {"syndication": base + "/syn?id={}", "fxtwitter": base + "/fx/{}"}
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TestFetchMetricsMany(unittest.TestCase):
+    def _serve(self, delay: float = 0.0) -> _StubServer:
+        srv = _StubServer(delay)
+        self.addCleanup(srv.close)
+        patcher = mock.patch.dict(x_metrics_lib.ENDPOINTS, srv.endpoints)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return srv
+
+    def test_input_order_dedup_and_garbage(self):
+        srv = self._serve()
+        recs = fetch_metrics_many(["3", "https://x.com/a/status/5", "https://x.com/home", "3"],
+                                  rate_per_sec=100)
+        self.assertEqual([r and r["status_id"] for r in recs], ["3", "5", None, "3"])
+        self.assertEqual(recs[0]["likes"], 30)
+        self.assertEqual(recs[1]["views"], 500)
+        self.assertEqual(len(srv.hits), 4)  # "3" の重複は1回だけ（2経路×2ID）
+
+    def test_404_is_null_not_zero(self):
+        self._serve()
+        rec = fetch_metrics_many(["404"], rate_per_sec=100)[0]
+        for f in METRIC_FIELDS:
+            self.assertIsNone(rec[f], f)
+        self.assertEqual(len(rec["errors"]), 2)
+        self.assertIn("HTTP404", rec["errors"][0])
+
+    def test_parallel_across_ids_and_sources(self):
+        srv = self._serve(delay=0.2)
+        t0 = time.monotonic()
+        recs = fetch_metrics_many([str(i) for i in range(1, 6)], workers=10, rate_per_sec=100)
+        # 直列なら 10 リクエスト × 0.2s = 2s
+        self.assertLess(time.monotonic() - t0, 1.0)
+        self.assertEqual(len(srv.hits), 10)
+        self.assertTrue(all(r["errors"] == [] for r in recs))
+
+    def test_rate_limit_per_endpoint(self):
+        srv = self._serve()
+        fetch_metrics_many([str(i) for i in range(1, 5)], workers=8, rate_per_sec=10)
+        syn = sorted(t for src, _, t in srv.hits if src == "syn")
+        gaps = [b - a for a, b in zip(syn, syn[1:])]
+        self.assertTrue(all(g >= 0.08 for g in gaps), gaps)
+
+    def test_retry_after_respected(self):
+        srv = self._serve()
+        rec = fetch_metrics_many(["429"], rate_per_sec=100)[0]
+        syn = [t for src, _, t in srv.hits if src == "syn"]
+        self.assertEqual(len(syn), 2)
+        self.assertGreaterEqual(syn[1] - syn[0], 0.9)
+        self.assertEqual(rec["likes"], 4290)
+        self.assertEqual(rec["errors"], [])
+
+    def test_disk_cache_keeps_captured_at(self):
+        srv = self._serve()
+        with tempfile.TemporaryDirectory() as d:
+            first = fetch_metrics_many(["7"], rate_per_sec=100, cache_dir=Path(d))[0]
+            n = len(srv.hits)
+            second = fetch_metrics_many(["7"], rate_per_sec=100, cache_dir=Path(d))[0]
+            self.assertEqual(len(srv.hits), n)  # キャッシュ命中＝リクエスト無し
+            self.assertEqual(second, first)     # captured_at も実測時刻のまま
+            fetch_metrics_many(["7"], rate_per_sec=100, cache_dir=Path(d), ttl_sec=-1)
+            self.assertEqual(len(srv.hits), 2 * n)  # 期限切れは取り直す
+
+    def test_expired_cache_files_are_pruned(self):
+        self._serve()
+        with tempfile.TemporaryDirectory() as d:
+            fetch_metrics_many(["7", "8"], rate_per_sec=100, cache_dir=Path(d))
+            stale = Path(d) / "syndication" / "7.json"
+            old = time.time() - x_metrics_lib.CACHE_TTL_SEC - 60
+            os.utime(stale, (old, old))
+            fetch_metrics_many(["9"], rate_per_sec=100, cache_dir=Path(d))
+            self.assertEqual(sorted(p.name for p in (Path(d) / "syndication").iterdir()), ["8.json", "9.json"])
+            self.assertEqual(len(list((Path(d) / "fxtwitter").iterdir())), 3)
+
+    def test_cli_uses_default_cache_dir(self):
+        self._serve()
+        with tempfile.TemporaryDirectory() as d, \
+                mock.patch.object(x_metrics_lib, "DEFAULT_CACHE_DIR", Path(d)), \
+                mock.patch("sys.stdout"):
+            self.assertEqual(x_metrics_lib.main(["7"]), 0)
+            self.assertTrue((Path(d) / "syndication" / "7.json").exists())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,150 @@
+"""x_tracer_index（ライブ・バズトレーサーの最終観測索引と速度モデル）のテスト。
+
+固定する点:
+  1. 索引は旧 load_recent_snapshots と同じ窓・同じ壊れ行ガードで作られ、末尾（offsets 以降）
+     だけを追いつかせる。索引が壊れた・JSONL が縮んだ時は作り直す
+  2. velocity_model=last は旧 detect の「前回との差分」と同値。ols/ewma は観測点列全体を使う
+
+stdlib のみ（Playwright・ネットワーク不要）。
+
+実行:
+    python3 -m unittest tests.test_x_tracer_index -v
+"""
+from __future__ import annotations
+
+import datetime as dt
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import x_tracer_index as xti  # noqa: E402
+
+TODAY = dt.date(2026, 10, 19)
+
+
+def _row(tid: str, hour: float, likes, day: dt.date = TODAY) -> dict:
+    t = dt.datetime(day.year, day.month, day.day, tzinfo=dt.timezone(dt.timedelta(hours=9))) \
+        + dt.timedelta(hours=hour)
+    return {"tweet_id": tid, "scraped_at": t.isoformat(timespec="seconds"), "likes": likes,
+            "impressions": None if likes is None else likes * 100}
+
+
+def _write(path: Path, rows: list, mode: str = "a") -> None:
+    with open(path, mode, encoding="utf-8") as f:
+        for r in rows:
+            f.write((r if isinstance(r, str) else json.dumps(r)) + "\n")
+
+
+class TestLoadIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.out = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _day(self, d: dt.date) -> Path:
+        return self.out / f"tracer-{d}.jsonl"
+
+    def test_window_and_guard_match_old_loader(self):
+        old_day = TODAY - dt.timedelta(days=4)   # 窓の外
+        in_day = TODAY - dt.timedelta(days=3)    # 窓の端（当日＋3日前まで）
+        _write(self._day(old_day), [_row("1", 1, 5, old_day)])
+        _write(self._day(in_day), [_row("1", 1, 10, in_day), "[1,2]", "not json",
+                                   {"tweet_id": "2"}])
+        _write(self._day(TODAY), [_row("1", 2, 40)])
+        idx = xti.load_index(self.out, today=TODAY)
+        self.assertEqual([p[1] for p in idx["ids"]["1"]], [10, 40])
+        self.assertNotIn("2", idx["ids"])  # scraped_at 欠落は採用しない
+        self.assertEqual(xti.last_seen(idx, "1")["likes"], 40)
+        self.assertIsNone(xti.last_seen(idx, "9"))
+
+    def test_tail_only_after_append(self):
+        idx = xti.load_index(self.out, today=TODAY)
+        xti.append_rows(self.out, self._day(TODAY), [_row("1", 1, 10)], idx)
+        # 別経路で JSONL だけ伸びた（索引の保存が落ちた想定）→ 末尾だけ取り込む
+        _write(self._day(TODAY), [_row("1", 2, 20)])
+        idx2 = xti.load_index(self.out, today=TODAY)
+        self.assertEqual([p[1] for p in idx2["ids"]["1"]], [10, 20])
+        self.assertEqual(idx2["offsets"][self._day(TODAY).name], self._day(TODAY).stat().st_size)
+
+    def test_partial_last_line_waits(self):
+        with open(self._day(TODAY), "w", encoding="utf-8") as f:
+            f.write(json.dumps(_row("1", 1, 10)) + "\n" + '{"tweet_id": "1", "scr')
+        idx = xti.load_index(self.out, today=TODAY)
+        self.assertEqual(len(idx["ids"]["1"]), 1)
+        with open(self._day(TODAY), "a", encoding="utf-8") as f:
+            f.write('aped_at": "2026-10-19T03:00:00+09:00", "likes": 30}\n')
+        idx = xti.load_index(self.out, today=TODAY)
+        self.assertEqual([p[1] for p in idx["ids"]["1"]], [10, 30])
+
+    def test_rebuild_when_index_broken_or_file_shrank(self):
+        idx = xti.load_index(self.out, today=TODAY)
+        xti.append_rows(self.out, self._day(TODAY), [_row("1", 1, 10), _row("1", 2, 20)], idx)
+        _write(self._day(TODAY), [_row("1", 3, 30)], mode="w")  # 書き直し＝縮んだ
+        idx = xti.load_index(self.out, today=TODAY)
+        self.assertEqual([p[1] for p in idx["ids"]["1"]], [30])
+        (self.out / xti.INDEX_NAME).write_text("{broken")
+        idx = xti.load_index(self.out, today=TODAY)
+        self.assertEqual([p[1] for p in idx["ids"]["1"]], [30])
+
+    def test_max_points_and_eviction(self):
+        rows = [_row("1", h, h * 10) for h in range(30)]
+        _write(self._day(TODAY - dt.timedelta(days=1)), rows)
+        idx = xti.load_index(self.out, today=TODAY)
+        self.assertEqual(len(idx["ids"]["1"]), xti.MAX_POINTS)
+        xti.save_index(self.out, idx)
+        later = xti.load_index(self.out, today=TODAY + dt.timedelta(days=5))
+        self.assertEqual(later["ids"], {})
+        self.assertEqual(later["offsets"], {})
+
+
+class TestVelocity(unittest.TestCase):
+    def _pts(self, rows):
+        return [[r["scraped_at"], r["likes"], r["impressions"]] for r in rows]
+
+    def test_last_matches_old_detect(self):
+        prev = self._pts([_row("1", 0, 100), _row("1", 2, 160)])
+        self.assertEqual(xti.velocity(prev, _row("1", 4, 220), {}), 30.0)
+        # likes 欠測は 0 扱い（旧 detect の `or 0`）
+        self.assertEqual(xti.velocity(self._pts([_row("1", 0, None)]), _row("1", 1, 30), {}), 30.0)
+        # 15分未満は速度ノイズ・数値でない likes は判定しない
+        self.assertIsNone(xti.velocity(prev, _row("1", 2.1, 999), {}))
+        self.assertIsNone(xti.velocity([[prev[-1][0], "12", None]], _row("1", 4, 20), {}))
+        self.assertIsNone(xti.velocity([], _row("1", 4, 20), {}))
+
+    def test_ols_uses_whole_series(self):
+        # 直線的に 20 likes/時で伸びる列に、前回だけ計測ぶれ（+40）が乗っている
+        rows = [_row("1", h, 20 * h) for h in range(5)]
+        rows[-1]["likes"] += 40
+        cfg = {"velocity_model": "ols", "velocity_window_hours": 12}
+        v_last = xti.velocity(self._pts(rows), _row("1", 5, 100), {})
+        v_ols = xti.velocity(self._pts(rows), _row("1", 5, 100), cfg)
+        self.assertAlmostEqual(v_last, -20.0)
+        self.assertGreater(v_ols, 15.0)
+
+    def test_window_limits_points(self):
+        rows = [_row("1", 0, 0), _row("1", 10, 0)]
+        cfg = {"velocity_model": "ols", "velocity_window_hours": 1}
+        self.assertIsNone(xti.velocity(self._pts(rows), _row("1", 12, 100), cfg))
+
+    def test_ewma_weights_recent_segments(self):
+        # 前半は横ばい、直近2時間で加速
+        rows = [_row("1", h, 0) for h in range(0, 5)]
+        cur = _row("1", 6, 120)
+        v_ewma = xti.velocity(self._pts(rows), cur, {"velocity_model": "ewma",
+                                                     "velocity_halflife_hours": 1})
+        v_ols = xti.velocity(self._pts(rows), cur, {"velocity_model": "ols"})
+        self.assertGreater(v_ewma, v_ols)
+
+    def test_unknown_model_raises(self):
+        with self.assertRaises(ValueError):
+            xti.velocity([], _row("1", 1, 1), {"velocity_model": "magic"})
+
+
+if __name__ == "__main__":
+    unittest.main()